@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Per-merchant anomaly baselines at 1M merchants: per-event Python state vs arrays.
+
+Baselines `--merchants` (region, merchant) pairs, half CA and half IN, with one
+event each, then streams `--events` transactions over them (Zipf-skewed
+merchant popularity, log-normal amounts) and scores each one against its
+merchant's baseline two ways:
+
+  python      a dict of per-merchant Python objects (four EWMA sums and a
+              sketch list), scored and updated one event at a time: the
+              straightforward online detector
+  vectorized  `MerchantAnomalyDetector.update` from fraud_radar.anomaly, one
+              call per micro-batch: a batch-wide hash-table probe, then prefix
+              sums over struct-of-arrays state
+
+Reports microseconds per event and events/s per batch size, and memory per
+merchant. The vectorized detector's memory is fixed by its capacity
+(`memory_bytes`). The Python detector's is measured with tracemalloc on a
+`--sample` of merchants. The Python variant runs on fewer events because
+it is slow.
+
+Usage:
+  uv run python -m benchmarks.bench_anomaly
+  uv run python -m benchmarks.bench_anomaly --merchants 1000000 --events 500000 --batch-sizes 256 4096 --json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import time
+import tracemalloc
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from fraud_radar.anomaly import (
+    DEFAULT_ALPHA,
+    MAX_GAP_MS,
+    MIN_HISTORY,
+    MIN_STD,
+    SKETCH_BUCKETS,
+    SKETCH_LOG2_STEP,
+    MerchantAnomalyDetector,
+)
+
+START_MS = 1_763_400_000_000
+
+
+class PythonBaseline:
+    __slots__ = ("events", "last_ts", "sums", "sketch")
+
+    def __init__(self) -> None:
+        self.events = 0
+        self.last_ts = 0
+        self.sums = [0.0, 0.0, 0.0, 0.0]
+        self.sketch = [0.0] * SKETCH_BUCKETS
+
+
+class PythonDetector:
+    """The same scores, one event at a time over a dict of objects."""
+
+    def __init__(self, alpha: float = DEFAULT_ALPHA) -> None:
+        self.alpha = alpha
+        self.state: Dict[Tuple[bytes, bytes], PythonBaseline] = {}
+
+    def update(self, region: bytes, merchant: bytes, ts_ms: int, amount_minor: int) -> Tuple[float, float, float]:
+        state = self.state.get((region, merchant))
+        if state is None:
+            state = self.state[(region, merchant)] = PythonBaseline()
+        beta = 1.0 - self.alpha
+        gap = min(max(ts_ms - state.last_ts, 1), MAX_GAP_MS) if state.events else MAX_GAP_MS
+        pace = math.log1p(3_600_000.0 / gap)
+        x = math.log1p(amount_minor / 100.0)
+        bucket = min(int(math.log2(1.0 + amount_minor) / SKETCH_LOG2_STEP), SKETCH_BUCKETS - 1)
+        scores = (0.0, 0.0, 0.0)
+        if state.events >= MIN_HISTORY:
+            norm = 1.0 - beta**state.events
+            zs = []
+            for value, total, squares in ((x, state.sums[0], state.sums[1]), (pace, state.sums[2], state.sums[3])):
+                mean = total / norm
+                std = math.sqrt(max(squares / norm - mean * mean, 0.0))
+                zs.append(max(-10.0, min(10.0, (value - mean) / max(std, MIN_STD))))
+            share = (sum(state.sketch[bucket + 1 :]) + 0.5 * state.sketch[bucket]) / norm
+            scores = (zs[0], zs[1], -math.log10(min(max(share, 1e-4), 1.0)))
+        for idx, value in enumerate((x, x * x, pace, pace * pace)):
+            state.sums[idx] = beta * state.sums[idx] + self.alpha * value
+        sketch = state.sketch
+        for idx in range(SKETCH_BUCKETS):
+            sketch[idx] *= beta
+        sketch[bucket] += self.alpha
+        state.events += 1
+        state.last_ts = max(state.last_ts, ts_ms)
+        return scores
+
+
+def make_stream(merchants: int, events: int, skew: float, seed: int) -> Tuple[np.ndarray, ...]:
+    rng = np.random.default_rng(seed)
+    ids = np.char.add(b"m-", np.arange(merchants).astype("S14"))
+    regions = np.where(np.arange(merchants) % 2, b"IN", b"CA").astype("S2")
+    popularity = rng.permutation(merchants)
+    pick = popularity[np.minimum(rng.zipf(skew, events), merchants) - 1]
+    ts = START_MS + 60_000 + np.sort(rng.integers(0, 3_600_000, events))
+    amounts = np.maximum(rng.lognormal(7.5, 1.0, events), 1).astype(np.int64)
+    return ids, regions, pick, ts, amounts
+
+
+def check_agreement(seed: int) -> None:
+    """Both variants score a small hot stream (many events per merchant per batch) the same."""
+    ids, regions, pick, ts, amounts = make_stream(50, 5_000, 1.1, seed)
+    vectorized = MerchantAnomalyDetector(64).update(regions[pick], ids[pick], ts, amounts)
+    python = PythonDetector()
+    rows = zip(regions[pick].tolist(), ids[pick].tolist(), ts.tolist(), amounts.tolist())
+    expected = np.array([python.update(*row) for row in rows])
+    assert np.abs(vectorized - expected).max() < 1e-3
+
+
+def python_bytes_per_merchant(sample: int) -> float:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    detector = PythonDetector()
+    for idx in range(sample):
+        detector.update(b"CA", b"m-%d" % idx, START_MS, 5000)
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return used / sample
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark per-merchant anomaly baselines at 1M merchants.")
+    parser.add_argument("--merchants", type=int, default=1_000_000)
+    parser.add_argument("--events", type=int, default=400_000, help="Events per vectorized measurement")
+    parser.add_argument("--python-events", type=int, default=50_000, help="Events for the per-event Python loop")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[256, 4096, 65536])
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent over merchant popularity")
+    parser.add_argument("--sample", type=int, default=100_000, help="Merchants for the Python memory measurement")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    check_agreement(args.seed)
+    ids, regions, pick, ts, amounts = make_stream(args.merchants, args.events, args.skew, args.seed)
+    results: Dict[str, Dict[str, float]] = {}
+
+    detector = MerchantAnomalyDetector(capacity=args.merchants)
+    started = time.perf_counter()
+    detector.update(regions, ids, np.full(args.merchants, START_MS), np.full(args.merchants, 5000))
+    results["insert"] = {"seconds": time.perf_counter() - started, "merchants": len(detector)}
+    results["memory"] = {
+        "vectorized_mb": detector.memory_bytes / 2**20,
+        "vectorized_bytes_per_merchant": detector.memory_bytes / args.merchants,
+        "python_bytes_per_merchant": python_bytes_per_merchant(args.sample),
+    }
+
+    rows: List[Tuple[str, int, float]] = []
+    python = PythonDetector()
+    for region, merchant in zip(regions.tolist(), ids.tolist()):
+        python.state[(region, merchant)] = PythonBaseline()
+    count = min(args.python_events, args.events)
+    sel_regions, sel_ids = regions[pick[:count]].tolist(), ids[pick[:count]].tolist()
+    started = time.perf_counter()
+    for region, merchant, ts_ms, amount in zip(sel_regions, sel_ids, ts[:count].tolist(), amounts[:count].tolist()):
+        python.update(region, merchant, ts_ms, amount)
+    rows.append(("python", 1, (time.perf_counter() - started) / count))
+
+    for batch in args.batch_sizes:
+        # Each batch size continues the same stream on a freshly baselined detector.
+        fresh = MerchantAnomalyDetector(capacity=args.merchants)
+        fresh.update(regions, ids, np.full(args.merchants, START_MS), np.full(args.merchants, 5000))
+        started = time.perf_counter()
+        for start in range(0, args.events, batch):
+            chosen = pick[start : start + batch]
+            fresh.update(regions[chosen], ids[chosen], ts[start : start + batch], amounts[start : start + batch])
+        rows.append(("vectorized", batch, (time.perf_counter() - started) / args.events))
+    for name, batch, seconds in rows:
+        results[f"{name}/{batch}"] = {"us_per_event": seconds * 1e6, "events_per_s": 1 / seconds}
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    memory = results["memory"]
+    print(f"{args.merchants:,} merchants baselined in {results['insert']['seconds']:.2f} s")
+    print(
+        f"memory: {memory['vectorized_mb']:.1f} MB, {memory['vectorized_bytes_per_merchant']:.0f} bytes/merchant "
+        f"(python dict: {memory['python_bytes_per_merchant']:.0f} bytes/merchant)"
+    )
+    print(f"{'variant':<11} {'batch':>6} {'us/event':>9} {'events/s':>12}")
+    for name, batch, _ in rows:
+        row = results[f"{name}/{batch}"]
+        print(f"{name:<11} {batch:>6} {row['us_per_event']:9.2f} {row['events_per_s']:12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Dashboard refresh: full recompute vs incrementally materialized aggregates.
+
+Streams `--hours` of scored CA events (`--rate` per second, Zipf-skewed over
+`--merchants` merchants) and serves dashboard refreshes two ways:
+
+  recompute     every refresh rebuilds the one-hour per-merchant window totals
+                and today's regional DailyAggregate from the retained scored
+                history (bincount per measure over the window, histogram fold
+                over the day)
+  incremental   `DashboardMaterializer` folds each 1 s micro-batch as it is
+                scored; a refresh is `snapshot()`, one copy of the totals
+
+Reports the cost of one refresh at the end of the stream (where history is
+largest), the incremental per-batch update cost, and the refresh CPU per hour
+at the premium (10 s) and standard (60 s) intervals. Both give identical totals.
+
+Usage:
+  uv run python -m benchmarks.bench_dashboard
+  uv run python -m benchmarks.bench_dashboard --merchants 100000 --rate 2000 --hours 4 --json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from typing import Dict
+
+import numpy as np
+
+from fraud_radar.alerts import PREMIUM, STANDARD
+from fraud_radar.dashboard import MEASURES, REFRESH_INTERVAL_S, DashboardMaterializer
+from fraud_radar.events import CA, new_events
+from fraud_radar.retention import DailyAggregate
+from fraud_radar.scoring import APPROVE, BLOCK, ScoredBatch, apply_thresholds
+
+START_MS = 1_763_337_600_000  # 2025-11-17T00:00:00Z
+WINDOW_MS = 3_600_000
+
+
+def recompute(merchant_rows: np.ndarray, ts_ms: np.ndarray, amount_minor: np.ndarray, scores: np.ndarray,
+              merchants: int, now_ms: int) -> np.ndarray:
+    """Window totals and today's aggregate from the scored history."""
+    head = now_ms // 300_000
+    window = ts_ms // 300_000 > head - WINDOW_MS // 300_000
+    rows = merchant_rows[window]
+    decisions = apply_thresholds(scores[window])
+    totals = np.empty((merchants, len(MEASURES)))
+    totals[:, 0] = np.bincount(rows, minlength=merchants)
+    totals[:, 1] = np.bincount(rows, weights=decisions != APPROVE, minlength=merchants)
+    totals[:, 2] = np.bincount(rows, weights=decisions == BLOCK, minlength=merchants)
+    totals[:, 3] = np.bincount(rows, weights=amount_minor[window] / 100.0, minlength=merchants)
+    totals[:, 4] = np.bincount(rows, weights=scores[window], minlength=merchants)
+    DailyAggregate("CA", "2025-11-17").add_columns(amount_minor, scores)
+    return totals
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark dashboard refresh: full recompute vs incremental.")
+    parser.add_argument("--merchants", type=int, default=100_000)
+    parser.add_argument("--rate", type=float, default=1_000.0, help="Scored events per second")
+    parser.add_argument("--hours", type=float, default=2.0, help="History streamed before the measured refresh")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    seconds = int(args.hours * 3600)
+    per_batch = int(args.rate)
+    names = np.char.add(b"m-", np.arange(args.merchants).astype("S8"))
+    popularity = np.arange(1, args.merchants + 1, dtype=np.float64) ** -1.1
+    cdf = np.cumsum(rng.permutation(popularity))
+    cdf /= cdf[-1]
+
+    total = seconds * per_batch
+    merchant_rows = np.minimum(np.searchsorted(cdf, rng.random(total)), args.merchants - 1)
+    ts_ms = START_MS + np.repeat(np.arange(seconds, dtype=np.int64) * 1000, per_batch) + rng.integers(0, 1000, total)
+    amount_minor = (rng.lognormal(3.5, 1.2, total) * 100).astype(np.int64)
+    scores = rng.random(total) ** 3
+
+    materializer = DashboardMaterializer(CA, initial_merchants=args.merchants)
+    # Register every merchant up front (outside the window and the measured day).
+    events = new_events(args.merchants)
+    events["region"], events["merchant_id"], events["ts_ms"] = b"CA", names, START_MS - 86_400_000
+    materializer.update(events, ScoredBatch(np.zeros(args.merchants), np.zeros(args.merchants, np.int8), ""))
+    materializer.days.clear()
+
+    update_s = 0.0
+    batch = new_events(per_batch)
+    batch["region"] = b"CA"
+    for second in range(seconds):
+        rows = slice(second * per_batch, (second + 1) * per_batch)
+        batch["merchant_id"] = names[merchant_rows[rows]]
+        batch["ts_ms"] = ts_ms[rows]
+        batch["amount_minor"] = amount_minor[rows]
+        scored = ScoredBatch(scores[rows], apply_thresholds(scores[rows]), "")
+        started = time.perf_counter()
+        materializer.update(batch, scored)
+        update_s += time.perf_counter() - started
+
+    now_ms = int(ts_ms.max())
+    started = time.perf_counter()
+    expected = recompute(merchant_rows, ts_ms, amount_minor, scores, args.merchants, now_ms)
+    recompute_s = time.perf_counter() - started
+    started = time.perf_counter()
+    snapshot = materializer.snapshot()
+    snapshot_s = time.perf_counter() - started
+    order = np.array([snapshot.merchant_index[name] for name in names.tolist()])
+    assert np.allclose(snapshot.merchant_totals[order], expected)
+    assert snapshot.today is not None and snapshot.today.transactions == total
+
+    results: Dict[str, Dict[str, float]] = {}
+    for name, refresh_s in (("recompute", recompute_s), ("incremental", snapshot_s)):
+        results[name] = {
+            "refresh_ms": refresh_s * 1000,
+            "update_us_per_batch": update_s / seconds * 1e6 if name == "incremental" else 0.0,
+            "premium_cpu_s_per_hour": refresh_s * 3600 / REFRESH_INTERVAL_S[PREMIUM],
+            "standard_cpu_s_per_hour": refresh_s * 3600 / REFRESH_INTERVAL_S[STANDARD],
+        }
+    results["incremental"]["premium_cpu_s_per_hour"] += update_s / args.hours
+    results["incremental"]["standard_cpu_s_per_hour"] += update_s / args.hours
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{args.merchants} merchants, {total} scored events over {args.hours:g} h; refresh at the end of the stream")
+    print("(incremental CPU/hour includes folding every batch, which both tiers share)")
+    print(f"{'variant':<12} {'refresh ms':>11} {'update us/batch':>16} {'premium cpu s/h':>16} {'standard cpu s/h':>17}")
+    for name, row in results.items():
+        print(f"{name:<12} {row['refresh_ms']:11.2f} {row['update_us_per_batch']:16.1f} "
+              f"{row['premium_cpu_s_per_hour']:16.1f} {row['standard_cpu_s_per_hour']:17.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+DNS allowlist lookup: linear rule scan vs the compiled label trie.
+
+Builds a regional resolver policy with `--rules` allow/deny patterns (merchant
+webhook domains, half exact names and half `*.` suffixes, plus the default
+deny rules) and times one policy decision per query three ways:
+
+  linear    every rule checked against the name (exact match or suffix),
+            most specific wins, deny wins ties: the same decision as the trie
+  trie      `RuleTrie.match` from fraud_radar.dns: one dict step per label
+  cached    `Resolver.resolve` with the answer already in its TTL/LRU cache
+            (includes the clock read and cache lock)
+
+for queried names of several label counts. Trie time should stay flat as
+the rule count grows and rise only with the number of labels. Linear time
+grows with the rule count. The linear scan is timed on fewer queries, once,
+because it is slow.
+
+Usage:
+  uv run python -m benchmarks.bench_dns
+  uv run python -m benchmarks.bench_dns --rules 100 10000 100000 --labels 3 8 16 32 --json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+from dataclasses import replace
+from typing import Callable, Dict, List, Optional, Sequence
+
+from fraud_radar.dns import ALLOW, DEFAULT_POLICIES, DENY, Resolver, Rule, RuleTrie, normalize
+
+
+def linear(rules: Sequence[Rule]) -> Callable[[str], Optional[Rule]]:
+    """The per-lookup scan a resolver without a compiled rule set does."""
+    compiled = [(rule.pattern.startswith("*."), rule.pattern.removeprefix("*."), rule) for rule in rules]
+
+    def match(name: str) -> Optional[Rule]:
+        best, depth = None, -1
+        for subtree, suffix, rule in compiled:
+            if subtree:
+                hit = name.endswith("." + suffix)
+                specificity = suffix.count(".") * 2 + 1
+            else:
+                hit = name == suffix
+                specificity = suffix.count(".") * 2 + 2
+            if hit and (specificity > depth or (specificity == depth and rule.action == DENY)):
+                best, depth = rule, specificity
+        return best
+
+    return match
+
+
+def make_rules(count: int, rng: random.Random) -> List[Rule]:
+    rules = []
+    for idx in range(count):
+        domain = f"m{idx}.hooks-{rng.randrange(1000)}.example.in"
+        if idx % 2:
+            rules.append(Rule(f"*.{domain}", ALLOW, f"*.{domain}"))
+        else:
+            rules.append(Rule(f"webhooks.{domain}", ALLOW, f"webhooks.{domain}"))
+    return rules
+
+
+def make_names(rules: Sequence[Rule], labels: int, count: int, rng: random.Random) -> List[str]:
+    names = []
+    for _ in range(count):
+        base = rng.choice(rules).pattern.removeprefix("*.") if rng.random() < 0.75 else "cdn.example.com"
+        parts = base.split(".")
+        while len(parts) < labels:
+            parts.insert(0, f"x{rng.randrange(10_000)}")
+        names.append(".".join(parts[-labels:] if len(parts) > labels else parts))
+    return names
+
+
+def _time(match: Callable[[str], object], names: Sequence[str], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for name in names:
+            match(name)
+        best = min(best, time.perf_counter() - started)
+    return best / len(names)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark DNS allowlist lookup: linear scan vs compiled trie.")
+    parser.add_argument("--rules", type=int, nargs="+", default=[100, 10_000, 100_000])
+    parser.add_argument("--labels", type=int, nargs="+", default=[3, 8, 16, 32], help="Labels per queried name")
+    parser.add_argument("--queries", type=int, default=20_000, help="Queries per trie / cached measurement")
+    parser.add_argument("--linear-queries", type=int, default=50, help="Queries per linear-scan measurement")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    base = DEFAULT_POLICIES[0]
+    results: Dict[str, Dict[str, float]] = {}
+    for count in args.rules:
+        extra = make_rules(count, rng)
+        policy = replace(base, allow=base.allow + tuple(rule.pattern for rule in extra))
+        rules = policy.rules()
+        trie = RuleTrie(rules)
+        scan = linear(rules)
+        resolver = Resolver(policy, cache_size=args.queries)
+        for labels in args.labels:
+            names = make_names(extra, labels, args.queries, rng)
+            probe = [normalize(name) for name in names[: args.linear_queries]]
+            assert all(scan(name) == trie.match(name) for name in probe)
+            resolver.resolve_many(names)
+            for name, match, queries in (
+                ("linear", scan, probe),
+                ("trie", trie.match, names),
+                ("cached", resolver.resolve, names),
+            ):
+                repeat = 1 if name == "linear" else args.repeat
+                results[f"{count}/{labels}/{name}"] = {"us_per_lookup": _time(match, queries, repeat) * 1e6}
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'rules':>8} {'labels':>7} {'variant':<8} {'us/lookup':>11}")
+    for key, row in results.items():
+        count, labels, name = key.split("/")
+        print(f"{count:>8} {labels:>7} {name:<8} {row['us_per_lookup']:11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for the region-partitioned event stream.
+
+Pushes synthetic ingress events through one partition on one core (producer
+and consumer interleaved on the same thread) at several publish batch sizes and
+reports events/sec against the 1M events/sec per-partition target. A second
+run routes mixed CA/IN batches through `EventBus.route`.
+
+Usage:
+  uv run python -m benchmarks.bench_events
+  uv run python -m benchmarks.bench_events --events 2000000 --batch-sizes 64 1024 --report reports/bench_events.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+from fraud_radar.events import CA, IN, EventBus, Partition, RegionBatch, new_events
+
+TARGET_EVENTS_PER_S = 1_000_000
+
+
+def synthetic_events(count: int, seed: int, regions: List[bytes]) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    events = new_events(count)
+    events["event_id"] = np.arange(count, dtype=np.uint64)
+    events["ts_ms"] = 1_763_400_000_000 + np.arange(count)
+    events["region"] = np.array(regions, dtype="S2")[rng.integers(0, len(regions), count)]
+    events["tier"] = rng.random(count) < 0.2
+    events["currency"] = np.where(events["region"] == b"CA", b"CAD", b"INR")
+    events["amount_minor"] = rng.integers(100, 500_000, count)
+    events["merchant_id"] = np.char.add(b"m-", rng.integers(0, 50_000, count).astype("S10"))
+    events["card_token"] = np.char.add(b"tok_", rng.integers(0, 2**62, count).astype("S20"))
+    events["device_hash"] = np.char.add(b"d", rng.integers(0, 2**40, count).astype("S15"))
+    return events
+
+
+def run_partition(events: np.ndarray, batch_size: int, capacity: int) -> float:
+    partition = Partition(CA, capacity=capacity)
+    batches = [RegionBatch(CA, events[i : i + batch_size]) for i in range(0, len(events), batch_size)]
+    checksum = 0
+    start = time.perf_counter()
+    for batch in batches:
+        written = partition.try_publish(batch)
+        while written < len(batch):
+            view = partition.poll(capacity)
+            checksum += int(view["amount_minor"][-1]) if len(view) else 0
+            partition.commit(len(view))
+            written += partition.try_publish(RegionBatch(CA, batch.records[written:]))
+    while len(partition):
+        partition.commit(len(partition.poll(capacity)))
+    elapsed = time.perf_counter() - start
+    assert partition.stats.consumed == len(events), checksum
+    return len(events) / elapsed
+
+
+def run_router(events: np.ndarray, batch_size: int, capacity: int) -> float:
+    bus = EventBus(capacity=capacity)
+    start = time.perf_counter()
+    for i in range(0, len(events), batch_size):
+        bus.route(events[i : i + batch_size])
+        for region in (CA, IN):
+            partition = bus.partition(region)
+            while len(partition):
+                partition.commit(len(partition.poll(capacity)))
+    return len(events) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the region-partitioned event stream.")
+    parser.add_argument("--events", type=int, default=1_000_000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 64, 256, 1024, 8192])
+    parser.add_argument("--capacity", type=int, default=1 << 16, help="Ring capacity per partition (records)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--report", type=Path, help="Write the results here as JSON")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    ca_events = synthetic_events(args.events, args.seed, [b"CA"])
+    mixed = synthetic_events(args.events, args.seed, [b"CA", b"IN"])
+    rows: List[Dict[str, Any]] = []
+    for batch_size in args.batch_sizes:
+        # Single-record publishing is far slower; keep its run short.
+        count = args.events if batch_size >= 64 else min(args.events, 100_000)
+        rows.append({
+            "batch_size": batch_size,
+            "partition_events_per_s": run_partition(ca_events[:count], batch_size, args.capacity),
+            "router_events_per_s": run_router(mixed[:count], batch_size, args.capacity),
+        })
+        rows[-1]["meets_target"] = rows[-1]["partition_events_per_s"] >= TARGET_EVENTS_PER_S
+
+    if args.report is not None:
+        args.report.parent.mkdir(parents=True, exist_ok=True)
+        args.report.write_text(json.dumps(rows, indent=2) + "\n", encoding="utf-8")
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+
+    print(f"record size {ca_events.dtype.itemsize} bytes, ring capacity {args.capacity} records")
+    print(f"{'batch':>6} {'partition ev/s':>16} {'routed ev/s':>14}")
+    for row in rows:
+        flag = "" if row["meets_target"] else "  (below 1M/s target)"
+        print(f"{row['batch_size']:>6} {row['partition_events_per_s']:>16,.0f} {row['router_events_per_s']:>14,.0f}{flag}")
+
+
+if __name__ == "__main__":
+    main()
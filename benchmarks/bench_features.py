@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Latency and throughput benchmark for the rolling-window feature engine.
+
+Streams synthetic ingest events (tokenized cards and devices drawn from a fixed
+keyspace, timestamps advancing across several hours) through `FeatureEngine`
+at several batch sizes and reports events/sec plus p50/p99 per-batch latency
+against the spec's 80 ms feature budget.
+
+Usage:
+  uv run python -m benchmarks.bench_features
+  uv run python -m benchmarks.bench_features --cards 200000 --capacity 262144 --report reports/bench_features.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+from benchmarks.bench_events import synthetic_events
+from fraud_radar.features import FeatureEngine
+
+FEATURE_BUDGET_MS = 80.0
+
+
+def keyed_events(count: int, cards: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    events = synthetic_events(count, seed, [b"CA", b"IN"])
+    # Zipf-ish reuse: a few hot cards, a long tail of occasional ones.
+    card_ids = np.minimum(rng.zipf(1.3, count), cards) - 1
+    events["card_token"] = np.char.add(b"tok_", card_ids.astype("S20"))
+    events["device_hash"] = np.char.add(b"d", (card_ids * 7 % (cards * 2)).astype("S15"))
+    events["ts_ms"] = 1_763_400_000_000 + np.sort(rng.integers(0, 6 * 3_600_000, count))
+    return events
+
+
+def run(events: np.ndarray, batch_size: int, capacity: int) -> Dict[str, Any]:
+    engine = FeatureEngine(card_capacity=capacity, device_capacity=capacity)
+    timings: List[float] = []
+    start = time.perf_counter()
+    for i in range(0, len(events), batch_size):
+        t0 = time.perf_counter_ns()
+        engine.transform(events[i : i + batch_size])
+        timings.append((time.perf_counter_ns() - t0) / 1e6)
+    elapsed = time.perf_counter() - start
+    p50, p99 = np.percentile(timings, [50, 99]).tolist()
+    return {
+        "batch_size": batch_size,
+        "events_per_s": len(events) / elapsed,
+        "p50_ms": p50,
+        "p99_ms": p99,
+        "within_budget": p99 < FEATURE_BUDGET_MS,
+        "cards_held": len(engine.cards),
+        "evictions": engine.cards.evictions,
+        "store_mb": (engine.cards.memory_bytes + engine.devices.memory_bytes + engine.merchants.memory_bytes) / 2**20,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the rolling-window feature engine.")
+    parser.add_argument("--events", type=int, default=500_000)
+    parser.add_argument("--cards", type=int, default=100_000, help="Distinct card tokens in the keyspace")
+    parser.add_argument("--capacity", type=int, default=1 << 16, help="Slots per store (cards, devices)")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 64, 1024, 4096])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--report", type=Path, help="Write the results here as JSON")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    events = keyed_events(args.events, args.cards, args.seed)
+    rows = []
+    for batch_size in args.batch_sizes:
+        # Per-event calls are dominated by fixed overhead; keep that run short.
+        count = args.events if batch_size >= 64 else min(args.events, 20_000)
+        rows.append(run(events[:count], batch_size, args.capacity))
+
+    if args.report is not None:
+        args.report.parent.mkdir(parents=True, exist_ok=True)
+        args.report.write_text(json.dumps(rows, indent=2) + "\n", encoding="utf-8")
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+
+    print(f"{args.cards} card tokens, {args.capacity} slots per store")
+    print(f"{'batch':>6} {'events/s':>12} {'p50 ms':>9} {'p99 ms':>9} {'evictions':>10} {'store MB':>9}")
+    for row in rows:
+        flag = "" if row["within_budget"] else "  (over 80 ms budget)"
+        print(
+            f"{row['batch_size']:>6} {row['events_per_s']:>12,.0f} {row['p50_ms']:>9.3f} "
+            f"{row['p99_ms']:>9.3f} {row['evictions']:>10} {row['store_mb']:>9.1f}{flag}"
+        )
+
+
+if __name__ == "__main__":
+    main()
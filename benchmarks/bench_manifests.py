@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Wall-time benchmark for validating a tree of per-stack manifests.
+
+Builds a temporary tree of project3.yaml copies whose policies point at one
+shared policy/ directory (with one stack drifting to its own log policy), then
+times a shell-style loop of `--path` invocations against a single `--root` run.
+
+Usage:
+  uv run python -m benchmarks.bench_manifests
+  uv run python -m benchmarks.bench_manifests --manifests 50 --processes 4
+"""
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+VALIDATOR = REPO_ROOT / "tools" / "validate_manifest.py"
+POLICY_FILES = (
+    "terms_of_service.md",
+    "privacy_addendum.md",
+    "dns_policy.md",
+    "log_retention_policy.md",
+    "data_handling_policy.md",
+)
+
+
+def build_tree(root: Path, count: int) -> List[Path]:
+    template = (REPO_ROOT / "project3.yaml").read_text(encoding="utf-8")
+    (root / "policy").mkdir()
+    for name in POLICY_FILES:
+        (root / "policy" / name).write_text(f"# {name}\n", encoding="utf-8")
+    manifests = []
+    for idx in range(count):
+        stack = root / "stacks" / f"team-{idx:03d}"
+        stack.mkdir(parents=True)
+        text = template.replace('"policy/', '"../../policy/')
+        if idx == count - 1:
+            # One stack drifts to its own log policy; --root should flag it.
+            text = text.replace("../../policy/log_retention_policy.md", "policy/log_retention_policy.md")
+            (stack / "policy").mkdir()
+            (stack / "policy" / "log_retention_policy.md").write_text("# local\n", encoding="utf-8")
+        path = stack / "project3.yaml"
+        path.write_text(text, encoding="utf-8")
+        manifests.append(path)
+    return manifests
+
+
+def _run(args: List[str]) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, str(VALIDATOR), *args], capture_output=True, text=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark multi-manifest validation.")
+    parser.add_argument("--manifests", type=int, default=200, help="Number of stack manifests to generate")
+    parser.add_argument("--processes", type=int, default=None, help="--processes passed to the --root run")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        manifests = build_tree(root, args.manifests)
+
+        start = time.perf_counter()
+        for path in manifests:
+            _run(["--path", str(path), "--check-paths", "--no-cache"])
+        loop_s = time.perf_counter() - start
+
+        extra = ["--processes", str(args.processes)] if args.processes else []
+        start = time.perf_counter()
+        batch = _run(["--root", str(root), "--check-paths", "--no-cache", *extra])
+        batch_s = time.perf_counter() - start
+
+    print(f"{len(manifests)} manifests")
+    print(f"{'shell loop (--path)':>22}: {loop_s:8.2f} s")
+    print(f"{'single run (--root)':>22}: {batch_s:8.2f} s")
+    print(f"{'speedup':>22}: {loop_s / batch_s:8.1f}x")
+    print(batch.stdout.strip().splitlines()[-1] if batch.stdout.strip() else batch.stderr.strip())
+
+
+if __name__ == "__main__":
+    main()
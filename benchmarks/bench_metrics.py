@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark of metrics recording on the scoring hot path.
+
+Times one `record()` call for:
+
+  list_append       bare list.append (the floor for any Python recorder)
+  sorted_insort     bisect.insort into a sorted sample list (exact quantiles)
+  histogram         `LatencyHistogram` with batched folds (the default)
+  windowed          `WindowedHistogram` (sliding 10 s window)
+  counter           `Counter.inc`
+  slo               `BurnRateTracker.record`
+
+and then checks mergeability: per-region histograms from several worker
+"processes" (pickled round trip) are pooled and their p99 compared with the
+exact pooled p99 and with the naive average of per-region p99s.
+
+Usage:
+  uv run python -m benchmarks.bench_metrics
+  uv run python -m benchmarks.bench_metrics --calls 2000000 --json
+"""
+from __future__ import annotations
+
+import argparse
+import bisect
+import json
+import pickle
+import time
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from fraud_radar.metrics import BurnRateTracker, Counter, LatencyHistogram, WindowedHistogram, merge_histograms
+
+
+def _time_calls(record: Callable[[float], None], values: List[float]) -> float:
+    started = time.perf_counter()
+    for value in values:
+        record(value)
+    return (time.perf_counter() - started) / len(values) * 1e9
+
+
+def _time_loop(values: List[float]) -> float:
+    started = time.perf_counter()
+    for _ in values:
+        pass
+    return (time.perf_counter() - started) / len(values) * 1e9
+
+
+def record_overhead(calls: int, seed: int) -> Dict[str, float]:
+    values = np.random.default_rng(seed).lognormal(np.log(0.03), 0.6, calls).tolist()
+    loop_only = _time_loop(values)
+    samples: List[float] = []
+    ordered: List[float] = []
+    counter = Counter()
+    slo = BurnRateTracker()
+    recorders: Dict[str, Callable[[float], None]] = {
+        "list_append": samples.append,
+        "sorted_insort": lambda value: bisect.insort(ordered, value),
+        "histogram": LatencyHistogram().record,
+        "windowed": WindowedHistogram().record,
+        "counter": lambda value: counter.inc(),
+        "slo": lambda value: slo.record(value < 0.2),
+    }
+    # Per-call cost, call overhead included, net of the bare loop.
+    results: Dict[str, float] = {}
+    for name, record in recorders.items():
+        subset = values if name != "sorted_insort" else values[: min(calls, 200_000)]
+        results[name] = max(0.0, _time_calls(record, subset) - loop_only)
+    return results
+
+
+def merge_accuracy(regions: int, workers: int, per_worker: int, seed: int) -> Dict[str, float]:
+    rng = np.random.default_rng(seed)
+    shipped: List[LatencyHistogram] = []
+    region_p99: List[float] = []
+    pooled: List[np.ndarray] = []
+    for region in range(regions):
+        # Regions differ in scale and traffic, which is what breaks averaging.
+        scale = 0.02 * (region + 1)
+        region_values = []
+        for _ in range(workers):
+            values = rng.lognormal(np.log(scale), 0.5, per_worker * (region + 1))
+            histogram = LatencyHistogram()
+            histogram.record_many(values)
+            shipped.append(pickle.loads(pickle.dumps(histogram)))
+            region_values.append(values)
+        merged_region = np.concatenate(region_values)
+        region_p99.append(float(np.quantile(merged_region, 0.99)))
+        pooled.append(merged_region)
+    exact = float(np.quantile(np.concatenate(pooled), 0.99))
+    merged = merge_histograms(shipped).quantile(0.99) or 0.0
+    averaged = float(np.mean(region_p99))
+    return {
+        "exact_p99_s": exact,
+        "merged_p99_s": merged,
+        "merged_error_pct": abs(merged - exact) / exact * 100,
+        "averaged_p99_s": averaged,
+        "averaged_error_pct": abs(averaged - exact) / exact * 100,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark metrics record() overhead and histogram merging.")
+    parser.add_argument("--calls", type=int, default=1_000_000, help="record() calls per variant")
+    parser.add_argument("--regions", type=int, default=2)
+    parser.add_argument("--workers", type=int, default=4, help="Worker histograms per region")
+    parser.add_argument("--per-worker", type=int, default=50_000, help="Samples per worker (scaled by region)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = {
+        "record_ns": record_overhead(args.calls, args.seed),
+        "merge": merge_accuracy(args.regions, args.workers, args.per_worker, args.seed),
+    }
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'recorder':<16} {'ns/call':>8}")
+    for name, ns in results["record_ns"].items():
+        print(f"{name:<16} {ns:8.0f}")
+    merge = results["merge"]
+    print(
+        f"\npooled p99 over {args.regions} regions x {args.workers} workers: exact {merge['exact_p99_s'] * 1000:.1f} ms, "
+        f"merged {merge['merged_p99_s'] * 1000:.1f} ms ({merge['merged_error_pct']:.2f} % off), "
+        f"averaged {merge['averaged_p99_s'] * 1000:.1f} ms ({merge['averaged_error_pct']:.1f} % off)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Load-curve simulation for premium fanout overload protection.
+
+Replays scoring and premium-alert load curves through a fluid model of one
+scoring node on a virtual clock: scoring requests and premium webhook
+deliveries share `--cores` of CPU through one run queue, so every premium
+delivery started adds queueing delay to the scoring requests behind it.
+Premium deliveries are admitted by one of:
+
+  uncapped        every queued premium alert starts immediately
+  static-N        a fixed worker cap of N deliveries in flight
+  aimd / gradient `PremiumGuard` with that limit algorithm and its breaker
+
+and each curve reports scoring p50/p99, the share of scoring requests over
+the 200 ms p99 target, premium shed rate and premium queueing delay.
+
+Usage:
+  uv run python -m benchmarks.bench_overload
+  uv run python -m benchmarks.bench_overload --curve spike --duration 300 --json
+"""
+from __future__ import annotations
+
+import argparse
+import heapq
+import json
+import math
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from fraud_radar.alerts import FanoutConfig
+from fraud_radar.overload import AIMDLimit, GradientLimit, GuardConfig, PremiumGuard
+
+TICK_S = 0.01
+
+# name -> (scoring requests/s, premium alerts/s) as a function of time and duration.
+Curve = Callable[[float, float], Tuple[float, float]]
+
+
+def _steady(t: float, duration: float) -> Tuple[float, float]:
+    return 1000.0, 150.0
+
+
+def _ramp(t: float, duration: float) -> Tuple[float, float]:
+    rate = 500.0 + 1300.0 * t / duration
+    return rate, 0.15 * rate
+
+
+def _spike(t: float, duration: float) -> Tuple[float, float]:
+    # chaos experiment 2: a premium burst on top of normal scoring peak.
+    burst = 0.35 * duration <= t < 0.5 * duration
+    return 1200.0, 900.0 if burst else 150.0
+
+
+def _diurnal(t: float, duration: float) -> Tuple[float, float]:
+    rate = 1100.0 + 700.0 * math.sin(2 * math.pi * t / duration)
+    return rate, 0.15 * rate
+
+
+CURVES: Dict[str, Curve] = {"steady": _steady, "ramp": _ramp, "spike": _spike, "diurnal": _diurnal}
+
+
+@dataclass
+class NodeModel:
+    cores: int = 8
+    scoring_cpu_ms: float = 4.0
+    scoring_base_ms: float = 25.0
+    premium_cpu_ms: float = 9.0
+    premium_wall_ms: float = 120.0
+    premium_capacity: int = FanoutConfig().premium_capacity
+
+
+class VirtualClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def simulate(curve: Curve, strategy: str, duration: float, model: NodeModel, seed: int) -> Dict[str, float]:
+    rng = np.random.default_rng(seed)
+    clock = VirtualClock()
+    guard: Optional[PremiumGuard] = None
+    cap = math.inf
+    if strategy in ("aimd", "gradient"):
+        algorithm = AIMDLimit() if strategy == "aimd" else GradientLimit()
+        guard = PremiumGuard(GuardConfig(), algorithm, clock=clock, on_change=lambda *_: None)
+    elif strategy.startswith("static-"):
+        cap = int(strategy.split("-", 1)[1])
+
+    backlog_ms = 0.0  # CPU work queued on the node
+    capacity_ms = model.cores * TICK_S * 1000.0
+    premium_queue: List[float] = []  # enqueue times, FIFO via index
+    head = 0
+    inflight: List[float] = []  # completion times (heap)
+    latencies: List[np.ndarray] = []
+    delays: List[float] = []
+    offered = shed = 0
+    limits: List[float] = []
+
+    for step in range(int(duration / TICK_S)):
+        clock.now = step * TICK_S
+        scoring_rate, premium_rate = curve(clock.now, duration)
+
+        while inflight and inflight[0] <= clock.now:
+            heapq.heappop(inflight)
+            if guard is not None:
+                guard.release()
+
+        arrivals = int(rng.poisson(premium_rate * TICK_S))
+        offered += arrivals
+        room = model.premium_capacity - (len(premium_queue) - head)
+        shed += max(0, arrivals - room)
+        premium_queue.extend([clock.now] * min(arrivals, room))
+
+        while head < len(premium_queue):
+            if guard is not None:
+                if not guard.try_acquire():
+                    break
+            elif len(inflight) >= cap:
+                break
+            delays.append(clock.now - premium_queue[head])
+            head += 1
+            heapq.heappush(inflight, clock.now + model.premium_wall_ms / 1000.0)
+            backlog_ms += model.premium_cpu_ms
+        if head > 4096:
+            del premium_queue[:head]
+            head = 0
+
+        requests = int(rng.poisson(scoring_rate * TICK_S))
+        if requests:
+            wait_ms = backlog_ms / model.cores
+            service = model.scoring_base_ms + rng.exponential(model.scoring_base_ms / 4, requests)
+            sample = (wait_ms + service) / 1000.0
+            latencies.append(sample)
+            if guard is not None:
+                guard.record_scoring_many(sample)
+            backlog_ms += requests * model.scoring_cpu_ms
+        backlog_ms = max(0.0, backlog_ms - capacity_ms)
+        if guard is not None:
+            limits.append(guard.limit)
+
+    scoring = np.concatenate(latencies) if latencies else np.zeros(1)
+    p50, p99 = np.percentile(scoring, [50, 99])
+    return {
+        "scoring_p50_ms": float(p50) * 1000,
+        "scoring_p99_ms": float(p99) * 1000,
+        "scoring_over_target_pct": float((scoring > GuardConfig().p99_target_s).mean() * 100),
+        "premium_offered": float(offered),
+        "premium_shed_pct": 100.0 * shed / offered if offered else 0.0,
+        "premium_started": float(len(delays)),
+        "premium_delay_p95_s": float(np.percentile(delays, 95)) if delays else 0.0,
+        "breaker_opens": float(guard.breaker.opens) if guard is not None else 0.0,
+        "mean_limit": float(np.mean(limits)) if limits else (cap if cap != math.inf else 0.0),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Simulate premium fanout overload protection over load curves.")
+    parser.add_argument("--curve", choices=sorted(CURVES), action="append", help="Curve(s) to replay (default: all)")
+    parser.add_argument(
+        "--strategy",
+        action="append",
+        help="uncapped, static-N, aimd or gradient (default: uncapped, static-8, static-32, aimd, gradient)",
+    )
+    parser.add_argument("--duration", type=float, default=120.0, help="Simulated seconds per curve")
+    parser.add_argument("--cores", type=int, default=NodeModel.cores)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    curves = args.curve or sorted(CURVES)
+    strategies = args.strategy or ["uncapped", "static-8", "static-32", "aimd", "gradient"]
+    for strategy in strategies:
+        if strategy not in ("uncapped", "aimd", "gradient") and not (
+            strategy.startswith("static-") and strategy[len("static-") :].isdigit()
+        ):
+            raise SystemExit(f"Unknown strategy `{strategy}`.")
+    model = NodeModel(cores=args.cores)
+
+    results: Dict[str, Dict[str, Dict[str, float]]] = {
+        curve: {strategy: simulate(CURVES[curve], strategy, args.duration, model, args.seed) for strategy in strategies}
+        for curve in curves
+    }
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    header = f"{'curve':<8} {'strategy':<10} {'p50 ms':>8} {'p99 ms':>8} {'>200ms %':>9} {'shed %':>7} {'delay p95 s':>12} {'opens':>6} {'limit':>6}"
+    print(header)
+    print("-" * len(header))
+    for curve, by_strategy in results.items():
+        for strategy, row in by_strategy.items():
+            print(
+                f"{curve:<8} {strategy:<10} {row['scoring_p50_ms']:8.1f} {row['scoring_p99_ms']:8.1f} "
+                f"{row['scoring_over_target_pct']:9.2f} {row['premium_shed_pct']:7.1f} "
+                f"{row['premium_delay_p95_s']:12.2f} {row['breaker_opens']:6.0f} {row['mean_limit']:6.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+End-to-end pipeline latency against the spec budgets, across offered load.
+
+Replays `--duration` seconds of seeded synthetic CA/IN traffic
+(`fraud_radar.traffic`) through `fraud_radar.loadtest` at each `--rates`
+baseline rate and reports the budgeted percentile of every stage:
+
+  ingestion p95 < 120 ms, features p95 < 80 ms, scoring p99 < 200 ms,
+  detection (ingest -> score) p99 <= 400 ms, premium webhook p95 < 10 s and
+  p99 < 15 s, standard dashboard p99 <= 180 s
+
+The last rate that passes every budget is the headroom of this host. The
+per-rate reports are written to `--report` as JSON; the run exits 1 when the
+first rate (the expected production load) misses a budget.
+
+Usage:
+  uv run python -m benchmarks.bench_pipeline
+  uv run python -m benchmarks.bench_pipeline --rates 1000 4000 16000 --duration 20 --report pipeline.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+from typing import Dict, List
+
+from fraud_radar.loadtest import LoadTestConfig, run_load_test
+from fraud_radar.traffic import TrafficProfile, generate
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark end-to-end pipeline latency against the spec budgets.")
+    parser.add_argument("--rates", type=float, nargs="+", default=[500.0, 2_000.0, 8_000.0],
+                        help="Baseline transactions per second to offer, in increasing order")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of traffic per rate")
+    parser.add_argument("--premium-share", type=float, default=0.2)
+    parser.add_argument("--bursts-per-min", type=float, default=6.0, help="Fraud bursts per minute")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--report", type=Path, help="Write every rate's report here as JSON")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    documents: List[Dict[str, object]] = []
+    for rate in args.rates:
+        profile = TrafficProfile(
+            rate_per_s=rate, premium_share=args.premium_share, fraud_bursts_per_min=args.bursts_per_min
+        )
+        report = run_load_test(generate(profile, args.duration, seed=args.seed), LoadTestConfig())
+        documents.append({"rate_per_s": rate, **report.to_json()})
+    if args.report is not None:
+        args.report.write_text(json.dumps(documents, indent=2) + "\n", encoding="utf-8")
+
+    if args.json:
+        print(json.dumps(documents, indent=2))
+    else:
+        budgets = [check["stage"] + " p" + format(check["quantile"] * 100, "g") for check in documents[0]["budgets"]]
+        print(f"{args.duration:g} s of traffic per rate; budgeted percentile per stage in ms")
+        print(f"{'rate/s':>8} {'events':>8} {'dropped':>8} " + " ".join(f"{name:>22}" for name in budgets) + "  passed")
+        for document in documents:
+            cells = []
+            for check in document["budgets"]:
+                observed = check["observed_s"]
+                mark = "" if check["passed"] else " !"
+                cells.append(f"{observed * 1000:20.1f}{mark:2}" if observed is not None else f"{'-':>22}")
+            print(f"{document['rate_per_s']:8.0f} {document['events']:8d} {document['dropped']:8d} "
+                  + " ".join(cells) + f"  {document['passed']}")
+    if not documents[0]["passed"]:
+        raise SystemExit(f"Spec budgets missed at {args.rates[0]:g} transactions/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Per-decision cost of per-tenant rate limiting at 100k tenants.
+
+Replays a skewed request stream (a few hot merchants, a long tail) in
+micro-batches on a virtual clock through:
+
+  dict_lock   a dict of per-tenant bucket objects behind one global lock
+              (the design this replaces)
+  scalar      `TenantRateLimiter.try_acquire`, one call per request
+  bulk        `TenantRateLimiter.admit_many`, one call per micro-batch
+
+and reports ns per decision, the admitted share (all three must agree) and
+the memory held per tenant.
+
+Usage:
+  uv run python -m benchmarks.bench_ratelimit
+  uv run python -m benchmarks.bench_ratelimit --tenants 500000 --batch 1024 --json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import threading
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from fraud_radar.ratelimit import TenantLimit, TenantRateLimiter
+
+
+class _Bucket:
+    __slots__ = ("tokens", "stamp")
+
+    def __init__(self, burst: float, now: float) -> None:
+        self.tokens = burst
+        self.stamp = now
+
+
+class DictLockLimiter:
+    def __init__(self, limit: TenantLimit) -> None:
+        self.limit = limit
+        self.buckets: Dict[str, _Bucket] = {}
+        self.lock = threading.Lock()
+
+    def try_acquire(self, tenant: str, now: float) -> bool:
+        with self.lock:
+            bucket = self.buckets.get(tenant)
+            if bucket is None:
+                bucket = self.buckets[tenant] = _Bucket(self.limit.burst, now)
+            bucket.tokens = min(self.limit.burst, bucket.tokens + (now - bucket.stamp) * self.limit.rate_per_s)
+            bucket.stamp = now
+            if bucket.tokens >= 1.0:
+                bucket.tokens -= 1.0
+                return True
+            return False
+
+
+def _stream(tenants: int, requests: int, batch: int, seed: int) -> List[List[str]]:
+    rng = np.random.default_rng(seed)
+    names = [f"merchant-{i:06d}" for i in range(tenants)]
+    # Zipf-like skew: rank r gets weight 1/r.
+    ranks = np.minimum(rng.zipf(1.2, requests), tenants) - 1
+    ids = rng.permutation(tenants)[ranks]
+    return [[names[i] for i in ids[start : start + batch]] for start in range(0, requests, batch)]
+
+
+def _run(decide: Callable[[List[str], float], int], batches: List[List[str]], tick_s: float) -> Dict[str, float]:
+    admitted = 0
+    started = time.perf_counter()
+    for step, batch in enumerate(batches):
+        admitted += decide(batch, step * tick_s)
+    elapsed = time.perf_counter() - started
+    decisions = sum(len(batch) for batch in batches)
+    return {"ns_per_decision": elapsed / decisions * 1e9, "admitted_pct": 100.0 * admitted / decisions}
+
+
+def _traced_bytes(build: Callable[[], object]) -> int:
+    tracemalloc.start()
+    kept = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return current
+
+
+def run(args: argparse.Namespace) -> Dict[str, Dict[str, float]]:
+    limit = TenantLimit(args.rate, args.burst)
+    batches = _stream(args.tenants, args.requests, args.batch, args.seed)
+    warm = [f"merchant-{i:06d}" for i in range(args.tenants)]
+    tick_s = args.batch / args.rps
+
+    baseline = DictLockLimiter(limit)
+    scalar = TenantRateLimiter(limit)
+    bulk = TenantRateLimiter(limit)
+    # Every tenant already has a bucket, as on a long-running gateway.
+    for tenant in warm:
+        baseline.try_acquire(tenant, 0.0)
+    scalar.admit_many(warm, now=0.0)
+    bulk.admit_many(warm, now=0.0)
+
+    results = {
+        "dict_lock": _run(lambda batch, now: sum(baseline.try_acquire(t, now) for t in batch), batches, tick_s),
+        "scalar": _run(lambda batch, now: sum(scalar.try_acquire(t, now=now) for t in batch), batches, tick_s),
+        "bulk": _run(lambda batch, now: int(bulk.admit_many(batch, now=now).sum()), batches, tick_s),
+    }
+
+    def build_baseline() -> DictLockLimiter:
+        limiter = DictLockLimiter(limit)
+        for tenant in warm:
+            limiter.try_acquire(tenant, 0.0)
+        return limiter
+
+    def build_sharded() -> TenantRateLimiter:
+        limiter = TenantRateLimiter(limit)
+        limiter.admit_many(warm, now=0.0)
+        return limiter
+
+    # Tenant-name strings are shared by both designs and excluded.
+    results["dict_lock"]["bytes_per_tenant"] = _traced_bytes(build_baseline) / args.tenants
+    sharded_bytes = _traced_bytes(build_sharded) / args.tenants
+    results["scalar"]["bytes_per_tenant"] = results["bulk"]["bytes_per_tenant"] = sharded_bytes
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark per-tenant rate limiting decisions.")
+    parser.add_argument("--tenants", type=int, default=100_000)
+    parser.add_argument("--requests", type=int, default=1_000_000)
+    parser.add_argument("--batch", type=int, default=512, help="Requests per micro-batch")
+    parser.add_argument("--rps", type=float, default=50_000.0, help="Offered requests/s (sets the virtual clock)")
+    parser.add_argument("--rate", type=float, default=100.0, help="Tokens/s per tenant")
+    parser.add_argument("--burst", type=float, default=200.0, help="Bucket size per tenant")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = run(args)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{args.requests} decisions over {args.tenants} tenants, batches of {args.batch}")
+    print(f"{'variant':<10} {'ns/decision':>12} {'admitted %':>11} {'bytes/tenant':>13}")
+    for name, row in results.items():
+        print(f"{name:<10} {row['ns_per_decision']:12.0f} {row['admitted_pct']:11.2f} {row['bytes_per_tenant']:13.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for streaming PAN/CVV redaction.
+
+Generates a synthetic JSON-lines fraud log (mostly clean records, with a share
+of Luhn-valid PANs, CVV fields and PAN-like order ids) and reports MB/s for the
+chunked `StreamRedactor` next to a per-line regex + Python Luhn baseline.
+
+Usage:
+  uv run python -m benchmarks.bench_redaction
+  uv run python -m benchmarks.bench_redaction --size-mb 256 --chunk-size 4194304
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import random
+import re
+import time
+from typing import Callable, Dict, List
+
+from fraud_radar.redaction import DEFAULT_CHUNK_SIZE, StreamRedactor, luhn_valid
+
+
+def _luhn_pan(rng: random.Random) -> str:
+    body = "4" + "".join(str(rng.randint(0, 9)) for _ in range(14))
+    for check in "0123456789":
+        if luhn_valid((body + check).encode()):
+            return body + check
+    raise AssertionError("unreachable")
+
+
+def synthetic_log(size_mb: float, seed: int, sensitive_share: float = 0.02) -> bytes:
+    rng = random.Random(seed)
+    target = int(size_mb * 1024 * 1024)
+    lines: List[str] = []
+    size = 0
+    seq = 0
+    while size < target:
+        seq += 1
+        roll = rng.random()
+        if roll < sensitive_share / 2:
+            extra = f', "card": "{_luhn_pan(rng)}"'
+        elif roll < sensitive_share:
+            extra = f', "cvv": "{rng.randint(100, 999)}"'
+        elif roll < 0.1:
+            # PAN-length order ids: candidates that the Luhn check mostly rejects.
+            extra = f', "order_id": "{rng.randint(10**14, 10**16)}"'
+        else:
+            extra = f', "order_id": "{rng.randint(10**9, 10**11)}"'
+        line = (
+            f'{{"ts": "2025-11-17T20:{seq % 60:02d}:{seq % 59:02d}Z", "region": "CA", '
+            f'"merchant_id": "m-{rng.randint(1, 50000)}", "card_token": "tok_{rng.getrandbits(64):016x}", '
+            f'"amount": {rng.random() * 500:.2f}, "decision": "approve"{extra}}}\n'
+        )
+        lines.append(line)
+        size += len(line)
+    return "".join(lines).encode("ascii")
+
+
+_BASELINE_PAN = re.compile(r"(?<!\d)\d(?:[ -]?\d){12,18}(?!\d)")
+_BASELINE_CVV = re.compile(r"(?i)\b(cvv2?|cvc2?)[\"']?\s*[:=]\s*[\"']?\d{3,4}")
+
+
+def _python_luhn(digits: str) -> bool:
+    total = 0
+    for idx, ch in enumerate(reversed(digits)):
+        value = int(ch)
+        if idx % 2:
+            value *= 2
+            if value > 9:
+                value -= 9
+        total += value
+    return total % 10 == 0
+
+
+def baseline_per_line(data: bytes) -> None:
+    for line in data.decode("ascii").splitlines():
+        for match in _BASELINE_PAN.finditer(line):
+            if _python_luhn(re.sub(r"[ -]", "", match.group())):
+                line = line.replace(match.group(), "[REDACTED-PAN]")
+        line = _BASELINE_CVV.sub(r"\1: [REDACTED-CVV]", line)
+
+
+def streaming(data: bytes, chunk_size: int) -> None:
+    StreamRedactor(chunk_size).redact_stream(io.BytesIO(data), io.BytesIO())
+
+
+def _mb_per_s(fn: Callable[[], None], size: int, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return size / (1024 * 1024) / best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark streaming PAN/CVV redaction.")
+    parser.add_argument("--size-mb", type=float, default=64.0, help="Synthetic log size")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--repeats", type=int, default=3, help="Best-of repeats per variant")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    data = synthetic_log(args.size_mb, args.seed)
+    results: Dict[str, float] = {
+        "stream_redactor": _mb_per_s(lambda: streaming(data, args.chunk_size), len(data), args.repeats),
+        "per_line_baseline": _mb_per_s(lambda: baseline_per_line(data), len(data), args.repeats),
+    }
+    print(f"synthetic log: {len(data) / (1024 * 1024):.1f} MB, chunk size {args.chunk_size} bytes")
+    for name, rate in results.items():
+        print(f"{name:>18}: {rate:8.1f} MB/s")
+    print(f"{'speedup':>18}: {results['stream_redactor'] / results['per_line_baseline']:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
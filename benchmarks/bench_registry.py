@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Model startup, memory and hot-swap latency: per-worker copies vs the
+memory-mapped registry.
+
+Publishes a synthetic `--features`-wide model (float64 weights) to a temp
+registry and starts `--workers` scoring processes that each load it:
+
+  copy   np.load into private memory and hash it into a FraudModel (what
+         every worker does when it owns its model)
+  mmap   `ModelRegistry.load`: map the published file read-only
+
+Each worker touches every weight (as scoring does) and, once all workers hold
+the model, reports its load time and proportional set size (Pss, which splits
+shared pages between the processes mapping them; the totals include each
+interpreter's own baseline).
+
+Then, in one process, it times `activate()` + `ModelWatcher.poll()` swaps
+between two versions while a thread keeps scoring, and counts failed
+batches (there should be none).
+
+Usage:
+  uv run python -m benchmarks.bench_registry
+  uv run python -m benchmarks.bench_registry --features 8000000 --workers 8 --json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing as mp
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+from fraud_radar.registry import ModelRegistry, ModelWatcher
+from fraud_radar.scoring import FraudModel, ScoringEngine
+
+
+def _memory_kb(field: str) -> int:
+    path = Path("/proc/self/smaps_rollup")
+    if not path.exists():
+        return 0
+    for line in path.read_text().splitlines():
+        if line.startswith(field + ":"):
+            return int(line.split()[1])
+    return 0
+
+
+def _worker(mode: str, root: str, version: str, barrier, results) -> None:
+    registry = ModelRegistry(Path(root))
+    started = time.perf_counter()
+    if mode == "copy":
+        weights_path, _ = registry._paths(version)
+        model = FraudModel(np.load(weights_path), registry.record(version).bias)
+    else:
+        model = registry.load(version, feature_names=None)
+    loaded = time.perf_counter() - started
+    float(np.asarray(model.weights).sum())  # fault in every page, as scoring would
+    ready = time.perf_counter() - started
+    barrier.wait()  # measure while every worker holds its model
+    results.put({"load_s": loaded, "ready_s": ready, "pss_kb": _memory_kb("Pss"), "version": model.version})
+    barrier.wait()
+
+
+def startup(mode: str, root: Path, version: str, workers: int) -> Dict[str, float]:
+    context = mp.get_context("fork")
+    barrier = context.Barrier(workers)
+    results = context.Queue()
+    processes = [context.Process(target=_worker, args=(mode, str(root), version, barrier, results)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    rows = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    assert {row["version"] for row in rows} == {version}
+    return {
+        "load_ms_max": max(row["load_s"] for row in rows) * 1000,
+        "ready_ms_max": max(row["ready_s"] for row in rows) * 1000,
+        "pss_mb_total": sum(row["pss_kb"] for row in rows) / 1024,
+    }
+
+
+def hot_swap(registry: ModelRegistry, versions: List[str], swaps: int) -> Dict[str, float]:
+    engine = ScoringEngine(registry.load(versions[0], feature_names=None))
+    registry.activate(versions[0])
+    watcher = ModelWatcher(registry, engine, feature_names=None)
+    watcher.poll()
+    row = np.random.default_rng(0).normal(size=(1, engine.model.n_features))
+    stop = threading.Event()
+    scored: Dict[str, int] = {}
+    failures: List[BaseException] = []
+
+    def score_forever() -> None:
+        while not stop.is_set():
+            try:
+                version = engine.score_batch(row).model_version
+                scored[version] = scored.get(version, 0) + 1
+            except BaseException as exc:  # a swap must never fail a batch
+                failures.append(exc)
+
+    scorer = threading.Thread(target=score_forever)
+    scorer.start()
+    latencies = []
+    try:
+        for swap in range(swaps):
+            time.sleep(0.02)
+            started = time.perf_counter()
+            registry.activate(versions[(swap + 1) % len(versions)])
+            assert watcher.poll()
+            latencies.append(time.perf_counter() - started)
+    finally:
+        stop.set()
+        scorer.join()
+    return {
+        "swap_ms_p50": float(np.percentile(latencies, 50)) * 1000,
+        "swap_ms_max": max(latencies) * 1000,
+        "batches_scored": float(sum(scored.values())),
+        "versions_seen": float(len(scored)),
+        "failed_batches": float(len(failures)),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark model registry startup, memory and hot swap.")
+    parser.add_argument("--features", type=int, default=2_000_000, help="Model width (8 bytes per weight)")
+    parser.add_argument("--workers", type=int, default=4, help="Scoring worker processes")
+    parser.add_argument("--swaps", type=int, default=20)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        registry = ModelRegistry(Path(tmp))
+        versions = [
+            registry.publish(FraudModel(rng.normal(scale=1e-3, size=args.features), bias), feature_names=None)
+            for bias in (-3.0, -2.5)
+        ]
+        results: Dict[str, Dict[str, float]] = {
+            mode: startup(mode, registry.root, versions[0], args.workers) for mode in ("copy", "mmap")
+        }
+        results["hot_swap"] = hot_swap(registry, versions, args.swaps)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    size_mb = args.features * 8 / (1 << 20)
+    print(f"{size_mb:.0f} MB model, {args.workers} workers")
+    print(f"{'mode':<6} {'load ms':>9} {'ready ms':>9} {'Pss MB total':>13}")
+    for mode in ("copy", "mmap"):
+        row = results[mode]
+        print(f"{mode:<6} {row['load_ms_max']:9.1f} {row['ready_ms_max']:9.1f} {row['pss_mb_total']:13.1f}")
+    swap = results["hot_swap"]
+    print(
+        f"\nhot swap: p50 {swap['swap_ms_p50']:.2f} ms, max {swap['swap_ms_max']:.2f} ms over {args.swaps} swaps; "
+        f"{swap['batches_scored']:.0f} batches scored across {swap['versions_seen']:.0f} versions, "
+        f"{swap['failed_batches']:.0f} failed"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Residency audit wall time over a month of JSON-lines log sinks.
+
+Writes `--days` daily partitions of `--partition-mb` for each of the CA
+(ca-central-1) and IN (ap-south-1) sinks, then times:
+
+  json_rescan    parse every line with json.loads and check its tag (the
+                 full re-audit this replaces)
+  audit_full     `ResidencyAuditor.run(full=True)`: numpy tag check per chunk,
+                 one worker process per partition
+  audit_deploy   one more day of logs is written, then an incremental run
+                 against the saved high-water marks
+
+All three must agree on the planted violations (a few foreign-tagged lines).
+
+Usage:
+  uv run python -m benchmarks.bench_residency
+  uv run python -m benchmarks.bench_residency --days 30 --partition-mb 16 --jobs 4 --json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict
+
+from fraud_radar.residency import ALLOWED_REGIONS, ResidencyAuditor
+
+TODAY = date(2025, 12, 31)
+SINKS = {"CA": "ca-central-1", "IN": "ap-south-1"}
+
+
+def write_partition(path: Path, region: str, size_mb: float, rng: random.Random, foreign: int) -> int:
+    path.mkdir(parents=True, exist_ok=True)
+    target = int(size_mb * 1024 * 1024)
+    size = 0
+    other = "IN" if region == "CA" else "CA"
+    with (path / "part-0000.jsonl").open("w", encoding="ascii") as handle:
+        while size < target:
+            tag = other if foreign and rng.random() < 0.001 else region
+            foreign -= tag != region
+            line = (
+                f'{{"ts": "2025-11-17T20:00:00Z", "region": "{tag}", "merchant_id": "m-{rng.randint(1, 50000)}", '
+                f'"card_token": "tok_{rng.getrandbits(64):016x}", "amount": {rng.random() * 500:.2f}, '
+                f'"score": {rng.random() ** 3:.4f}, "latency_ms": {rng.expovariate(1 / 40):.1f}}}\n'
+            )
+            handle.write(line)
+            size += len(line)
+    return size
+
+
+def build_sinks(root: Path, days: int, partition_mb: float, seed: int) -> int:
+    rng = random.Random(seed)
+    total = 0
+    for age in range(1, days + 1):
+        day = (TODAY - timedelta(days=age)).isoformat()
+        for region, sink in SINKS.items():
+            # A couple of misrouted records, in the oldest partitions only.
+            path = root / sink / f"region={region}" / f"date={day}"
+            total += write_partition(path, region, partition_mb, rng, foreign=2 if age == days else 0)
+    return total
+
+
+def json_rescan(root: Path) -> int:
+    violations = 0
+    for sink in SINKS.values():
+        for path in sorted((root / sink).rglob("*.jsonl")):
+            with path.open("rb") as handle:
+                for line in handle:
+                    if ALLOWED_REGIONS.get(json.loads(line).get("region")) != sink:
+                        violations += 1
+    return violations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the residency audit over JSON-lines sinks.")
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--partition-mb", type=float, default=2.0, help="Size of each region's daily partition")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Audit worker processes")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results: Dict[str, Dict[str, float]] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        total = build_sinks(root, args.days, args.partition_mb, args.seed)
+        sinks = {sink: root / sink for sink in SINKS.values()}
+
+        started = time.perf_counter()
+        expected = json_rescan(root)
+        elapsed = time.perf_counter() - started
+        results["json_rescan"] = {"s": elapsed, "mb_scanned": total / 2**20, "findings": float(expected)}
+
+        auditor = ResidencyAuditor(sinks, state_path=root / "audit-state.json", processes=args.jobs)
+        report = auditor.run(full=True)
+        assert len(report.findings) == expected
+        results["audit_full"] = {
+            "s": report.elapsed_s, "mb_scanned": report.bytes_scanned / 2**20, "findings": float(len(report.findings))
+        }
+
+        rng = random.Random(args.seed + 1)
+        for region, sink in SINKS.items():
+            path = root / sink / f"region={region}" / f"date={TODAY.isoformat()}"
+            write_partition(path, region, args.partition_mb, rng, foreign=0)
+        report = auditor.run()
+        assert len(report.findings) == expected and report.new_findings == 0
+        results["audit_deploy"] = {
+            "s": report.elapsed_s, "mb_scanned": report.bytes_scanned / 2**20, "findings": float(len(report.findings))
+        }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{args.days} days x {len(SINKS)} sinks x {args.partition_mb} MB, {args.jobs} audit process(es)")
+    print(f"{'variant':<13} {'seconds':>9} {'MB scanned':>11} {'MB/s':>9} {'findings':>9}")
+    for name, row in results.items():
+        rate = row["mb_scanned"] / row["s"] if row["s"] else float("inf")
+        print(f"{name:<13} {row['s']:9.3f} {row['mb_scanned']:11.1f} {rate:9.1f} {row['findings']:9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the raw-log retention engine.
+
+Writes a month of synthetic date-partitioned raw fraud logs for CA and IN,
+then compares the nightly cost of recomputing daily aggregates by rescanning
+every retained partition against `RetentionEngine`, which folds each partition
+once, on the night it expires. Peak Python heap is reported for partitions of
+two sizes to show memory does not grow with the partition.
+
+Usage:
+  uv run python -m benchmarks.bench_retention
+  uv run python -m benchmarks.bench_retention --partition-mb 32 --days 30
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import shutil
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, Tuple
+
+from fraud_radar.retention import RAW_RETENTION_DAYS, DailyAggregate, RetentionEngine, find_partitions
+
+TODAY = date(2025, 12, 31)
+
+
+def write_partition(path: Path, region: str, size_mb: float, rng: random.Random) -> int:
+    path.mkdir(parents=True, exist_ok=True)
+    target = int(size_mb * 1024 * 1024)
+    size = 0
+    with (path / "part-0000.jsonl").open("w", encoding="ascii") as handle:
+        while size < target:
+            score = rng.random() ** 3
+            line = (
+                f'{{"ts": "2025-11-17T20:00:00Z", "region": "{region}", "merchant_id": "m-{rng.randint(1, 50000)}", '
+                f'"card_token": "tok_{rng.getrandbits(64):016x}", "amount": {rng.random() * 500:.2f}, '
+                f'"score": {score:.4f}, "latency_ms": {rng.expovariate(1 / 40):.1f}}}\n'
+            )
+            handle.write(line)
+            size += len(line)
+    return size
+
+
+def build_tree(root: Path, days: int, partition_mb: float, seed: int) -> int:
+    rng = random.Random(seed)
+    total = 0
+    for age in range(days + 1):
+        day = (TODAY - timedelta(days=age)).isoformat()
+        for region in ("CA", "IN"):
+            total += write_partition(root / "raw" / f"region={region}" / f"date={day}", region, partition_mb, rng)
+    return total
+
+
+def rescan_all(root: Path) -> Tuple[float, int]:
+    """The nightly batch this replaces: recompute every retained day's aggregate from raw."""
+    start = time.perf_counter()
+    scanned = 0
+    for partition in find_partitions(root / "raw"):
+        aggregate = DailyAggregate(partition.region, partition.day.isoformat())
+        for path in partition.files():
+            with path.open("rb") as handle:
+                for line in handle:
+                    scanned += len(line)
+                    aggregate.add(json.loads(line))
+    return time.perf_counter() - start, scanned
+
+
+def expire_nightly(root: Path) -> Tuple[float, int]:
+    start = time.perf_counter()
+    report = RetentionEngine(root, today=TODAY).run()
+    return time.perf_counter() - start, report.bytes_scanned
+
+
+def peak_heap(root: Path, partition_mb: float, seed: int) -> int:
+    """Peak traced allocation while expiring a single partition of the given size."""
+    day = (TODAY - timedelta(days=RAW_RETENTION_DAYS)).isoformat()
+    write_partition(root / "raw" / "region=CA" / f"date={day}", "CA", partition_mb, random.Random(seed))
+    tracemalloc.start()
+    RetentionEngine(root, today=TODAY).run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark single-pass raw-log expiry against nightly rescans.")
+    parser.add_argument("--days", type=int, default=RAW_RETENTION_DAYS, help="Days of raw logs on disk")
+    parser.add_argument("--partition-mb", type=float, default=4.0, help="Size of one region-day partition")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results: Dict[str, float] = {}
+    workdir = Path(tempfile.mkdtemp(prefix="bench-retention-"))
+    try:
+        total = build_tree(workdir, args.days, args.partition_mb, args.seed)
+        elapsed, scanned = rescan_all(workdir)
+        results["rescan_seconds"] = elapsed
+        results["rescan_mb"] = scanned / (1 << 20)
+
+        # The oldest day expires tonight: one fold per region, then delete.
+        elapsed, scanned = expire_nightly(workdir)
+        results["expire_seconds"] = elapsed
+        results["expire_mb"] = scanned / (1 << 20)
+        results["expire_mb_per_s"] = results["expire_mb"] / elapsed if elapsed else 0.0
+        results["raw_mb_on_disk"] = total / (1 << 20)
+
+        # Peak memory for one partition and for one 8x larger should match.
+        results["expire_peak_kb"] = peak_heap(workdir / "peak-1x", args.partition_mb, args.seed) / 1024
+        results["expire_peak_kb_8x"] = peak_heap(workdir / "peak-8x", args.partition_mb * 8, args.seed) / 1024
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"raw logs: {results['raw_mb_on_disk']:.0f} MB over {args.days + 1} days x 2 regions")
+    print(f"{'nightly rescan':>16}: {results['rescan_mb']:8.1f} MB read in {results['rescan_seconds']:7.2f} s")
+    print(
+        f"{'expire + fold':>16}: {results['expire_mb']:8.1f} MB read in {results['expire_seconds']:7.2f} s "
+        f"({results['expire_mb_per_s']:.1f} MB/s)"
+    )
+    print(f"{'batch reduction':>16}: {results['rescan_seconds'] / results['expire_seconds']:8.1f}x")
+    print(f"{'peak heap':>16}: {results['expire_peak_kb']:8.0f} KB ({results['expire_peak_kb_8x']:.0f} KB at 8x partition)")
+
+
+if __name__ == "__main__":
+    main()
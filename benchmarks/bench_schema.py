@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Ingest schema validation cost per micro-batch.
+
+Validates batches of decoded JSON records two ways and reports microseconds
+per batch and per record:
+
+  per_record   every field of every record through an isinstance / range
+               chain, then the columns assembled with numpy (what the score
+               API did before the compiled schema)
+  compiled     `BatchValidator` from fraud_radar.schema: key sets once per
+               batch, one type set per column, checks and dtype conversion
+               on whole columns
+
+for the score request (one value per model feature) and the telemetry event
+records, at several batch sizes. Validation sits inside the 120 ms ingestion
+p95 budget.
+
+Usage:
+  uv run python -m benchmarks.bench_schema
+  uv run python -m benchmarks.bench_schema --batches 1 64 512 4096 --json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import random
+import time
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+from fraud_radar.schema import CHOICE, INTEGER, NUMBER, SCORE_REQUEST, STRING, TELEMETRY, VECTOR, Schema
+from fraud_radar.scoring import FEATURE_NAMES
+
+
+def score_records(count: int, rng: random.Random) -> List[Dict[str, Any]]:
+    return [
+        {
+            "transaction_id": f"txn-{idx}",
+            "merchant_id": f"m-{rng.randint(1, 50_000)}",
+            "tier": rng.choice(("standard", "premium")),
+            "features": [rng.gauss(0.0, 1.0) for _ in FEATURE_NAMES],
+        }
+        for idx in range(count)
+    ]
+
+
+def telemetry_records(count: int, rng: random.Random) -> List[Dict[str, Any]]:
+    return [
+        {
+            "event_id": idx,
+            "ts_ms": 1_763_400_000_000 + idx,
+            "region": rng.choice(("CA", "IN")),
+            "tier": rng.choice(("standard", "premium")),
+            "currency": rng.choice(("CAD", "INR", "USD")),
+            "amount_minor": rng.randint(100, 500_000),
+            "merchant_id": f"m-{rng.randint(1, 50_000)}",
+            "card_token": f"tok_{rng.getrandbits(64):016x}",
+            "device_hash": f"{rng.getrandbits(60):015x}",
+        }
+        for idx in range(count)
+    ]
+
+
+def per_record(schema: Schema) -> Callable[[List[Dict[str, Any]]], Dict[str, np.ndarray]]:
+    """The conventional validator: walk each record field by field."""
+    allowed = {field.name for field in schema.fields}
+
+    def validate(records: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        if not isinstance(records, list) or not records:
+            raise ValueError("Expected a non-empty list")
+        for idx, record in enumerate(records):
+            if not isinstance(record, dict):
+                raise ValueError(f"records[{idx}]: each record must be a mapping")
+            for key in record:
+                if key not in allowed:
+                    raise ValueError(f"records[{idx}]: unknown field {key}")
+            for field in schema.fields:
+                value = record.get(field.name)
+                if value is None:
+                    if field.required:
+                        raise ValueError(f"records[{idx}].{field.name}: missing")
+                elif field.kind in (STRING, CHOICE):
+                    if not isinstance(value, str) or (field.max_length is not None and len(value) > field.max_length):
+                        raise ValueError(f"records[{idx}].{field.name}: expected a string")
+                    if field.choices and value not in field.choices:
+                        raise ValueError(f"records[{idx}].{field.name}: expected a choice")
+                elif field.kind == INTEGER:
+                    if isinstance(value, bool) or not isinstance(value, int):
+                        raise ValueError(f"records[{idx}].{field.name}: expected an integer")
+                    if field.minimum is not None and value < field.minimum:
+                        raise ValueError(f"records[{idx}].{field.name}: out of range")
+                elif field.kind == NUMBER:
+                    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+                        raise ValueError(f"records[{idx}].{field.name}: expected a number")
+                elif field.kind == VECTOR:
+                    if not isinstance(value, list):
+                        raise ValueError(f"records[{idx}].{field.name}: expected a list")
+                    for item in value:
+                        if isinstance(item, bool) or not isinstance(item, (int, float)) or not math.isfinite(item):
+                            raise ValueError(f"records[{idx}].{field.name}: expected numbers")
+        columns = {}
+        for field in schema.fields:
+            column = [record.get(field.name, field.default) for record in records]
+            if field.dtype.startswith("u") and field.choices:
+                column = [field.choices.index(value) for value in column]
+            columns[field.name] = np.array(column, dtype=field.dtype or None)
+        return columns
+
+    return validate
+
+
+def _time(validate: Callable[[List[Dict[str, Any]]], Any], batches: List[List[Dict[str, Any]]], repeat: int) -> float:
+    best = math.inf
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for batch in batches:
+            validate(batch)
+        best = min(best, time.perf_counter() - started)
+    return best / len(batches)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark ingest schema validation per micro-batch.")
+    parser.add_argument("--batches", type=int, nargs="+", default=[1, 64, 512, 4096], help="Records per batch")
+    parser.add_argument("--records", type=int, default=65_536, help="Records validated per measurement")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    results: Dict[str, Dict[str, float]] = {}
+    for schema, make in ((SCORE_REQUEST, score_records), (TELEMETRY, telemetry_records)):
+        records = make(args.records, rng)
+        variants = {"per_record": per_record(schema), "compiled": schema.compile().validate}
+        for size in args.batches:
+            batches = [records[start : start + size] for start in range(0, len(records) - size + 1, size)]
+            for name, validate in variants.items():
+                seconds = _time(validate, batches, args.repeat)
+                results[f"{schema.name}/{size}/{name}"] = {"us_per_batch": seconds * 1e6, "us_per_record": seconds * 1e6 / size}
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'schema':<14} {'batch':>6} {'variant':<11} {'us/batch':>11} {'us/record':>10}")
+    for key, row in results.items():
+        schema_name, size, name = key.split("/")
+        print(f"{schema_name:<14} {size:>6} {name:<11} {row['us_per_batch']:11.1f} {row['us_per_record']:10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for vectorized fraud scoring.
+
+Scores random feature batches at several micro-batch sizes and reports
+transactions/sec plus p50/p95/p99 latency per batch against the spec's
+p99 < 200 ms scoring budget.
+
+Usage:
+  uv run python -m benchmarks.bench_scoring
+  uv run python -m benchmarks.bench_scoring --batch-sizes 1 64 1024 --iterations 500 --report reports/bench_scoring.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+from fraud_radar.scoring import FEATURE_NAMES, ScoringEngine
+
+SCORING_P99_BUDGET_MS = 200.0
+
+
+def run(batch_sizes: List[int], iterations: int, seed: int) -> List[Dict[str, Any]]:
+    engine = ScoringEngine()
+    rng = np.random.default_rng(seed)
+    rows: List[Dict[str, Any]] = []
+    for batch_size in batch_sizes:
+        batches = [rng.normal(size=(batch_size, len(FEATURE_NAMES))) for _ in range(min(iterations, 64))]
+        engine.score_batch(batches[0])  # warm up
+        timings = np.empty(iterations, dtype=np.float64)
+        for i in range(iterations):
+            batch = batches[i % len(batches)]
+            start = time.perf_counter_ns()
+            engine.score_batch(batch)
+            timings[i] = time.perf_counter_ns() - start
+        timings_ms = timings / 1e6
+        p50, p95, p99 = np.percentile(timings_ms, [50, 95, 99]).tolist()
+        rows.append(
+            {
+                "batch_size": batch_size,
+                "iterations": iterations,
+                "txn_per_sec": batch_size * iterations / (timings.sum() / 1e9),
+                "p50_ms": p50,
+                "p95_ms": p95,
+                "p99_ms": p99,
+                "within_budget": p99 < SCORING_P99_BUDGET_MS,
+            }
+        )
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark vectorized fraud scoring.")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 64, 256, 1024, 4096])
+    parser.add_argument("--iterations", type=int, default=1000, help="Timed batches per batch size")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--report", type=Path, help="Write the results here as JSON")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    rows = run(args.batch_sizes, args.iterations, args.seed)
+    if args.report is not None:
+        args.report.parent.mkdir(parents=True, exist_ok=True)
+        args.report.write_text(json.dumps(rows, indent=2) + "\n", encoding="utf-8")
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+
+    print(f"{'batch':>6} {'txn/s':>14} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for row in rows:
+        flag = "" if row["within_budget"] else "  (over p99 budget)"
+        print(
+            f"{row['batch_size']:>6} {row['txn_per_sec']:>14,.0f} "
+            f"{row['p50_ms']:>9.3f} {row['p95_ms']:>9.3f} {row['p99_ms']:>9.3f}{flag}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Raw telemetry on disk: JSON lines vs columnar segments.
+
+Writes the same synthetic CA telemetry (tokens, merchant, amount, currency,
+device hash, model features, score, latency) spread over `--days` day partitions
+in both formats, then times what the retention, aggregation and residency
+jobs do with it:
+
+  write       encode and write every row
+  fold        fold every partition into `DailyAggregate`s (retention expiry)
+  window      scores for one hour of one day (dashboard / investigation read)
+  residency   confirm every file only holds CA rows
+
+JSON lines must parse every line of a partition for each job. Segments map
+only the columns a job needs, skip whole segments by their header's time
+range, and answer residency from the header alone.
+
+Usage:
+  uv run python -m benchmarks.bench_segments
+  uv run python -m benchmarks.bench_segments --rows 2000000 --days 7 --json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from fraud_radar.events import CA
+from fraud_radar.retention import DailyAggregate, find_partitions
+from fraud_radar.segments import (
+    LABELS,
+    MS_PER_DAY,
+    SEGMENT_SUFFIX,
+    Segment,
+    SegmentLog,
+    new_telemetry,
+    read_header,
+    scan,
+)
+from fraud_radar.scoring import FEATURE_NAMES
+
+START_MS = 1_763_337_600_000  # 2025-11-17T00:00:00Z
+
+
+def synthetic(rows: int, days: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    telemetry = new_telemetry(rows)
+    telemetry["event_id"] = np.arange(rows)
+    telemetry["ts_ms"] = START_MS + rng.integers(0, days * MS_PER_DAY, rows)
+    telemetry["region"] = b"CA"
+    telemetry["currency"] = rng.choice(np.array([b"CAD", b"USD", b"EUR"]), rows, p=[0.9, 0.08, 0.02])
+    telemetry["amount_minor"] = (rng.lognormal(3.5, 1.2, rows) * 100).astype(np.int64)
+    telemetry["merchant_id"] = np.char.add(b"m-", rng.integers(1, 50_000, rows).astype("S8"))
+    telemetry["card_token"] = np.char.add(b"tok_", rng.integers(0, 2**62, rows).astype("S20"))
+    telemetry["device_hash"] = rng.integers(0, 2**62, rows).astype("S16")
+    telemetry["score"] = np.round(rng.random(rows) ** 3, 4)
+    telemetry["latency_ms"] = np.round(rng.exponential(40.0, rows), 1)
+    telemetry["label"] = rng.choice(3, rows, p=[0.9, 0.09, 0.01])
+    telemetry["features"] = rng.normal(size=(rows, len(FEATURE_NAMES))).round(4)
+    return telemetry
+
+
+def _day_dir(raw: Path, day: int) -> Path:
+    return raw / "region=CA" / f"date={np.datetime64(day, 'D')}"
+
+
+def write_jsonl(raw: Path, telemetry: np.ndarray) -> None:
+    days = telemetry["ts_ms"] // MS_PER_DAY
+    for day in np.unique(days).tolist():
+        directory = _day_dir(raw, day)
+        directory.mkdir(parents=True, exist_ok=True)
+        with (directory / "part-0000.jsonl").open("w", encoding="ascii") as handle:
+            for row in telemetry[days == day].tolist():
+                record = {
+                    "event_id": row[0], "ts_ms": row[1], "region": row[2].decode(), "currency": row[3].decode(),
+                    "amount": row[4] / 100, "merchant_id": row[5].decode(), "card_token": row[6].decode(),
+                    "device_hash": row[7].decode(), "score": row[8], "latency_ms": row[9],
+                    "features": row[11].tolist(),
+                }
+                if row[10]:
+                    record["label"] = LABELS[row[10]]
+                handle.write(json.dumps(record) + "\n")
+
+
+def write_segments(raw: Path, telemetry: np.ndarray) -> None:
+    log = SegmentLog(raw)
+    for start in range(0, len(telemetry), 8192):  # arrives in ingest-sized batches
+        log.append(CA, telemetry[start : start + 8192])
+    log.flush()
+
+
+def _jsonl_records(directory: Path):
+    for path in sorted(directory.glob("*.jsonl")):
+        with path.open("rb") as handle:
+            for line in handle:
+                yield json.loads(line)
+
+
+def fold_jsonl(raw: Path) -> int:
+    rows = 0
+    for partition in find_partitions(raw):
+        aggregate = DailyAggregate(partition.region, partition.day.isoformat())
+        for record in _jsonl_records(partition.path):
+            aggregate.add(record)
+        rows += aggregate.transactions
+    return rows
+
+
+def fold_segments(raw: Path) -> int:
+    rows = 0
+    for partition in find_partitions(raw):
+        aggregate = DailyAggregate(partition.region, partition.day.isoformat())
+        for path in sorted(partition.path.glob(f"*{SEGMENT_SUFFIX}")):
+            aggregate.add_segment(Segment(path))
+        rows += aggregate.transactions
+    return rows
+
+
+def window_jsonl(raw: Path, start_ms: int, end_ms: int) -> int:
+    # Day partitions already narrow the scan; within the day every line is parsed.
+    directory = _day_dir(raw, start_ms // MS_PER_DAY)
+    return sum(1 for record in _jsonl_records(directory) if start_ms <= record["ts_ms"] < end_ms)
+
+
+def window_segments(raw: Path, start_ms: int, end_ms: int) -> int:
+    return sum(len(batch) for batch in scan(raw, "CA", start_ms, end_ms, columns=("ts_ms", "score")))
+
+
+def residency_jsonl(raw: Path) -> int:
+    files = sorted(raw.rglob("*.jsonl"))
+    assert all(record["region"] == "CA" for path in files for record in _jsonl_records(path.parent))
+    return len(files)
+
+
+def residency_segments(raw: Path) -> int:
+    files = sorted(raw.rglob(f"*{SEGMENT_SUFFIX}"))
+    assert all(read_header(path).region == "CA" for path in files)
+    return len(files)
+
+
+def _timed(job: Callable[[], int]) -> Dict[str, float]:
+    started = time.perf_counter()
+    result = job()
+    return {"s": time.perf_counter() - started, "result": float(result)}
+
+
+def run(args: argparse.Namespace) -> Dict[str, Dict[str, float]]:
+    telemetry = synthetic(args.rows, args.days, args.seed)
+    start_ms = START_MS + 13 * 3_600_000
+    end_ms = start_ms + 3_600_000
+    results: Dict[str, Dict[str, float]] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, writer, fold, window, residency in (
+            ("jsonl", write_jsonl, fold_jsonl, window_jsonl, residency_jsonl),
+            ("segments", write_segments, fold_segments, window_segments, residency_segments),
+        ):
+            raw = Path(tmp) / name
+            write = _timed(lambda: writer(raw, telemetry) or len(telemetry))
+            disk = sum(path.stat().st_size for path in raw.rglob("*") if path.is_file())
+            folded = _timed(lambda: fold(raw))
+            assert folded["result"] == len(telemetry)
+            results[name] = {
+                "bytes_per_row": disk / len(telemetry),
+                "write_s": write["s"],
+                "fold_s": folded["s"],
+                "window_ms": _timed(lambda: window(raw, start_ms, end_ms))["s"] * 1000,
+                "window_rows": _timed(lambda: window(raw, start_ms, end_ms))["result"],
+                "residency_ms": _timed(lambda: residency(raw))["s"] * 1000,
+            }
+    assert results["jsonl"]["window_rows"] == results["segments"]["window_rows"]
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark raw telemetry storage: JSON lines vs columnar segments.")
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--days", type=int, default=4, help="Day partitions the rows are spread over")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = run(args)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{args.rows} CA telemetry rows over {args.days} days")
+    columns: List[str] = ["bytes/row", "write s", "fold s", "1h window ms", "residency ms"]
+    print(f"{'format':<9} " + " ".join(f"{column:>13}" for column in columns))
+    for name, row in results.items():
+        values = (row["bytes_per_row"], row["write_s"], row["fold_s"], row["window_ms"], row["residency_ms"])
+        print(f"{name:<9} " + " ".join(f"{value:13.2f}" for value in values))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Ingress tokenization: per-request HMAC vs the batched keyed tokenizer.
+
+Generates Luhn-valid PANs and device fingerprints and times producing one card
+token and one device hash per record three ways:
+
+  hmac      what a per-request tokenizer does: a Luhn check, then
+            `hmac.new(key, pan, sha256)` for each card and each device, so the
+            key is set up each time, and the digest is hex-encoded in Python
+  blake2b   still per request, but using keyed BLAKE2b (key setup on every call)
+  batched   `Tokenizer.tokenize` from fraud_radar.tokenizer: one arena per
+            micro-batch, vectorized Luhn check, BLAKE2b keyed once and
+            `copy()`'d per value, numpy letter encoding, arena wiped after use
+
+The per-request variants are called once per batch element, so they take
+the same time at every batch size. Batched cost per record falls as the batch
+grows, until hashing dominates. Packing the batch into its arena
+(`CardBatch.from_values`) is included in the batched timing.
+
+Read `batched` against `blake2b`, not `hmac`: most of the gap to HMAC is the
+hash choice. Keying BLAKE2b is cheap, so batching does not make hashing
+faster, and at large batches `batched` costs about as much per record as
+per-request `blake2b` (a little more: the per-request variants skip the token
+metadata LRU, rejection masks and arena wipe). What batching buys is one
+wipeable arena and a vectorized PAN check at that same cost. Batches of up to
+`SCALAR_BATCH_MAX` cards take a per-card path instead of numpy, so a single
+request pays tens of microseconds, not numpy's fixed per-call cost.
+
+Usage:
+  uv run python -m benchmarks.bench_tokenizer
+  uv run python -m benchmarks.bench_tokenizer --batch-sizes 1 64 512 4096 --records 100000 --json
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import hmac
+import json
+import random
+import time
+from typing import Callable, Dict, List
+
+from fraud_radar.events import CA
+from fraud_radar.redaction import luhn_valid
+from fraud_radar.tokenizer import CARD_TOKEN_BYTES, DEVICE_HASH_BYTES, CardBatch, TokenKeys, Tokenizer
+
+
+def make_pans(count: int, rng: random.Random) -> List[bytes]:
+    pans = []
+    for _ in range(count):
+        body = [4] + [rng.randrange(10) for _ in range(14)]
+        # The check digit makes the Luhn sum of the full PAN a multiple of 10.
+        total = sum(digit * 2 - 9 * (digit > 4) if idx % 2 == 0 else digit for idx, digit in enumerate(reversed(body)))
+        pans.append("".join(map(str, body + [-total % 10])).encode())
+    return pans
+
+
+def per_request_hmac(keys: TokenKeys) -> Callable[[List[bytes], List[bytes]], None]:
+    def run(pans: List[bytes], devices: List[bytes]) -> None:
+        for pan, device in zip(pans, devices):
+            luhn_valid(pan)
+            b"tok_" + hmac.new(keys.card, pan, hashlib.sha256).hexdigest()[: 2 * CARD_TOKEN_BYTES].encode()
+            hmac.new(keys.device, device, hashlib.sha256).hexdigest()[: 2 * DEVICE_HASH_BYTES].encode()
+
+    return run
+
+
+def per_request_blake2b(keys: TokenKeys) -> Callable[[List[bytes], List[bytes]], None]:
+    def run(pans: List[bytes], devices: List[bytes]) -> None:
+        for pan, device in zip(pans, devices):
+            luhn_valid(pan)
+            b"tok_" + hashlib.blake2b(pan, key=keys.card, digest_size=CARD_TOKEN_BYTES).hexdigest().encode()
+            hashlib.blake2b(device, key=keys.device, digest_size=DEVICE_HASH_BYTES).hexdigest().encode()
+
+    return run
+
+
+def batched(keys: TokenKeys) -> Callable[[List[bytes], List[bytes]], None]:
+    tokenizer = Tokenizer(CA, keys)
+
+    def run(pans: List[bytes], devices: List[bytes]) -> None:
+        tokenizer.tokenize(CardBatch.from_values(pans), devices, ts_ms=0)
+
+    return run
+
+
+def _time(run: Callable[[List[bytes], List[bytes]], None], pans, devices, batch: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for start in range(0, len(pans), batch):
+            run(pans[start : start + batch], devices[start : start + batch])
+        best = min(best, time.perf_counter() - started)
+    return best / len(pans)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark ingress tokenization: per-request HMAC vs batched.")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 64, 512, 4096])
+    parser.add_argument("--records", type=int, default=50_000, help="Records tokenized per measurement")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    pans = make_pans(args.records, rng)
+    devices = [f"fp-{rng.randrange(1 << 40):010x}".encode() for _ in range(args.records)]
+    keys = TokenKeys.generate()
+    variants = {"hmac": per_request_hmac(keys), "blake2b": per_request_blake2b(keys), "batched": batched(keys)}
+
+    results: Dict[str, Dict[str, float]] = {}
+    for batch in args.batch_sizes:
+        for name, run in variants.items():
+            seconds = _time(run, pans, devices, batch, args.repeat)
+            results[f"{batch}/{name}"] = {"us_per_record": seconds * 1e6, "records_per_s": 1 / seconds}
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'batch':>6} {'variant':<8} {'us/record':>10} {'records/s':>12}")
+    for key, row in results.items():
+        batch, name = key.split("/")
+        print(f"{batch:>6} {name:<8} {row['us_per_record']:10.2f} {row['records_per_s']:12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
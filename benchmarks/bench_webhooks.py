@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Premium webhook delivery benchmark against local stub merchant hosts.
+
+Starts `--hosts` stub receivers (each its own host:port, with a share of
+transient 503s) and pushes a fraud-spike burst of `--alerts` premium alerts
+through:
+
+  per_alert   one task per alert, a new connection per attempt and an
+              asyncio.sleep per retry (the approach this replaces)
+  dispatcher  `WebhookDispatcher`: per-host keep-alive lanes, per-host caps
+              and one timer wheel for every retry
+
+and reports wall time, deliveries/s, TCP connections opened, peak tasks
+and end-to-end delivery p95/p99 against the 10 s / 15 s premium targets.
+
+Usage:
+  uv run python -m benchmarks.bench_webhooks
+  uv run python -m benchmarks.bench_webhooks --hosts 200 --alerts 20000 --json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from fraud_radar.webhooks import (
+    PREMIUM_DELIVERY_P99_S,
+    PREMIUM_DELIVERY_TARGET_S,
+    RETRYABLE_STATUS,
+    RetryPolicy,
+    StubWebhookServer,
+    WebhookDispatcher,
+)
+
+
+def _payload(seq: int) -> Dict[str, object]:
+    return {"alert_id": f"a-{seq}", "merchant_id": f"m-{seq % 997}", "tier": "premium", "score": 0.93, "decision": "block"}
+
+
+async def _peak_tasks(stop: asyncio.Event, peak: List[int]) -> None:
+    while not stop.is_set():
+        peak[0] = max(peak[0], len(asyncio.all_tasks()))
+        await asyncio.sleep(0.01)
+
+
+async def per_alert(urls: List[str], alerts: int, policy: RetryPolicy, max_connections: int) -> Dict[str, float]:
+    rng = random.Random(0)
+    connect = asyncio.Semaphore(max_connections)  # stay under the fd limit
+    opened = [0]
+    latencies: List[float] = []
+
+    async def post(url: str, body: bytes, key: str) -> int:
+        host, port = url.split("//", 1)[1].split("/", 1)[0].split(":")
+        async with connect:
+            reader, writer = await asyncio.open_connection(host, int(port))
+            opened[0] += 1
+            try:
+                writer.write(
+                    f"POST /webhook HTTP/1.1\r\nHost: {host}:{port}\r\nContent-Type: application/json\r\n"
+                    f"Content-Length: {len(body)}\r\nIdempotency-Key: {key}\r\nConnection: close\r\n\r\n".encode()
+                    + body
+                )
+                await writer.drain()
+                status = int((await reader.readline()).split()[1])
+                await reader.read()
+                return status
+            finally:
+                writer.close()
+
+    async def deliver(seq: int) -> None:
+        started = time.perf_counter()
+        body = json.dumps(_payload(seq)).encode()
+        for attempt in range(1, policy.max_attempts + 1):
+            try:
+                status = await post(urls[seq % len(urls)], body, f"a-{seq}")
+            except OSError:
+                status = 599
+            if 200 <= status < 300:
+                latencies.append(time.perf_counter() - started)
+                return
+            if status not in RETRYABLE_STATUS and status != 599:
+                return
+            delay = policy.delay(attempt, rng)
+            if time.perf_counter() + delay - started >= policy.deadline_s:
+                return
+            await asyncio.sleep(delay)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(deliver(seq) for seq in range(alerts)))
+    return _summary(time.perf_counter() - started, latencies, opened[0])
+
+
+async def dispatcher(urls: List[str], alerts: int, policy: RetryPolicy, per_host_limit: int) -> Dict[str, float]:
+    async with WebhookDispatcher(policy, per_host_limit=per_host_limit, wheel_tick_s=0.01, seed=0) as dispatch:
+        started = time.perf_counter()
+        futures = [dispatch.submit(urls[seq % len(urls)], _payload(seq), f"a-{seq}") for seq in range(alerts)]
+        results = await asyncio.gather(*futures)
+        elapsed = time.perf_counter() - started
+        latencies = [result.latency_s for result in results if result.delivered]
+        return _summary(elapsed, latencies, dispatch.pool_stats()["connections_opened"])
+
+
+def _summary(elapsed: float, latencies: List[float], connections: int) -> Dict[str, float]:
+    values = np.array(latencies) if latencies else np.zeros(1)
+    p95, p99 = np.percentile(values, [95, 99])
+    return {
+        "seconds": elapsed,
+        "delivered": float(len(latencies)),
+        "deliveries_per_s": len(latencies) / elapsed if elapsed else 0.0,
+        "connections_opened": float(connections),
+        "delivery_p95_s": float(p95),
+        "delivery_p99_s": float(p99),
+    }
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Dict[str, float]]:
+    servers = [
+        await StubWebhookServer(latency_s=args.latency_ms / 1000.0, failure_rate=args.failure_rate, seed=i).start()
+        for i in range(args.hosts)
+    ]
+    urls = [server.url() for server in servers]
+    policy = RetryPolicy(base_delay_s=args.base_delay_ms / 1000.0)
+    results: Dict[str, Dict[str, float]] = {}
+    try:
+        for name in ("per_alert", "dispatcher"):
+            stop = asyncio.Event()
+            peak = [0]
+            watcher = asyncio.create_task(_peak_tasks(stop, peak))
+            if name == "per_alert":
+                results[name] = await per_alert(urls, args.alerts, policy, args.max_connections)
+            else:
+                results[name] = await dispatcher(urls, args.alerts, policy, args.per_host_limit)
+            stop.set()
+            await watcher
+            results[name]["peak_tasks"] = float(peak[0])
+    finally:
+        for server in servers:
+            await server.close()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark premium webhook delivery against local stub hosts.")
+    parser.add_argument("--hosts", type=int, default=50, help="Stub merchant hosts")
+    parser.add_argument("--alerts", type=int, default=5_000, help="Premium alerts in the burst")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="Stub response latency")
+    parser.add_argument("--failure-rate", type=float, default=0.1, help="Share of requests answered 503")
+    parser.add_argument("--base-delay-ms", type=float, default=500.0, help="First retry backoff")
+    parser.add_argument("--per-host-limit", type=int, default=4)
+    parser.add_argument("--max-connections", type=int, default=4096, help="Connect cap for the per-alert baseline")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(
+        f"{args.alerts} premium alerts to {args.hosts} hosts, {args.failure_rate:.0%} transient 503s, "
+        f"targets p95 < {PREMIUM_DELIVERY_TARGET_S:g} s, p99 < {PREMIUM_DELIVERY_P99_S:g} s"
+    )
+    print(f"{'variant':>10} {'seconds':>8} {'deliv/s':>9} {'delivered':>9} {'conns':>7} {'tasks':>7} {'p95 s':>7} {'p99 s':>7}")
+    for name, row in results.items():
+        print(
+            f"{name:>10} {row['seconds']:8.2f} {row['deliveries_per_s']:9.0f} {row['delivered']:9.0f} "
+            f"{row['connections_opened']:7.0f} {row['peak_tasks']:7.0f} {row['delivery_p95_s']:7.2f} {row['delivery_p99_s']:7.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,10 @@
+"""
+Payments Fraud Radar runtime components.
+
+Everything in this package runs identically for standard and premium merchants;
+tier only ever changes alert delivery, never scoring, telemetry or retention.
+
+Import from the submodules (`fraud_radar.scoring`, `fraud_radar.alerts`, ...).
+The package itself stays import-free so `python -m fraud_radar.<module>`
+command-line entry points run without pre-importing their own module.
+"""
@@ -0,0 +1,267 @@
+"""
+Two-tier alert fanout: standard and premium queues drained by one worker pool.
+
+Scoring output is written to a standard and a premium alert queue per region
+(spec/overview.md, "Alerting and Dashboards"). This scheduler enforces the
+monetization guardrail on those queues:
+
+- Both tiers share one bounded capacity. When it is exhausted, premium alerts
+  are shed first; a standard alert is only rejected when no premium alert is
+  left to evict.
+- Workers pick the next alert by deficit round robin over the tiers, so premium
+  gets its weighted share without being able to starve standard.
+- An admission controller watches the age of the oldest standard alert and
+  pauses premium fanout when it approaches the 1–3 minute standard baseline,
+  resuming once the backlog has drained (with hysteresis).
+- An optional `PremiumGuard` (fraud_radar/overload.py) caps premium deliveries
+  in flight with an adaptive limit driven by scoring p99, and holds premium
+  entirely while its circuit breaker is open. Held alerts stay queued (and are
+  shed by the capacity rules above if the pause outlasts the queue).
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Deque, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from fraud_radar.overload import PremiumGuard
+from fraud_radar.scoring import APPROVE, DECISION_LABELS, ScoredBatch
+
+STANDARD = "standard"
+PREMIUM = "premium"
+TIERS = (STANDARD, PREMIUM)
+
+# Upper end of the standard-tier 1–3 minute dashboard delivery window.
+STANDARD_BASELINE_S = 180.0
+
+
+@dataclass
+class Alert:
+    alert_id: str
+    merchant_id: str
+    tier: str
+    region: str
+    score: float
+    decision: str
+    cost: int = 1
+    enqueued_at: float = 0.0
+
+
+@dataclass
+class FanoutConfig:
+    capacity: int = 10_000
+    premium_capacity: int = 2_000
+    weights: Dict[str, int] = field(default_factory=lambda: {STANDARD: 1, PREMIUM: 2})
+    workers: int = 8
+    standard_baseline_s: float = STANDARD_BASELINE_S
+    pause_ratio: float = 0.5
+    resume_ratio: float = 0.25
+    latency_samples: int = 100_000
+
+
+@dataclass
+class FanoutStats:
+    enqueued: Dict[str, int] = field(default_factory=lambda: dict.fromkeys(TIERS, 0))
+    delivered: Dict[str, int] = field(default_factory=lambda: dict.fromkeys(TIERS, 0))
+    failed: Dict[str, int] = field(default_factory=lambda: dict.fromkeys(TIERS, 0))
+    shed: Dict[str, int] = field(default_factory=lambda: dict.fromkeys(TIERS, 0))
+    pauses: int = 0
+
+
+class AdmissionController:
+    """Pauses premium fanout while the oldest standard alert nears its baseline."""
+
+    def __init__(self, baseline_s: float, pause_ratio: float, resume_ratio: float) -> None:
+        if not 0.0 <= resume_ratio < pause_ratio <= 1.0:
+            raise ValueError("Expected 0 <= resume_ratio < pause_ratio <= 1")
+        self.pause_at_s = baseline_s * pause_ratio
+        self.resume_at_s = baseline_s * resume_ratio
+        self.paused = False
+        self.pauses = 0
+
+    def update(self, standard_age_s: float) -> bool:
+        if not self.paused and standard_age_s >= self.pause_at_s:
+            self.paused = True
+            self.pauses += 1
+        elif self.paused and standard_age_s <= self.resume_at_s:
+            self.paused = False
+        return self.paused
+
+
+class FanoutScheduler:
+    """Weighted fair alert fanout with premium-first shedding."""
+
+    def __init__(
+        self,
+        deliver: Callable[[Alert], Awaitable[None]],
+        config: Optional[FanoutConfig] = None,
+        clock: Callable[[], float] = time.monotonic,
+        guard: Optional[PremiumGuard] = None,
+    ) -> None:
+        self.config = config or FanoutConfig()
+        if set(self.config.weights) != set(TIERS) or min(self.config.weights.values()) < 1:
+            raise ValueError(f"weights must assign a positive quantum to each of {TIERS}")
+        self._deliver = deliver
+        self._clock = clock
+        self.guard = guard
+        self._queues: Dict[str, Deque[Alert]] = {tier: deque() for tier in TIERS}
+        self._deficit: Dict[str, int] = dict.fromkeys(TIERS, 0)
+        self._turn = 0
+        self._latencies: Dict[str, Deque[float]] = {
+            tier: deque(maxlen=self.config.latency_samples) for tier in TIERS
+        }
+        self.admission = AdmissionController(
+            self.config.standard_baseline_s, self.config.pause_ratio, self.config.resume_ratio
+        )
+        self.stats = FanoutStats()
+        self._wakeup = asyncio.Event()
+        self._workers: List[asyncio.Task] = []
+        self._closing = False
+
+    # -- admission ---------------------------------------------------------
+
+    def offer(self, alert: Alert) -> bool:
+        """Enqueue an alert without blocking; returns False if it was shed."""
+        if alert.tier not in self._queues:
+            raise ValueError(f"Unknown tier `{alert.tier}`")
+        self._refresh_admission()
+        if alert.tier == PREMIUM and len(self._queues[PREMIUM]) >= self.config.premium_capacity:
+            self.stats.shed[PREMIUM] += 1
+            return False
+        if self.depth() >= self.config.capacity:
+            if alert.tier == PREMIUM or not self._queues[PREMIUM]:
+                self.stats.shed[alert.tier] += 1
+                return False
+            # Make room for standard by shedding the newest premium alert.
+            self._queues[PREMIUM].pop()
+            self.stats.shed[PREMIUM] += 1
+        alert.enqueued_at = self._clock()
+        self._queues[alert.tier].append(alert)
+        self.stats.enqueued[alert.tier] += 1
+        self._wakeup.set()
+        return True
+
+    def offer_scored(
+        self,
+        scored: ScoredBatch,
+        transaction_ids: Sequence[str],
+        merchant_ids: Sequence[str],
+        tiers: Sequence[str],
+        region: str,
+    ) -> int:
+        """Route review/block decisions from a scored batch; returns alerts admitted."""
+        admitted = 0
+        rows = zip(transaction_ids, merchant_ids, tiers, scored.scores.tolist(), scored.decisions.tolist())
+        for txn_id, merchant_id, tier, score, decision in rows:
+            if decision == APPROVE:
+                continue
+            alert = Alert(txn_id, merchant_id, tier, region, score, DECISION_LABELS[decision])
+            admitted += self.offer(alert)
+        return admitted
+
+    def depth(self, tier: Optional[str] = None) -> int:
+        if tier is not None:
+            return len(self._queues[tier])
+        return sum(len(queue) for queue in self._queues.values())
+
+    def standard_age_s(self) -> float:
+        queue = self._queues[STANDARD]
+        return self._clock() - queue[0].enqueued_at if queue else 0.0
+
+    def _refresh_admission(self) -> bool:
+        paused = self.admission.update(self.standard_age_s())
+        self.stats.pauses = self.admission.pauses
+        return paused
+
+    # -- deficit round robin ----------------------------------------------
+
+    def _servable(self, tier: str) -> bool:
+        if not self._queues[tier]:
+            return False
+        if tier != PREMIUM:
+            return True
+        return not self.admission.paused and (self.guard is None or self.guard.admits())
+
+    def _pick(self) -> Optional[Alert]:
+        self._refresh_admission()
+        # Decide servability once per pick: the guard re-evaluates on a timer,
+        # and a tier flipping mid-loop must not leave the loop without a target.
+        servable = {tier: self._servable(tier) for tier in TIERS}
+        while any(servable.values()):
+            tier = TIERS[self._turn]
+            if servable[tier]:
+                head = self._queues[tier][0]
+                if self._deficit[tier] >= head.cost:
+                    if tier == PREMIUM and self.guard is not None and not self.guard.try_acquire():
+                        servable[PREMIUM] = False
+                        continue
+                    self._deficit[tier] -= head.cost
+                    return self._queues[tier].popleft()
+            else:
+                # Idle or paused tiers must not bank credit for later bursts.
+                self._deficit[tier] = 0
+            self._turn = (self._turn + 1) % len(TIERS)
+            self._deficit[TIERS[self._turn]] += self.config.weights[TIERS[self._turn]]
+        return None
+
+    # -- worker pool -------------------------------------------------------
+
+    async def start(self) -> None:
+        if self._workers:
+            return
+        self._closing = False
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.config.workers)]
+
+    async def stop(self) -> None:
+        """Drain every queued alert (except premium held by the guard), then stop the workers."""
+        self._closing = True
+        self._wakeup.set()
+        await asyncio.gather(*self._workers)
+        self._workers = []
+
+    async def _worker(self) -> None:
+        while True:
+            alert = self._pick()
+            if alert is None:
+                # Nothing servable: both queues are empty (premium is never
+                # paused by admission while the standard queue is empty), or
+                # the guard is holding premium.
+                if self._closing:
+                    return
+                self._wakeup.clear()
+                if self.guard is not None and self._queues[PREMIUM]:
+                    # Nothing wakes us when the guard's limit or breaker
+                    # relaxes, so re-check at its evaluation interval.
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), self.guard.config.eval_interval_s)
+                    except asyncio.TimeoutError:
+                        pass
+                else:
+                    await self._wakeup.wait()
+                continue
+            try:
+                await self._deliver(alert)
+            except Exception:
+                self.stats.failed[alert.tier] += 1
+            else:
+                self.stats.delivered[alert.tier] += 1
+                self._latencies[alert.tier].append(self._clock() - alert.enqueued_at)
+            finally:
+                if alert.tier == PREMIUM and self.guard is not None:
+                    self.guard.release()
+            if self.depth():
+                self._wakeup.set()
+
+    # -- reporting ---------------------------------------------------------
+
+    def latency_percentiles(self, tier: str, percentiles: Iterable[float] = (50, 95, 99)) -> Dict[str, float]:
+        """Enqueue-to-delivery latency percentiles in seconds (empty if nothing delivered)."""
+        samples = self._latencies[tier]
+        if not samples:
+            return {}
+        values = np.percentile(np.fromiter(samples, dtype=np.float64), list(percentiles))
+        return {f"p{p:g}": float(v) for p, v in zip(percentiles, values.tolist())}
@@ -0,0 +1,316 @@
+"""
+Online per-merchant anomaly baselines with fixed memory per merchant.
+
+Keeps a streaming baseline for every (region, merchant) and scores how far each
+transaction in a micro-batch sits from it. The three results are model features
+(`ANOMALY_FEATURE_NAMES`), computed from the event stream alone. The tier never
+enters, so premium and standard merchants feed the shared model identically:
+
+- `merchant_amount_zscore`: log amount against an EWMA mean/variance of the
+  merchant's log amounts.
+- `merchant_velocity_zscore`: the pace of this transaction, the log of events
+  per hour implied by the gap since the merchant's previous one (capped at a
+  day), against an EWMA mean/variance of that pace. Positive means faster than
+  usual.
+- `merchant_amount_tail`: -log10 of the share of the merchant's recent amounts
+  at or above this one (mid-bucket), from a decayed quantile sketch. 0 is
+  typical, 4 means beyond the 99.99th percentile.
+
+How the state is kept:
+
+- Each EWMA weighs events, not time (`alpha` per event, so about the last
+  1/alpha transactions), starts from zero and is bias-corrected. That makes a
+  merchant's baseline an exact linear function of its history. A micro-batch
+  is folded in with prefix sums: every event is scored against the baseline
+  as of the event just before it, including earlier events in the same batch,
+  so scores do not depend on how the stream is cut into batches (up to the
+  float32 rounding of the stored state). Events are folded in blocks of
+  `RANK_BLOCK` per merchant to keep the prefix sums well conditioned.
+- The quantile sketch is a histogram of `SKETCH_BUCKETS` log-spaced buckets
+  (a factor of 2**`SKETCH_LOG2_STEP` apart, from 1 minor unit up to 2**24;
+  larger amounts share the top bucket) decayed with the same `alpha`.
+- State lives in preallocated struct-of-arrays indexed by merchant slot. A
+  slot is found through an open-addressing hash table over the 16-byte
+  merchant id and region code, probed for a whole batch at once. The table has
+  at least two entries per slot. Memory is fixed by `capacity` at
+  `BYTES_PER_MERCHANT` (182 bytes) each, plus up to 8 more where the table
+  rounds up to a power of two. The footprint is `memory_bytes`.
+- When every slot is in use, a new merchant is not baselined (its features
+  are 0 and `overflow` counts it) until `expire` drops merchants idle since a
+  cutoff. Features are also 0 until a merchant has `min_history` events.
+
+The state holds only per-merchant aggregates, never cards, devices or raw
+events. The baseline updates online, so the detector never needs to re-read
+raw logs that the 30-day retention rule (fraud_radar.retention) has deleted.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+
+ANOMALY_FEATURE_NAMES: Tuple[str, ...] = (
+    "merchant_amount_zscore",
+    "merchant_velocity_zscore",
+    "merchant_amount_tail",
+)
+
+DEFAULT_CAPACITY = 1 << 16
+DEFAULT_ALPHA = 0.02  # per event: the baseline spans roughly the last 50 transactions
+MIN_HISTORY = 20
+RANK_BLOCK = 64
+
+SKETCH_BUCKETS = 32
+SKETCH_LOG2_STEP = 0.75
+MAX_GAP_MS = 86_400_000
+MIN_STD = 0.05  # log units: a merchant charging one fixed price does not make every cent an outlier
+MAX_ZSCORE = 10.0
+MIN_TAIL = 1e-4
+
+# slot keys (16 + 2), last_ts (8), events (4), four EWMA sums and the sketch
+# (float32) and two hash-table entries (int32).
+BYTES_PER_MERCHANT = 18 + 8 + 4 + 4 * (4 + SKETCH_BUCKETS) + 2 * 4
+
+_EMPTY = -1
+# Columns of the packed EWMA sums.
+_AMOUNT, _AMOUNT_SQ, _PACE, _PACE_SQ = 0, 1, 2, 3
+
+
+@dataclass(frozen=True)
+class MerchantBaseline:
+    events: int
+    last_ts_ms: int
+    typical_amount: float  # exp of the EWMA mean log amount, major units
+    amount_log_std: float
+    typical_per_hour: float  # exp of the EWMA mean log pace
+    p50_minor: float
+    p99_minor: float
+
+
+def _words(values: np.ndarray, width: int) -> np.ndarray:
+    """Fixed-width byte strings as rows of uint64 words."""
+    return np.ascontiguousarray(values.astype(f"S{width}")).view("<u8").reshape(len(values), -1)
+
+
+def _hash(region: np.ndarray, words: np.ndarray) -> np.ndarray:
+    h = words[:, 0] * np.uint64(0x9E3779B97F4A7C15) ^ words[:, 1] * np.uint64(0xC2B2AE3D27D4EB4F)
+    h ^= region.astype(np.uint64) * np.uint64(0x165667B19E3779F9)
+    h ^= h >> np.uint64(29)
+    h *= np.uint64(0x94D049BB133111EB)
+    h ^= h >> np.uint64(32)
+    return h
+
+
+def amount_buckets(amount_minor: np.ndarray) -> np.ndarray:
+    """Sketch bucket of each amount (minor units)."""
+    log2 = np.log2(1.0 + np.maximum(np.asarray(amount_minor, dtype=np.float64), 0.0))
+    return np.minimum((log2 / SKETCH_LOG2_STEP).astype(np.int64), SKETCH_BUCKETS - 1)
+
+
+def bucket_upper_minor(bucket: np.ndarray) -> np.ndarray:
+    return 2.0 ** ((np.asarray(bucket) + 1) * SKETCH_LOG2_STEP) - 1.0
+
+
+class MerchantAnomalyDetector:
+    """Streaming amount/velocity baselines and quantile sketches for up to `capacity` (region, merchant) pairs."""
+
+    def __init__(
+        self, capacity: int = DEFAULT_CAPACITY, alpha: float = DEFAULT_ALPHA, min_history: int = MIN_HISTORY
+    ) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        if not 0.0 < alpha < 1.0:
+            raise ValueError("alpha must be in (0, 1)")
+        self.capacity = capacity
+        self.alpha = alpha
+        self.min_history = min_history
+        self._table = np.full(1 << max(3, (2 * capacity - 1).bit_length()), _EMPTY, dtype=np.int32)
+        self._mask = len(self._table) - 1
+        self._key = np.zeros((capacity, 2), dtype=np.uint64)
+        self._region = np.zeros(capacity, dtype=np.uint16)
+        self._last_ts = np.zeros(capacity, dtype=np.int64)
+        self._events = np.zeros(capacity, dtype=np.uint32)
+        self._sums = np.zeros((capacity, 4), dtype=np.float32)
+        self._sketch = np.zeros((capacity, SKETCH_BUCKETS), dtype=np.float32)
+        self._count = 0
+        self.overflow = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def memory_bytes(self) -> int:
+        arrays = (self._table, self._key, self._region, self._last_ts, self._events, self._sums, self._sketch)
+        return sum(array.nbytes for array in arrays)
+
+    # -- slot lookup -------------------------------------------------------
+
+    def _slots(self, region: np.ndarray, words: np.ndarray, insert: bool) -> np.ndarray:
+        """Slot of each (unique) key, claiming free slots if `insert`; -1 where absent or full."""
+        table, mask = self._table, self._mask
+        pos = (_hash(region, words) & np.uint64(mask)).astype(np.int64)
+        slots = np.full(len(words), _EMPTY, dtype=np.int64)
+        pending = np.arange(len(words))
+        while len(pending):
+            probe = pos[pending]
+            ref = table[probe].astype(np.int64)
+            occupied = np.flatnonzero(ref != _EMPTY)
+            hit = occupied[
+                (self._key[ref[occupied], 0] == words[pending[occupied], 0])
+                & (self._key[ref[occupied], 1] == words[pending[occupied], 1])
+                & (self._region[ref[occupied]] == region[pending[occupied]])
+            ]
+            slots[pending[hit]] = ref[hit]
+            free = np.flatnonzero(ref == _EMPTY)
+            if insert and len(free) and self._count < self.capacity:
+                # Keys probing the same free entry: the first claims it, the others probe on.
+                claimed, first = np.unique(probe[free], return_index=True)
+                winners = pending[free[first]]
+                room = self.capacity - self._count
+                claimed, winners = claimed[:room], winners[:room]
+                ids = np.arange(self._count, self._count + len(winners))
+                self._key[ids] = words[winners]
+                self._region[ids] = region[winners]
+                table[claimed] = ids
+                slots[winners] = ids
+                self._count += len(winners)
+            pending = pending[slots[pending] == _EMPTY]
+            # A key that reached a free entry without claiming it is absent (or the detector is full).
+            pending = pending[table[pos[pending]] != _EMPTY]
+            pos[pending] = (pos[pending] + 1) & mask
+        if insert:
+            self.overflow += int((slots == _EMPTY).sum())
+        return slots
+
+    def _slot(self, region: bytes, merchant_id: bytes) -> int:
+        codes = np.array([region], dtype="S2").view("<u2")
+        return int(self._slots(codes, _words(np.array([merchant_id], dtype="S16"), 16), insert=False)[0])
+
+    # -- batch update ------------------------------------------------------
+
+    def update(
+        self, regions: np.ndarray, merchant_ids: np.ndarray, ts_ms: np.ndarray, amount_minor: np.ndarray
+    ) -> np.ndarray:
+        """Score a batch against each merchant's baseline, fold it in, and return (batch, 3) features."""
+        n = len(merchant_ids)
+        out = np.zeros((n, len(ANOMALY_FEATURE_NAMES)))
+        if n == 0:
+            return out
+        region = np.asarray(regions, dtype="S2").view("<u2")
+        words = _words(np.asarray(merchant_ids), 16)
+        ts = np.asarray(ts_ms, dtype=np.int64)
+        order = np.lexsort((ts, words[:, 1], words[:, 0], region))
+        region_o, words_o = region[order], words[order]
+        new_group = np.empty(n, dtype=bool)
+        new_group[0] = True
+        new_group[1:] = (region_o[1:] != region_o[:-1]) | np.any(words_o[1:] != words_o[:-1], axis=1)
+        starts = np.flatnonzero(new_group)
+        group = np.cumsum(new_group) - 1
+        rank = np.arange(n) - starts[group]
+        slot = self._slots(region_o[starts], words_o[starts], insert=True)[group]
+
+        amounts = np.asarray(amount_minor, dtype=np.float64)[order]
+        for block in range(int(rank.max()) // RANK_BLOCK + 1):
+            take = np.flatnonzero((rank // RANK_BLOCK == block) & (slot != _EMPTY))
+            if len(take):
+                out[order[take]] = self._apply(slot[take], ts[order[take]], amounts[take])
+        return out
+
+    def _apply(self, s: np.ndarray, t: np.ndarray, amount: np.ndarray) -> np.ndarray:
+        """Score and fold one block: events grouped by slot, in time order, at most RANK_BLOCK per slot."""
+        n = len(s)
+        alpha, beta = self.alpha, 1.0 - self.alpha
+        first = np.empty(n, dtype=bool)
+        first[0] = True
+        first[1:] = s[1:] != s[:-1]
+        starts = np.flatnonzero(first)
+        ends = np.append(starts[1:], n) - 1
+        group = np.cumsum(first) - 1
+        rank = np.arange(n) - starts[group]
+        seen = self._events[s].astype(np.int64) + rank  # events before this one
+
+        previous = np.where(first, self._last_ts[s], np.roll(t, 1))
+        gap = np.where(seen > 0, np.clip(t - previous, 1, MAX_GAP_MS), MAX_GAP_MS)
+        pace = np.log1p(3_600_000.0 / gap)
+        x = np.log1p(amount / 100.0)
+        bucket = amount_buckets(amount)
+
+        # Zero-started EWMA sums as of each event: beta**rank * (stored + alpha * weighted prefix of the block).
+        decay = beta**rank
+        lift = beta ** -(rank + 1.0)
+        weighted = np.zeros((n, 4 + SKETCH_BUCKETS))
+        weighted[:, :4] = np.stack([x, x * x, pace, pace * pace], axis=1) * lift[:, None]
+        weighted[np.arange(n), 4 + bucket] = lift
+        stored = np.concatenate([self._sums[s], self._sketch[s]], axis=1).astype(np.float64)
+        if len(starts) == n:
+            # One event per merchant (the usual case across many merchants): nothing earlier in the block.
+            before = stored
+            folded = stored + alpha * weighted
+        else:
+            prefix = np.zeros((n + 1, 4 + SKETCH_BUCKETS))
+            np.cumsum(weighted, axis=0, out=prefix[1:])
+            before = decay[:, None] * (stored + alpha * (prefix[:-1] - prefix[starts[group]]))
+            folded = stored[starts] + alpha * (prefix[ends + 1] - prefix[starts])
+
+        norm = np.maximum(1.0 - beta**seen, 1e-12)
+        features = np.zeros((n, len(ANOMALY_FEATURE_NAMES)))
+        for column, (mean_col, sq_col, value) in enumerate(((_AMOUNT, _AMOUNT_SQ, x), (_PACE, _PACE_SQ, pace))):
+            mean = before[:, mean_col] / norm
+            std = np.sqrt(np.maximum(before[:, sq_col] / norm - mean * mean, 0.0))
+            features[:, column] = np.clip((value - mean) / np.maximum(std, MIN_STD), -MAX_ZSCORE, MAX_ZSCORE)
+        sketch = before[:, 4:]
+        above = np.zeros((n, SKETCH_BUCKETS + 1))  # above[:, b]: weight in buckets b and up
+        above[:, :-1] = np.cumsum(sketch[:, ::-1], axis=1)[:, ::-1]
+        rows = np.arange(n)
+        share = (above[rows, bucket + 1] + 0.5 * sketch[rows, bucket]) / norm
+        features[:, 2] = -np.log10(np.clip(share, MIN_TAIL, 1.0))
+        features[seen < self.min_history] = 0.0
+
+        # Fold the block into each slot: the same sums as of one event past its last.
+        us = s[starts]
+        after = (beta ** (rank[ends] + 1.0))[:, None] * folded
+        self._sums[us] = after[:, :4]
+        self._sketch[us] = after[:, 4:]
+        self._events[us] = np.minimum(seen[ends] + 1, np.iinfo(np.uint32).max)
+        self._last_ts[us] = np.maximum(self._last_ts[us], t[ends])
+        return features
+
+    # -- inspection and expiry -----------------------------------------------
+
+    def baseline(self, region: bytes, merchant_id: bytes) -> Optional[MerchantBaseline]:
+        slot = self._slot(region, merchant_id)
+        if slot == _EMPTY or not self._events[slot]:
+            return None
+        events = int(self._events[slot])
+        sums = self._sums[slot].astype(np.float64) / (1.0 - (1.0 - self.alpha) ** events)
+        sketch = self._sketch[slot].astype(np.float64)
+        cdf = np.cumsum(sketch) / sketch.sum()
+        p50, p99 = bucket_upper_minor(np.searchsorted(cdf, [0.5, 0.99]))
+        return MerchantBaseline(
+            events=events,
+            last_ts_ms=int(self._last_ts[slot]),
+            typical_amount=float(np.expm1(sums[_AMOUNT])),
+            amount_log_std=float(np.sqrt(max(sums[_AMOUNT_SQ] - sums[_AMOUNT] ** 2, 0.0))),
+            typical_per_hour=float(np.expm1(sums[_PACE])),
+            p50_minor=float(p50),
+            p99_minor=float(p99),
+        )
+
+    def expire(self, idle_before_ms: int) -> int:
+        """Drop merchants with no event since `idle_before_ms` and rebuild the table; returns the number dropped."""
+        keep = np.flatnonzero(self._last_ts[: self._count] >= idle_before_ms)
+        dropped = self._count - len(keep)
+        if not dropped:
+            return 0
+        saved = [array[keep].copy() for array in (self._last_ts, self._events, self._sums, self._sketch)]
+        key, region = self._key[keep].copy(), self._region[keep].copy()
+        self._table.fill(_EMPTY)
+        self._count = 0
+        slots = self._slots(region, key, insert=True)
+        for array, values in zip((self._last_ts, self._events, self._sums, self._sketch), saved):
+            array[slots] = values
+            array[self._count :] = 0
+        self._key[self._count :] = 0
+        self._region[self._count :] = 0
+        return dropped
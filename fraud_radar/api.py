@@ -0,0 +1,216 @@
+"""
+HTTP surface for the fraud scoring API (`POST /api/v1/score`), its
+Prometheus metrics (`GET /metrics`) and the health check the in-region router
+probes (`GET /health`, fraud_radar/router.py).
+
+Request body:
+  {"feature_version": 2,
+   "transactions": [{"transaction_id": "...", "merchant_id": "...",
+                     "tier": "standard" | "premium", "features": [...]}, ...]}
+
+`feature_version` names the `fraud_radar.scoring.FEATURE_SCHEMAS` entry the
+vectors follow. Without it the version is inferred from the vector width, so
+clients still sending the 8 version-1 features keep working; older vectors are
+zero-padded to the model's width. The response echoes the version used.
+
+Transactions are validated as one batch against `fraud_radar.schema.SCORE_REQUEST`,
+which accepts the same fields for every tier and rejects CVV/PAN fields. The
+tier is validated but never passed to the model: every transaction in a
+request is scored in one batch by the same engine.
+
+With `ApiMetrics`, every score request records its latency and outcome:
+server errors (5xx) count against the 99.9 % monthly uptime SLO, client
+errors (4xx) do not.
+
+With a `TenantRateLimiter`, requests must name their tenant in `X-Tenant-ID`
+and spend one token per transaction; a tenant over its limit gets 429 with
+`Retry-After` while every other tenant is unaffected. A request is validated
+before it is admitted, so a malformed one (400) spends no tokens.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import math
+import time
+from dataclasses import dataclass
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler
+from typing import Any, Dict, List, Optional, Type
+
+import numpy as np
+
+from fraud_radar.metrics import PROMETHEUS_CONTENT_TYPE, BurnRateTracker, MetricsRegistry
+from fraud_radar.ratelimit import TenantRateLimiter
+from fraud_radar.schema import SCORE_REQUEST, TIERS, TieredValidator
+from fraud_radar.scoring import DECISION_LABELS, FEATURE_SCHEMAS, MicroBatcher, feature_schema_version, pad_features
+
+logger = logging.getLogger(__name__)
+
+SCORE_ROUTE = "/api/v1/score"
+METRICS_ROUTE = "/metrics"
+HEALTH_ROUTE = "/health"
+TENANT_HEADER = "X-Tenant-ID"
+
+# project3.yaml observability: uptime_slo "99.9", p95_latency_ms 2000.
+UPTIME_SLO = 0.999
+P95_LATENCY_TARGET_S = 2.0
+
+_REQUEST_VALIDATOR = TieredValidator(SCORE_REQUEST)
+
+
+@dataclass
+class ScoreRequest:
+    """A validated score request: features already padded to the model's width."""
+
+    transaction_ids: List[Any]
+    features: np.ndarray
+    feature_version: Optional[int]
+
+    def __len__(self) -> int:
+        return len(self.transaction_ids)
+
+
+def validate_score_request(payload: Any, n_features: int) -> ScoreRequest:
+    """Validate a score request body for a model taking `n_features` features; raises ValueError."""
+    transactions = payload.get("transactions") if isinstance(payload, dict) else None
+    columns = _REQUEST_VALIDATOR.validate(transactions, "transactions")
+    features = columns["features"]
+    width = features.shape[1]
+    version = payload.get("feature_version")
+    if version is None:
+        version = feature_schema_version(width)
+    elif type(version) is not int or version not in FEATURE_SCHEMAS:
+        raise ValueError(f"feature_version: expected one of {sorted(FEATURE_SCHEMAS)}")
+    elif width != len(FEATURE_SCHEMAS[version]):
+        raise ValueError(f"transactions[0].features: expected {len(FEATURE_SCHEMAS[version])} numeric values")
+    if width > n_features or (width < n_features and version is None):
+        raise ValueError(f"transactions[0].features: expected {n_features} numeric values")
+    return ScoreRequest(columns["transaction_id"].tolist(), pad_features(features, n_features), version)
+
+
+def score_request(batcher: MicroBatcher, request: ScoreRequest) -> Dict[str, Any]:
+    """Per-transaction scores and decisions for a validated request."""
+    scored = batcher.submit(request.features)
+    results = [
+        {
+            "transaction_id": txn_id,
+            "score": round(score, 6),
+            "decision": DECISION_LABELS[decision],
+        }
+        for txn_id, score, decision in zip(request.transaction_ids, scored.scores.tolist(), scored.decisions.tolist())
+    ]
+    return {"model_version": scored.model_version, "feature_version": request.feature_version, "results": results}
+
+
+def score_transactions(batcher: MicroBatcher, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate a score request and return per-transaction scores and decisions."""
+    return score_request(batcher, validate_score_request(payload, batcher.engine.model.n_features))
+
+
+def check_rate_limit(limiter: TenantRateLimiter, tenant: Optional[str], transactions: int) -> Optional[float]:
+    """None if the request is admitted, else seconds until it could be (inf if it exceeds the tenant's burst)."""
+    if not tenant:
+        raise ValueError(f"Missing {TENANT_HEADER} header")
+    cost = float(max(1, transactions))
+    if limiter.try_acquire(tenant, cost):
+        return None
+    return limiter.retry_after(tenant, cost)
+
+
+class ApiMetrics:
+    """Request latency histogram, outcome counters and the uptime SLO tracker for one API process."""
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None, slo: Optional[BurnRateTracker] = None) -> None:
+        self.registry = registry or MetricsRegistry()
+        self.latency = self.registry.histogram(
+            "fraud_radar_score_request_seconds", "Scoring API request latency in seconds."
+        )
+        self._outcomes = {
+            outcome: self.registry.counter(
+                "fraud_radar_score_requests_total", "Scoring API requests by outcome.", outcome=outcome
+            )
+            for outcome in ("ok", "rate_limited", "client_error", "server_error")
+        }
+        self.slo = self.registry.slo(
+            "fraud_radar_score_uptime", "Scoring API 99.9% monthly uptime.", slo or BurnRateTracker(UPTIME_SLO)
+        )
+
+    def observe(self, status: int, latency_s: float) -> None:
+        self.latency.record(latency_s)
+        if status >= 500:
+            self._outcomes["server_error"].inc()
+        elif status == HTTPStatus.TOO_MANY_REQUESTS:
+            self._outcomes["rate_limited"].inc()
+        elif status >= 400:
+            self._outcomes["client_error"].inc()
+        else:
+            self._outcomes["ok"].inc()
+        self.slo.record(status < 500)
+
+
+def make_handler(
+    batcher: MicroBatcher,
+    metrics: Optional[ApiMetrics] = None,
+    limiter: Optional[TenantRateLimiter] = None,
+) -> Type[BaseHTTPRequestHandler]:
+    class ScoreHandler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:  # noqa: N802 - http.server naming
+            if self.path == HEALTH_ROUTE:
+                self._reply(HTTPStatus.OK, {"status": "ok", "model_version": batcher.engine.model_version})
+                return
+            if self.path != METRICS_ROUTE or metrics is None:
+                self._reply(HTTPStatus.NOT_FOUND, {"error": f"unknown route {self.path}"})
+                return
+            self._send(HTTPStatus.OK, metrics.registry.render().encode("utf-8"), PROMETHEUS_CONTENT_TYPE)
+
+        def do_POST(self) -> None:  # noqa: N802 - http.server naming
+            if self.path != SCORE_ROUTE:
+                self._reply(HTTPStatus.NOT_FOUND, {"error": f"unknown route {self.path}"})
+                return
+            started = time.perf_counter()
+            status = HTTPStatus.OK
+            headers: Dict[str, str] = {}
+            try:
+                length = int(self.headers.get("Content-Length", "0"))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                # Validate before admission: a request answered with 400 must not spend the tenant's tokens.
+                request = validate_score_request(payload, batcher.engine.model.n_features)
+                retry_after = None
+                if limiter is not None:
+                    retry_after = check_rate_limit(limiter, self.headers.get(TENANT_HEADER), len(request))
+                if retry_after is None:
+                    body = score_request(batcher, request)
+                elif math.isinf(retry_after):
+                    status, body = HTTPStatus.TOO_MANY_REQUESTS, {"error": "request exceeds the tenant's burst limit"}
+                else:
+                    status, body = HTTPStatus.TOO_MANY_REQUESTS, {"error": "tenant rate limit exceeded"}
+                    headers["Retry-After"] = str(max(1, math.ceil(retry_after)))
+            except ValueError as exc:  # includes json.JSONDecodeError
+                status, body = HTTPStatus.BAD_REQUEST, {"error": str(exc)}
+            except Exception:
+                logger.exception("scoring request failed")
+                status, body = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "internal error"}
+            self._reply(status, body, headers)
+            if metrics is not None:
+                metrics.observe(status, time.perf_counter() - started)
+
+        def _reply(self, status: HTTPStatus, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+            self._send(status, json.dumps(body).encode("utf-8"), "application/json", headers)
+
+        def _send(
+            self, status: HTTPStatus, data: bytes, content_type: str, headers: Optional[Dict[str, str]] = None
+        ) -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+            # Request lines carry merchant traffic; keep them out of stderr.
+            return
+
+    return ScoreHandler
@@ -0,0 +1,718 @@
+"""
+Replayable chaos experiments on a virtual clock.
+
+experiments/chaos/2025-11-17.md describes its experiments in prose. This module
+declares them as code (`SCENARIOS`). Each one runs as a seeded discrete-event
+simulation over local stand-ins for scoring, routing and alert fanout. Faults
+are injected on a virtual clock, so an hour of peak traffic replays in seconds
+and the same seed always gives the same report.
+
+- Control events sit on a heap keyed by virtual time: fault start and end,
+  router health-check rounds, and instance ejections. Between two events,
+  traffic advances in segments of at most `segment_s`.
+- Scoring: Poisson arrivals at `rate_per_s`, a `premium_share` of them from
+  premium merchants, are spread uniformly over the instances in rotation
+  (the real router's power-of-two pick is not modelled). Each instance is a
+  FIFO server with exponential service times. A segment's queue is solved
+  for every instance at once with the Lindley recurrence
+  D_n = max(D_{n-1}, A_n) + S_n, written as a prefix sum plus a running
+  maximum, and the backlog carries into the next segment.
+- Routing follows `RouterConfig`. A probe round every `probe_interval_s`
+  ejects a dead instance once its probe times out, and brings a recovered
+  one back after `healthy_after` good probes. An attempt sent to a dead
+  instance fails after `attempt_timeout_s`. After `eject_after_failures`
+  consecutive failures the instance is ejected without waiting for a probe,
+  and the request is retried once in another AZ.
+- Alert fanout is a fluid model of `FanoutScheduler`. Scored requests raise
+  alerts at `alert_share`, and a premium flood adds more. Queues are shed
+  with the scheduler's rules: premium goes first. `workers` are shared by
+  deficit-round-robin weight. The scheduler's own `AdmissionController` and
+  the real `PremiumGuard`, both running on the virtual clock, decide how many
+  premium deliveries may run. Alert delivery latency is resolved to one
+  segment.
+- Contention: each premium delivery in flight uses `delivery_cpu_share` of
+  one scoring instance's CPU, which stretches scoring service times. This is
+  the coupling the guard exists to break. `guarded=False` replays the same
+  scenario without the guard, which is how the chaos log first described it.
+
+A `ChaosReport` holds per-tier scoring latency, availability and retries,
+per-tier alert enqueue/deliver/shed counts and delivery latency, breaker
+activity, router ejections and AZ detection time. It passes when the
+graceful-degradation promise holds:
+
+- scoring p99 is within its 200 ms target for both tiers;
+- availability is at least the 99.9 % uptime SLO;
+- no standard alert is shed, and standard delivery p99 is within its
+  180 s baseline;
+- a dead AZ leaves rotation within one probe interval plus the probe
+  timeout.
+
+Premium alerts may be shed or delayed, because that is the degradation the
+promise allows.
+
+Usage:
+  uv run python -m fraud_radar.chaos                      # every scenario, JSON next to the chaos log
+  uv run python -m fraud_radar.chaos az-failure --json
+  uv run python -m fraud_radar.chaos premium-overload --no-guard --out-dir /tmp
+"""
+from __future__ import annotations
+
+import argparse
+import heapq
+import json
+import math
+import sys
+from collections import deque
+from dataclasses import asdict, dataclass, field, replace
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple, Type
+
+import numpy as np
+
+from fraud_radar.alerts import PREMIUM, STANDARD, STANDARD_BASELINE_S, TIERS, AdmissionController, FanoutConfig
+from fraud_radar.api import UPTIME_SLO
+from fraud_radar.events import CA, IN, Region
+from fraud_radar.metrics import LatencyHistogram
+from fraud_radar.overload import SCORING_P99_TARGET_S, GuardConfig, PremiumGuard
+from fraud_radar.router import HEALTH_CHECK_FAILED, REQUESTS_FAILING, Ejection, RouterConfig
+
+CHAOS_DIR = Path(__file__).resolve().parents[1] / "experiments" / "chaos"
+CHAOS_LOG = "2025-11-17.md"
+
+AZ_OUTAGE = "az_outage"
+PREMIUM_FLOOD = "premium_flood"
+FAULT_KINDS = (AZ_OUTAGE, PREMIUM_FLOOD)
+
+# Event kinds, in the order they apply when they share a timestamp.
+_FAULT_START, _FAULT_END, _EJECT, _PROBE = range(4)
+# Lindley offsets: one instance's running maximum must never leak into the next.
+_INSTANCE_OFFSET_S = 1e6
+
+
+@dataclass(frozen=True)
+class Fault:
+    kind: str
+    at_s: float
+    duration_s: float
+    az: str = ""  # AZ suffix, for AZ_OUTAGE
+    rate_per_s: float = 0.0  # extra premium alerts per second, for PREMIUM_FLOOD
+
+    def __post_init__(self) -> None:
+        if self.kind not in FAULT_KINDS:
+            raise ValueError(f"Unknown fault kind `{self.kind}`; expected one of {FAULT_KINDS}")
+        if self.at_s < 0 or self.duration_s <= 0:
+            raise ValueError("Expected at_s >= 0 and duration_s > 0")
+        if self.kind == AZ_OUTAGE and not self.az:
+            raise ValueError("An AZ outage needs the AZ suffix it takes down")
+        if self.kind == PREMIUM_FLOOD and self.rate_per_s <= 0:
+            raise ValueError("A premium flood needs a positive rate_per_s")
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    experiment: str  # heading of the experiment in the chaos log
+    region: Type[Region]
+    faults: Tuple[Fault, ...]
+    azs: Tuple[str, ...] = ("a", "b", "d")  # suffixes of the region's AWS name
+    instances_per_az: int = 2
+    duration_s: float = 3600.0
+    rate_per_s: float = 1_500.0  # scoring requests per second
+    premium_share: float = 0.2  # share of scoring requests from premium merchants
+    alert_share: float = 0.03  # share of scored requests that raise a review/block alert
+    service_s: float = 0.002  # mean scoring service time per request on an idle instance
+    attempt_timeout_s: float = 0.1
+    attempts: int = 2
+    premium_delivery_s: float = 0.2  # one premium webhook delivery
+    standard_delivery_s: float = 0.05  # one standard dashboard write
+    delivery_cpu_share: float = 0.25  # scoring-instance CPU used by one premium delivery in flight
+    segment_s: float = 0.25
+    router: RouterConfig = RouterConfig()
+    fanout: FanoutConfig = field(default_factory=FanoutConfig)
+    guard: GuardConfig = field(default_factory=GuardConfig)
+    seed: int = 0
+
+    def __post_init__(self) -> None:
+        if len(set(self.azs)) < self.router.min_azs or self.instances_per_az < 1:
+            raise ValueError(f"Expected at least {self.router.min_azs} AZs with one instance each")
+        if self.duration_s <= 0 or self.rate_per_s <= 0 or self.service_s <= 0 or self.segment_s <= 0:
+            raise ValueError("duration_s, rate_per_s, service_s and segment_s must be positive")
+        if not 0.0 <= self.premium_share <= 1.0 or not 0.0 <= self.alert_share <= 1.0:
+            raise ValueError("premium_share and alert_share must be in [0, 1]")
+        for fault in self.faults:
+            if fault.kind == AZ_OUTAGE and fault.az not in self.azs:
+                raise ValueError(f"Fault targets AZ `{fault.az}`, not one of {self.azs}")
+
+    def scaled(self, factor: float) -> "Scenario":
+        """The same scenario with its duration and fault timeline shrunk by `factor` (for quick runs)."""
+        faults = tuple(replace(f, at_s=f.at_s * factor, duration_s=f.duration_s * factor) for f in self.faults)
+        return replace(self, duration_s=self.duration_s * factor, faults=faults)
+
+
+# Experiment 1: hard-fail one ca-central-1 AZ for half an hour of peak evening load.
+AZ_FAILURE = Scenario(
+    name="az-failure",
+    experiment="Experiment 1 — ca-central-1 AZ Failure During Peak Load",
+    region=CA,
+    faults=(Fault(AZ_OUTAGE, at_s=900.0, duration_s=1800.0, az="a"),),
+)
+
+# Experiment 2: a few ap-south-1 premium merchants flood the premium alert queue while
+# standard scoring stays at peak. The large worker pool is what let premium fanout eat
+# scoring CPU before the guard existed.
+PREMIUM_OVERLOAD = Scenario(
+    name="premium-overload",
+    experiment="Experiment 2 — Premium Alert Queue Overload",
+    region=IN,
+    faults=(Fault(PREMIUM_FLOOD, at_s=600.0, duration_s=1800.0, rate_per_s=500.0),),
+    azs=("a", "b", "c"),
+    fanout=FanoutConfig(workers=32),
+)
+
+SCENARIOS: Dict[str, Scenario] = {scenario.name: scenario for scenario in (AZ_FAILURE, PREMIUM_OVERLOAD)}
+
+
+# -- report -------------------------------------------------------------------
+
+
+@dataclass
+class ChaosReport:
+    scenario: str
+    experiment: str
+    region: str
+    guarded: bool
+    seed: int
+    duration_s: float
+    faults: List[Dict[str, Any]]
+    scoring: Dict[str, Dict[str, Any]]  # per tier: requests, failed, retried, availability, latency quantiles
+    alerts: Dict[str, Dict[str, Any]]  # per tier: enqueued, delivered, shed, pending, delivery quantiles
+    misrouted: int  # attempts sent to an instance that was already dead
+    detect_s: Optional[float]  # fault start -> last instance of the dead AZ out of rotation
+    detect_limit_s: float
+    breaker_opens: int
+    premium_paused_s: float  # virtual seconds the breaker held premium fanout
+    admission_pauses: int
+    min_premium_limit: Optional[float]
+    ejections: List[Dict[str, Any]]
+
+    def failures(self) -> List[str]:
+        failed = []
+        for tier in TIERS:
+            scoring = self.scoring[tier]
+            if (scoring["p99_s"] or 0.0) > SCORING_P99_TARGET_S:
+                failed.append(f"{tier} scoring p99 = {scoring['p99_s']:.3f} s > {SCORING_P99_TARGET_S:g} s")
+            if scoring["availability"] < UPTIME_SLO:
+                failed.append(f"{tier} scoring availability = {scoring['availability']:.5f} < {UPTIME_SLO:g}")
+        standard = self.alerts[STANDARD]
+        if standard["shed"]:
+            failed.append(f"{standard['shed']} standard alerts shed")
+        if (standard["p99_s"] or 0.0) > STANDARD_BASELINE_S:
+            failed.append(f"standard alert delivery p99 = {standard['p99_s']:.1f} s > {STANDARD_BASELINE_S:g} s")
+        if any(fault["kind"] == AZ_OUTAGE for fault in self.faults):
+            if self.detect_s is None or self.detect_s > self.detect_limit_s:
+                failed.append(f"dead AZ not out of rotation within {self.detect_limit_s:g} s (took {self.detect_s})")
+        return failed
+
+    @property
+    def passed(self) -> bool:
+        return not self.failures()
+
+    def to_json(self) -> Dict[str, Any]:
+        document = asdict(self)
+        document["passed"] = self.passed
+        document["failures"] = self.failures()
+        return document
+
+
+# -- stand-ins ----------------------------------------------------------------
+
+
+class VirtualClock:
+    """Monotonic clock that only moves when the simulation advances it."""
+
+    def __init__(self, start: float = 0.0) -> None:
+        self.now = start
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _Cohorts:
+    """FIFO alert queue as (enqueued_at, count) cohorts."""
+
+    def __init__(self) -> None:
+        self._cohorts: Deque[List[float]] = deque()
+        self.depth = 0
+
+    def push(self, at: float, count: int) -> None:
+        if count:
+            self._cohorts.append([at, count])
+            self.depth += count
+
+    def drop_newest(self, count: int) -> int:
+        dropped = 0
+        while dropped < count and self._cohorts:
+            cohort = self._cohorts[-1]
+            take = min(count - dropped, int(cohort[1]))
+            cohort[1] -= take
+            dropped += take
+            if not cohort[1]:
+                self._cohorts.pop()
+        self.depth -= dropped
+        return dropped
+
+    def pop_oldest(self, count: int, now: float, waits: List[Tuple[float, int]]) -> int:
+        """Deliver up to `count` alerts at `now`, appending (wait, alerts) pairs to `waits`."""
+        served = 0
+        while served < count and self._cohorts:
+            cohort = self._cohorts[0]
+            take = min(count - served, int(cohort[1]))
+            waits.append((now - cohort[0], take))
+            cohort[1] -= take
+            served += take
+            if not cohort[1]:
+                self._cohorts.popleft()
+        self.depth -= served
+        return served
+
+    def head_age(self, now: float) -> float:
+        return now - self._cohorts[0][0] if self._cohorts else 0.0
+
+
+def _weighted_quantiles(waits: List[Tuple[float, int]], quantiles: Tuple[float, ...]) -> List[Optional[float]]:
+    if not waits:
+        return [None] * len(quantiles)
+    values, counts = np.array(waits, dtype=np.float64).T
+    order = np.argsort(values, kind="stable")
+    cumulative = np.cumsum(counts[order])
+    ranks = np.ceil(np.asarray(quantiles) * cumulative[-1])
+    picks = np.searchsorted(cumulative, np.maximum(ranks, 1.0))
+    return values[order][picks].tolist()
+
+
+# -- simulation ---------------------------------------------------------------
+
+
+class _Simulation:
+    def __init__(self, scenario: Scenario, guarded: bool) -> None:
+        self.scenario = scenario
+        self.rng = np.random.default_rng(scenario.seed)
+        self.clock = VirtualClock()
+        aws = scenario.region.aws_region
+        self.names = [f"{aws}{az}-{idx}" for az in scenario.azs for idx in range(scenario.instances_per_az)]
+        self.az_of = np.repeat(np.arange(len(scenario.azs)), scenario.instances_per_az)
+        count = len(self.names)
+        self.alive = np.ones(count, dtype=bool)
+        self.in_rotation = np.ones(count, dtype=bool)
+        self.good_probes = np.zeros(count, dtype=np.int64)
+        self.failed_requests = np.zeros(count, dtype=np.int64)
+        self.eject_pending = np.zeros(count, dtype=bool)
+        self.free_at = np.zeros(count, dtype=np.float64)
+        self.ejections: List[Ejection] = []
+        self.events: List[Tuple[float, int, int, Any]] = []
+        self._seq = 0
+        # Retries not yet due: (time, started, premium, failed AZ).
+        self.retries = (np.empty(0), np.empty(0), np.empty(0, dtype=bool), np.empty(0, dtype=np.int64))
+        self.flood_rate = 0.0
+
+        self.latency = {tier: LatencyHistogram() for tier in TIERS}
+        self.requests = dict.fromkeys(TIERS, 0)
+        self.failed = dict.fromkeys(TIERS, 0)
+        self.retried = dict.fromkeys(TIERS, 0)
+        self.misrouted = 0
+
+        fanout = scenario.fanout
+        self.queues = {tier: _Cohorts() for tier in TIERS}
+        self.waits: Dict[str, List[Tuple[float, int]]] = {tier: [] for tier in TIERS}
+        self.enqueued = dict.fromkeys(TIERS, 0)
+        self.delivered = dict.fromkeys(TIERS, 0)
+        self.shed = dict.fromkeys(TIERS, 0)
+        self.credit = dict.fromkeys(TIERS, 0.0)  # fractional deliveries carried between segments
+        self.admission = AdmissionController(fanout.standard_baseline_s, fanout.pause_ratio, fanout.resume_ratio)
+        self.guard = (
+            PremiumGuard(scenario.guard, clock=self.clock, on_change=lambda *_: None) if guarded else None
+        )
+        self.premium_paused_s = 0.0
+        self.min_limit: Optional[float] = None
+
+    def _push(self, at: float, kind: int, payload: Any = None) -> None:
+        self._seq += 1
+        heapq.heappush(self.events, (at, kind, self._seq, payload))
+
+    # -- control events ----------------------------------------------------
+
+    def _apply(self, kind: int, payload: Any) -> None:
+        now = self.clock.now
+        if kind == _FAULT_START or kind == _FAULT_END:
+            fault: Fault = payload
+            starting = kind == _FAULT_START
+            if fault.kind == AZ_OUTAGE:
+                self.alive[self.az_of == self.scenario.azs.index(fault.az)] = not starting
+            else:
+                self.flood_rate += fault.rate_per_s if starting else -fault.rate_per_s
+        elif kind == _EJECT:
+            index, reason = payload
+            if reason == HEALTH_CHECK_FAILED:
+                self.eject_pending[index] = False
+            if self.in_rotation[index]:
+                self._eject(index, reason, now)
+        elif kind == _PROBE:
+            config = self.scenario.router
+            for index in range(len(self.names)):
+                if not self.alive[index]:
+                    self.good_probes[index] = 0
+                    if self.in_rotation[index] and not self.eject_pending[index]:
+                        # The failed probe is only seen once it times out.
+                        self.eject_pending[index] = True
+                        self._push(now + config.probe_timeout_s, _EJECT, (index, HEALTH_CHECK_FAILED))
+                    continue
+                self.good_probes[index] += 1
+                if not self.in_rotation[index] and self.good_probes[index] >= config.healthy_after:
+                    self.in_rotation[index] = True
+                    self.failed_requests[index] = 0
+            if now + config.probe_interval_s < self.scenario.duration_s:
+                self._push(now + config.probe_interval_s, _PROBE)
+
+    def _eject(self, index: int, reason: str, at: float) -> None:
+        self.in_rotation[index] = False
+        self.good_probes[index] = 0
+        az = f"{self.scenario.region.aws_region}{self.scenario.azs[self.az_of[index]]}"
+        self.ejections.append(Ejection(round(at, 6), self.names[index], az, reason))
+
+    # -- scoring -------------------------------------------------------------
+
+    def _pick(self, count: int, avoid_az: Optional[np.ndarray] = None) -> np.ndarray:
+        """Uniform picks over instances in rotation, outside `avoid_az` while another AZ is available; -1 if none."""
+        rotation = np.flatnonzero(self.in_rotation)
+        if not rotation.size:
+            return np.full(count, -1, dtype=np.int64)
+        picks = rotation[self.rng.integers(0, rotation.size, count)]
+        if avoid_az is not None and count:
+            clash = self.az_of[picks] == avoid_az
+            for az in np.unique(avoid_az[clash]).tolist():
+                elsewhere = rotation[self.az_of[rotation] != az]
+                rows = np.flatnonzero(clash & (avoid_az == az))
+                if elsewhere.size:
+                    picks[rows] = elsewhere[self.rng.integers(0, elsewhere.size, rows.size)]
+        return picks
+
+    def _passive_ejections(self, arrivals: np.ndarray, targets: np.ndarray, t1: float) -> float:
+        """
+        Schedule the ejection of every dead instance in rotation that collects its
+        `eject_after_failures`-th failure in this segment; returns where the segment
+        must end so that later arrivals see the new rotation.
+        """
+        timeout = self.scenario.attempt_timeout_s
+        needed = self.scenario.router.eject_after_failures
+        failing: List[Tuple[float, float, int]] = []
+        for index in np.flatnonzero(self.in_rotation & ~self.alive).tolist():
+            hits = arrivals[targets == index]
+            missing = needed - int(self.failed_requests[index])
+            if 0 < missing <= hits.size:
+                failing.append((float(hits[missing - 1]), float(hits[missing - 1]) + timeout, index))
+        if not failing:
+            return t1
+        end = min(t1, min(seen for _, seen, _ in failing))
+        for failed_at, seen, index in failing:
+            # Instances whose threshold failure is cut off by `end` are judged again next segment.
+            if failed_at < end:
+                self._push(seen, _EJECT, (index, REQUESTS_FAILING))
+        return end
+
+    def _score(self, t0: float, t1: float, premium_busy: float) -> Tuple[float, Dict[str, int]]:
+        """Serve the scoring traffic of [t0, t1); returns where the segment ended and requests scored per tier."""
+        scenario = self.scenario
+        count = int(self.rng.poisson(scenario.rate_per_s * (t1 - t0)))
+        arrivals = t0 + np.sort(self.rng.random(count)) * (t1 - t0)
+        premium = self.rng.random(count) < scenario.premium_share
+        targets = self._pick(count)
+
+        # Failed requests eject a dead instance without waiting for a probe; the segment ends
+        # when the first ejection lands and the rest is redrawn against the new rotation.
+        end = self._passive_ejections(arrivals, targets, t1)
+        if end < t1:
+            keep = arrivals < end
+            arrivals, premium, targets, t1 = arrivals[keep], premium[keep], targets[keep], end
+
+        due_at, due_started, due_premium, due_az = self.retries
+        due = due_at < t1
+        self.retries = (due_at[~due], due_started[~due], due_premium[~due], due_az[~due])
+        retry_targets = self._pick(int(due.sum()), due_az[due])
+
+        at = np.concatenate([arrivals, due_at[due]])
+        started = np.concatenate([arrivals, due_started[due]])
+        tiers = np.concatenate([premium, due_premium[due]])
+        targets = np.concatenate([targets, retry_targets])
+        first_attempt = np.arange(at.size) < arrivals.size
+
+        unrouted = targets < 0
+        dead = ~unrouted & ~self.alive[np.maximum(targets, 0)]
+        self.misrouted += int(dead.sum())
+        np.add.at(self.failed_requests, targets[dead], 1)
+        # A first attempt that found a dead instance (or none) is retried in another AZ.
+        retry = (dead | unrouted) & first_attempt if scenario.attempts > 1 else np.zeros_like(dead)
+        given_up = (dead | unrouted) & ~retry
+        for tier, mask in ((STANDARD, ~tiers), (PREMIUM, tiers)):
+            self.failed[tier] += int((given_up & mask).sum())
+            self.retried[tier] += int((retry & mask).sum())
+        if retry.any():
+            failed_az = np.where(targets[retry] >= 0, self.az_of[np.maximum(targets[retry], 0)], -1)
+            pending = (
+                at[retry] + np.where(unrouted[retry], 0.0, scenario.attempt_timeout_s),
+                started[retry],
+                tiers[retry],
+                failed_az,
+            )
+            self.retries = tuple(np.concatenate([old, new]) for old, new in zip(self.retries, pending))
+
+        served = ~(dead | unrouted)
+        if served.any():
+            self._serve(at[served], started[served], tiers[served], targets[served], premium_busy)
+        scored = {STANDARD: int((served & ~tiers).sum()), PREMIUM: int((served & tiers).sum())}
+        for tier, mask in ((STANDARD, ~premium), (PREMIUM, premium)):
+            self.requests[tier] += int(mask.sum())
+        return t1, scored
+
+    def _serve(
+        self, at: np.ndarray, started: np.ndarray, premium: np.ndarray, targets: np.ndarray, premium_busy: float
+    ) -> None:
+        scenario = self.scenario
+        live = max(int(self.alive.sum()), 1)
+        stretch = 1.0 + scenario.delivery_cpu_share * premium_busy / live
+        service = self.rng.exponential(scenario.service_s * stretch, at.size)
+        order = np.lexsort((at, targets))
+        at, started, premium = at[order], started[order], premium[order]
+        targets, service = targets[order], service[order]
+        # Lindley per instance in one pass: D_n = C_n + max(free_at, max_{k<=n}(A_k - C_{k-1})), C being the
+        # instance's running service total. Offsetting each instance keeps the running maximum per instance.
+        done = np.cumsum(service)
+        starts = np.flatnonzero(targets[1:] != targets[:-1]) + 1
+        starts = np.concatenate(([0], starts))
+        ends = np.append(starts[1:], at.size)
+        base = np.repeat(done[starts] - service[starts], ends - starts)
+        done -= base
+        offset = targets * _INSTANCE_OFFSET_S
+        ready = np.maximum(at - (done - service), self.free_at[targets])
+        departures = done + np.maximum.accumulate(ready + offset) - offset
+        last = ends - 1
+        self.free_at[targets[last]] = departures[last]
+
+        latency = departures - started
+        for tier, mask in ((STANDARD, ~premium), (PREMIUM, premium)):
+            self.latency[tier].record_many(latency[mask])
+        if self.guard is not None:
+            self.guard.record_scoring_many(latency)
+
+    # -- alert fanout ----------------------------------------------------------
+
+    def _offer(self, tier: str, count: int) -> None:
+        config = self.scenario.fanout
+        queues = self.queues
+        depth = queues[STANDARD].depth + queues[PREMIUM].depth
+        if tier == PREMIUM:
+            admitted = max(0, min(count, config.premium_capacity - queues[PREMIUM].depth, config.capacity - depth))
+        else:
+            admitted = max(0, min(count, config.capacity - depth))
+            # Standard makes room by shedding the newest premium alerts.
+            evicted = queues[PREMIUM].drop_newest(count - admitted)
+            self.shed[PREMIUM] += evicted
+            admitted += evicted
+        queues[tier].push(self.clock.now, admitted)
+        self.enqueued[tier] += admitted
+        self.shed[tier] += count - admitted
+
+    def _start_fanout(self, dt: float) -> int:
+        """Workers for standard and premium this segment; returns premium slots acquired."""
+        scenario, config = self.scenario, self.scenario.fanout
+        now = self.clock.now
+        self.admission.update(self.queues[STANDARD].head_age(now))
+        standard_need = math.ceil(self.queues[STANDARD].depth * scenario.standard_delivery_s / dt)
+        premium_need = math.ceil(self.queues[PREMIUM].depth * scenario.premium_delivery_s / dt)
+        if not premium_need or self.admission.paused:
+            return 0
+        weights = config.weights
+        share = config.workers * weights[PREMIUM] // (weights[PREMIUM] + weights[STANDARD])
+        want = min(premium_need, max(config.workers - standard_need, share))
+        if self.guard is None:
+            return want
+        acquired = 0
+        while acquired < want and self.guard.try_acquire():
+            acquired += 1
+        return acquired
+
+    def _finish_fanout(self, dt: float, premium_slots: int) -> None:
+        scenario, now = self.scenario, self.clock.now
+        standard_slots = scenario.fanout.workers - premium_slots
+        for tier, slots, cost in (
+            (STANDARD, standard_slots, scenario.standard_delivery_s),
+            (PREMIUM, premium_slots, scenario.premium_delivery_s),
+        ):
+            capacity = slots * dt / cost + self.credit[tier]
+            served = self.queues[tier].pop_oldest(int(capacity), now, self.waits[tier])
+            self.delivered[tier] += served
+            self.credit[tier] = capacity - int(capacity) if self.queues[tier].depth else 0.0
+        if self.guard is not None:
+            # Evaluate while the slots are still held, as the guard sees busy workers in the scheduler.
+            self.guard.evaluate()
+            for _ in range(premium_slots):
+                self.guard.release()
+
+    # -- driver ----------------------------------------------------------------
+
+    def run(self) -> None:
+        scenario = self.scenario
+        for fault in scenario.faults:
+            self._push(fault.at_s, _FAULT_START, fault)
+            self._push(fault.at_s + fault.duration_s, _FAULT_END, fault)
+        self._push(scenario.router.probe_interval_s, _PROBE)
+        now = 0.0
+        while now < scenario.duration_s:
+            while self.events and self.events[0][0] <= now:
+                _, kind, _, payload = heapq.heappop(self.events)
+                self._apply(kind, payload)
+            horizon = min(now + scenario.segment_s, scenario.duration_s)
+            if self.events:
+                horizon = min(horizon, self.events[0][0])
+            premium_slots = self._start_fanout(horizon - now)
+            if self.guard is not None:
+                self.min_limit = self.guard.limit if self.min_limit is None else min(self.min_limit, self.guard.limit)
+            premium_busy = min(
+                premium_slots, self.queues[PREMIUM].depth * scenario.premium_delivery_s / (horizon - now)
+            )
+            end, scored = self._score(now, horizon, premium_busy)
+            self.clock.now = end
+            if self.guard is not None and self.guard.paused:
+                self.premium_paused_s += end - now
+            self._finish_fanout(end - now, premium_slots)
+            # Review and block decisions from this segment's scoring become alerts.
+            self._offer(STANDARD, int(self.rng.binomial(scored[STANDARD], scenario.alert_share)))
+            flood = int(self.rng.poisson(self.flood_rate * (end - now)))
+            self._offer(PREMIUM, int(self.rng.binomial(scored[PREMIUM], scenario.alert_share)) + flood)
+            now = end
+
+    def report(self, guarded: bool) -> ChaosReport:
+        scenario = self.scenario
+        scoring: Dict[str, Dict[str, Any]] = {}
+        for tier in TIERS:
+            histogram = self.latency[tier]
+            requests = self.requests[tier]
+            scoring[tier] = {
+                "requests": requests,
+                "failed": self.failed[tier],
+                "retried": self.retried[tier],
+                "availability": 1.0 - self.failed[tier] / requests if requests else 1.0,
+                **{f"p{q * 100:g}_s": histogram.quantile(q) for q in (0.5, 0.95, 0.99)},
+                "max_s": histogram.max if histogram.count else None,
+            }
+        alerts: Dict[str, Dict[str, Any]] = {}
+        for tier in TIERS:
+            quantiles = _weighted_quantiles(self.waits[tier], (0.5, 0.95, 0.99))
+            alerts[tier] = {
+                "enqueued": self.enqueued[tier],
+                "delivered": self.delivered[tier],
+                "shed": self.shed[tier],
+                "pending": self.queues[tier].depth,
+                **{f"p{q}_s": value for q, value in zip((50, 95, 99), quantiles)},
+            }
+        detect_s: Optional[float] = None
+        for fault in scenario.faults:
+            if fault.kind != AZ_OUTAGE:
+                continue
+            az = f"{scenario.region.aws_region}{fault.az}"
+            out = {e.instance: e.at for e in self.ejections if e.az == az and e.at >= fault.at_s}
+            if len(out) == scenario.instances_per_az:
+                detect_s = max(detect_s or 0.0, round(max(out.values()) - fault.at_s, 6))
+        breaker = self.guard.breaker if self.guard is not None else None
+        return ChaosReport(
+            scenario=scenario.name,
+            experiment=scenario.experiment,
+            region=scenario.region.aws_region,
+            guarded=guarded,
+            seed=scenario.seed,
+            duration_s=scenario.duration_s,
+            faults=[asdict(fault) for fault in scenario.faults],
+            scoring=scoring,
+            alerts=alerts,
+            misrouted=self.misrouted,
+            detect_s=detect_s,
+            detect_limit_s=scenario.router.probe_interval_s + scenario.router.probe_timeout_s,
+            breaker_opens=breaker.opens if breaker is not None else 0,
+            premium_paused_s=round(self.premium_paused_s, 6),
+            admission_pauses=self.admission.pauses,
+            min_premium_limit=self.min_limit,
+            ejections=[asdict(e) for e in self.ejections],
+        )
+
+
+def run_scenario(scenario: Scenario, guarded: bool = True) -> ChaosReport:
+    """Replay `scenario` on a virtual clock; `guarded=False` runs premium fanout without the `PremiumGuard`."""
+    simulation = _Simulation(scenario, guarded)
+    simulation.run()
+    return simulation.report(guarded)
+
+
+def report_path(scenario: Scenario, guarded: bool = True, directory: Path = CHAOS_DIR) -> Path:
+    """Where a scenario's report lives: next to the chaos log it replays, e.g. 2025-11-17-az-failure.json."""
+    suffix = "" if guarded else "-unguarded"
+    return directory / f"{Path(CHAOS_LOG).stem}-{scenario.name}{suffix}.json"
+
+
+def _print_report(report: ChaosReport, path: Optional[Path]) -> None:
+    def ms(value: Optional[float]) -> str:
+        return "-" if value is None else f"{value * 1000:.1f}"
+
+    guard = "guarded" if report.guarded else "unguarded"
+    print(f"{report.scenario} ({report.region}, {guard}, {report.duration_s:g} virtual s): {report.experiment}")
+    print(f"{'tier':<9} {'requests':>10} {'failed':>7} {'retried':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+          f" {'alerts':>8} {'shed':>7} {'deliv p95 s':>11}")
+    for tier in TIERS:
+        scoring, alerts = report.scoring[tier], report.alerts[tier]
+        delivery = "-" if alerts["p95_s"] is None else f"{alerts['p95_s']:.2f}"
+        print(f"{tier:<9} {scoring['requests']:>10} {scoring['failed']:>7} {scoring['retried']:>8}"
+              f" {ms(scoring['p50_s']):>8} {ms(scoring['p95_s']):>8} {ms(scoring['p99_s']):>8}"
+              f" {alerts['enqueued']:>8} {alerts['shed']:>7} {delivery:>11}")
+    detect = "-" if report.detect_s is None else f"{report.detect_s:.2f} s"
+    print(f"misrouted {report.misrouted}, AZ detected in {detect}, breaker opened {report.breaker_opens}x, "
+          f"premium paused {report.premium_paused_s:.1f} s, admission pauses {report.admission_pauses}")
+    print(("PASS" if report.passed else "FAIL: " + "; ".join(report.failures()))
+          + (f"  -> {path}" if path is not None else ""))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Replay the chaos log's experiments on a virtual clock.")
+    parser.add_argument(
+        "scenarios", nargs="*", metavar="scenario", help=f"Any of {', '.join(SCENARIOS)} (default: all)"
+    )
+    parser.add_argument("--no-guard", action="store_true", help="Run premium fanout without the PremiumGuard")
+    parser.add_argument("--seed", type=int, help="Override the scenario seed")
+    parser.add_argument("--out-dir", type=Path, default=CHAOS_DIR, help="Where to write the JSON reports")
+    parser.add_argument("--no-write", action="store_true", help="Do not write reports")
+    parser.add_argument("--json", action="store_true", help="Print the reports as JSON")
+    args = parser.parse_args(argv)
+
+    unknown = sorted(set(args.scenarios) - set(SCENARIOS))
+    if unknown:
+        raise SystemExit(f"Unknown scenario(s) {', '.join(unknown)}; expected any of {', '.join(SCENARIOS)}")
+    guarded = not args.no_guard
+    failed = False
+    for name in args.scenarios or list(SCENARIOS):
+        scenario = SCENARIOS[name]
+        if args.seed is not None:
+            scenario = replace(scenario, seed=args.seed)
+        report = run_scenario(scenario, guarded)
+        document = report.to_json()
+        path = None if args.no_write else report_path(scenario, guarded, args.out_dir)
+        if path is not None:
+            path.write_text(json.dumps(document, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+        if args.json:
+            print(json.dumps(document, indent=2, ensure_ascii=False))
+        else:
+            _print_report(report, path)
+        failed |= not report.passed
+    if failed:
+        print("Graceful-degradation promise broken in at least one scenario.", file=sys.stderr)
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+"""
+Incrementally materialized dashboard aggregates with per-tier refresh.
+
+Premium dashboards refresh every 5–10 s and standard ones every 30–60 s, both
+from the same anonymized aggregates (spec/overview.md, "Premium Dashboard
+Refresh"). Recomputing those aggregates from history on every refresh makes
+refresh cost grow with history; this module maintains them as scored events
+arrive instead:
+
+- `DashboardMaterializer` (one per region, like the event stream) folds each
+  scored micro-batch into rolling-window totals per merchant and for the
+  region. A window is a ring of time buckets: an event adds to its bucket and
+  to the window totals, and a bucket leaving the window is zeroed and the
+  totals re-summed. Update cost is proportional to the batch, not to history.
+- It also folds the batch into the region's `DailyAggregate` for each day, so
+  the same pass produces the anonymized output kept for a year
+  (fraud_radar/retention.py). `write_closed_days` hands finished days to the
+  retention engine, where they stand in until the day's raw partition is
+  folded: this process may not have seen every event of the day.
+- `snapshot()` publishes an immutable, versioned `DashboardSnapshot`: a copy of
+  the window totals taken only when something changed since the last one.
+  Readers never see a half-applied batch and never block the writer.
+- `TierViews` gives each tier a snapshot no older than its refresh interval.
+  A refresh costs one copy of the totals, the same for both tiers; premium
+  only refreshes more often.
+"""
+from __future__ import annotations
+
+import copy
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date
+from typing import Callable, Dict, List, Optional, Tuple, Type
+
+import numpy as np
+
+from fraud_radar.alerts import PREMIUM, STANDARD
+from fraud_radar.events import Region, ResidencyViolation
+from fraud_radar.retention import DailyAggregate, RetentionEngine
+from fraud_radar.scoring import APPROVE, BLOCK, ScoredBatch
+
+# Upper ends of the spec refresh ranges: premium 5–10 s, standard 30–60 s.
+REFRESH_INTERVAL_S: Dict[str, float] = {PREMIUM: 10.0, STANDARD: 60.0}
+
+DEFAULT_BUCKET_S = 300
+DEFAULT_WINDOW_BUCKETS = 12  # one hour
+MS_PER_DAY = 86_400_000
+
+# Measures kept per merchant (and for the region) per bucket.
+MEASURES: Tuple[str, ...] = ("transactions", "alerts", "blocked", "amount", "score_sum")
+_TXN, _ALERTS, _BLOCKED, _AMOUNT, _SCORE = range(len(MEASURES))
+
+
+class _RollingTotals:
+    """Per-key bucket ring plus the window totals it sums to."""
+
+    def __init__(self, buckets: int, capacity: int) -> None:
+        self.ring = np.zeros((buckets, capacity, len(MEASURES)))
+        self.totals = np.zeros((capacity, len(MEASURES)))
+
+    @property
+    def capacity(self) -> int:
+        return self.totals.shape[0]
+
+    def grow(self, capacity: int) -> None:
+        ring = np.zeros((self.ring.shape[0], capacity, len(MEASURES)))
+        ring[:, : self.capacity] = self.ring
+        totals = np.zeros((capacity, len(MEASURES)))
+        totals[: self.capacity] = self.totals
+        self.ring, self.totals = ring, totals
+
+    def add(self, slots: np.ndarray, keys: np.ndarray, values: np.ndarray) -> None:
+        np.add.at(self.ring, (slots, keys), values)
+        np.add.at(self.totals, keys, values)
+
+    def expire(self, slots: List[int]) -> None:
+        self.ring[slots] = 0.0
+        # Re-summing (instead of subtracting) keeps float totals from drifting.
+        np.sum(self.ring, axis=0, out=self.totals)
+
+
+@dataclass(frozen=True)
+class MerchantView:
+    merchant_id: str
+    transactions: int
+    alerts: int
+    blocked: int
+    amount: float
+    mean_score: Optional[float]
+
+
+@dataclass(frozen=True)
+class DashboardSnapshot:
+    """One published state of a region's aggregates; never modified after publication."""
+
+    region: str
+    version: int
+    as_of_ms: int  # newest event time folded in
+    window_s: int
+    taken_at: float
+    merchant_index: Dict[bytes, int]  # shared and append-only; rows >= `merchants` are not part of this snapshot
+    merchants: int
+    merchant_totals: np.ndarray  # (merchants, len(MEASURES))
+    region_totals: np.ndarray  # (len(MEASURES),)
+    today: Optional[DailyAggregate]
+
+    def merchant(self, merchant_id: str) -> Optional[MerchantView]:
+        row = self.merchant_index.get(merchant_id.encode("ascii"))
+        if row is None or row >= self.merchants:
+            return None
+        return _view(merchant_id, self.merchant_totals[row])
+
+    def region_view(self) -> MerchantView:
+        return _view(self.region, self.region_totals)
+
+    def top_merchants(self, measure: str = "alerts", count: int = 10) -> List[Tuple[int, float]]:
+        """(row, value) of the `count` merchants with the highest window `measure`."""
+        column = self.merchant_totals[:, MEASURES.index(measure)]
+        count = min(count, len(column))
+        rows = np.argpartition(column, len(column) - count)[len(column) - count :] if count else np.empty(0, int)
+        rows = rows[np.argsort(column[rows])[::-1]]
+        return list(zip(rows.tolist(), column[rows].tolist()))
+
+
+def _view(name: str, totals: np.ndarray) -> MerchantView:
+    transactions = int(totals[_TXN])
+    return MerchantView(
+        name,
+        transactions,
+        int(totals[_ALERTS]),
+        int(totals[_BLOCKED]),
+        float(totals[_AMOUNT]),
+        float(totals[_SCORE]) / transactions if transactions else None,
+    )
+
+
+class DashboardMaterializer:
+    """Rolling per-merchant and per-region aggregates for one region, folded in as scored batches arrive."""
+
+    def __init__(
+        self,
+        region: Type[Region],
+        bucket_s: int = DEFAULT_BUCKET_S,
+        window_buckets: int = DEFAULT_WINDOW_BUCKETS,
+        initial_merchants: int = 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if bucket_s < 1 or window_buckets < 1:
+            raise ValueError("bucket_s and window_buckets must be positive")
+        self.region = region
+        self.label = region.code.decode()
+        self.bucket_ms = bucket_s * 1000
+        self.window_buckets = window_buckets
+        self._clock = clock
+        self._merchant_index: Dict[bytes, int] = {}
+        self._merchants = _RollingTotals(window_buckets, max(1, initial_merchants))
+        self._region = _RollingTotals(window_buckets, 1)
+        self._head: Optional[int] = None  # newest bucket epoch in the window
+        self._as_of_ms = 0
+        self.days: Dict[str, DailyAggregate] = {}
+        self.late = 0  # events older than the window: in the daily aggregates only
+        self._version = 0
+        self._published: Optional[DashboardSnapshot] = None
+        self._lock = threading.Lock()
+
+    @property
+    def window_s(self) -> int:
+        return self.bucket_ms * self.window_buckets // 1000
+
+    # -- writer ---------------------------------------------------------------
+
+    def update(self, events: np.ndarray, scored: ScoredBatch, latency_ms: Optional[np.ndarray] = None) -> None:
+        """Fold one scored micro-batch (`EVENT_DTYPE` rows and their `ScoredBatch`)."""
+        if len(events) != len(scored):
+            raise ValueError("events and scored batch differ in length")
+        if not len(events):
+            return
+        if not np.all(events["region"] == self.region.code):
+            raise ResidencyViolation(f"{self.label} dashboard aggregates only accept {self.label} events")
+        ts_ms = events["ts_ms"]
+        values = np.empty((len(events), len(MEASURES)))
+        values[:, _TXN] = 1.0
+        values[:, _ALERTS] = scored.decisions != APPROVE
+        values[:, _BLOCKED] = scored.decisions == BLOCK
+        values[:, _AMOUNT] = events["amount_minor"] / 100.0
+        values[:, _SCORE] = scored.scores
+
+        with self._lock:
+            keys = self._merchant_keys(events["merchant_id"])
+            epochs = ts_ms // self.bucket_ms
+            self._advance(int(epochs.max()))
+            live = epochs > self._head - self.window_buckets
+            self.late += int(len(live) - live.sum())
+            if live.any():
+                slots = epochs[live] % self.window_buckets
+                self._merchants.add(slots, keys[live], values[live])
+                self._region.add(slots, np.zeros(int(live.sum()), dtype=np.int64), values[live])
+            days = ts_ms // MS_PER_DAY
+            for day in np.unique(days).tolist():
+                rows = days == day
+                name = date.fromordinal(date(1970, 1, 1).toordinal() + day).isoformat()
+                aggregate = self.days.setdefault(name, DailyAggregate(self.label, name))
+                aggregate.add_columns(
+                    events["amount_minor"][rows],
+                    scored.scores[rows],
+                    latency_ms[rows] if latency_ms is not None else None,
+                )
+            self._as_of_ms = max(self._as_of_ms, int(ts_ms.max()))
+            self._version += 1
+
+    def _merchant_keys(self, merchant_ids: np.ndarray) -> np.ndarray:
+        unique, inverse = np.unique(merchant_ids, return_inverse=True)
+        index = self._merchant_index
+        rows = np.fromiter((index.setdefault(merchant, len(index)) for merchant in unique.tolist()),
+                           dtype=np.int64, count=len(unique))
+        if len(index) > self._merchants.capacity:
+            capacity = self._merchants.capacity
+            while capacity < len(index):
+                capacity *= 2
+            self._merchants.grow(capacity)
+        return rows[inverse]
+
+    def _advance(self, epoch: int) -> None:
+        if self._head is None:
+            self._head = epoch
+            return
+        if epoch <= self._head:
+            return
+        expired = range(self._head + 1, min(epoch, self._head + self.window_buckets) + 1)
+        slots = [bucket % self.window_buckets for bucket in expired]
+        self._merchants.expire(slots)
+        self._region.expire(slots)
+        self._head = epoch
+
+    # -- readers --------------------------------------------------------------
+
+    def snapshot(self) -> DashboardSnapshot:
+        """The latest published state, copied only if a batch was folded since the last one."""
+        published = self._published
+        if published is not None and published.version == self._version:
+            return published
+        with self._lock:
+            merchants = len(self._merchant_index)
+            today = self.days.get(max(self.days)) if self.days else None
+            published = DashboardSnapshot(
+                region=self.label,
+                version=self._version,
+                as_of_ms=self._as_of_ms,
+                window_s=self.window_s,
+                taken_at=self._clock(),
+                merchant_index=self._merchant_index,
+                merchants=merchants,
+                merchant_totals=self._merchants.totals[:merchants].copy(),
+                region_totals=self._region.totals[0].copy(),
+                today=copy.deepcopy(today),
+            )
+        published.merchant_totals.setflags(write=False)
+        published.region_totals.setflags(write=False)
+        self._published = published
+        return published
+
+    # -- retention output -----------------------------------------------------
+
+    def closed_days(self, today: date) -> List[DailyAggregate]:
+        return [self.days[day] for day in sorted(self.days) if day < today.isoformat()]
+
+    def write_closed_days(self, engine: RetentionEngine, today: date) -> List[str]:
+        """Hand every day before `today` to the retention engine as its anonymized aggregate, then forget it."""
+        written = []
+        with self._lock:
+            for aggregate in self.closed_days(today):
+                if engine.store_materialized(aggregate):
+                    written.append(aggregate.day)
+                del self.days[aggregate.day]
+        return written
+
+
+class TierViews:
+    """Per-tier dashboard reads: each tier's snapshot is refreshed once it is older than the tier's interval."""
+
+    def __init__(
+        self,
+        materializer: DashboardMaterializer,
+        intervals: Optional[Dict[str, float]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.materializer = materializer
+        self.intervals = dict(intervals or REFRESH_INTERVAL_S)
+        self._clock = clock
+        self._views: Dict[str, DashboardSnapshot] = {}
+        self._refreshed: Dict[str, float] = {}
+        self.refreshes = dict.fromkeys(self.intervals, 0)
+
+    def read(self, tier: str) -> DashboardSnapshot:
+        if tier not in self.intervals:
+            raise ValueError(f"Unknown tier `{tier}`")
+        now = self._clock()
+        if tier not in self._views or now - self._refreshed[tier] >= self.intervals[tier]:
+            self._views[tier] = self.materializer.snapshot()
+            self._refreshed[tier] = now
+            self.refreshes[tier] += 1
+        return self._views[tier]
@@ -0,0 +1,459 @@
+"""
+Region-locked DNS resolvers with a compiled allowlist trie and a TTL cache.
+
+policy/dns_policy.md defines two resolvers, `ca-central-1-resolver` and
+`ap-south-1-resolver`. Each resolves only its region's allowlist, never
+forwards a query to the other region, blocks non-regional AWS endpoints and
+global analytics services, and logs blocked queries to the region's DNS
+firewall log. Premium and standard merchants use the same resolver.
+
+- A `ResolverPolicy` lists allow patterns and named deny rules. A pattern is
+  an exact name (`scoring.ca.central.internal`) or `*.` plus a suffix, which
+  matches every name strictly below that suffix. The most specific matching
+  pattern decides, with deny winning a tie. A name that matches nothing is
+  REFUSED: recursion is disabled outside the allowlist.
+- `RuleTrie` compiles those patterns into a trie keyed by labels from the
+  right (`internal` -> `central` -> `ca` -> ...). A lookup walks one node per
+  label of the queried name, so its cost depends on the name's length and not
+  on how many rules there are.
+- `Resolver` answers from an LRU cache with TTLs. Refusals and NXDOMAINs are
+  cached too, with a shorter TTL, so repeated blocked queries cost one
+  dictionary hit. Allowed names are looked up in the region's own zone
+  (`RegionalZone`), and an answer outside the region's network is blocked.
+- `FirewallLog` buffers blocked queries and appends them in batches, as JSON
+  lines, to `dns_firewall_<region>/date=YYYY-MM-DD.jsonl`. Entries hold the
+  resolver, name, status and rule; the log has no tier or merchant field.
+- `ResolverSet` is the API callers use. It holds one resolver per region,
+  `for_merchant(region, tier)` returns the same resolver for every tier, and
+  construction fails if `check_policies` finds a problem, such as a
+  premium-only policy or an allowlist entry for another region.
+
+Usage:
+    python -m fraud_radar.dns --region CA scoring.ca.central.internal s3.us-east-1.amazonaws.com
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import ipaddress
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Type
+
+from fraud_radar.events import CA, IN, REGIONS, Region
+from fraud_radar.schema import TIERS
+
+NOERROR = "NOERROR"
+NXDOMAIN = "NXDOMAIN"
+REFUSED = "REFUSED"
+FORMERR = "FORMERR"
+
+ALLOW = "allow"
+DENY = "deny"
+
+# Rule names for decisions that no configured rule made.
+NOT_ALLOWLISTED = "not-allowlisted"
+OUT_OF_REGION_ANSWER = "out-of-region-answer"
+MALFORMED = "malformed-name"
+
+DEFAULT_TTL_S = 60.0
+DEFAULT_NEGATIVE_TTL_S = 30.0
+DEFAULT_CACHE_SIZE = 65_536
+DEFAULT_LOG_BATCH = 1024
+
+MAX_NAME_LENGTH = 253
+MAX_LABEL_LENGTH = 63
+
+_AWS_REGION = re.compile(r"^[a-z]{2}(?:-gov)?-[a-z]+-\d$")
+
+
+# -- rules --------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class Rule:
+    pattern: str
+    action: str
+    name: str  # logged when the rule blocks a query
+
+
+@dataclass(frozen=True)
+class ResolverPolicy:
+    resolver: str
+    region: Type[Region]
+    network: str  # CIDR every answer must fall in
+    allow: Tuple[str, ...]
+    deny: Tuple[Tuple[str, str], ...]  # (pattern, rule name)
+    records: Dict[str, str] = field(default_factory=dict)  # fixed answers; other allowed names are synthesized
+    tiers: Tuple[str, ...] = TIERS  # tiers the policy applies to; anything but all of them is a violation
+
+    def rules(self) -> List[Rule]:
+        return [Rule(pattern, ALLOW, pattern) for pattern in self.allow] + [
+            Rule(pattern, DENY, name) for pattern, name in self.deny
+        ]
+
+
+def normalize(name: str) -> Optional[str]:
+    """Lowercased name without the trailing dot, or None if it is not a valid DNS name."""
+    name = name.lower()
+    if name.endswith("."):
+        name = name[:-1]
+    if not name or len(name) > MAX_NAME_LENGTH:
+        return None
+    for label in name.split("."):
+        if not label or len(label) > MAX_LABEL_LENGTH:
+            return None
+    return name
+
+
+# Non-string keys cannot collide with a label.
+_EXACT = 0
+_SUBTREE = 1
+
+
+class RuleTrie:
+    """Rules compiled into a trie over labels from the right; lookups are O(labels in the name)."""
+
+    def __init__(self, rules: Iterable[Rule]) -> None:
+        self._root: Dict[object, object] = {}
+        self.size = 0
+        for rule in rules:
+            self.add(rule)
+
+    def add(self, rule: Rule) -> None:
+        subtree = rule.pattern.startswith("*.")
+        name = normalize(rule.pattern[2:] if subtree else rule.pattern)
+        if name is None or "*" in name:
+            raise ValueError(f"Invalid DNS rule pattern `{rule.pattern}`")
+        node = self._root
+        for label in reversed(name.split(".")):
+            node = node.setdefault(label, {})  # type: ignore[assignment]
+        key = _SUBTREE if subtree else _EXACT
+        current = node.get(key)
+        if current is None or (rule.action == DENY and current.action != DENY):  # type: ignore[union-attr]
+            node[key] = rule
+        self.size += 1
+
+    def match(self, name: str) -> Optional[Rule]:
+        """The most specific rule matching a normalized name."""
+        node = self._root
+        found = None
+        for label in reversed(name.split(".")):
+            below = node.get(_SUBTREE)
+            if below is not None:
+                found = below
+            node = node.get(label)  # type: ignore[assignment]
+            if node is None:
+                return found  # type: ignore[return-value]
+        return node.get(_EXACT, found)  # type: ignore[return-value]
+
+
+# -- default policies ---------------------------------------------------------
+
+# Blocked everywhere: global services a resolver must never hand out.
+_GLOBAL_DENY: Tuple[Tuple[str, str], ...] = (
+    ("*.amazonaws.com", "non-regional-aws"),
+    ("*.internal", "other-region-internal"),
+    ("*.cloudfront.net", "global-cdn"),
+    ("*.awsglobalaccelerator.com", "global-accelerator"),
+    ("*.google-analytics.com", "global-analytics"),
+    ("*.googletagmanager.com", "global-analytics"),
+    ("*.segment.io", "global-analytics"),
+    ("*.mixpanel.com", "global-analytics"),
+)
+
+
+def _regional_policy(region: Type[Region], internal: str, network: str) -> ResolverPolicy:
+    aws = region.aws_region
+    return ResolverPolicy(
+        resolver=f"{aws}-resolver",
+        region=region,
+        network=network,
+        allow=(
+            f"scoring.{internal}",
+            f"monitoring.{internal}",
+            f"webhooks.{internal}",
+            f"logs.{aws}.amazonaws.com",
+            f"s3.{aws}.amazonaws.com",
+            f"*.s3.{aws}.amazonaws.com",
+            f"kinesis.{aws}.amazonaws.com",
+            f"monitoring.{aws}.amazonaws.com",
+        ),
+        deny=_GLOBAL_DENY,
+        records={f"scoring.{internal}": str(ipaddress.ip_network(network)[10])},
+    )
+
+
+DEFAULT_POLICIES: Tuple[ResolverPolicy, ...] = (
+    _regional_policy(CA, "ca.central.internal", "10.10.0.0/16"),
+    _regional_policy(IN, "ap.south.internal", "10.20.0.0/16"),
+)
+
+
+def check_policies(policies: Sequence[ResolverPolicy] = DEFAULT_POLICIES) -> List[str]:
+    """Ways the policies break dns_policy.md; empty when every region has one tier-blind, region-locked resolver."""
+    problems: List[str] = []
+    for region in REGIONS:
+        count = sum(policy.region is region for policy in policies)
+        if count != 1:
+            problems.append(f"{region.aws_region}: {count} resolver policies (expected exactly one for every tier)")
+    for policy in policies:
+        aws = policy.region.aws_region
+        if tuple(sorted(policy.tiers)) != tuple(sorted(TIERS)):
+            problems.append(f"{policy.resolver}: applies to {', '.join(policy.tiers) or 'no tier'} only")
+        try:
+            network = ipaddress.ip_network(policy.network)
+        except ValueError:
+            problems.append(f"{policy.resolver}: invalid network `{policy.network}`")
+            continue
+        for pattern in policy.allow:
+            labels = pattern.lower().split(".")
+            foreign = [label for label in labels if _AWS_REGION.match(label) and label != aws]
+            if foreign:
+                problems.append(f"{policy.resolver}: allows `{pattern}` in {foreign[0]}")
+            elif labels[-2:] == ["amazonaws", "com"] and aws not in labels:
+                problems.append(f"{policy.resolver}: allows non-regional AWS endpoint `{pattern}`")
+            if pattern.startswith("*.") and pattern.count(".") < 2:
+                problems.append(f"{policy.resolver}: allows a whole top-level domain `{pattern}`")
+        for name, address in policy.records.items():
+            if ipaddress.ip_address(address) not in network:
+                problems.append(f"{policy.resolver}: record `{name}` -> {address} is outside {network}")
+        try:
+            trie = RuleTrie(policy.rules())
+        except ValueError as exc:
+            problems.append(f"{policy.resolver}: {exc}")
+            continue
+        for other in policies:
+            if other.region is policy.region:
+                continue
+            for pattern in other.allow:
+                rule = trie.match(pattern[2:] if pattern.startswith("*.") else pattern)
+                if rule is not None and rule.action == ALLOW:
+                    problems.append(f"{policy.resolver}: resolves `{pattern}` from the {other.resolver} allowlist")
+    return problems
+
+
+# -- firewall log -------------------------------------------------------------
+
+
+class FirewallLog:
+    """Blocked queries, appended in batches as JSON lines under `<root>/dns_firewall_<region>/`."""
+
+    def __init__(self, root: Path, batch_size: int = DEFAULT_LOG_BATCH, clock: Callable[[], float] = time.time) -> None:
+        if batch_size < 1:
+            raise ValueError("batch_size must be positive")
+        self.root = Path(root)
+        self.batch_size = batch_size
+        self._clock = clock
+        self._pending: List[Tuple[float, Type[Region], str, str, str, str]] = []
+        self._lock = threading.Lock()
+        self.written = 0
+
+    def directory(self, region: Type[Region]) -> Path:
+        return self.root / f"dns_firewall_{region.code.decode().lower()}"
+
+    def record(self, policy: ResolverPolicy, name: str, status: str, rule: str) -> None:
+        with self._lock:
+            self._pending.append((self._clock(), policy.region, policy.resolver, name, status, rule))
+            if len(self._pending) < self.batch_size:
+                return
+            batch, self._pending = self._pending, []
+        self._write(batch)
+
+    def flush(self) -> None:
+        with self._lock:
+            batch, self._pending = self._pending, []
+        self._write(batch)
+
+    def _write(self, batch: List[Tuple[float, Type[Region], str, str, str, str]]) -> None:
+        files: Dict[Path, List[str]] = {}
+        for ts, region, resolver, name, status, rule in batch:
+            day = datetime.fromtimestamp(ts, timezone.utc).date().isoformat()
+            path = self.directory(region) / f"date={day}.jsonl"
+            entry = {"ts_ms": int(ts * 1000), "resolver": resolver, "name": name, "status": status, "rule": rule}
+            files.setdefault(path, []).append(json.dumps(entry))
+        for path, lines in files.items():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with path.open("a", encoding="utf-8") as handle:
+                handle.write("\n".join(lines) + "\n")
+        self.written += len(batch)
+
+
+# -- resolver -----------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class Answer:
+    name: str
+    status: str
+    address: Optional[str]
+    rule: Optional[str]  # the rule that decided; None for a name absent from the zone
+    ttl_s: float
+
+
+class RegionalZone:
+    """The region's own authoritative data: fixed records, otherwise a stable address inside the region's network."""
+
+    def __init__(self, policy: ResolverPolicy) -> None:
+        self.records = {normalize(name): address for name, address in policy.records.items()}
+        self._network = ipaddress.ip_network(policy.network)
+
+    def __call__(self, name: str) -> Optional[str]:
+        address = self.records.get(name)
+        if address is not None:
+            return address
+        digest = int.from_bytes(hashlib.blake2b(name.encode(), digest_size=8).digest(), "big")
+        return str(self._network[1 + digest % (self._network.num_addresses - 2)])
+
+
+@dataclass
+class ResolverStats:
+    queries: int = 0
+    hits: int = 0
+    blocked: int = 0
+    refused: int = 0
+
+
+class Resolver:
+    """One region's resolver: allowlist trie, in-region zone, LRU/TTL cache and firewall logging."""
+
+    def __init__(
+        self,
+        policy: ResolverPolicy,
+        zone: Optional[Callable[[str], Optional[str]]] = None,
+        log: Optional[FirewallLog] = None,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+        ttl_s: float = DEFAULT_TTL_S,
+        negative_ttl_s: float = DEFAULT_NEGATIVE_TTL_S,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if cache_size < 0 or ttl_s < 0 or negative_ttl_s < 0:
+            raise ValueError("cache_size and TTLs must not be negative")
+        self.policy = policy
+        self.trie = RuleTrie(policy.rules())
+        self.zone = zone or RegionalZone(policy)
+        self.network = ipaddress.ip_network(policy.network)
+        self.log = log
+        self.cache_size = cache_size
+        self.ttl_s = ttl_s
+        self.negative_ttl_s = negative_ttl_s
+        self._clock = clock
+        self._cache: "OrderedDict[str, Tuple[float, Answer]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = ResolverStats()
+
+    def resolve(self, name: str) -> Answer:
+        now = self._clock()
+        key = name.lower()
+        with self._lock:
+            self.stats.queries += 1
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] > now:
+                self._cache.move_to_end(key)
+                self.stats.hits += 1
+                answer = cached[1]
+            else:
+                answer = None
+        if answer is None:
+            answer = self._answer(name)
+            if self.cache_size:
+                with self._lock:
+                    self._cache[key] = (now + answer.ttl_s, answer)
+                    self._cache.move_to_end(key)
+                    if len(self._cache) > self.cache_size:
+                        self._cache.popitem(last=False)
+        if answer.status != NOERROR and answer.rule is not None:
+            self._blocked(answer)
+        return answer
+
+    def resolve_many(self, names: Iterable[str]) -> List[Answer]:
+        return [self.resolve(name) for name in names]
+
+    def _answer(self, query: str) -> Answer:
+        name = normalize(query)
+        if name is None:
+            return Answer(query, FORMERR, None, MALFORMED, self.negative_ttl_s)
+        rule = self.trie.match(name)
+        if rule is None:
+            return Answer(name, REFUSED, None, NOT_ALLOWLISTED, self.negative_ttl_s)
+        if rule.action == DENY:
+            # Route 53 Resolver DNS Firewall answers blocked names with NXDOMAIN.
+            return Answer(name, NXDOMAIN, None, rule.name, self.negative_ttl_s)
+        address = self.zone(name)
+        if address is None:
+            return Answer(name, NXDOMAIN, None, None, self.negative_ttl_s)
+        if ipaddress.ip_address(address) not in self.network:
+            return Answer(name, NXDOMAIN, None, OUT_OF_REGION_ANSWER, self.negative_ttl_s)
+        return Answer(name, NOERROR, address, rule.name, self.ttl_s)
+
+    def _blocked(self, answer: Answer) -> None:
+        with self._lock:
+            if answer.status == NXDOMAIN:
+                self.stats.blocked += 1
+            else:
+                self.stats.refused += 1
+        if self.log is not None:
+            self.log.record(self.policy, answer.name, answer.status, answer.rule or "")
+
+
+class ResolverSet:
+    """The regional resolvers; every tier of a region's merchants gets the same one."""
+
+    def __init__(
+        self,
+        policies: Sequence[ResolverPolicy] = DEFAULT_POLICIES,
+        log: Optional[FirewallLog] = None,
+        **options: float,
+    ) -> None:
+        problems = check_policies(policies)
+        if problems:
+            raise ValueError("DNS policy violates dns_policy.md:\n  " + "\n  ".join(problems))
+        self._resolvers: Dict[str, Resolver] = {
+            policy.region.code.decode(): Resolver(policy, log=log, **options) for policy in policies  # type: ignore[arg-type]
+        }
+        self.log = log
+
+    def for_merchant(self, region: str, tier: str) -> Resolver:
+        if tier not in TIERS:
+            raise ValueError(f"Unknown tier `{tier}`")
+        return self.resolver(region)
+
+    def resolver(self, region: str) -> Resolver:
+        resolver = self._resolvers.get(region)
+        if resolver is None:
+            raise ValueError(f"No resolver for region `{region}`")
+        return resolver
+
+    def resolve(self, region: str, name: str) -> Answer:
+        return self.resolver(region).resolve(name)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Check the regional DNS policies and resolve names through them.")
+    parser.add_argument("--region", choices=[region.code.decode() for region in REGIONS], default="CA")
+    parser.add_argument("--log-root", type=Path, help="Write blocked queries to DNS firewall logs under this root")
+    parser.add_argument("names", nargs="*")
+    args = parser.parse_args(argv)
+
+    problems = check_policies()
+    if problems:
+        raise SystemExit("DNS policy check failed:\n  " + "\n  ".join(problems))
+    log = FirewallLog(args.log_root) if args.log_root else None
+    resolvers = ResolverSet(log=log)
+    for policy in DEFAULT_POLICIES:
+        print(f"{policy.resolver}: {len(policy.allow)} allowed, {len(policy.deny)} deny rules, answers in {policy.network}")
+    for name in args.names:
+        answer = resolvers.resolve(args.region, name)
+        print(f"{answer.name:<48} {answer.status:<9} {answer.address or '-':<15} {answer.rule or '-'}")
+    if log is not None:
+        log.flush()
+
+
+if __name__ == "__main__":
+    main()
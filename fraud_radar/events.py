@@ -0,0 +1,307 @@
+"""
+Region-partitioned in-process event stream for ingested transactions.
+
+Stand-in for the per-jurisdiction topics in spec/overview.md ("Telemetry
+Flows"): `fraud-events-ca` (ca-central-1) and `fraud-events-in` (ap-south-1)
+decouple ingestion from feature computation and scoring.
+
+- Each partition is a preallocated ring buffer of fixed-width `EVENT_DTYPE`
+  records with a producer cursor and a consumer cursor. Producers copy whole
+  batches in (at most two slice assignments); consumers get zero-copy views of
+  the ring and commit what they processed.
+- A full partition applies backpressure: `try_publish` accepts what fits and
+  returns the count, `publish` waits up to a timeout for space.
+- Records that cannot be delivered (unknown region tag, rejected by a consumer)
+  go to a bounded dead-letter queue; a region's DLQ lives with its partition.
+- Residency is part of the types: a `Partition[CA]` only accepts a
+  `RegionBatch[CA]`, and a `RegionBatch` can only be built from records whose
+  region tag matches. Anything else raises `ResidencyViolation` at runtime and
+  is a type error for mypy.
+
+Records carry tokenized identifiers only; there is no field a PAN or CVV could
+be written to.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import ClassVar, Deque, Dict, Generic, List, Optional, Tuple, Type, TypeVar
+
+import numpy as np
+
+EVENT_DTYPE = np.dtype(
+    [
+        ("event_id", "<u8"),
+        ("ts_ms", "<i8"),
+        ("region", "S2"),
+        ("tier", "u1"),  # 0 = standard, 1 = premium; routing metadata only
+        ("currency", "S3"),
+        ("amount_minor", "<i8"),
+        ("merchant_id", "S16"),
+        ("card_token", "S24"),
+        ("device_hash", "S16"),
+    ]
+)
+
+DEFAULT_CAPACITY = 1 << 16
+DEFAULT_DLQ_CAPACITY = 4096
+
+UNROUTABLE = "unroutable_region"
+REJECTED = "consumer_rejected"
+
+
+class ResidencyViolation(ValueError):
+    """A record was about to cross into another jurisdiction's partition."""
+
+
+class Region:
+    """Jurisdiction marker; subclasses pin a region tag to its AWS region and topic."""
+
+    code: ClassVar[bytes]
+    aws_region: ClassVar[str]
+    topic: ClassVar[str]
+
+
+class CA(Region):
+    code = b"CA"
+    aws_region = "ca-central-1"
+    topic = "fraud-events-ca"
+
+
+class IN(Region):
+    code = b"IN"
+    aws_region = "ap-south-1"
+    topic = "fraud-events-in"
+
+
+REGIONS: Tuple[Type[Region], ...] = (CA, IN)
+
+R = TypeVar("R", bound=Region)
+
+
+def new_events(count: int) -> np.ndarray:
+    return np.zeros(count, dtype=EVENT_DTYPE)
+
+
+class RegionBatch(Generic[R]):
+    """Records proven to carry one region's tag; the only thing a partition accepts."""
+
+    __slots__ = ("region", "records")
+
+    def __init__(self, region: Type[R], records: np.ndarray) -> None:
+        if records.dtype != EVENT_DTYPE or records.ndim != 1:
+            raise ValueError("RegionBatch expects a 1-d array of EVENT_DTYPE records")
+        if len(records) and not (records["region"] == region.code).all():
+            raise ResidencyViolation(f"Batch for {region.topic} contains records tagged for another region")
+        self.region = region
+        self.records = records
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+
+class RingBuffer:
+    """Fixed-capacity FIFO of structured records with monotonically increasing cursors."""
+
+    def __init__(self, capacity: int, dtype: np.dtype = EVENT_DTYPE) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self._buf = np.zeros(capacity, dtype=dtype)
+        self.head = 0  # producer cursor: records ever written
+        self.tail = 0  # consumer cursor: records ever committed
+
+    def __len__(self) -> int:
+        return self.head - self.tail
+
+    def free(self) -> int:
+        return self.capacity - (self.head - self.tail)
+
+    def write(self, records: np.ndarray) -> int:
+        count = min(len(records), self.free())
+        if count == 0:
+            return 0
+        start = self.head % self.capacity
+        first = min(count, self.capacity - start)
+        self._buf[start : start + first] = records[:first]
+        if count > first:
+            self._buf[: count - first] = records[first:count]
+        self.head += count
+        return count
+
+    def peek(self, max_records: int) -> np.ndarray:
+        """Zero-copy view of up to `max_records` unconsumed records (stops at the wrap)."""
+        start = self.tail % self.capacity
+        count = min(max_records, self.head - self.tail, self.capacity - start)
+        return self._buf[start : start + count]
+
+    def advance(self, count: int) -> None:
+        if not 0 <= count <= self.head - self.tail:
+            raise ValueError(f"Cannot commit {count} records; {self.head - self.tail} are pending")
+        self.tail += count
+
+
+@dataclass
+class DeadLetter:
+    records: np.ndarray
+    reason: str
+
+
+class DeadLetterQueue:
+    """Bounded parking lot for undeliverable records; overflow is counted, not blocked on."""
+
+    def __init__(self, capacity: int = DEFAULT_DLQ_CAPACITY) -> None:
+        self.capacity = capacity
+        self._letters: Deque[DeadLetter] = deque()
+        self._size = 0
+        self.overflow = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def put(self, records: np.ndarray, reason: str) -> int:
+        with self._lock:
+            count = min(len(records), self.capacity - self._size)
+            self.overflow += len(records) - count
+            if count:
+                self._letters.append(DeadLetter(records[:count].copy(), reason))
+                self._size += count
+            return count
+
+    def drain(self) -> List[DeadLetter]:
+        with self._lock:
+            letters, self._letters, self._size = list(self._letters), deque(), 0
+        return letters
+
+
+@dataclass
+class PartitionStats:
+    published: int = 0
+    consumed: int = 0
+    backpressured: int = 0
+    dead_lettered: int = 0
+    high_water: int = 0
+
+
+class Partition(Generic[R]):
+    """One jurisdiction's topic: a single ring buffer with producer/consumer cursors."""
+
+    def __init__(self, region: Type[R], capacity: int = DEFAULT_CAPACITY, dlq_capacity: int = DEFAULT_DLQ_CAPACITY) -> None:
+        self.region = region
+        self.topic = region.topic
+        self._ring = RingBuffer(capacity)
+        self.dlq = DeadLetterQueue(dlq_capacity)
+        self.stats = PartitionStats()
+        self._lock = threading.Lock()
+        self._not_full = threading.Condition(self._lock)
+        self._not_empty = threading.Condition(self._lock)
+
+    def __len__(self) -> int:
+        return len(self._ring)
+
+    def _check(self, batch: RegionBatch[R]) -> None:
+        if batch.region is not self.region:
+            raise ResidencyViolation(f"{batch.region.topic} batch cannot be written to {self.topic}")
+
+    # -- producer ----------------------------------------------------------
+
+    def try_publish(self, batch: RegionBatch[R]) -> int:
+        """Append as much of the batch as fits without waiting; returns records accepted."""
+        self._check(batch)
+        with self._lock:
+            written = self._write(batch.records)
+            self.stats.backpressured += len(batch) - written
+        return written
+
+    def publish(self, batch: RegionBatch[R], timeout: Optional[float] = None) -> int:
+        """Append the batch, waiting for the consumer to free space (up to `timeout` seconds)."""
+        self._check(batch)
+        records = batch.records
+        deadline = None if timeout is None else time.monotonic() + timeout
+        written = 0
+        with self._lock:
+            while written < len(records):
+                written += self._write(records[written:])
+                if written == len(records):
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._not_full.wait(remaining)
+            self.stats.backpressured += len(records) - written
+        return written
+
+    def _write(self, records: np.ndarray) -> int:
+        written = self._ring.write(records)
+        if written:
+            self.stats.published += written
+            self.stats.high_water = max(self.stats.high_water, len(self._ring))
+            self._not_empty.notify()
+        return written
+
+    # -- consumer ----------------------------------------------------------
+
+    def poll(self, max_records: int = 1024, timeout: Optional[float] = 0.0) -> np.ndarray:
+        """
+        Zero-copy view of the next pending records, valid until `commit`.
+
+        Waits up to `timeout` seconds (None = forever) when the partition is empty.
+        """
+        with self._lock:
+            if not len(self._ring) and timeout != 0.0:
+                self._not_empty.wait_for(lambda: len(self._ring) > 0, timeout)
+            return self._ring.peek(max_records)
+
+    def commit(self, count: int) -> None:
+        with self._lock:
+            self._ring.advance(count)
+            self.stats.consumed += count
+            self._not_full.notify_all()
+
+    def dead_letter(self, batch: RegionBatch[R], reason: str = REJECTED) -> int:
+        """Park records a consumer could not process; they stay in this region's DLQ."""
+        self._check(batch)
+        parked = self.dlq.put(batch.records, reason)
+        self.stats.dead_lettered += parked
+        return parked
+
+
+class EventBus:
+    """The set of regional partitions plus a router for region-tagged ingress batches."""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, dlq_capacity: int = DEFAULT_DLQ_CAPACITY) -> None:
+        self._partitions: Dict[Type[Region], Partition] = {
+            region: Partition(region, capacity, dlq_capacity) for region in REGIONS
+        }
+        # Records without a known region tag never enter any jurisdiction's stream.
+        self.unroutable = DeadLetterQueue(dlq_capacity)
+
+    def partition(self, region: Type[R]) -> Partition[R]:
+        return self._partitions[region]
+
+    def route(self, records: np.ndarray, timeout: Optional[float] = 0.0) -> Dict[str, int]:
+        """
+        Split a mixed-region ingress batch by region tag and publish each part.
+
+        Returns records accepted per topic; records without a known tag go to
+        `unroutable`. With `timeout=0.0` a full partition drops the overflow
+        (counted as backpressured) instead of waiting.
+        """
+        accepted: Dict[str, int] = {}
+        known = np.zeros(len(records), dtype=bool)
+        for region, partition in self._partitions.items():
+            mask = records["region"] == region.code
+            known |= mask
+            if not mask.any():
+                continue
+            batch = RegionBatch(region, records[mask])
+            if timeout == 0.0:
+                accepted[region.topic] = partition.try_publish(batch)
+            else:
+                accepted[region.topic] = partition.publish(batch, timeout)
+        if not known.all():
+            self.unroutable.put(records[~known], UNROUTABLE)
+        return accepted
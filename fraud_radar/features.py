@@ -0,0 +1,394 @@
+"""
+Feature engine: rolling-window aggregates per tokenized card and device.
+
+Builds the `FEATURE_NAMES` vector the scoring model consumes (spec/overview.md
+budgets 80 ms for this stage) from ingest events without re-scanning history:
+
+- `RollingWindowStore` keeps, per token, count / sum / sum of squares / max
+  amount and a distinct-merchant sketch over 1 minute, 1 hour and 24 hours.
+  Each window is a ring of time buckets (6 x 10 s, 12 x 5 min, 24 x 1 h), so an
+  update touches one bucket and a read combines a fixed number of them; windows
+  slide at bucket granularity.
+- Token state lives in preallocated numpy arrays indexed by slot. Slots are
+  recycled least-recently-used when the store is full, so memory is fixed by
+  `capacity` (see `memory_bytes`).
+- A batch is applied in timestamp order per token and each event's aggregates
+  include every earlier event and itself. Events older than a token's newest
+  bucket are counted as of that bucket.
+- Distinct merchants are a 64-bit linear-counting sketch per bucket: exact
+  enough for the handful of merchants a card normally touches, saturating
+  around 250.
+
+The last three features are per-merchant anomaly scores from
+`fraud_radar.anomaly.MerchantAnomalyDetector` (amount and velocity against
+the merchant's streaming baseline, and the amount's tail share), sized by
+`merchant_capacity`.
+
+Keys are tokenized identifiers only. A key that contains a Luhn-valid PAN is
+refused with ValueError before any state is written.
+"""
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from fraud_radar.anomaly import DEFAULT_CAPACITY as DEFAULT_MERCHANT_CAPACITY, MerchantAnomalyDetector
+from fraud_radar.redaction import redact_bytes
+from fraud_radar.scoring import FEATURE_NAMES
+
+
+@dataclass(frozen=True)
+class Window:
+    name: str
+    bucket_ms: int
+    buckets: int
+
+    @property
+    def span_ms(self) -> int:
+        return self.bucket_ms * self.buckets
+
+
+WINDOWS: Tuple[Window, ...] = (
+    Window("1m", 10_000, 6),
+    Window("1h", 300_000, 12),
+    Window("24h", 3_600_000, 24),
+)
+WINDOW_1M, WINDOW_1H, WINDOW_24H = 0, 1, 2
+
+DEFAULT_CAPACITY = 1 << 14
+SKETCH_BITS = 64
+
+# Fixed offsets for the night_hour feature (Eastern time for CA, IST for IN).
+UTC_OFFSET_MS: Dict[bytes, int] = {b"CA": -5 * 3_600_000, b"IN": 19_800_000}
+HOME_CURRENCY: Dict[bytes, bytes] = {b"CA": b"CAD", b"IN": b"INR"}
+NIGHT_HOURS = (0, 6)
+
+_EMPTY_HEAD = np.int64(-(1 << 62))
+
+
+@dataclass
+class WindowAggregates:
+    """Per-event aggregates, each shaped (events, len(WINDOWS))."""
+
+    count: np.ndarray
+    total: np.ndarray
+    sumsq: np.ndarray
+    max: np.ndarray
+    distinct_merchants: np.ndarray
+
+    def mean(self) -> np.ndarray:
+        return self.total / np.maximum(self.count, 1)
+
+    def std(self) -> np.ndarray:
+        mean = self.mean()
+        var = self.sumsq / np.maximum(self.count, 1) - mean * mean
+        return np.sqrt(np.maximum(var, 0.0))
+
+
+# Columns of the packed per-bucket statistics.
+_COUNT, _TOTAL, _SUMSQ, _MAX = 0, 1, 2, 3
+_ADDITIVE = slice(_COUNT, _SUMSQ + 1)
+
+
+class _WindowState:
+    def __init__(self, window: Window, capacity: int) -> None:
+        self.window = window
+        self.head = np.full(capacity, _EMPTY_HEAD, dtype=np.int64)  # epoch of the newest bucket
+        # count / total / sumsq / max per bucket, packed so one row gather reads a token.
+        self.stats = np.zeros((capacity, window.buckets, 4), dtype=np.float64)
+        self.sketch = np.zeros((capacity, window.buckets), dtype=np.uint64)
+
+    def arrays(self) -> Tuple[np.ndarray, ...]:
+        return (self.head, self.stats, self.sketch)
+
+    def reset(self, slot: int) -> None:
+        self.head[slot] = _EMPTY_HEAD
+        for array in self.arrays()[1:]:
+            array[slot] = 0
+
+
+def merchant_bits(merchant_ids: np.ndarray) -> np.ndarray:
+    """One sketch bit per merchant id (hash of the fixed-width id bytes)."""
+    raw = np.ascontiguousarray(merchant_ids.astype("S16")).view("<u8").reshape(-1, 2)
+    h = raw[:, 0] * np.uint64(0x9E3779B97F4A7C15) ^ raw[:, 1] * np.uint64(0xC2B2AE3D27D4EB4F)
+    h ^= h >> np.uint64(29)
+    h *= np.uint64(0x94D049BB133111EB)
+    return np.uint64(1) << (h >> np.uint64(58))
+
+
+def estimate_distinct(sketch: np.ndarray) -> np.ndarray:
+    """Linear-counting estimate of distinct merchants from OR-ed sketch bits."""
+    zeros = SKETCH_BITS - np.bitwise_count(sketch).astype(np.float64)
+    return SKETCH_BITS * np.log(SKETCH_BITS / np.maximum(zeros, 1.0))
+
+
+def _token_words(tokens: np.ndarray) -> np.ndarray:
+    """Fixed-width byte tokens as rows of uint64 words, for sorting without string compares."""
+    width = -(-tokens.dtype.itemsize // 8) * 8
+    return np.ascontiguousarray(tokens.astype(f"S{width}")).view("<u8").reshape(len(tokens), -1)
+
+
+def _range_reduce(values: np.ndarray, lo: np.ndarray, hi: np.ndarray, op: np.ufunc) -> np.ndarray:
+    """op over values[lo..hi] (inclusive) for every query, via a sparse table."""
+    out = values.copy()
+    multi = np.flatnonzero(lo < hi)
+    if not len(multi):
+        return out
+    lo, hi = lo[multi], hi[multi]
+    length = hi - lo + 1
+    levels = [values]
+    span = 1
+    while span * 2 <= length.max():
+        prev = levels[-1]
+        nxt = prev.copy()
+        nxt[: len(prev) - span] = op(prev[: len(prev) - span], prev[span:])
+        levels.append(nxt)
+        span *= 2
+    table = np.stack(levels)
+    k = np.frexp(length.astype(np.float64))[1] - 1
+    out[multi] = op(table[k, lo], table[k, hi - (1 << k) + 1])
+    return out
+
+
+class RollingWindowStore:
+    """Sliding-window aggregates for up to `capacity` tokens, recycled LRU."""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, windows: Tuple[Window, ...] = WINDOWS) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.windows = windows
+        self._states = [_WindowState(window, capacity) for window in windows]
+        self._slots: "OrderedDict[bytes, int]" = OrderedDict()
+        self._next_free = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, token: bytes) -> bool:
+        return token in self._slots
+
+    def tokens(self) -> List[bytes]:
+        """Keys currently held, least recently used first."""
+        return list(self._slots)
+
+    @property
+    def memory_bytes(self) -> int:
+        return sum(array.nbytes for state in self._states for array in state.arrays())
+
+    # -- slot management ---------------------------------------------------
+
+    def _assign(self, tokens: List[bytes]) -> np.ndarray:
+        if len(tokens) > self.capacity:
+            raise ValueError(f"Batch holds {len(tokens)} distinct tokens but the store has {self.capacity} slots")
+        slots = np.empty(len(tokens), dtype=np.int64)
+        missing: List[int] = []
+        for idx, token in enumerate(tokens):
+            slot = self._slots.get(token)
+            if slot is None:
+                missing.append(idx)
+            else:
+                self._slots.move_to_end(token)
+                slots[idx] = slot
+        # One scan over all new keys; newlines keep digits of adjacent keys apart.
+        new_keys = b"\n".join(tokens[idx] for idx in missing)
+        if redact_bytes(new_keys) != new_keys:
+            raise ValueError("Refusing to key features by a raw PAN; tokenize card numbers at ingress")
+        # Tokens seen in this batch are now the most recent, so eviction never
+        # recycles a slot that the batch is about to use.
+        for idx in missing:
+            if self._next_free < self.capacity:
+                slot = self._next_free
+                self._next_free += 1
+            else:
+                _, slot = self._slots.popitem(last=False)
+                for state in self._states:
+                    state.reset(slot)
+                self.evictions += 1
+            self._slots[tokens[idx]] = slot
+            slots[idx] = slot
+        return slots
+
+    # -- batch update ------------------------------------------------------
+
+    def update(
+        self,
+        tokens: np.ndarray,
+        ts_ms: np.ndarray,
+        amounts: np.ndarray,
+        merchant_ids: np.ndarray,
+    ) -> WindowAggregates:
+        """Apply a batch of events and return each event's aggregates, in input order."""
+        n = len(tokens)
+        shape = (n, len(self.windows))
+        out = WindowAggregates(
+            np.zeros(shape, dtype=np.int64),
+            np.zeros(shape),
+            np.zeros(shape),
+            np.zeros(shape),
+            np.zeros(shape),
+        )
+        if n == 0:
+            return out
+
+        # Group events by token (then time) with one lexsort over the token's words.
+        words = _token_words(tokens)
+        order = np.lexsort((ts_ms,) + tuple(words[:, col] for col in range(words.shape[1] - 1, -1, -1)))
+        sorted_words = words[order]
+        new_group = np.empty(n, dtype=bool)
+        new_group[0] = True
+        np.any(sorted_words[1:] != sorted_words[:-1], axis=1, out=new_group[1:])
+        group = np.cumsum(new_group) - 1
+        starts = np.flatnonzero(new_group)
+        ends = np.append(starts[1:], n) - 1
+        us = self._assign(tokens[order[starts]].tolist())
+        s = us[group]
+        t = np.asarray(ts_ms, dtype=np.int64)[order]
+        a = np.asarray(amounts, dtype=np.float64)[order]
+        bits = merchant_bits(np.asarray(merchant_ids)[order])
+
+        for w, state in enumerate(self._states):
+            count, total, sumsq, mx, sketch = self._apply(state, s, t, a, bits, group, ends, us)
+            out.count[order, w] = count
+            out.total[order, w] = total
+            out.sumsq[order, w] = sumsq
+            out.max[order, w] = mx
+            out.distinct_merchants[order, w] = estimate_distinct(sketch)
+        return out
+
+    @staticmethod
+    def _apply(
+        state: _WindowState,
+        s: np.ndarray,
+        t: np.ndarray,
+        a: np.ndarray,
+        bits: np.ndarray,
+        group: np.ndarray,
+        ends: np.ndarray,
+        us: np.ndarray,
+    ) -> Tuple[np.ndarray, ...]:
+        n = len(s)
+        buckets = state.window.buckets
+        ring = np.arange(buckets)
+        head_u = state.head[us]
+        epoch = np.maximum(t // state.window.bucket_ms, head_u[group])
+        new_head_u = epoch[ends]
+
+        # Stored part: a token's buckets whose epoch is still inside the event's
+        # window. Events in the head bucket see the whole ring, events a full
+        # window past it see none; only the ones in between need a mask.
+        rows = state.stats[us]
+        row_sketch = state.sketch[us]
+        held_epoch = head_u[:, None] - (head_u[:, None] - ring) % buckets
+        lag = epoch - head_u[group]
+        stored = np.zeros((n, 4))
+        stored_sketch = np.zeros(n, dtype=np.uint64)
+        whole = lag == 0
+        if whole.any():
+            g = group[whole]
+            stored[whole, _ADDITIVE] = rows[:, :, _ADDITIVE].sum(axis=1)[g]
+            stored[whole, _MAX] = rows[:, :, _MAX].max(axis=1)[g]
+            stored_sketch[whole] = np.bitwise_or.reduce(row_sketch, axis=1)[g]
+        partial = np.flatnonzero((lag > 0) & (lag < buckets))
+        if len(partial):
+            g = group[partial]
+            live = held_epoch[g] > (epoch[partial] - buckets)[:, None]
+            live_rows = rows[g] * live[:, :, None]
+            stored[partial, _ADDITIVE] = live_rows[:, :, _ADDITIVE].sum(axis=1)
+            stored[partial, _MAX] = live_rows[:, :, _MAX].max(axis=1)
+            stored_sketch[partial] = np.bitwise_or.reduce(np.where(live, row_sketch[g], 0), axis=1)
+
+        # In-batch part: earlier events of the same token (and this one) within the window.
+        base = epoch.min()
+        stride = epoch.max() - base + buckets + 1
+        key = group * stride + (epoch - base + buckets)
+        lo = np.searchsorted(key, group * stride + (epoch - base + 1), side="left")
+        idx = np.arange(n)
+        csum = np.concatenate(([0.0], np.cumsum(a)))
+        csq = np.concatenate(([0.0], np.cumsum(a * a)))
+        count = stored[:, _COUNT] + (idx - lo + 1)
+        total = stored[:, _TOTAL] + csum[idx + 1] - csum[lo]
+        sumsq = stored[:, _SUMSQ] + csq[idx + 1] - csq[lo]
+        mx = np.maximum(stored[:, _MAX], _range_reduce(a, lo, idx, np.maximum))
+        sketch = stored_sketch | _range_reduce(bits, lo, idx, np.bitwise_or)
+
+        # Write back: expire buckets that fell out of the new window, then add the batch.
+        stale_row, stale_col = np.nonzero(held_epoch <= (new_head_u - buckets)[:, None])
+        state.stats[us[stale_row], stale_col] = 0.0
+        state.sketch[us[stale_row], stale_col] = 0
+        keep = epoch > new_head_u[group] - buckets
+        cell = (s[keep], epoch[keep] % buckets)
+        kept = a[keep]
+        np.add.at(state.stats, cell, np.stack([np.ones_like(kept), kept, kept * kept, np.zeros_like(kept)], axis=1))
+        np.maximum.at(state.stats[:, :, _MAX], cell, kept)
+        np.bitwise_or.at(state.sketch, cell, bits[keep])
+        state.head[us] = new_head_u
+        return count, total, sumsq, mx, sketch
+
+
+class FeatureEngine:
+    """Turns ingest events (`fraud_radar.events.EVENT_DTYPE`) into model feature vectors."""
+
+    def __init__(
+        self,
+        card_capacity: int = DEFAULT_CAPACITY,
+        device_capacity: int = DEFAULT_CAPACITY,
+        merchant_risk: Optional[Dict[bytes, float]] = None,
+        merchant_capacity: int = DEFAULT_MERCHANT_CAPACITY,
+    ) -> None:
+        self.cards = RollingWindowStore(card_capacity)
+        self.devices = RollingWindowStore(device_capacity)
+        self.merchants = MerchantAnomalyDetector(merchant_capacity)
+        self.merchant_risk = merchant_risk if merchant_risk is not None else {}
+
+    def transform(self, events: np.ndarray) -> np.ndarray:
+        """Update the stores with a batch and return its (batch, len(FEATURE_NAMES)) features."""
+        n = len(events)
+        amount = events["amount_minor"].astype(np.float64) / 100.0
+        ts_ms = events["ts_ms"]
+        merchants = events["merchant_id"]
+
+        card = self.cards.update(events["card_token"], ts_ms, amount, merchants)
+        # Events without a device fingerprint contribute no device history.
+        has_device = events["device_hash"] != b""
+        device_count = np.zeros(n)
+        if has_device.any():
+            device = self.devices.update(
+                events["device_hash"][has_device], ts_ms[has_device], amount[has_device], merchants[has_device]
+            )
+            device_count[has_device] = device.count[:, WINDOW_1H]
+
+        mean = card.mean()[:, WINDOW_24H]
+        std = card.std()[:, WINDOW_24H]
+        zscore = np.where(card.count[:, WINDOW_24H] > 1, (amount - mean) / np.maximum(std, 1.0), 0.0)
+
+        region = events["region"]
+        offset = np.zeros(n, dtype=np.int64)
+        home = np.full(n, b"", dtype="S3")
+        for code, utc_offset in UTC_OFFSET_MS.items():
+            offset[region == code] = utc_offset
+            home[region == code] = HOME_CURRENCY[code]
+        local_hour = ((ts_ms + offset) // 3_600_000) % 24
+
+        features = np.empty((n, len(FEATURE_NAMES)), dtype=np.float64)
+        features[:, 0] = np.log1p(amount)
+        features[:, 1] = np.clip(zscore, -10.0, 10.0)
+        features[:, 2] = card.count[:, WINDOW_1H]
+        features[:, 3] = card.distinct_merchants[:, WINDOW_24H]
+        features[:, 4] = device_count
+        features[:, 5] = self._merchant_risk(merchants)
+        features[:, 6] = (home != b"") & (events["currency"] != home)
+        features[:, 7] = (local_hour >= NIGHT_HOURS[0]) & (local_hour < NIGHT_HOURS[1])
+        features[:, 8:11] = self.merchants.update(region, merchants, ts_ms, events["amount_minor"])
+        return features
+
+    def _merchant_risk(self, merchants: np.ndarray) -> np.ndarray:
+        if not self.merchant_risk:
+            return np.zeros(len(merchants))
+        unique, inverse = np.unique(merchants, return_inverse=True)
+        risk = np.array([self.merchant_risk.get(m, 0.0) for m in unique.tolist()], dtype=np.float64)
+        return risk[inverse]
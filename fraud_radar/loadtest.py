@@ -0,0 +1,378 @@
+"""
+End-to-end load test of the fraud pipeline against the spec latency budgets.
+
+`run_load_test` replays a `fraud_radar.traffic` stream in real time through
+the in-process pipeline and records, per event or alert, the latency of each
+stage (spec/overview.md, "Performance" and "Alerting and Dashboards"):
+
+  ingestion           arrival -> published on its region's partition
+  features            published -> feature vector (per-region FeatureEngine)
+  scoring             feature vector -> score and decision (ScoringEngine)
+  detection           arrival -> decision, ingest -> model -> score
+  premium_webhook     arrival -> accepted by the merchant's webhook
+                      (FanoutScheduler + WebhookDispatcher to local receivers)
+  standard_dashboard  arrival -> visible on the next standard dashboard refresh
+
+Every `tick_s` the driver publishes what has arrived, then each region's
+consumer drains its partition in micro-batches, exactly as the scoring
+service does. Review and block decisions become alerts; premium alerts are
+pushed to `StubWebhookServer`s with injected latency and failures, standard
+alerts are modelled as landing on the dashboard's next refresh boundary.
+
+Stage latencies go into `LatencyHistogram`s. An alert that was shed or whose
+delivery failed counts as an infinitely slow sample of its tier's stage, and a
+stage that should have seen traffic but recorded none fails its budget. A run
+passes when every `StageBudget` holds and no event was dropped for
+backpressure; the CLI writes the report as JSON and exits 1 otherwise, so it
+can gate a deploy.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import sys
+import time
+import zlib
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Type
+
+import numpy as np
+
+from fraud_radar.alerts import PREMIUM, STANDARD, STANDARD_BASELINE_S, Alert, FanoutConfig, FanoutScheduler
+from fraud_radar.events import REGIONS, EventBus, Region
+from fraud_radar.features import FeatureEngine
+from fraud_radar.metrics import LatencyHistogram
+from fraud_radar.overload import SCORING_P99_TARGET_S
+from fraud_radar.scoring import APPROVE, DECISION_LABELS, ScoringEngine
+from fraud_radar.traffic import Traffic, TrafficProfile, generate
+from fraud_radar.webhooks import (
+    PREMIUM_DELIVERY_P99_S,
+    PREMIUM_DELIVERY_TARGET_S,
+    RetryPolicy,
+    StubWebhookServer,
+    WebhookDispatcher,
+)
+
+INGESTION = "ingestion"
+FEATURES = "features"
+SCORING = "scoring"
+DETECTION = "detection"
+PREMIUM_WEBHOOK = "premium_webhook"
+STANDARD_DASHBOARD = "standard_dashboard"
+STAGES = (INGESTION, FEATURES, SCORING, DETECTION, PREMIUM_WEBHOOK, STANDARD_DASHBOARD)
+
+INGESTION_P95_S = 0.120
+FEATURES_P95_S = 0.080
+DETECTION_P99_S = 0.400
+STANDARD_REFRESH_S = 60.0  # slowest standard dashboard refresh (20-60 s)
+
+# The stage that records each alert tier's deliveries.
+ALERT_STAGES = {PREMIUM: PREMIUM_WEBHOOK, STANDARD: STANDARD_DASHBOARD}
+
+
+@dataclass(frozen=True)
+class StageBudget:
+    stage: str
+    quantile: float
+    limit_s: float
+
+    @property
+    def name(self) -> str:
+        return f"{self.stage} p{self.quantile * 100:g}"
+
+
+SPEC_BUDGETS: Tuple[StageBudget, ...] = (
+    StageBudget(INGESTION, 0.95, INGESTION_P95_S),
+    StageBudget(FEATURES, 0.95, FEATURES_P95_S),
+    StageBudget(SCORING, 0.99, SCORING_P99_TARGET_S),
+    StageBudget(DETECTION, 0.99, DETECTION_P99_S),
+    StageBudget(PREMIUM_WEBHOOK, 0.95, PREMIUM_DELIVERY_TARGET_S),
+    StageBudget(PREMIUM_WEBHOOK, 0.99, PREMIUM_DELIVERY_P99_S),
+    StageBudget(STANDARD_DASHBOARD, 0.99, STANDARD_BASELINE_S),
+)
+
+
+@dataclass
+class LoadTestConfig:
+    tick_s: float = 0.01
+    max_batch: int = 4096  # consumer micro-batch
+    dashboard_refresh_s: float = STANDARD_REFRESH_S
+    webhook_hosts: int = 4
+    webhook_latency_s: float = 0.005
+    webhook_failure_rate: float = 0.02
+    retry: RetryPolicy = field(default_factory=RetryPolicy)
+    fanout: FanoutConfig = field(default_factory=FanoutConfig)
+    budgets: Tuple[StageBudget, ...] = SPEC_BUDGETS
+
+
+@dataclass
+class BudgetCheck:
+    budget: StageBudget
+    observed_s: Optional[float]  # inf when too many deliveries were missed to reach the quantile
+    expected: bool = False  # the stage should have seen traffic
+    missed: int = 0  # shed or failed deliveries, counted as never arriving
+
+    @property
+    def passed(self) -> bool:
+        if self.observed_s is None:
+            return not self.expected
+        return self.observed_s <= self.budget.limit_s
+
+    def describe(self) -> str:
+        if self.observed_s is None:
+            return f"{self.budget.name}: no samples"
+        missed = f" ({self.missed} shed or failed)" if self.missed else ""
+        return f"{self.budget.name} = {self.observed_s:.3f} s > {self.budget.limit_s:g} s{missed}"
+
+
+def quantile_with_misses(histogram: LatencyHistogram, q: float, missed: int) -> Optional[float]:
+    """Quantile q of `histogram` with `missed` more samples that never arrived (inf if q falls among them)."""
+    count = histogram.count
+    if not missed:
+        return histogram.quantile(q)
+    rank = q * (count + missed - 1)
+    if rank > count - 1:
+        return math.inf
+    return histogram.quantile(rank / (count - 1) if count > 1 else 0.0)
+
+
+@dataclass
+class LoadReport:
+    duration_s: float
+    events: int
+    fraud_events: int
+    dropped: int
+    alerts: Dict[str, int]
+    shed: Dict[str, int]
+    undelivered: Dict[str, int]
+    stages: Dict[str, LatencyHistogram]
+    checks: List[BudgetCheck]
+
+    @property
+    def passed(self) -> bool:
+        return self.dropped == 0 and all(check.passed for check in self.checks)
+
+    def failures(self) -> List[str]:
+        failed = [check.describe() for check in self.checks if not check.passed]
+        if self.dropped:
+            failed.append(f"{self.dropped} events dropped for backpressure")
+        return failed
+
+    def stage_summary(self, stage: str) -> Dict[str, Optional[float]]:
+        histogram = self.stages[stage]
+        summary: Dict[str, Optional[float]] = {"count": float(histogram.count)}
+        for q in (0.5, 0.95, 0.99):
+            summary[f"p{q * 100:g}"] = histogram.quantile(q)
+        summary["max"] = histogram.max if histogram.count else None
+        return summary
+
+    def to_json(self) -> Dict[str, object]:
+        return {
+            "duration_s": self.duration_s,
+            "events": self.events,
+            "fraud_events": self.fraud_events,
+            "dropped": self.dropped,
+            "alerts": self.alerts,
+            "shed": self.shed,
+            "undelivered": self.undelivered,
+            "stages": {stage: self.stage_summary(stage) for stage in STAGES},
+            "budgets": [
+                {
+                    **asdict(check.budget),
+                    # null for no samples, or when the quantile falls among the missed deliveries
+                    "observed_s": check.observed_s if check.observed_s != math.inf else None,
+                    "missed": check.missed,
+                    "passed": check.passed,
+                }
+                for check in self.checks
+            ],
+            "passed": self.passed,
+        }
+
+
+def run_load_test(
+    traffic: Traffic, config: Optional[LoadTestConfig] = None, engine: Optional[ScoringEngine] = None
+) -> LoadReport:
+    """Replay `traffic` in real time and check the stage latencies against `config.budgets`."""
+    return asyncio.run(_drive(traffic, config or LoadTestConfig(), engine or ScoringEngine()))
+
+
+# -- driver -------------------------------------------------------------------
+
+
+async def _drive(traffic: Traffic, config: LoadTestConfig, engine: ScoringEngine) -> LoadReport:
+    events = traffic.events
+    stages = {stage: LatencyHistogram() for stage in STAGES}
+    bus = EventBus()
+    feature_engines = {region: FeatureEngine() for region in REGIONS}
+    published_at = np.zeros(len(events))
+    alerts = dict.fromkeys((STANDARD, PREMIUM), 0)
+    servers = [
+        StubWebhookServer(config.webhook_latency_s, failure_rate=config.webhook_failure_rate, seed=index)
+        for index in range(config.webhook_hosts)
+    ]
+    for server in servers:
+        await server.start()
+    urls = [server.url() for server in servers]
+
+    async with WebhookDispatcher(config.retry, seed=0) as dispatcher:
+
+        async def deliver(alert: Alert) -> None:
+            arrival = arrived_at[int(alert.alert_id)]
+            if alert.tier == PREMIUM:
+                url = urls[zlib.crc32(alert.merchant_id.encode()) % len(urls)]
+                payload = {"alert_id": alert.alert_id, "merchant_id": alert.merchant_id, "region": alert.region,
+                           "score": alert.score, "decision": alert.decision}
+                result = await dispatcher.submit(url, payload, alert.alert_id, PREMIUM)
+                if not result.delivered:
+                    raise RuntimeError(f"webhook for alert {alert.alert_id} failed: {result.error or result.status}")
+                stages[PREMIUM_WEBHOOK].record(time.monotonic() - arrival)
+            else:
+                refresh = config.dashboard_refresh_s
+                visible = start + math.ceil((time.monotonic() - start) / refresh) * refresh
+                stages[STANDARD_DASHBOARD].record(visible - arrival)
+
+        fanout = FanoutScheduler(deliver, config.fanout)
+        await fanout.start()
+        # Absolute arrival times on the monotonic clock, also read by `deliver`.
+        start = time.monotonic()
+        arrived_at = start + traffic.arrival_s
+        dropped = 0
+        cursor = 0
+        try:
+            while cursor < len(events):
+                now = time.monotonic()
+                upto = int(np.searchsorted(traffic.arrival_s, now - start, side="right"))
+                if upto > cursor:
+                    accepted = bus.route(events[cursor:upto])
+                    published_at[cursor:upto] = time.monotonic()
+                    dropped += (upto - cursor) - sum(accepted.values())
+                    cursor = upto
+                for region in REGIONS:
+                    _consume(bus, region, feature_engines[region], engine, config, arrived_at, published_at,
+                             stages, fanout, alerts)
+                # Sleep to the next tick, or just yield when processing overran it.
+                await asyncio.sleep(max(0.0, config.tick_s - (time.monotonic() - now)))
+            await fanout.stop()
+        finally:
+            for server in servers:
+                await server.close()
+
+    shed, undelivered = dict(fanout.stats.shed), dict(fanout.stats.failed)
+    # Every event passes the pipeline stages; an alert stage expects every alert raised for its tier.
+    raised = dict.fromkeys(STAGES, len(events))
+    missed = dict.fromkeys(STAGES, 0)
+    for tier, stage in ALERT_STAGES.items():
+        missed[stage] = shed[tier] + undelivered[tier]
+        raised[stage] = stages[stage].count + missed[stage]
+    checks = [
+        BudgetCheck(
+            budget,
+            quantile_with_misses(stages[budget.stage], budget.quantile, missed[budget.stage]),
+            expected=raised[budget.stage] > 0,
+            missed=missed[budget.stage],
+        )
+        for budget in config.budgets
+    ]
+    return LoadReport(
+        duration_s=traffic.duration_s,
+        events=len(events),
+        fraud_events=int(traffic.fraud.sum()),
+        dropped=dropped,
+        alerts=alerts,
+        shed=shed,
+        undelivered=undelivered,
+        stages=stages,
+        checks=checks,
+    )
+
+
+def _consume(
+    bus: EventBus,
+    region: Type[Region],
+    feature_engine: FeatureEngine,
+    engine: ScoringEngine,
+    config: LoadTestConfig,
+    arrived_at: np.ndarray,
+    published_at: np.ndarray,
+    stages: Dict[str, LatencyHistogram],
+    fanout: FanoutScheduler,
+    alerts: Dict[str, int],
+) -> None:
+    partition = bus.partition(region)
+    label = region.code.decode()
+    while len(partition):
+        batch = partition.poll(config.max_batch)
+        ids = batch["event_id"].astype(np.int64)
+        features = feature_engine.transform(batch)
+        featurized = time.monotonic()
+        scored = engine.score_batch(features)
+        decided = time.monotonic()
+        stages[INGESTION].record_many(published_at[ids] - arrived_at[ids])
+        stages[FEATURES].record_many(featurized - published_at[ids])
+        stages[SCORING].record_many(np.full(len(ids), decided - featurized))
+        stages[DETECTION].record_many(decided - arrived_at[ids])
+        flagged = np.flatnonzero(scored.decisions != APPROVE)
+        merchants = batch["merchant_id"][flagged].tolist()
+        premium = batch["tier"][flagged].astype(bool).tolist()
+        for row, merchant, is_premium in zip(flagged.tolist(), merchants, premium):
+            tier = PREMIUM if is_premium else STANDARD
+            alert = Alert(str(ids[row]), merchant.decode(), tier, label, float(scored.scores[row]),
+                          DECISION_LABELS[scored.decisions[row]])
+            alerts[tier] += fanout.offer(alert)
+        partition.commit(len(batch))
+
+
+# -- CLI ----------------------------------------------------------------------
+
+
+def _print_report(report: LoadReport) -> None:
+    print(f"{report.events} events ({report.fraud_events} fraud) over {report.duration_s:.1f} s, "
+          f"{report.dropped} dropped; alerts {report.alerts}, shed {report.shed}, undelivered {report.undelivered}")
+    print(f"{'stage':<19} {'count':>8} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'max ms':>10}")
+    for stage in STAGES:
+        summary = report.stage_summary(stage)
+        values = [summary[key] for key in ("p50", "p95", "p99", "max")]
+        cells = " ".join(f"{value * 1000:10.1f}" if value is not None else f"{'-':>10}" for value in values)
+        print(f"{stage:<19} {summary['count']:8.0f} {cells}")
+    for check in report.checks:
+        observed = f"{check.observed_s:.3f} s" if check.observed_s is not None else "no samples"
+        print(f"{'PASS' if check.passed else 'FAIL'}  {check.budget.name:<24} {observed:>12} <= {check.budget.limit_s:g} s")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Replay synthetic traffic through the pipeline and check spec budgets.")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of traffic to replay")
+    parser.add_argument("--rate", type=float, default=1_000.0, help="Baseline transactions per second")
+    parser.add_argument("--premium-share", type=float, default=0.2, help="Share of merchants on the premium tier")
+    parser.add_argument("--ca-share", type=float, default=0.5, help="Share of merchants in CA")
+    parser.add_argument("--bursts-per-min", type=float, default=2.0, help="Fraud bursts per minute")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--report", type=Path, help="Write the JSON report here")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    profile = TrafficProfile(
+        rate_per_s=args.rate,
+        ca_share=args.ca_share,
+        premium_share=args.premium_share,
+        fraud_bursts_per_min=args.bursts_per_min,
+    )
+    report = run_load_test(generate(profile, args.duration, seed=args.seed))
+    document = report.to_json()
+    if args.report is not None:
+        args.report.write_text(json.dumps(document, indent=2) + "\n", encoding="utf-8")
+    if args.json:
+        print(json.dumps(document, indent=2))
+    else:
+        _print_report(report)
+    if not report.passed:
+        print("Spec budgets missed:\n  " + "\n  ".join(report.failures()), file=sys.stderr)
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
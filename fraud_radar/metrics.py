@@ -0,0 +1,627 @@
+"""
+Streaming latency histograms, SLO burn rates and Prometheus exposition.
+
+`LatencyHistogram` buckets values on a logarithmic scale, so any quantile it
+reports is within `relative_error` of the true sample quantile while memory
+stays fixed (about a thousand integer counters for 1 µs–1000 s at 1 %).
+`record` is a list append; values are folded into the buckets with numpy in
+batches, so there is no sorting and no unbounded sample buffer. Histograms
+with the same layout merge by adding buckets, which is how per-process and
+per-region p99 are combined (pooled, never averaged).
+
+`WindowedHistogram` keeps a ring of such histograms, one per slot of a
+sliding window, so "p99 over the last 10 s" costs a merge of a few slots
+instead of a scan of every sample.
+
+`BurnRateTracker` counts good and failed requests over the monthly SLO period
+(project3.yaml observability: 99.9 % uptime) and reports availability,
+remaining error budget and multi-window burn-rate alerts. `MetricsRegistry`
+renders all of it in the Prometheus text format for the `/metrics` endpoint.
+"""
+from __future__ import annotations
+
+import math
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_RELATIVE_ERROR = 0.01
+DEFAULT_MIN_VALUE = 1e-6
+DEFAULT_MAX_VALUE = 1e3
+DEFAULT_FLUSH_AT = 1024
+
+
+class LatencyHistogram:
+    """
+    Fixed-size log-bucketed histogram with bounded relative quantile error.
+
+    `record` only appends to a small pending buffer; every `flush_at` values
+    (or on any read) the buffer is folded into the buckets with numpy. Under
+    the GIL the append and the prefix delete in `_fold` are each atomic, so
+    concurrent writers need no lock; folds are serialised by a private lock.
+    """
+
+    def __init__(
+        self,
+        relative_error: float = DEFAULT_RELATIVE_ERROR,
+        min_value: float = DEFAULT_MIN_VALUE,
+        max_value: float = DEFAULT_MAX_VALUE,
+        flush_at: int = DEFAULT_FLUSH_AT,
+    ) -> None:
+        if not 0.0 < relative_error < 1.0:
+            raise ValueError("relative_error must be in (0, 1)")
+        if not 0.0 < min_value < max_value:
+            raise ValueError("Expected 0 < min_value < max_value")
+        if flush_at < 1:
+            raise ValueError("flush_at must be at least 1")
+        self.relative_error = relative_error
+        self.min_value = min_value
+        self.max_value = max_value
+        self.flush_at = flush_at
+        self._gamma = (1.0 + relative_error) / (1.0 - relative_error)
+        self._inv_log_gamma = 1.0 / math.log(self._gamma)
+        self._offset = math.log(min_value) * self._inv_log_gamma
+        # Bucket 0 collects everything <= min_value, the last bucket everything >= max_value.
+        self._buckets = int(math.ceil(math.log(max_value) * self._inv_log_gamma - self._offset)) + 1
+        self._counts = np.zeros(self._buckets, dtype=np.int64)
+        self._count = 0
+        self._total = 0.0
+        self._max = 0.0
+        self._pending: List[float] = []
+        self._fold_lock = threading.Lock()
+
+    # -- recording ---------------------------------------------------------
+
+    def record(self, value: float) -> None:
+        pending = self._pending
+        pending.append(value)
+        if len(pending) >= self.flush_at:
+            self._fold()
+
+    def record_many(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if values.size:
+            with self._fold_lock:
+                self._add(values)
+
+    def _fold(self) -> None:
+        with self._fold_lock:
+            pending = self._pending
+            n = len(pending)
+            if not n:
+                return
+            values = np.array(pending[:n], dtype=np.float64)
+            # Values appended after the copy stay at the tail for the next fold.
+            del pending[:n]
+            self._add(values)
+
+    def _add(self, values: np.ndarray) -> None:
+        clipped = np.maximum(values, self.min_value)
+        indices = np.ceil(np.log(clipped) * self._inv_log_gamma - self._offset).astype(np.int64)
+        np.clip(indices, 0, self._buckets - 1, out=indices)
+        self._counts += np.bincount(indices, minlength=self._buckets)
+        self._count += int(values.size)
+        self._total += float(values.sum())
+        self._max = max(self._max, float(values.max()))
+
+    # -- reading -----------------------------------------------------------
+
+    @property
+    def counts(self) -> np.ndarray:
+        self._fold()
+        return self._counts
+
+    @property
+    def count(self) -> int:
+        self._fold()
+        return self._count
+
+    @property
+    def total(self) -> float:
+        self._fold()
+        return self._total
+
+    @property
+    def max(self) -> float:
+        self._fold()
+        return self._max
+
+    def bucket_upper(self, index: int) -> float:
+        """Inclusive upper bound of bucket `index`."""
+        if index == 0:
+            return self.min_value
+        return math.exp((index + self._offset) / self._inv_log_gamma)
+
+    def _bucket_value(self, index: int) -> float:
+        if index == 0:
+            return self.min_value
+        # Midpoint (in relative terms) of (gamma^(i-1), gamma^i].
+        return min(self.bucket_upper(index) * 2.0 / (1.0 + self._gamma), self._max)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Value at quantile q in [0, 1], or None when nothing has been recorded."""
+        if not 0.0 <= q <= 1.0:
+            raise ValueError("q must be in [0, 1]")
+        self._fold()
+        if not self._count:
+            return None
+        rank = q * (self._count - 1)
+        index = int(np.searchsorted(np.cumsum(self._counts), rank, side="right"))
+        if index >= self._buckets:
+            return self._max
+        return self._bucket_value(index)
+
+    def count_le(self, bound: float) -> int:
+        """
+        Recorded values <= `bound` (a Prometheus `le` bucket). The bucket that
+        holds `bound` is counted whole, so values up to `relative_error` above
+        it may be included but none at or below it are missed.
+        """
+        self._fold()
+        if bound >= self.max_value:
+            return self._count
+        if bound < self.min_value:
+            return 0
+        last = int(math.ceil(math.log(bound) * self._inv_log_gamma - self._offset))
+        return int(self._counts[: last + 1].sum())
+
+    def mean(self) -> Optional[float]:
+        count = self.count
+        return self._total / count if count else None
+
+    # -- merging -----------------------------------------------------------
+
+    def compatible(self, other: "LatencyHistogram") -> bool:
+        return (self.relative_error, self.min_value, self.max_value) == (
+            other.relative_error,
+            other.min_value,
+            other.max_value,
+        )
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """
+        Add `other`'s buckets into this histogram. Quantiles of the result are
+        those of the pooled samples, so per-region or per-process p99 is merged
+        here rather than averaged.
+        """
+        if not self.compatible(other):
+            raise ValueError("Cannot merge histograms with different bucket layouts")
+        other._fold()
+        with self._fold_lock:
+            self._counts += other._counts
+            self._count += other._count
+            self._total += other._total
+            self._max = max(self._max, other._max)
+
+    def copy(self) -> "LatencyHistogram":
+        clone = LatencyHistogram(self.relative_error, self.min_value, self.max_value, self.flush_at)
+        clone.merge(self)
+        return clone
+
+    def clear(self) -> None:
+        with self._fold_lock:
+            self._pending.clear()
+            self._counts[:] = 0
+            self._count = 0
+            self._total = 0.0
+            self._max = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Sparse JSON-safe form for shipping a worker's histogram to an aggregator."""
+        self._fold()
+        nonzero = np.flatnonzero(self._counts)
+        return {
+            "relative_error": self.relative_error,
+            "min_value": self.min_value,
+            "max_value": self.max_value,
+            "count": self._count,
+            "total": self._total,
+            "max": self._max,
+            "buckets": {str(int(i)): int(self._counts[i]) for i in nonzero},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LatencyHistogram":
+        histogram = cls(float(data["relative_error"]), float(data["min_value"]), float(data["max_value"]))
+        for index, count in data["buckets"].items():
+            histogram._counts[int(index)] = int(count)
+        histogram._count = int(data["count"])
+        histogram._total = float(data["total"])
+        histogram._max = float(data["max"])
+        return histogram
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return self.to_dict() | {"flush_at": self.flush_at}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        restored = LatencyHistogram.from_dict(state)
+        restored.flush_at = int(state["flush_at"])
+        self.__dict__.update(restored.__dict__)
+
+
+def merge_histograms(histograms: Iterable[LatencyHistogram]) -> LatencyHistogram:
+    """Pool compatible histograms (e.g. one per worker process or per region) into a new one."""
+    merged: Optional[LatencyHistogram] = None
+    for histogram in histograms:
+        if merged is None:
+            merged = LatencyHistogram(histogram.relative_error, histogram.min_value, histogram.max_value)
+        merged.merge(histogram)
+    return merged if merged is not None else LatencyHistogram()
+
+
+class WindowedHistogram:
+    """Sliding-window view over a ring of `slots` histograms covering `window_s` seconds."""
+
+    def __init__(
+        self,
+        window_s: float = 10.0,
+        slots: int = 10,
+        clock: Callable[[], float] = time.monotonic,
+        relative_error: float = DEFAULT_RELATIVE_ERROR,
+        min_value: float = DEFAULT_MIN_VALUE,
+        max_value: float = DEFAULT_MAX_VALUE,
+    ) -> None:
+        if window_s <= 0 or slots < 1:
+            raise ValueError("window_s must be positive and slots at least 1")
+        self.window_s = window_s
+        self.slot_s = window_s / slots
+        self._clock = clock
+        self._slots = [LatencyHistogram(relative_error, min_value, max_value) for _ in range(slots)]
+        self._epoch = int(clock() // self.slot_s)
+        self._head = self._slots[self._epoch % slots]
+        self._head_end = (self._epoch + 1) * self.slot_s
+
+    def _rotate(self) -> LatencyHistogram:
+        epoch = int(self._clock() // self.slot_s)
+        stale = min(epoch - self._epoch, len(self._slots))
+        for step in range(stale):
+            self._slots[(epoch - step) % len(self._slots)].clear()
+        self._epoch = max(self._epoch, epoch)
+        self._head = self._slots[self._epoch % len(self._slots)]
+        self._head_end = (self._epoch + 1) * self.slot_s
+        return self._head
+
+    def record(self, value: float) -> None:
+        # Hot path: one clock read; the ring only rotates when a slot boundary passes.
+        head = self._rotate() if self._clock() >= self._head_end else self._head
+        head.record(value)
+
+    def record_many(self, values: np.ndarray) -> None:
+        self._rotate().record_many(values)
+
+    def snapshot(self) -> LatencyHistogram:
+        self._rotate()
+        merged = LatencyHistogram(self._slots[0].relative_error, self._slots[0].min_value, self._slots[0].max_value)
+        for slot in self._slots:
+            if slot.count:
+                merged.merge(slot)
+        return merged
+
+    @property
+    def count(self) -> int:
+        self._rotate()
+        return sum(slot.count for slot in self._slots)
+
+    def quantile(self, q: float) -> Optional[float]:
+        return self.snapshot().quantile(q)
+
+
+# -- SLO burn rate --------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class BurnRule:
+    """Alert when the burn rate over both windows is at least `factor`."""
+
+    severity: str
+    long_window_s: float
+    short_window_s: float
+    factor: float
+
+
+# Multi-window, multi-burn-rate alerts for a 30-day budget (Google SRE workbook, ch. 5):
+# 14.4x over 1 h spends 2 % of the budget, 6x over 6 h spends 5 %, 1x over 3 d spends 10 %.
+DEFAULT_BURN_RULES: Tuple[BurnRule, ...] = (
+    BurnRule("page", 3600.0, 300.0, 14.4),
+    BurnRule("page", 6 * 3600.0, 1800.0, 6.0),
+    BurnRule("ticket", 3 * 86400.0, 6 * 3600.0, 1.0),
+)
+
+
+@dataclass
+class BurnAlert:
+    rule: BurnRule
+    long_burn: float
+    short_burn: float
+
+
+@dataclass
+class SLOStatus:
+    objective: float
+    good: int
+    bad: int
+    availability: Optional[float]
+    budget_remaining: float
+    burn_rates: Dict[str, float] = field(default_factory=dict)
+    alerts: List[BurnAlert] = field(default_factory=list)
+
+    @property
+    def met(self) -> bool:
+        return self.availability is None or self.availability >= self.objective
+
+
+def window_label(seconds: float) -> str:
+    for unit, size in (("d", 86400), ("h", 3600), ("m", 60)):
+        if seconds >= size and seconds % size == 0:
+            return f"{int(seconds // size)}{unit}"
+    return f"{seconds:g}s"
+
+
+class BurnRateTracker:
+    """
+    Good/bad request counts over a rolling SLO period, for availability,
+    remaining error budget and multi-window burn-rate alerts.
+
+    Counts live in one ring of `period_s / bucket_s` buckets per outcome (a
+    30-day period at one-minute buckets is 43,200 int64 pairs), so any window
+    up to the period is a slice sum and memory does not grow with traffic.
+    """
+
+    def __init__(
+        self,
+        objective: float = 0.999,
+        period_s: float = 30 * 86400.0,
+        bucket_s: float = 60.0,
+        clock: Callable[[], float] = time.time,
+        rules: Sequence[BurnRule] = DEFAULT_BURN_RULES,
+    ) -> None:
+        if not 0.0 < objective < 1.0:
+            raise ValueError("objective must be in (0, 1)")
+        if bucket_s <= 0 or period_s < bucket_s:
+            raise ValueError("Expected 0 < bucket_s <= period_s")
+        self.objective = objective
+        self.period_s = period_s
+        self.bucket_s = bucket_s
+        self.rules = tuple(rules)
+        self._clock = clock
+        self._slots = int(math.ceil(period_s / bucket_s))
+        self._good = np.zeros(self._slots, dtype=np.int64)
+        self._bad = np.zeros(self._slots, dtype=np.int64)
+        self._epoch = int(clock() // bucket_s)
+        self._bucket_end = (self._epoch + 1) * bucket_s
+        # Outcomes recorded since the last rotation; appends are atomic, so no lock.
+        self._pending: List[bool] = []
+        self._lock = threading.Lock()
+
+    def _rotate(self) -> int:
+        with self._lock:
+            slot = self._epoch % self._slots
+            pending = self._pending
+            n = len(pending)
+            if n:
+                good = sum(pending[:n])
+                del pending[:n]
+                self._good[slot] += good
+                self._bad[slot] += n - good
+            epoch = int(self._clock() // self.bucket_s)
+            stale = min(epoch - self._epoch, self._slots)
+            if stale > 0:
+                cleared = np.arange(epoch - stale + 1, epoch + 1) % self._slots
+                self._good[cleared] = 0
+                self._bad[cleared] = 0
+            self._epoch = max(self._epoch, epoch)
+            self._bucket_end = (self._epoch + 1) * self.bucket_s
+            return self._epoch % self._slots
+
+    def record(self, ok: bool) -> None:
+        if self._clock() >= self._bucket_end:
+            self._rotate()
+        pending = self._pending
+        pending.append(ok)
+        if len(pending) >= DEFAULT_FLUSH_AT:
+            self._rotate()
+
+    def record_many(self, good: int, bad: int = 0) -> None:
+        slot = self._rotate()
+        self._good[slot] += good
+        self._bad[slot] += bad
+
+    def _window(self, window_s: float) -> Tuple[int, int]:
+        end = self._rotate() + 1
+        span = max(1, min(self._slots, int(math.ceil(window_s / self.bucket_s))))
+        start = end - span
+        if start >= 0:
+            return int(self._good[start:end].sum()), int(self._bad[start:end].sum())
+        return (
+            int(self._good[:end].sum() + self._good[start:].sum()),
+            int(self._bad[:end].sum() + self._bad[start:].sum()),
+        )
+
+    def error_ratio(self, window_s: float) -> Optional[float]:
+        good, bad = self._window(window_s)
+        return bad / (good + bad) if good + bad else None
+
+    def burn_rate(self, window_s: float) -> float:
+        """Error ratio over the window as a multiple of the budgeted 1 - objective (1.0 spends it exactly)."""
+        ratio = self.error_ratio(window_s)
+        return 0.0 if ratio is None else ratio / (1.0 - self.objective)
+
+    def status(self) -> SLOStatus:
+        good, bad = self._window(self.period_s)
+        total = good + bad
+        allowed = (1.0 - self.objective) * total
+        burn_rates: Dict[str, float] = {}
+        alerts: List[BurnAlert] = []
+        for rule in self.rules:
+            long_burn = burn_rates.setdefault(window_label(rule.long_window_s), self.burn_rate(rule.long_window_s))
+            short_burn = burn_rates.setdefault(window_label(rule.short_window_s), self.burn_rate(rule.short_window_s))
+            if long_burn >= rule.factor and short_burn >= rule.factor:
+                alerts.append(BurnAlert(rule, long_burn, short_burn))
+        return SLOStatus(
+            objective=self.objective,
+            good=good,
+            bad=bad,
+            availability=good / total if total else None,
+            budget_remaining=1.0 - bad / allowed if allowed else 1.0,
+            burn_rates=burn_rates,
+            alerts=alerts,
+        )
+
+    def merge(self, other: "BurnRateTracker") -> None:
+        """Add another process's counts; both trackers must share bucketing and time base."""
+        if (self.bucket_s, self._slots, self.objective) != (other.bucket_s, other._slots, other.objective):
+            raise ValueError("Cannot merge trackers with different objectives or bucketing")
+        self._rotate()
+        other._rotate()
+        if self._epoch != other._epoch:
+            raise ValueError("Cannot merge trackers on different clocks")
+        self._good += other._good
+        self._bad += other._bad
+
+
+# -- Prometheus exposition --------------------------------------------------------
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Seconds; covers the scoring (200 ms p99, 2 s p95 dashboard budget) and webhook (10/15 s) targets.
+DEFAULT_LE_BOUNDS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0, 5.0, 10.0, 15.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class Counter:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        if amount < 0:
+            raise ValueError("Counters only go up")
+        self.value += amount
+
+
+class Gauge:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label(value)}"' for name, value in pairs) + "}"
+
+
+class MetricsRegistry:
+    """
+    Named counters, gauges, latency histograms and SLO trackers, rendered in
+    the Prometheus text exposition format (0.0.4).
+
+    Histograms are `LatencyHistogram`s exposed as cumulative `le` buckets, so
+    Prometheus can aggregate them across instances; in-process,
+    `merged_histogram` pools label sets (e.g. every worker in a region) before
+    a quantile is taken.
+    """
+
+    def __init__(self, le_bounds: Sequence[float] = DEFAULT_LE_BOUNDS) -> None:
+        self.le_bounds = tuple(sorted(le_bounds))
+        self._families: Dict[str, Tuple[str, str]] = {}
+        self._series: Dict[str, Dict[LabelKey, Any]] = {}
+        self._slos: Dict[str, Tuple[str, BurnRateTracker]] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, kind: str, name: str, help_text: str, labels: Dict[str, str], factory: Callable[[], Any]) -> Any:
+        key: LabelKey = tuple(sorted((k, str(v)) for k, v in labels.items()))
+        series = self._series.get(name)
+        if series is not None and key in series:
+            return series[key]
+        with self._lock:
+            known = self._families.setdefault(name, (kind, help_text))
+            if known[0] != kind:
+                raise ValueError(f"Metric `{name}` is already registered as a {known[0]}")
+            return self._series.setdefault(name, {}).setdefault(key, factory())
+
+    def counter(self, name: str, help_text: str = "", **labels: str) -> Counter:
+        return self._get("counter", name, help_text, labels, Counter)
+
+    def gauge(self, name: str, help_text: str = "", **labels: str) -> Gauge:
+        return self._get("gauge", name, help_text, labels, Gauge)
+
+    def histogram(self, name: str, help_text: str = "", **labels: str) -> LatencyHistogram:
+        return self._get("histogram", name, help_text, labels, LatencyHistogram)
+
+    def slo(self, name: str, help_text: str, tracker: BurnRateTracker) -> BurnRateTracker:
+        with self._lock:
+            self._slos[name] = (help_text, tracker)
+        return tracker
+
+    def merged_histogram(self, name: str, **match: str) -> LatencyHistogram:
+        """Pool every series of histogram `name` whose labels include `match`."""
+        wanted = {(k, str(v)) for k, v in match.items()}
+        series = self._series.get(name, {})
+        return merge_histograms(histogram for key, histogram in series.items() if wanted <= set(key))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for name in sorted(self._families):
+            kind, help_text = self._families[name]
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for key, metric in sorted(self._series[name].items()):
+                if kind == "histogram":
+                    for bound in self.le_bounds + (math.inf,):
+                        le = (("le", _format_value(bound)),)
+                        lines.append(f"{name}_bucket{_format_labels(key, le)} {metric.count_le(bound)}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {_format_value(metric.total)}")
+                    lines.append(f"{name}_count{_format_labels(key)} {metric.count}")
+                else:
+                    lines.append(f"{name}{_format_labels(key)} {_format_value(metric.value)}")
+        for name in sorted(self._slos):
+            help_text, tracker = self._slos[name]
+            status = tracker.status()
+            gauges: List[Tuple[str, str, LabelKey, float]] = [
+                ("objective", "SLO objective", (), status.objective),
+                ("good_requests", "Good requests in the SLO period", (), status.good),
+                ("bad_requests", "Failed requests in the SLO period", (), status.bad),
+                ("error_budget_remaining", "Share of the error budget left", (), status.budget_remaining),
+            ]
+            if status.availability is not None:
+                gauges.append(("availability", "Availability over the SLO period", (), status.availability))
+            gauges.extend(
+                ("burn_rate", "Error budget burn rate by window", (("window", window),), rate)
+                for window, rate in sorted(status.burn_rates.items())
+            )
+            firing = {alert.rule.severity for alert in status.alerts}
+            gauges.extend(
+                ("burn_alert", "Multi-window burn-rate alert firing", (("severity", severity),), float(severity in firing))
+                for severity in sorted({rule.severity for rule in tracker.rules})
+            )
+            seen = set()
+            for suffix, description, key, value in gauges:
+                metric = f"{name}_{suffix}"
+                if metric not in seen:
+                    seen.add(metric)
+                    lines.append(f"# HELP {metric} {help_text} {description}.")
+                    lines.append(f"# TYPE {metric} gauge")
+                lines.append(f"{metric}{_format_labels(key)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
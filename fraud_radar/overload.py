@@ -0,0 +1,321 @@
+"""
+Overload protection between scoring output and premium webhook workers.
+
+Premium fanout shares CPU, sockets and memory with core scoring. Instead of a
+static worker cap (which either idles capacity or lets premium push scoring
+past its SLO), `PremiumGuard` sizes premium concurrency from the one signal
+the guardrail cares about: scoring latency.
+
+- Scoring records its per-request latency into a sliding-window log-bucket
+  histogram (`fraud_radar.metrics.WindowedHistogram`).
+- An adaptive limit (`AIMDLimit` or `GradientLimit`) is recomputed from the
+  windowed scoring p99 against the spec target (p99 < 200 ms): it grows while
+  scoring has headroom and premium is actually using its slots, and shrinks
+  as soon as scoring p99 approaches the target.
+- A `CircuitBreaker` trips when scoring p99 crosses the target: premium
+  fanout pauses entirely, on call is notified through `on_change`, and after
+  a cooldown a few half-open probes decide whether to close again.
+
+Standard-tier alerts never pass through the guard.
+"""
+from __future__ import annotations
+
+import logging
+import math
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Optional, Protocol
+
+import numpy as np
+
+from fraud_radar.metrics import WindowedHistogram
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# spec/overview.md: "ML model returns a fraud score and decision with p99 < 200 ms".
+SCORING_P99_TARGET_S = 0.200
+
+
+# -- circuit breaker ----------------------------------------------------------
+
+
+class CircuitBreaker:
+    """
+    Closed -> open -> half-open breaker.
+
+    Opens when `trip` is called or when the failure ratio over the last
+    `window` recorded calls reaches `failure_ratio` (after `min_calls`). While
+    open nothing is admitted; after `cooldown_s` up to `half_open_probes` calls
+    are let through, and that many successes close it while any failure
+    re-opens it.
+    """
+
+    def __init__(
+        self,
+        cooldown_s: float = 5.0,
+        half_open_probes: int = 5,
+        failure_ratio: float = 0.5,
+        min_calls: int = 20,
+        window: int = 100,
+        clock: Callable[[], float] = time.monotonic,
+        on_change: Optional[Callable[[str, str, str], None]] = None,
+    ) -> None:
+        if cooldown_s < 0 or half_open_probes < 1 or not 0.0 < failure_ratio <= 1.0:
+            raise ValueError("Expected cooldown_s >= 0, half_open_probes >= 1 and 0 < failure_ratio <= 1")
+        self.cooldown_s = cooldown_s
+        self.half_open_probes = half_open_probes
+        self.failure_ratio = failure_ratio
+        self.min_calls = min_calls
+        self._clock = clock
+        self._on_change = on_change
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self._failures = 0
+        self._probes_admitted = 0
+        self._probe_successes = 0
+        self.opens = 0
+        self.reason = ""
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and self._clock() - self._opened_at >= self.cooldown_s:
+            self._transition(HALF_OPEN, "cooldown elapsed")
+        return self._state
+
+    def _transition(self, state: str, reason: str) -> None:
+        previous, self._state, self.reason = self._state, state, reason
+        if state == OPEN:
+            self._opened_at = self._clock()
+            self.opens += 1
+        if state == HALF_OPEN:
+            self._probes_admitted = self._probe_successes = 0
+        if state == CLOSED:
+            self._outcomes.clear()
+            self._failures = 0
+        if self._on_change is not None:
+            self._on_change(previous, state, reason)
+
+    def allow(self) -> bool:
+        """Whether a call would be admitted right now (does not reserve a probe)."""
+        state = self.state
+        return state == CLOSED or (state == HALF_OPEN and self._probes_admitted < self.half_open_probes)
+
+    def acquire(self) -> bool:
+        """Admit one call, reserving a half-open probe slot if needed."""
+        if not self.allow():
+            return False
+        if self._state == HALF_OPEN:
+            self._probes_admitted += 1
+        return True
+
+    def trip(self, reason: str) -> None:
+        if self.state != OPEN:
+            self._transition(OPEN, reason)
+
+    def record_success(self) -> None:
+        state = self.state
+        if state == HALF_OPEN:
+            self._probe_successes += 1
+            if self._probe_successes >= self.half_open_probes:
+                self._transition(CLOSED, "half-open probes succeeded")
+        elif state == CLOSED:
+            self._record(False)
+
+    def record_failure(self, reason: str = "call failed") -> None:
+        state = self.state
+        if state == HALF_OPEN:
+            self._transition(OPEN, reason)
+        elif state == CLOSED:
+            self._record(True)
+            calls = len(self._outcomes)
+            if calls >= self.min_calls and self._failures >= self.failure_ratio * calls:
+                self._transition(OPEN, f"{self._failures}/{calls} recent calls failed")
+
+    def _record(self, failed: bool) -> None:
+        if len(self._outcomes) == self._outcomes.maxlen and self._outcomes[0]:
+            self._failures -= 1
+        self._outcomes.append(failed)
+        self._failures += failed
+
+
+# -- adaptive limits ------------------------------------------------------------
+
+
+class LimitAlgorithm(Protocol):
+    def update(self, limit: float, pressure: float, inflight: int) -> float:
+        """New limit given `pressure` = observed scoring p99 / target."""
+
+
+@dataclass
+class AIMDLimit:
+    """Additive increase while saturated and below target, multiplicative decrease above it."""
+
+    min_limit: float = 1.0
+    max_limit: float = 256.0
+    increase: float = 1.0
+    backoff: float = 0.9
+    threshold: float = 0.8
+
+    def update(self, limit: float, pressure: float, inflight: int) -> float:
+        if pressure >= self.threshold:
+            return max(self.min_limit, limit * self.backoff)
+        if inflight * 2 >= limit:
+            return min(self.max_limit, limit + self.increase)
+        return limit
+
+
+@dataclass
+class GradientLimit:
+    """
+    Gradient limit in the style of Netflix's Gradient2.
+
+    The gradient is target / (tolerance * p99) clamped to [0.5, 1]: 1 while
+    scoring p99 is under target / tolerance, shrinking proportionally as it
+    closes in on the target. The new limit is `limit * gradient`, plus
+    `sqrt(limit)` of probing headroom when the gradient is 1 and premium is
+    using at least half its slots, exponentially smoothed.
+    """
+
+    min_limit: float = 1.0
+    max_limit: float = 256.0
+    smoothing: float = 0.3
+    tolerance: float = 2.0
+
+    def update(self, limit: float, pressure: float, inflight: int) -> float:
+        gradient = 1.0 if pressure <= 0.0 else max(0.5, min(1.0, 1.0 / (self.tolerance * pressure)))
+        headroom = math.sqrt(limit) if gradient >= 1.0 and inflight * 2 >= limit else 0.0
+        target = limit * gradient + headroom
+        smoothed = limit * (1.0 - self.smoothing) + target * self.smoothing
+        return max(self.min_limit, min(self.max_limit, smoothed))
+
+
+# -- premium guard --------------------------------------------------------------
+
+
+@dataclass
+class GuardConfig:
+    p99_target_s: float = SCORING_P99_TARGET_S
+    trip_ratio: float = 1.0
+    # Short window: a 10 s p99 lags the queue it is meant to protect.
+    window_s: float = 2.0
+    slots: int = 8
+    min_samples: int = 50
+    eval_interval_s: float = 0.05
+    cooldown_s: float = 5.0
+    half_open_probes: int = 5
+    initial_limit: float = 8.0
+
+
+@dataclass
+class GuardStats:
+    admitted: int = 0
+    deferred: int = 0
+    evaluations: int = 0
+
+
+def notify_on_call(previous: str, state: str, reason: str) -> None:
+    """Default alert path: breaker transitions are logged at WARNING for the pager integration."""
+    logger.warning("premium fanout breaker %s -> %s: %s", previous, state, reason)
+
+
+class PremiumGuard:
+    """Adaptive concurrency limit plus circuit breaker for premium fanout, driven by scoring p99."""
+
+    def __init__(
+        self,
+        config: Optional[GuardConfig] = None,
+        algorithm: Optional[LimitAlgorithm] = None,
+        clock: Callable[[], float] = time.monotonic,
+        on_change: Callable[[str, str, str], None] = notify_on_call,
+    ) -> None:
+        self.config = config or GuardConfig()
+        self.algorithm = algorithm or GradientLimit()
+        self._clock = clock
+        self.scoring_latency = WindowedHistogram(self.config.window_s, self.config.slots, clock)
+        # Scoring threads record while the fanout loop evaluates.
+        self._latency_lock = threading.Lock()
+        self.breaker = CircuitBreaker(
+            cooldown_s=self.config.cooldown_s,
+            half_open_probes=self.config.half_open_probes,
+            clock=clock,
+            on_change=on_change,
+        )
+        self.limit = float(self.config.initial_limit)
+        self.inflight = 0
+        self.stats = GuardStats()
+        self._next_eval = -math.inf
+        self._pressure = 0.0
+
+    # -- signal ------------------------------------------------------------
+
+    def record_scoring(self, latency_s: float) -> None:
+        with self._latency_lock:
+            self.scoring_latency.record(latency_s)
+
+    def record_scoring_many(self, latencies_s: np.ndarray) -> None:
+        with self._latency_lock:
+            self.scoring_latency.record_many(latencies_s)
+
+    def scoring_p99(self) -> Optional[float]:
+        with self._latency_lock:
+            snapshot = self.scoring_latency.snapshot()
+        if snapshot.count < self.config.min_samples:
+            return None
+        return snapshot.quantile(0.99)
+
+    @property
+    def pressure(self) -> float:
+        """Windowed scoring p99 over its target, as of the last evaluation."""
+        return self._pressure
+
+    @property
+    def paused(self) -> bool:
+        return self.breaker.state != CLOSED
+
+    def evaluate(self, force: bool = False) -> None:
+        now = self._clock()
+        if not force and now < self._next_eval:
+            return
+        self._next_eval = now + self.config.eval_interval_s
+        self.stats.evaluations += 1
+        p99 = self.scoring_p99()
+        if p99 is None:
+            # Too few scoring samples to judge; hold the current limit rather than probe blind.
+            self._pressure = 0.0
+            return
+        self._pressure = p99 / self.config.p99_target_s
+        if self._pressure >= self.config.trip_ratio:
+            self.breaker.trip(f"scoring p99 {p99 * 1000:.0f} ms over {self.config.p99_target_s * 1000:.0f} ms target")
+        self.limit = self.algorithm.update(self.limit, self._pressure, self.inflight)
+
+    # -- premium workers ---------------------------------------------------
+
+    def admits(self) -> bool:
+        """Whether a premium delivery could start now (does not reserve a slot)."""
+        self.evaluate()
+        return self.inflight < int(self.limit) and self.breaker.allow()
+
+    def try_acquire(self) -> bool:
+        if not self.admits() or not self.breaker.acquire():
+            self.stats.deferred += 1
+            return False
+        self.inflight += 1
+        self.stats.admitted += 1
+        return True
+
+    def release(self) -> None:
+        self.inflight -= 1
+        if self.breaker.state == HALF_OPEN:
+            # A probe succeeds if scoring stayed healthy while it ran.
+            self.evaluate(force=True)
+            if self._pressure < self.config.trip_ratio:
+                self.breaker.record_success()
+            else:
+                self.breaker.record_failure("scoring p99 still over target during probe")
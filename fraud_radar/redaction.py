@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+Streaming PAN/CVV redaction for log pipelines.
+
+PAN candidates (13–19 digits, optionally grouped with spaces or dashes) and
+CVV-labelled fields are matched by one compiled scanner. PAN candidates are
+only redacted when they pass the Luhn check, so order ids and timestamps that
+merely look long survive. A candidate is a whole run of digit groups, so it
+can hold a neighbouring group as well as the PAN ("25 4111 1111 1111 1111").
+When the run is not a Luhn-valid PAN as a whole, every 13–19-digit window
+between separator boundaries inside it is checked too, and the Luhn-valid ones
+are redacted. CVV values are redacted whenever they follow a CVV label,
+whatever the digits are.
+
+Chunks are prefiltered in vectorized form: numpy finds the few digit runs long
+enough to hold a PAN and literal searches find CVV labels, so the compiled
+patterns only run where a match is possible. The same patterns back three
+entry points:
+  - `PanCvvRedactingFilter`, a `logging.Filter` for application loggers
+  - `StreamRedactor`, which redacts fixed-size chunks of a byte stream and
+    carries any match that could cross a chunk boundary into the next chunk
+  - the CLI below, for redacting or auditing log files
+
+Usage:
+  uv run python -m fraud_radar.redaction raw.log -o clean.log
+  uv run python -m fraud_radar.redaction --check logs/*.log
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import re
+import sys
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, List, Optional, Tuple
+
+import numpy as np
+
+PAN_MASK = b"[REDACTED-PAN]"
+CVV_MASK = b"[REDACTED-CVV]"
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+_CVV_SOURCE = (
+    rb"(?P<label>\b(?:cvv2?|cvc2?|cid|csc|security[_ -]?code|card[_ -]?verification(?:[_ -]?value)?)"
+    rb"[\"']?[ \t]{0,4}[:=][ \t]{0,4}[\"']?)(?P<cvv>\d{3,4})(?!\d)"
+)
+# A candidate is a whole run of grouped digits, so a PAN next to another digit
+# group is always seen with all of its groups.
+_PAN_SOURCE = rb"(?<!\d)(?P<pan>\d(?:[ -]?\d){12,})(?![ -]?\d)"
+# Literal anchors for CVV labels and the offsets from each anchor back to where
+# a label can start ("verification" is preceded by "card", "card_", ...).
+_CVV_ANCHORS = ((b"cv", (0,)), (b"cid", (0,)), (b"csc", (0,)), (b"security", (0,)), (b"verification", (4, 5)))
+_PAN_MIN_DIGITS = 13
+_PAN_MAX_DIGITS = 19
+
+# One scanner for short strings (log records). Chunks use the same two patterns
+# separately, applied only where the vectorized prefilter found candidates.
+_SCANNER = re.compile(_CVV_SOURCE + b"|" + _PAN_SOURCE, re.ASCII | re.IGNORECASE)
+_TEXT_SCANNER = re.compile((_CVV_SOURCE + b"|" + _PAN_SOURCE).decode("ascii"), re.ASCII | re.IGNORECASE)
+_PAN = re.compile(_PAN_SOURCE, re.ASCII)
+# Matched against a lower()-ed copy of the chunk, which keeps byte offsets.
+_CVV_LOWER = re.compile(_CVV_SOURCE, re.ASCII)
+
+# Below this size the numpy prefilter costs more than it saves.
+_VECTORIZE_MIN_BYTES = 4096
+# Upper bound on a match: the longest padded CVV label (~38 bytes) or a run of
+# 63 digits with 62 separators. Any such match crossing the end of a buffer
+# starts within it; a longer digit run on one unterminated line may be split.
+_MAX_MATCH = 128
+
+_DOUBLED_DIGITS = bytes.maketrans(b"0123456789", b"0246813579")
+_SEPARATORS = b" -"
+_WORD_BYTES = frozenset(b"0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_")
+# Byte classes for the PAN prefilter: 1 = digit, 2 = separator, 0 = anything else.
+_PAN_CLASSES = bytes(1 if 48 <= b <= 57 else 2 if b in _SEPARATORS else 0 for b in range(256))
+
+
+@dataclass
+class RedactionStats:
+    bytes_scanned: int = 0
+    pan_redacted: int = 0
+    cvv_redacted: int = 0
+    luhn_rejected: int = 0
+
+    @property
+    def findings(self) -> int:
+        return self.pan_redacted + self.cvv_redacted
+
+
+def luhn_valid(digits: bytes) -> bool:
+    """Luhn check over ASCII digits, summed at C speed via translate()."""
+    reversed_digits = digits[::-1]
+    total = sum(reversed_digits[0::2]) + sum(reversed_digits[1::2].translate(_DOUBLED_DIGITS))
+    return (total - 48 * len(digits)) % 10 == 0
+
+
+def _inner_pans(run: bytes) -> List[Tuple[int, int]]:
+    """
+    Luhn-valid PANs inside a candidate run that failed the check as a whole.
+
+    Windows start at the run start or just after a separator and end at the
+    run end or just before one; they are taken leftmost, longest first.
+    """
+    separators = [idx for idx, byte in enumerate(run) if byte in _SEPARATORS]
+    if not separators:
+        return []
+    starts = [0] + [idx + 1 for idx in separators]
+    ends = separators + [len(run)]
+    # Digits before each boundary: a separator at offset i has i - k digits before it (k = its rank).
+    digits_before_start = [0] + [idx - rank for rank, idx in enumerate(separators)]
+    digits_before_end = digits_before_start[1:] + [len(run) - len(separators)]
+    spans: List[Tuple[int, int]] = []
+    cursor = 0
+    for first, start in enumerate(starts):
+        if start < cursor:
+            continue
+        # Ends holding 13..19 digits from this start, longest first.
+        lowest = bisect_left(digits_before_end, digits_before_start[first] + _PAN_MIN_DIGITS)
+        highest = bisect_right(digits_before_end, digits_before_start[first] + _PAN_MAX_DIGITS)
+        for last in range(highest - 1, lowest - 1, -1):
+            if luhn_valid(run[start : ends[last]].translate(None, _SEPARATORS)):
+                spans.append((start, ends[last]))
+                cursor = ends[last]
+                break
+    return spans
+
+
+class _Replacer:
+    def __init__(self, stats: RedactionStats) -> None:
+        self.stats = stats
+
+    def __call__(self, match: "re.Match[bytes]") -> bytes:
+        pan = match.group("pan")
+        if pan is None:
+            self.stats.cvv_redacted += 1
+            return match.group("label") + CVV_MASK
+        # luhn_valid() inlined: this runs once per candidate on the hot path.
+        reversed_digits = pan.translate(None, _SEPARATORS)[::-1]
+        total = sum(reversed_digits[0::2]) + sum(reversed_digits[1::2].translate(_DOUBLED_DIGITS))
+        if len(reversed_digits) <= _PAN_MAX_DIGITS and not (total - 48 * len(reversed_digits)) % 10:
+            self.stats.pan_redacted += 1
+            return PAN_MASK
+        spans = _inner_pans(pan)
+        if not spans:
+            self.stats.luhn_rejected += 1
+            return pan
+        self.stats.pan_redacted += len(spans)
+        pieces: List[bytes] = []
+        cursor = 0
+        for start, end in spans:
+            pieces += (pan[cursor:start], PAN_MASK)
+            cursor = end
+        pieces.append(pan[cursor:])
+        return b"".join(pieces)
+
+
+def _pan_candidate_runs(buf: bytes) -> Tuple[np.ndarray, np.ndarray]:
+    """Start/end offsets of maximal [0-9 -] runs holding at least 13 digits."""
+    classes = np.frombuffer(buf.translate(_PAN_CLASSES), dtype=np.int8)
+    in_run = classes != 0
+    edges = np.flatnonzero(in_run[1:] != in_run[:-1]) + 1
+    if in_run[0]:
+        edges = np.concatenate(([0], edges))
+    if in_run[-1]:
+        edges = np.concatenate((edges, [len(buf)]))
+    starts, ends = edges[0::2], edges[1::2]
+    # A run shorter than 13 bytes cannot hold 13 digits; count digits for the rest.
+    long_runs = ends - starts >= _PAN_MIN_DIGITS
+    starts, ends = starts[long_runs], ends[long_runs]
+    if not len(starts):
+        return starts, ends
+    bounds = np.empty(2 * len(starts), dtype=np.intp)
+    bounds[0::2], bounds[1::2] = starts, ends
+    if bounds[-1] == len(buf):
+        bounds = bounds[:-1]  # reduceat runs the last segment to the end anyway
+    digits = np.add.reduceat(classes == 1, bounds, dtype=np.int32)[0::2]
+    keep = digits >= _PAN_MIN_DIGITS
+    return starts[keep], ends[keep]
+
+
+def _scan(buf: bytes, stats: RedactionStats) -> bytes:
+    """Redact one buffer; equivalent to `_SCANNER.sub` but skips clean regions in C."""
+    stats.bytes_scanned += len(buf)
+    if len(buf) < _VECTORIZE_MIN_BYTES:
+        return _SCANNER.sub(_Replacer(stats), buf)
+
+    edits: List[Tuple[int, int, bytes]] = []
+    lowered = buf.lower()
+    for anchor, back_offsets in _CVV_ANCHORS:
+        pos = lowered.find(anchor)
+        while pos >= 0:
+            for back in back_offsets:
+                match = _CVV_LOWER.match(lowered, pos - back) if pos >= back else None
+                if match is not None:
+                    edits.append((match.start("cvv"), match.end("cvv"), CVV_MASK))
+                    stats.cvv_redacted += 1
+                    break
+            pos = lowered.find(anchor, pos + 1)
+
+    edits.sort()
+    # A CVV value can open a digit run ("cvv: 123 4567 ..."); PAN scanning
+    # resumes after it, exactly as the single-pass scanner would.
+    cvv_spans = list(edits)
+    cvv_ends = [end for _, end, _ in cvv_spans]
+    starts, ends = _pan_candidate_runs(buf)
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        pos = start
+        while True:
+            match = _PAN.search(buf, pos, end)
+            if match is None:
+                break
+            idx = bisect_right(cvv_ends, match.start())
+            if idx < len(cvv_spans) and cvv_spans[idx][0] < match.end():
+                pos = cvv_spans[idx][1]
+                continue
+            pos = match.end()
+            # luhn_valid() inlined: this runs once per candidate on the hot path.
+            reversed_digits = match.group().translate(None, _SEPARATORS)[::-1]
+            total = sum(reversed_digits[0::2]) + sum(reversed_digits[1::2].translate(_DOUBLED_DIGITS))
+            if len(reversed_digits) > _PAN_MAX_DIGITS or (total - 48 * len(reversed_digits)) % 10:
+                spans = _inner_pans(match.group())
+                if not spans:
+                    stats.luhn_rejected += 1
+                edits.extend((match.start() + lo, match.start() + hi, PAN_MASK) for lo, hi in spans)
+                stats.pan_redacted += len(spans)
+                continue
+            edits.append((match.start(), match.end(), PAN_MASK))
+            stats.pan_redacted += 1
+
+    if not edits:
+        return buf
+    edits.sort()
+    pieces: List[bytes] = []
+    cursor = 0
+    for start, end, mask in edits:
+        pieces.append(buf[cursor:start])
+        pieces.append(mask)
+        cursor = end
+    pieces.append(buf[cursor:])
+    return b"".join(pieces)
+
+
+def redact_bytes(data: bytes, stats: Optional[RedactionStats] = None) -> bytes:
+    return _scan(data, stats if stats is not None else RedactionStats())
+
+
+def redact_text(text: str, stats: Optional[RedactionStats] = None) -> str:
+    """Redact a single str; cheap no-op when no candidate is present."""
+    if _TEXT_SCANNER.search(text) is None:
+        return text
+    stats = stats if stats is not None else RedactionStats()
+    data = text.encode("utf-8", "surrogateescape")
+    stats.bytes_scanned += len(data)
+    return _SCANNER.sub(_Replacer(stats), data).decode("utf-8", "surrogateescape")
+
+
+class StreamRedactor:
+    """Incremental redactor for byte streams read in fixed-size chunks."""
+
+    def __init__(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+        self.chunk_size = chunk_size
+        self.stats = RedactionStats()
+        self._carry = b""
+
+    def feed(self, chunk: bytes) -> bytes:
+        """Redact and return everything that can no longer be part of a match."""
+        buf = self._carry + chunk if self._carry else chunk
+        cut = self._safe_cut(buf)
+        self._carry = buf[cut:]
+        if not cut:
+            return b""
+        return _scan(buf[:cut], self.stats)
+
+    def flush(self) -> bytes:
+        buf, self._carry = self._carry, b""
+        return _scan(buf, self.stats)
+
+    def redact_stream(self, src: BinaryIO, dst: BinaryIO) -> RedactionStats:
+        read = src.read
+        write = dst.write
+        while True:
+            chunk = read(self.chunk_size)
+            if not chunk:
+                break
+            write(self.feed(chunk))
+        write(self.flush())
+        return self.stats
+
+    @staticmethod
+    def _safe_cut(buf: bytes) -> int:
+        # Log records are newline-delimited and no match spans a newline.
+        newline = buf.rfind(b"\n")
+        if newline >= 0:
+            return newline + 1
+        # A single very long line: hold back the tail that could still grow into
+        # a match, and never split a complete match across the cut.
+        if len(buf) <= 2 * _MAX_MATCH:
+            return 0
+        cut = len(buf) - _MAX_MATCH
+        # Cut between words so lookbehinds in the carried tail see the same
+        # context they would in one pass (bounded for pathological words).
+        floor = max(cut - 4 * _MAX_MATCH, 0)
+        while cut > floor and buf[cut - 1] in _WORD_BYTES:
+            cut -= 1
+        for match in _SCANNER.finditer(buf, max(cut - _MAX_MATCH, 0)):
+            if match.start() >= cut:
+                break
+            if match.end() > cut:
+                return match.start()
+        return cut
+
+
+class PanCvvRedactingFilter(logging.Filter):
+    """
+    Redacts PAN/CVV from log records before any handler formats them.
+
+    Attach it to handlers rather than loggers: logger-level filters do not see
+    records propagated from child loggers.
+    """
+
+    def __init__(self, name: str = "") -> None:
+        super().__init__(name)
+        self.stats = RedactionStats()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        message = record.getMessage()
+        redacted = redact_text(message, self.stats)
+        if redacted is not message:
+            record.msg = redacted
+            record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        if record.exc_text:
+            record.exc_text = redact_text(record.exc_text, self.stats)
+        return True
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Redact or audit PAN/CVV values in log files.")
+    parser.add_argument("paths", nargs="+", type=Path, help="Log files to process")
+    parser.add_argument("-o", "--output", type=Path, help="Write redacted output here (single input only)")
+    parser.add_argument("--check", action="store_true", help="Only report findings; exit 1 if any are found")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Read size in bytes")
+    args = parser.parse_args(argv)
+
+    if args.output and len(args.paths) != 1:
+        raise SystemExit("--output requires exactly one input path.")
+
+    total_findings = 0
+    for path in args.paths:
+        if not path.is_file():
+            raise SystemExit(f"{path} not found.")
+        redactor = StreamRedactor(args.chunk_size)
+        with path.open("rb") as src:
+            if args.check:
+                while True:
+                    chunk = src.read(args.chunk_size)
+                    if not chunk:
+                        break
+                    redactor.feed(chunk)
+                redactor.flush()
+            elif args.output:
+                with args.output.open("wb") as dst:
+                    redactor.redact_stream(src, dst)
+            else:
+                redactor.redact_stream(src, sys.stdout.buffer)
+                sys.stdout.buffer.flush()
+        stats = redactor.stats
+        total_findings += stats.findings
+        print(
+            f"{path}: {stats.pan_redacted} PAN, {stats.cvv_redacted} CVV, "
+            f"{stats.luhn_rejected} non-Luhn candidate(s), {stats.bytes_scanned} bytes",
+            file=sys.stderr,
+        )
+
+    if args.check and total_findings:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
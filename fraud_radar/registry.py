@@ -0,0 +1,276 @@
+"""
+Model registry: versioned fraud model weights shared by every scoring worker.
+
+spec/overview.md puts "model version configuration" in the control plane, and
+the monetization guardrail needs standard and premium traffic on one model
+version. The registry is a directory:
+
+  <root>/models/<version>.npy    float64 weights (plain .npy)
+  <root>/models/<version>.json   bias, feature names, full sha256 (commit marker)
+  <root>/ACTIVE                  {"version": ...}, replaced atomically
+
+- Publishing hashes the weights once, writes both files through a temp file
+  and rename, and only then is the version listed. Republishing identical
+  weights is a no-op, since the version is the content hash.
+- Workers load weights with `np.load(mmap_mode="r")`: every process on a host
+  maps the same file, so the weights sit once in the page cache instead of
+  once per worker, and "loading" is an mmap plus a header read.
+- A scorer loads a model published for its feature names, or for an older
+  feature schema (a prefix of them), which is zero-padded to the current
+  width (`FraudModel.padded`).
+- `activate` flips `ACTIVE` with `os.replace`. `ModelWatcher` polls it and
+  swaps the engine's model by reference (`ScoringEngine.swap`): batches
+  already scoring finish on the model they started with, and the old mapping
+  is released once the last of them drops it.
+
+Usage:
+  python -m fraud_radar.registry --root models/ publish --default --activate
+  python -m fraud_radar.registry --root models/ publish --weights w.npy --bias -3.0
+  python -m fraud_radar.registry --root models/ activate eff9fe29f8a0
+  python -m fraud_radar.registry --root models/ list
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from fraud_radar.scoring import FEATURE_NAMES, FraudModel, ScoringEngine, model_digest
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_FILE = "ACTIVE"
+MODELS_DIR = "models"
+
+
+@dataclass(frozen=True)
+class ModelRecord:
+    version: str
+    sha256: str
+    bias: float
+    feature_names: Optional[Tuple[str, ...]]
+    published_at: float
+
+
+def _write_atomic(path: Path, write) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("wb") as handle:
+        write(handle)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(tmp, path)
+
+
+class ModelRegistry:
+    def __init__(self, root: Path) -> None:
+        self.root = Path(root)
+        self.models_dir = self.root / MODELS_DIR
+        self.active_path = self.root / ACTIVE_FILE
+
+    def _paths(self, version: str) -> Tuple[Path, Path]:
+        if not version or not version.isalnum():
+            raise ValueError(f"Invalid model version `{version}`")
+        return self.models_dir / f"{version}.npy", self.models_dir / f"{version}.json"
+
+    # -- control plane -----------------------------------------------------
+
+    def publish(self, model: FraudModel, feature_names: Optional[Sequence[str]] = FEATURE_NAMES) -> str:
+        """Publish `model`; `feature_names=None` records an unnamed model that scorers refuse to load."""
+        if feature_names is not None and len(feature_names) != model.n_features:
+            raise ValueError(f"Model takes {model.n_features} features but {len(feature_names)} names were given")
+        sha256 = model_digest(model.weights, model.bias)
+        version = sha256[:12]
+        weights_path, meta_path = self._paths(version)
+        if meta_path.exists():
+            return version
+        self.models_dir.mkdir(parents=True, exist_ok=True)
+        _write_atomic(weights_path, lambda handle: np.save(handle, np.asarray(model.weights, dtype=np.float64)))
+        record = {
+            "version": version,
+            "sha256": sha256,
+            "bias": float(model.bias),
+            "feature_names": None if feature_names is None else list(feature_names),
+            "published_at": time.time(),
+        }
+        _write_atomic(meta_path, lambda handle: handle.write(json.dumps(record, sort_keys=True).encode("utf-8")))
+        return version
+
+    def activate(self, version: str) -> None:
+        self.record(version)  # refuse to point ACTIVE at an unpublished version
+        document = {"version": version, "activated_at": time.time()}
+        _write_atomic(self.active_path, lambda handle: handle.write(json.dumps(document).encode("utf-8")))
+
+    def versions(self) -> List[ModelRecord]:
+        if not self.models_dir.is_dir():
+            return []
+        records = [self.record(path.stem) for path in self.models_dir.glob("*.json")]
+        return sorted(records, key=lambda record: record.published_at)
+
+    def record(self, version: str) -> ModelRecord:
+        _, meta_path = self._paths(version)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            raise ValueError(f"Model version `{version}` is not published") from None
+        names = meta["feature_names"]
+        return ModelRecord(
+            version=meta["version"],
+            sha256=meta["sha256"],
+            bias=float(meta["bias"]),
+            feature_names=None if names is None else tuple(names),
+            published_at=meta["published_at"],
+        )
+
+    # -- workers -----------------------------------------------------------
+
+    def active_version(self) -> Optional[str]:
+        try:
+            return json.loads(self.active_path.read_text(encoding="utf-8"))["version"]
+        except FileNotFoundError:
+            return None
+
+    def load(
+        self, version: str, verify: bool = False, feature_names: Optional[Sequence[str]] = FEATURE_NAMES
+    ) -> FraudModel:
+        """
+        Map `version`'s weights read-only. The model must have been published
+        with `feature_names` or an older schema's prefix of them, which is
+        zero-padded to the full width (pass None to skip the check); `verify`
+        re-hashes the weights, which reads every page.
+        """
+        record = self.record(version)
+        names = None if feature_names is None else tuple(feature_names)
+        published = record.feature_names
+        if names is not None and (published is None or names[: len(published)] != published):
+            raise ValueError(f"Model {version} was not published for this scorer's features")
+        weights_path, _ = self._paths(version)
+        weights = np.load(weights_path, mmap_mode="r")
+        if verify and model_digest(weights, record.bias) != record.sha256:
+            raise ValueError(f"Model {version} weights do not match their published sha256")
+        model = FraudModel(weights, record.bias, version=record.version)
+        return model if names is None else model.padded(len(names))
+
+    def load_active(self, verify: bool = False, feature_names: Optional[Sequence[str]] = FEATURE_NAMES) -> FraudModel:
+        version = self.active_version()
+        if version is None:
+            raise ValueError(f"No active model in {self.root}")
+        return self.load(version, verify=verify, feature_names=feature_names)
+
+
+class ModelWatcher:
+    """Follows the registry's active version and hot-swaps it into a `ScoringEngine`."""
+
+    def __init__(
+        self,
+        registry: ModelRegistry,
+        engine: ScoringEngine,
+        interval_s: float = 1.0,
+        feature_names: Optional[Sequence[str]] = FEATURE_NAMES,
+    ) -> None:
+        self.registry = registry
+        self.engine = engine
+        self.interval_s = interval_s
+        self.feature_names = feature_names
+        self.swaps = 0
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def poll(self) -> bool:
+        """Swap in the active version if it changed; True if a swap happened."""
+        try:
+            stat = self.registry.active_path.stat()
+        except FileNotFoundError:
+            return False
+        # os.replace gives every activation a new inode, even within one mtime tick.
+        stamp = (stat.st_ino, stat.st_mtime_ns)
+        if stamp == self._stamp:
+            return False
+        version = self.registry.active_version()
+        if version is None or version == self.engine.model_version:
+            self._stamp = stamp
+            return False
+        # Only mark this pointer as seen once the swap succeeded, so a bad model is retried, not skipped.
+        self.engine.swap(self.registry.load(version, feature_names=self.feature_names))
+        self._stamp = stamp
+        self.swaps += 1
+        logger.info("scoring model swapped to %s", version)
+        return True
+
+    def start(self) -> "ModelWatcher":
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="model-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            try:
+                self.poll()
+            except (OSError, ValueError):
+                logger.exception("model swap failed; keeping %s", self.engine.model_version)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Publish and activate fraud model versions.")
+    parser.add_argument("--root", type=Path, required=True, help="Registry directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+    publish = commands.add_parser("publish", help="Publish a model version")
+    source = publish.add_mutually_exclusive_group(required=True)
+    source.add_argument("--default", action="store_true", help="The built-in baseline model")
+    source.add_argument("--weights", type=Path, help=".npy file with one weight per feature")
+    publish.add_argument("--bias", type=float, help="Bias (required with --weights)")
+    publish.add_argument("--activate", action="store_true", help="Make it the active version")
+    activate = commands.add_parser("activate", help="Point scoring workers at a published version")
+    activate.add_argument("version")
+    commands.add_parser("list", help="List published versions")
+    args = parser.parse_args(argv)
+
+    registry = ModelRegistry(args.root)
+    if args.command == "publish":
+        if args.default:
+            model = FraudModel.default()
+        else:
+            if args.bias is None:
+                raise SystemExit("--bias is required with --weights.")
+            if not args.weights.is_file():
+                raise SystemExit(f"{args.weights} not found.")
+            model = FraudModel(np.load(args.weights), args.bias)
+        try:
+            version = registry.publish(model)
+        except ValueError as exc:
+            raise SystemExit(str(exc))
+        print(f"published {version}")
+        if args.activate:
+            registry.activate(version)
+            print(f"activated {version}")
+    elif args.command == "activate":
+        try:
+            registry.activate(args.version)
+        except ValueError as exc:
+            raise SystemExit(str(exc))
+        print(f"activated {args.version}")
+    else:
+        active = registry.active_version()
+        for record in registry.versions():
+            marker = "*" if record.version == active else " "
+            names = "unnamed features" if record.feature_names is None else f"{len(record.feature_names)} features"
+            print(f"{marker} {record.version} {names}, published {time.ctime(record.published_at)}")
+
+
+if __name__ == "__main__":
+    main()
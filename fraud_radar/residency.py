@@ -0,0 +1,402 @@
+"""
+Residency audit for region-partitioned log sinks.
+
+policy/dns_policy.md and the residency promises require Canadian records to
+stay in ca-central-1 and Indian records in ap-south-1. The event stream
+enforces that on the way in (fraud_radar.events); this audit checks what
+actually landed on disk. Each sink is a directory tree belonging to one AWS
+region (normally `raw/region=XX/date=YYYY-MM-DD/...`):
+
+    python -m fraud_radar.residency --sink ca-central-1=sinks/ca --sink ap-south-1=sinks/in
+
+- Every directory holding files is one task, audited in its own worker
+  process. JSON-lines files are checked in large chunks with numpy: one pass
+  finds each line's `"region"` key, and only lines without exactly one key
+  with an allowed tag are parsed with `json`. A line is compliant when its
+  region tag maps to the sink's AWS region. Columnar segments are checked
+  from their header, which the segment writer guarantees for every row.
+- A `region=XX` directory under another jurisdiction's sink is reported even
+  if its records look right, since that is where the next writer will put
+  XX data.
+- With `--state`, a high-water mark per file (inode, bytes audited) is kept
+  between runs: sinks are append-only, so a run reads only bytes written since
+  the last audit, and a trailing partial line waits for the next run. A file
+  that shrinks or is replaced is audited again from the start. Findings stay
+  open in the state (and in every report) until their file is deleted or
+  replaced, so an incremental run never hides an earlier violation.
+
+Findings hold locations and tags only, never record contents.
+Exit status is 1 when any finding is open.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from fraud_radar.events import REGIONS
+from fraud_radar.segments import SEGMENT_SUFFIX, SegmentFormatError, read_header
+
+JSONL_SUFFIX = ".jsonl"
+DEFAULT_CHUNK_BYTES = 16 << 20
+MAX_FINDINGS_PER_FILE = 100
+STATE_VERSION = 1
+
+# Region tag -> AWS region it must stay in.
+ALLOWED_REGIONS: Dict[str, str] = {region.code.decode("ascii"): region.aws_region for region in REGIONS}
+
+FOREIGN_TAG = "foreign_region_tag"
+MISSING_TAG = "missing_region_tag"
+UNPARSEABLE = "unparseable_record"
+MISFILED_PARTITION = "misfiled_partition"
+UNREADABLE = "unreadable_file"
+
+_KEY = b'"region"'
+
+
+@dataclass(frozen=True)
+class Finding:
+    sink: str  # AWS region the sink belongs to
+    path: str  # relative to the sink root
+    offset: int  # byte offset of the line, row 0 for a segment, -1 for the whole file
+    tag: str
+    reason: str
+
+
+@dataclass
+class _Task:
+    sink: str
+    root: str
+    directory: str  # relative to root
+    files: List[Tuple[str, int, int]]  # name, inode, start offset
+
+
+@dataclass
+class _TaskResult:
+    findings: List[Finding] = field(default_factory=list)
+    marks: Dict[str, Tuple[int, int]] = field(default_factory=dict)  # relative path -> (inode, offset)
+    records: int = 0
+    bytes_scanned: int = 0
+    truncated: int = 0
+
+
+@dataclass
+class AuditReport:
+    findings: List[Finding] = field(default_factory=list)
+    new_findings: int = 0
+    truncated_findings: int = 0
+    tasks: int = 0
+    files_scanned: int = 0
+    files_unchanged: int = 0
+    records_checked: int = 0
+    bytes_scanned: int = 0
+    elapsed_s: float = 0.0
+
+    @property
+    def clean(self) -> bool:
+        return not self.findings and not self.truncated_findings
+
+    def to_json(self) -> dict:
+        document = asdict(self)
+        document["clean"] = self.clean
+        return document
+
+
+# -- scanning -----------------------------------------------------------------
+
+
+def _match_at(buf: np.ndarray, positions: np.ndarray, pattern: bytes) -> np.ndarray:
+    matched = positions + len(pattern) <= len(buf)
+    for shift, byte in enumerate(pattern):
+        index = np.minimum(positions + shift, len(buf) - 1)
+        matched &= buf[index] == byte
+    return matched
+
+
+def _find(buf: np.ndarray, pattern: bytes) -> np.ndarray:
+    """Start offsets of `pattern` in `buf`, narrowing the candidates one byte at a time."""
+    positions = np.flatnonzero(buf[: max(len(buf) - len(pattern) + 1, 0)] == pattern[0])
+    for shift in range(1, len(pattern)):
+        positions = positions[buf[positions + shift] == pattern[shift]]
+    return positions
+
+
+def _allowed_forms(tags: Sequence[str]) -> List[bytes]:
+    return [f'"region"{sep}"{tag}"'.encode("ascii") for tag in tags for sep in (": ", ":")]
+
+
+def scan_jsonl_chunk(chunk: bytes, allowed: Sequence[str]) -> Tuple[int, List[Tuple[int, str, str]]]:
+    """
+    Check a run of complete lines (`chunk` ends with a newline).
+
+    Returns the record count and (offset in chunk, tag, reason) for every
+    line whose region tag is not in `allowed`.
+    """
+    buf = np.frombuffer(chunk, dtype=np.uint8)
+    ends = np.flatnonzero(buf == 0x0A)
+    starts = np.r_[0, ends[:-1] + 1]
+    keys = _find(buf, _KEY)
+    good = np.zeros(len(keys), dtype=bool)
+    for form in _allowed_forms(allowed):
+        good |= _match_at(buf, keys, form)
+    line_of = np.searchsorted(ends, keys)
+    per_line = np.bincount(line_of, minlength=len(ends))
+    good_per_line = np.bincount(line_of[good], minlength=len(ends))
+    blank = ends - starts == 0
+    suspects = np.flatnonzero(~((per_line == 1) & (good_per_line == 1)) & ~blank)
+
+    problems: List[Tuple[int, str, str]] = []
+    records = int((~blank).sum())
+    for line in suspects.tolist():
+        start, end = int(starts[line]), int(ends[line])
+        text = chunk[start:end]
+        if not text.strip():
+            records -= 1
+            continue
+        try:
+            record = json.loads(text)
+        except ValueError:
+            problems.append((start, "", UNPARSEABLE))
+            continue
+        tag = record.get("region") if isinstance(record, dict) else None
+        if not isinstance(tag, str):
+            problems.append((start, "", MISSING_TAG))
+        elif tag not in allowed:
+            problems.append((start, tag, FOREIGN_TAG))
+    return records, problems
+
+
+def _audit_jsonl(
+    path: Path, start: int, allowed: Sequence[str], chunk_bytes: int
+) -> Tuple[int, int, List[Tuple[int, str, str]]]:
+    """Scan complete lines from `start`; returns (new high-water mark, records, problems with file offsets)."""
+    offset = start
+    records = 0
+    problems: List[Tuple[int, str, str]] = []
+    carry = b""
+    with path.open("rb") as handle:
+        handle.seek(start)
+        while True:
+            block = handle.read(chunk_bytes)
+            if not block:
+                break
+            data = carry + block
+            cut = data.rfind(b"\n") + 1
+            if cut:
+                count, found = scan_jsonl_chunk(data[:cut], allowed)
+                records += count
+                problems.extend((offset + at, tag, reason) for at, tag, reason in found)
+                offset += cut
+            carry = data[cut:]
+    return offset, records, problems
+
+
+def _audit_task(task: _Task) -> _TaskResult:
+    result = _TaskResult()
+    sink_tags = [tag for tag, aws_region in ALLOWED_REGIONS.items() if aws_region == task.sink]
+    directory = Path(task.root) / task.directory
+    partition_tag = next(
+        (part[len("region=") :] for part in Path(task.directory).parts if part.startswith("region=")), None
+    )
+    misfiled = partition_tag is not None and ALLOWED_REGIONS.get(partition_tag) != task.sink
+
+    for name, inode, start in task.files:
+        path = directory / name
+        relative = (Path(task.directory) / name).as_posix()
+        findings: List[Finding] = []
+        if misfiled and start == 0:
+            findings.append(Finding(task.sink, relative, -1, partition_tag or "", MISFILED_PARTITION))
+        try:
+            size = path.stat().st_size
+            if path.suffix == SEGMENT_SUFFIX:
+                header = read_header(path)
+                if header.region not in sink_tags:
+                    findings.append(Finding(task.sink, relative, 0, header.region, FOREIGN_TAG))
+                result.records += header.rows
+                result.bytes_scanned += size
+                mark = size
+            else:
+                mark, records, problems = _audit_jsonl(path, start, sink_tags, DEFAULT_CHUNK_BYTES)
+                findings.extend(Finding(task.sink, relative, at, tag, reason) for at, tag, reason in problems)
+                result.records += records
+                result.bytes_scanned += mark - start
+        except (OSError, SegmentFormatError):
+            findings.append(Finding(task.sink, relative, -1, "", UNREADABLE))
+            mark = start
+        result.truncated += max(0, len(findings) - MAX_FINDINGS_PER_FILE)
+        result.findings.extend(findings[:MAX_FINDINGS_PER_FILE])
+        result.marks[relative] = (inode, mark)
+    return result
+
+
+# -- auditor ------------------------------------------------------------------
+
+
+class ResidencyAuditor:
+    """Audits sinks (AWS region -> directory) for records tagged for another jurisdiction."""
+
+    def __init__(
+        self,
+        sinks: Mapping[str, Path],
+        state_path: Optional[Path] = None,
+        processes: int = 1,
+        suffixes: Tuple[str, ...] = (JSONL_SUFFIX, SEGMENT_SUFFIX),
+    ) -> None:
+        unknown = sorted(set(sinks) - set(ALLOWED_REGIONS.values()))
+        if unknown:
+            raise ValueError(f"Unknown sink region(s): {', '.join(unknown)}")
+        if processes < 1:
+            raise ValueError("processes must be at least 1")
+        self.sinks = {sink: Path(root) for sink, root in sinks.items()}
+        self.state_path = None if state_path is None else Path(state_path)
+        self.processes = processes
+        self.suffixes = suffixes
+
+    def _load_state(self) -> dict:
+        if self.state_path is None or not self.state_path.is_file():
+            return {"version": STATE_VERSION, "files": {}, "findings": []}
+        state = json.loads(self.state_path.read_text(encoding="utf-8"))
+        if state.get("version") != STATE_VERSION:
+            return {"version": STATE_VERSION, "files": {}, "findings": []}
+        return state
+
+    def _save_state(self, state: dict) -> None:
+        if self.state_path is None:
+            return
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_name(self.state_path.name + ".tmp")
+        with tmp.open("w", encoding="utf-8") as handle:
+            json.dump(state, handle, sort_keys=True)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp, self.state_path)
+
+    def _plan(
+        self, marks: Dict[str, List[int]], report: AuditReport
+    ) -> Tuple[List[_Task], Dict[str, List[int]], Set[str]]:
+        """
+        Tasks for every directory with unaudited bytes, the (inode, mark) of
+        every file now present, and the files being audited from the start again.
+        """
+        tasks: List[_Task] = []
+        present: Dict[str, List[int]] = {}
+        restarted: Set[str] = set()
+        for sink, root in sorted(self.sinks.items()):
+            if not root.is_dir():
+                continue
+            for directory, _, names in sorted(os.walk(root)):
+                relative_dir = Path(directory).relative_to(root)
+                files: List[Tuple[str, int, int]] = []
+                for name in sorted(names):
+                    if not name.endswith(self.suffixes):
+                        continue
+                    stat = os.stat(os.path.join(directory, name))
+                    key = f"{sink}/{(relative_dir / name).as_posix()}"
+                    inode, offset = marks.get(key, (None, 0))
+                    if inode != stat.st_ino or stat.st_size < offset:
+                        offset = 0  # new, replaced or truncated: audit from the start
+                        restarted.add(key)
+                    present[key] = [stat.st_ino, offset]
+                    if offset < stat.st_size:
+                        files.append((name, stat.st_ino, offset))
+                    else:
+                        report.files_unchanged += 1
+                if files:
+                    tasks.append(_Task(sink, str(root), relative_dir.as_posix(), files))
+        return tasks, present, restarted
+
+    def run(self, full: bool = False) -> AuditReport:
+        """Audit everything written since the last run (`full` ignores the saved marks)."""
+        started = time.perf_counter()
+        report = AuditReport()
+        state = self._load_state()
+        tasks, present, restarted = self._plan({} if full else state["files"], report)
+        report.tasks = len(tasks)
+
+        if self.processes > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=min(self.processes, len(tasks))) as pool:
+                results = list(pool.map(_audit_task, tasks))
+        else:
+            results = [_audit_task(task) for task in tasks]
+
+        # Earlier findings stay open while their file is still the one they were found in.
+        carried = [
+            finding
+            for finding in (Finding(**item) for item in state["findings"])
+            if f"{finding.sink}/{finding.path}" in present
+            and f"{finding.sink}/{finding.path}" not in restarted
+        ]
+        fresh: List[Finding] = []
+        for task, result in zip(tasks, results):
+            fresh.extend(result.findings)
+            report.truncated_findings += result.truncated
+            report.records_checked += result.records
+            report.bytes_scanned += result.bytes_scanned
+            report.files_scanned += len(task.files)
+            for relative, (inode, offset) in result.marks.items():
+                present[f"{task.sink}/{relative}"] = [inode, offset]
+
+        report.findings = sorted(set(carried) | set(fresh), key=lambda f: (f.sink, f.path, f.offset))
+        report.new_findings = len(set(fresh) - set(carried))
+        self._save_state(
+            {"version": STATE_VERSION, "files": present, "findings": [asdict(finding) for finding in report.findings]}
+        )
+        report.elapsed_s = time.perf_counter() - started
+        return report
+
+
+def _parse_sink(value: str) -> Tuple[str, Path]:
+    sink, sep, path = value.partition("=")
+    if not sep or not path:
+        raise argparse.ArgumentTypeError(f"Expected AWS_REGION=PATH, got `{value}`")
+    return sink, Path(path)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Audit region-partitioned log sinks for cross-jurisdiction records.")
+    parser.add_argument(
+        "--sink", type=_parse_sink, action="append", required=True, help="AWS_REGION=PATH (repeat per sink)"
+    )
+    parser.add_argument("--state", type=Path, help="High-water-mark index; later runs only scan new data")
+    parser.add_argument("--full", action="store_true", help="Ignore the saved marks and re-audit everything")
+    parser.add_argument("--report", type=Path, help="Write the exception report as JSON")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    args = parser.parse_args(argv)
+
+    sinks = dict(args.sink)
+    missing = [str(path) for path in sinks.values() if not path.is_dir()]
+    if missing:
+        raise SystemExit(f"Sink directory not found: {', '.join(missing)}")
+    try:
+        auditor = ResidencyAuditor(sinks, state_path=args.state, processes=max(1, args.jobs))
+    except ValueError as exc:
+        raise SystemExit(str(exc))
+    report = auditor.run(full=args.full)
+
+    if args.report:
+        args.report.parent.mkdir(parents=True, exist_ok=True)
+        args.report.write_text(json.dumps(report.to_json(), indent=2) + "\n", encoding="utf-8")
+    for finding in report.findings:
+        location = "" if finding.offset < 0 else f" @{finding.offset}"
+        tag = f" [{finding.tag}]" if finding.tag else ""
+        print(f"{finding.sink}: {finding.path}{location}: {finding.reason}{tag}")
+    if report.truncated_findings:
+        print(f"... and {report.truncated_findings} more finding(s) not listed")
+    print(
+        f"{report.records_checked} record(s) in {report.files_scanned} file(s) audited "
+        f"({report.bytes_scanned} bytes, {report.files_unchanged} unchanged file(s) skipped) "
+        f"in {report.elapsed_s:.2f}s; {len(report.findings)} open finding(s), {report.new_findings} new"
+    )
+    if not report.clean:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,558 @@
+"""
+Retention engine for date-partitioned raw fraud logs.
+
+Local stand-in for the S3 lifecycle rules in policy/log_retention_policy.md:
+raw fraud logs live at most 30 days, and only anonymized per-region, per-day
+aggregates are kept, for at most a year.
+
+    <root>/raw/region=CA/date=2025-11-17/*.jsonl       raw logs (30 days)
+    <root>/raw/region=CA/date=2025-11-17/*.frseg       columnar raw telemetry (30 days)
+    <root>/aggregates/region=CA/date=2025-11-17.json   aggregates (365 days)
+    <root>/.retention-checkpoint.json                  in-flight partition
+
+Each expiring partition is read exactly once. Records are folded into a
+fixed-size `DailyAggregate` (counts, decision totals, score and latency
+histograms) as they stream past, the aggregate is written, and only then is
+the partition deleted. Memory is bounded by the aggregate plus one line,
+whatever the partition size; lines longer than `max_line_bytes` are skipped
+and counted as malformed. Columnar segments (fraud_radar.segments) are folded
+whole, from the four mapped columns the aggregate needs.
+
+Progress (file, byte offset, partial aggregate) is checkpointed every
+`checkpoint_bytes` and at file boundaries, so an interrupted run resumes where
+it stopped without folding any record twice. Every aggregate records the
+fingerprints of the partitions folded into it, which makes a rerun after a
+crash between "aggregate written" and "partition deleted" a no-op fold.
+A day's aggregate from the dashboard materializer (`store_materialized`) only
+covers what that one process saw, so it stands in for the day until the raw
+partition expires; the partition is then folded as usual and its aggregate
+replaces the materialized one.
+
+Usage:
+    python -m fraud_radar.retention --root logs/
+    python -m fraud_radar.retention --root logs/ --today 2025-12-20 --dry-run
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+from dataclasses import asdict, dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from fraud_radar.scoring import BLOCK, BLOCK_THRESHOLD, DECISION_LABELS, REVIEW_THRESHOLD, apply_thresholds
+from fraud_radar.segments import LEGIT, SEGMENT_SUFFIX, UNLABELLED, Segment
+
+RAW_RETENTION_DAYS = 30
+AGGREGATE_RETENTION_DAYS = 365
+
+RAW_DIR = "raw"
+AGGREGATE_DIR = "aggregates"
+CHECKPOINT_FILE = ".retention-checkpoint.json"
+
+DEFAULT_CHECKPOINT_BYTES = 16 << 20
+DEFAULT_MAX_LINE_BYTES = 1 << 16
+
+# Marks an aggregate written by the dashboard materializer (fraud_radar.dashboard)
+# as its day closed. It only holds what one process saw since it started (a
+# restart or another instance misses events), so folding the day's raw
+# partition replaces it rather than merging into it.
+MATERIALIZED_SOURCE = "materialized"
+
+SCORE_BINS = 20
+# Segment amounts are in minor units; CAD and INR both have two decimals.
+MINOR_UNITS_PER_MAJOR = 100
+# Upper bounds of the latency buckets in milliseconds; the last bucket is open.
+LATENCY_BOUNDS_MS: Tuple[float, ...] = (1, 2, 5, 10, 20, 50, 75, 100, 150, 200, 300, 500, 1000, 2000, 5000)
+
+
+# -- aggregates -------------------------------------------------------------
+
+
+@dataclass
+class DailyAggregate:
+    """
+    Anonymized totals for one region and day.
+
+    Only counts and fixed-width histograms: no merchant, card, device or
+    transaction identifiers, and nothing that grows with the partition.
+    """
+
+    region: str
+    day: str
+    transactions: int = 0
+    amount_total: float = 0.0
+    decisions: Dict[str, int] = field(default_factory=lambda: {label: 0 for label in DECISION_LABELS})
+    score_histogram: List[int] = field(default_factory=lambda: [0] * SCORE_BINS)
+    latency_histogram: List[int] = field(default_factory=lambda: [0] * (len(LATENCY_BOUNDS_MS) + 1))
+    labelled: int = 0
+    false_positives: int = 0
+    malformed: int = 0
+    region_mismatch: int = 0
+    sources: List[str] = field(default_factory=list)
+
+    def add(self, record: dict) -> None:
+        if record.get("region", self.region) != self.region:
+            # Misfiled record: counted so the residency audit can see it, never
+            # folded into another jurisdiction's totals.
+            self.region_mismatch += 1
+            return
+        self.transactions += 1
+        amount = record.get("amount")
+        if isinstance(amount, (int, float)):
+            self.amount_total += amount
+        score = record.get("score")
+        if isinstance(score, (int, float)) and 0.0 <= score <= 1.0:
+            self.score_histogram[min(int(score * SCORE_BINS), SCORE_BINS - 1)] += 1
+        decision = record.get("decision")
+        if decision not in self.decisions and isinstance(score, (int, float)):
+            decision = DECISION_LABELS[(score >= REVIEW_THRESHOLD) + (score >= BLOCK_THRESHOLD)]
+        if decision in self.decisions:
+            self.decisions[decision] += 1
+        latency = record.get("latency_ms")
+        if isinstance(latency, (int, float)):
+            self.latency_histogram[_latency_bucket(latency)] += 1
+        label = record.get("label")
+        if label in ("fraud", "legit"):
+            self.labelled += 1
+            if label == "legit" and decision == "block":
+                self.false_positives += 1
+
+    def add_segment(self, segment: Segment) -> None:
+        """Fold a whole segment with the same rules as `add`, one vectorised pass per column."""
+        if segment.region != self.region:
+            self.region_mismatch += segment.rows
+            return
+        self.add_columns(
+            segment.column("amount_minor"), segment.column("score"), segment.column("latency_ms"), segment.column("label")
+        )
+
+    def add_columns(
+        self,
+        amount_minor: np.ndarray,
+        score: np.ndarray,
+        latency_ms: Optional[np.ndarray] = None,
+        label: Optional[np.ndarray] = None,
+    ) -> None:
+        """Fold columns of this region's records (NaN score/latency = missing; label as in fraud_radar.segments)."""
+        self.transactions += len(amount_minor)
+        self.amount_total += float(np.sum(amount_minor)) / MINOR_UNITS_PER_MAJOR
+        score = np.asarray(score, dtype=np.float64)
+        scored = ~np.isnan(score)
+        in_range = scored & (score >= 0.0) & (score <= 1.0)
+        bins = np.minimum((score[in_range] * SCORE_BINS).astype(np.int64), SCORE_BINS - 1)
+        counts = np.bincount(bins, minlength=SCORE_BINS).tolist()
+        self.score_histogram = [a + b for a, b in zip(self.score_histogram, counts)]
+        decision = np.full(len(score), -1, dtype=np.int8)
+        decision[scored] = apply_thresholds(score[scored])
+        for index, count in enumerate(np.bincount(decision[scored], minlength=len(DECISION_LABELS)).tolist()):
+            self.decisions[DECISION_LABELS[index]] += count
+        if latency_ms is not None:
+            latency = np.asarray(latency_ms, dtype=np.float64)
+            buckets = np.searchsorted(LATENCY_BOUNDS_MS, latency[~np.isnan(latency)], side="left")
+            counts = np.bincount(buckets, minlength=len(LATENCY_BOUNDS_MS) + 1).tolist()
+            self.latency_histogram = [a + b for a, b in zip(self.latency_histogram, counts)]
+        if label is not None:
+            label = np.asarray(label)
+            self.labelled += int((label != UNLABELLED).sum())
+            self.false_positives += int(((label == LEGIT) & (decision == BLOCK)).sum())
+
+    def merge(self, other: "DailyAggregate") -> None:
+        if (other.region, other.day) != (self.region, self.day):
+            raise ValueError(f"Cannot merge {other.region}/{other.day} into {self.region}/{self.day}")
+        self.transactions += other.transactions
+        self.amount_total += other.amount_total
+        for label, count in other.decisions.items():
+            self.decisions[label] = self.decisions.get(label, 0) + count
+        self.score_histogram = [a + b for a, b in zip(self.score_histogram, other.score_histogram)]
+        self.latency_histogram = [a + b for a, b in zip(self.latency_histogram, other.latency_histogram)]
+        self.labelled += other.labelled
+        self.false_positives += other.false_positives
+        self.malformed += other.malformed
+        self.region_mismatch += other.region_mismatch
+        self.sources.extend(source for source in other.sources if source not in self.sources)
+
+    def false_positive_rate(self) -> Optional[float]:
+        return self.false_positives / self.labelled if self.labelled else None
+
+    def latency_percentile(self, q: float) -> Optional[float]:
+        """Upper bound of the latency bucket holding the q-th percentile (inf for the open bucket)."""
+        total = sum(self.latency_histogram)
+        if not total:
+            return None
+        rank = q / 100.0 * total
+        seen = 0
+        for index, count in enumerate(self.latency_histogram):
+            seen += count
+            if count and seen >= rank:
+                return LATENCY_BOUNDS_MS[index] if index < len(LATENCY_BOUNDS_MS) else float("inf")
+        return float("inf")
+
+    def to_json(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_json(cls, data: dict) -> "DailyAggregate":
+        return cls(**data)
+
+
+def _latency_bucket(latency_ms: float) -> int:
+    for index, bound in enumerate(LATENCY_BOUNDS_MS):
+        if latency_ms <= bound:
+            return index
+    return len(LATENCY_BOUNDS_MS)
+
+
+# -- partitions ---------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class LogPartition:
+    region: str
+    day: date
+    path: Path
+
+    @property
+    def key(self) -> str:
+        return f"region={self.region}/date={self.day.isoformat()}"
+
+    def files(self) -> List[Path]:
+        return sorted(path for path in self.path.rglob("*") if path.is_file())
+
+
+def _parse_key(name: str, prefix: str) -> Optional[str]:
+    return name[len(prefix) :] if name.startswith(prefix) else None
+
+
+def find_partitions(raw_root: Path) -> List[LogPartition]:
+    """Every `region=XX/date=YYYY-MM-DD` directory under `raw_root`, oldest first."""
+    partitions: List[LogPartition] = []
+    if not raw_root.is_dir():
+        return partitions
+    for region_dir in sorted(raw_root.iterdir()):
+        region = _parse_key(region_dir.name, "region=")
+        if region is None or not region_dir.is_dir():
+            continue
+        for day_dir in sorted(region_dir.iterdir()):
+            day = _parse_key(day_dir.name, "date=")
+            if day is None or not day_dir.is_dir():
+                continue
+            try:
+                partitions.append(LogPartition(region, date.fromisoformat(day), day_dir))
+            except ValueError:
+                continue
+    return sorted(partitions, key=lambda p: (p.day, p.region))
+
+
+def partition_fingerprint(partition: LogPartition, files: List[Path]) -> str:
+    """Identity of a partition's contents at scan time (names and sizes, not data)."""
+    digest = hashlib.sha256(partition.key.encode())
+    for path in files:
+        digest.update(f"\0{path.relative_to(partition.path).as_posix()}\0{path.stat().st_size}".encode())
+    return digest.hexdigest()[:16]
+
+
+def _write_json_atomic(path: Path, document: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("w", encoding="utf-8") as handle:
+        json.dump(document, handle, sort_keys=True)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(tmp, path)
+
+
+# -- engine -------------------------------------------------------------------
+
+
+@dataclass
+class RetentionReport:
+    expired_partitions: List[str] = field(default_factory=list)
+    expired_aggregates: List[str] = field(default_factory=list)
+    records_folded: int = 0
+    bytes_scanned: int = 0
+    resumed: Optional[str] = None
+    complete: bool = True
+
+
+class _Interrupted(Exception):
+    pass
+
+
+class RetentionEngine:
+    """Expires raw partitions older than `raw_days` and aggregates older than `aggregate_days`."""
+
+    def __init__(
+        self,
+        root: Path,
+        today: Optional[date] = None,
+        raw_days: int = RAW_RETENTION_DAYS,
+        aggregate_days: int = AGGREGATE_RETENTION_DAYS,
+        checkpoint_bytes: int = DEFAULT_CHECKPOINT_BYTES,
+        max_line_bytes: int = DEFAULT_MAX_LINE_BYTES,
+    ) -> None:
+        if checkpoint_bytes < 1 or max_line_bytes < 1:
+            raise ValueError("checkpoint_bytes and max_line_bytes must be positive")
+        self.root = Path(root)
+        self.today = today or date.today()
+        self.raw_days = raw_days
+        self.aggregate_days = aggregate_days
+        self.checkpoint_bytes = checkpoint_bytes
+        self.max_line_bytes = max_line_bytes
+        self.raw_root = self.root / RAW_DIR
+        self.aggregate_root = self.root / AGGREGATE_DIR
+        self.checkpoint_path = self.root / CHECKPOINT_FILE
+
+    def aggregate_path(self, region: str, day: str) -> Path:
+        return self.aggregate_root / f"region={region}" / f"date={day}.json"
+
+    def load_aggregate(self, region: str, day: str) -> Optional[DailyAggregate]:
+        path = self.aggregate_path(region, day)
+        if not path.is_file():
+            return None
+        return DailyAggregate.from_json(json.loads(path.read_text(encoding="utf-8")))
+
+    def store_materialized(self, aggregate: DailyAggregate) -> bool:
+        """Write a closed day's aggregate from the materializer; False if that day already has one."""
+        path = self.aggregate_path(aggregate.region, aggregate.day)
+        if path.is_file():
+            return False
+        document = aggregate.to_json()
+        document["sources"] = [MATERIALIZED_SOURCE]
+        _write_json_atomic(path, document)
+        return True
+
+    def expiring(self) -> List[LogPartition]:
+        return [p for p in find_partitions(self.raw_root) if (self.today - p.day).days >= self.raw_days]
+
+    def run(self, max_records: Optional[int] = None, dry_run: bool = False) -> RetentionReport:
+        """
+        Fold and delete every expiring partition, then drop stale aggregates.
+
+        `max_records` caps the records folded in this run (a maintenance
+        window, at least 1); the run checkpoints and returns with
+        `complete=False`, and the next run resumes from the checkpoint.
+        """
+        if max_records is not None and max_records < 1:
+            raise ValueError("max_records must be at least 1")
+        report = RetentionReport()
+        if dry_run:
+            report.expired_partitions = [p.key for p in self.expiring()]
+            report.expired_aggregates = [str(p.relative_to(self.root)) for p in self._stale_aggregates()]
+            return report
+
+        budget = [max_records]
+        checkpoint = self._load_checkpoint()
+        try:
+            if checkpoint is not None:
+                report.resumed = checkpoint["partition"]
+                self._resume(checkpoint, report, budget)
+            for partition in self.expiring():
+                self._expire(partition, None, report, budget)
+        except _Interrupted:
+            report.complete = False
+            return report
+
+        for path in self._stale_aggregates():
+            path.unlink()
+            report.expired_aggregates.append(str(path.relative_to(self.root)))
+        return report
+
+    # -- checkpoint ---------------------------------------------------------
+
+    def _load_checkpoint(self) -> Optional[dict]:
+        if not self.checkpoint_path.is_file():
+            return None
+        return json.loads(self.checkpoint_path.read_text(encoding="utf-8"))
+
+    def _save_checkpoint(self, state: dict) -> None:
+        _write_json_atomic(self.checkpoint_path, state)
+
+    def _resume(self, checkpoint: dict, report: RetentionReport, budget: List[Optional[int]]) -> None:
+        region, day = checkpoint["region"], checkpoint["day"]
+        partition = LogPartition(region, date.fromisoformat(day), self.raw_root / f"region={region}" / f"date={day}")
+        self._expire(partition, checkpoint, report, budget)
+
+    # -- expiry -------------------------------------------------------------
+
+    def _expire(
+        self,
+        partition: LogPartition,
+        state: Optional[dict],
+        report: RetentionReport,
+        budget: List[Optional[int]],
+    ) -> None:
+        if state is None:
+            files = partition.files()
+            state = {
+                "partition": partition.key,
+                "region": partition.region,
+                "day": partition.day.isoformat(),
+                "fingerprint": partition_fingerprint(partition, files),
+                "files": [path.relative_to(partition.path).as_posix() for path in files],
+                "file_index": 0,
+                "offset": 0,
+                "aggregate": DailyAggregate(partition.region, partition.day.isoformat()).to_json(),
+            }
+            self._save_checkpoint(state)
+
+        fingerprint = state["fingerprint"]
+        existing = self.load_aggregate(state["region"], state["day"])
+        folded = existing is not None and fingerprint in existing.sources
+        if not folded:
+            partial = DailyAggregate.from_json(state["aggregate"])
+            self._fold(partition, state, partial, report, budget)
+            partial.sources.append(fingerprint)
+            if existing is not None and MATERIALIZED_SOURCE not in existing.sources:
+                existing.merge(partial)
+                partial = existing
+            _write_json_atomic(self.aggregate_path(state["region"], state["day"]), partial.to_json())
+
+        # The aggregate now carries this fingerprint, so a crash from here on
+        # only repeats the deletion.
+        if partition.path.exists():
+            shutil.rmtree(partition.path)
+        region_dir = partition.path.parent
+        if region_dir.is_dir() and not any(region_dir.iterdir()):
+            region_dir.rmdir()
+        self.checkpoint_path.unlink(missing_ok=True)
+        report.expired_partitions.append(partition.key)
+
+    def _fold(
+        self,
+        partition: LogPartition,
+        state: dict,
+        aggregate: DailyAggregate,
+        report: RetentionReport,
+        budget: List[Optional[int]],
+    ) -> None:
+        files: List[str] = state["files"]
+        while state["file_index"] < len(files):
+            path = partition.path / files[state["file_index"]]
+            if path.is_file() and path.suffix == SEGMENT_SUFFIX:
+                self._fold_segment(path, aggregate, report, budget)
+            elif path.is_file():
+                self._fold_file(path, state, aggregate, report, budget)
+            state["file_index"] += 1
+            state["offset"] = 0
+            state["aggregate"] = aggregate.to_json()
+            self._save_checkpoint(state)
+            if budget[0] == 0:
+                raise _Interrupted()
+
+    @staticmethod
+    def _fold_segment(
+        path: Path, aggregate: DailyAggregate, report: RetentionReport, budget: List[Optional[int]]
+    ) -> None:
+        # Segments fold whole, so a --max-records window may overshoot by up to one segment.
+        segment = Segment(path)
+        aggregate.add_segment(segment)
+        report.records_folded += segment.rows
+        report.bytes_scanned += path.stat().st_size
+        if budget[0] is not None:
+            budget[0] = max(0, budget[0] - segment.rows)
+
+    def _fold_file(
+        self,
+        path: Path,
+        state: dict,
+        aggregate: DailyAggregate,
+        report: RetentionReport,
+        budget: List[Optional[int]],
+    ) -> None:
+        offset = state["offset"]
+        since_checkpoint = 0
+        skipping = False  # inside an over-long line; discard up to its newline
+        with path.open("rb") as handle:
+            handle.seek(offset)
+            while True:
+                line = handle.readline(self.max_line_bytes + 1)
+                if not line:
+                    break
+                offset += len(line)
+                report.bytes_scanned += len(line)
+                since_checkpoint += len(line)
+                complete = line.endswith(b"\n")
+                if skipping:
+                    skipping = not complete
+                    continue
+                if not complete and len(line) > self.max_line_bytes:
+                    aggregate.malformed += 1
+                    skipping = True
+                    continue
+                if line.strip():
+                    self._fold_line(line, aggregate)
+                    report.records_folded += 1
+                    if budget[0] is not None:
+                        budget[0] -= 1
+                if since_checkpoint >= self.checkpoint_bytes or budget[0] == 0:
+                    state["offset"] = offset
+                    state["aggregate"] = aggregate.to_json()
+                    self._save_checkpoint(state)
+                    since_checkpoint = 0
+                    if budget[0] == 0:
+                        raise _Interrupted()
+
+    @staticmethod
+    def _fold_line(line: bytes, aggregate: DailyAggregate) -> None:
+        try:
+            record = json.loads(line)
+        except ValueError:
+            aggregate.malformed += 1
+            return
+        if not isinstance(record, dict):
+            aggregate.malformed += 1
+            return
+        aggregate.add(record)
+
+    def _stale_aggregates(self) -> List[Path]:
+        stale: List[Path] = []
+        if not self.aggregate_root.is_dir():
+            return stale
+        for path in sorted(self.aggregate_root.glob("region=*/date=*.json")):
+            try:
+                day = date.fromisoformat(path.stem[len("date=") :])
+            except ValueError:
+                continue
+            if (self.today - day).days >= self.aggregate_days:
+                stale.append(path)
+        return stale
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Expire raw fraud logs into anonymized daily aggregates.")
+    parser.add_argument("--root", type=Path, required=True, help="Log root holding raw/ and aggregates/")
+    parser.add_argument("--today", type=date.fromisoformat, help="Evaluate expiry as of this date (YYYY-MM-DD)")
+    parser.add_argument("--max-records", type=int, help="Stop after folding this many records; rerun to resume")
+    parser.add_argument("--checkpoint-mb", type=float, default=DEFAULT_CHECKPOINT_BYTES / (1 << 20))
+    parser.add_argument("--dry-run", action="store_true", help="List what would expire without touching anything")
+    args = parser.parse_args(argv)
+
+    if not args.root.is_dir():
+        raise SystemExit(f"{args.root} not found.")
+    if args.max_records is not None and args.max_records < 1:
+        raise SystemExit("--max-records must be at least 1.")
+    engine = RetentionEngine(args.root, today=args.today, checkpoint_bytes=max(1, int(args.checkpoint_mb * (1 << 20))))
+    report = engine.run(max_records=args.max_records, dry_run=args.dry_run)
+
+    verb = "would expire" if args.dry_run else "expired"
+    if report.resumed:
+        print(f"resumed {report.resumed} from checkpoint")
+    for key in report.expired_partitions:
+        print(f"{verb} raw {key}")
+    for key in report.expired_aggregates:
+        print(f"{verb} aggregate {key}")
+    if not args.dry_run:
+        print(f"{report.records_folded} record(s), {report.bytes_scanned} byte(s) folded")
+    if not report.complete:
+        print(f"stopped after --max-records; checkpoint at {engine.checkpoint_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,671 @@
+"""
+In-region, health-checked, latency-aware routing over multi-AZ scoring instances.
+
+Chaos Experiment 1 (experiments/chaos/2025-11-17.md) found requests still
+going to instances in a failed AZ until health checks caught up. `Router`
+keeps every scoring instance of one region in rotation only while it is
+known good:
+
+- Active health checks: every `probe_interval_s` all instances are probed
+  concurrently (`GET /health`, fraud_radar.api). A failed or timed-out probe
+  takes the instance out of rotation at once, so a dead instance is ejected
+  within one probe interval (plus the probe timeout). It comes back after
+  `healthy_after` consecutive good probes.
+- Passive checks: `eject_after_failures` consecutive failed requests eject an
+  instance without waiting for the next probe. Under load this is what
+  usually catches a dead AZ first.
+- Latency: each instance keeps an EWMA of its request latency. An instance
+  whose EWMA is `outlier_factor` times the median of its peers is ejected as
+  an outlier for `outlier_ejection_s`. At most `max_ejected_fraction` of the
+  instances can be out as outliers at once.
+- Picking: power of two choices across AZs. Two AZs with instances in
+  rotation are drawn, then one instance in each, and the one with the lower
+  EWMA x (in-flight + 1) wins. A failed request is retried once on another
+  instance, preferably in another AZ.
+
+A router is built for one region and refuses instances from any other, so
+traffic never fails over across regions (policy/dns_policy.md, 4.3).
+
+`StubScoringInstance` is a local keep-alive scoring stand-in that can be
+slowed, marked unhealthy or killed. `run_az_failover` sends load through a
+router, kills one AZ mid-run and reports misrouted requests, failures,
+detection time and p99 latency during failover:
+
+    python -m fraud_radar.router --rate 300 --duration 4 --kill-at 1.5
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, FrozenSet, List, Optional, Set, Tuple, Type, TypeVar
+
+from fraud_radar.api import HEALTH_ROUTE, SCORE_ROUTE
+from fraud_radar.events import CA, REGIONS, Region, ResidencyViolation
+from fraud_radar.metrics import LatencyHistogram
+from fraud_radar.overload import SCORING_P99_TARGET_S
+from fraud_radar.scoring import FEATURE_NAMES, FEATURE_SCHEMA_VERSION
+
+T = TypeVar("T")
+
+HEALTH_CHECK_FAILED = "health_check_failed"
+REQUESTS_FAILING = "requests_failing"
+LATENCY_OUTLIER = "latency_outlier"
+
+_MAX_HEADER_BYTES = 64 * 1024
+
+
+class NoHealthyInstance(Exception):
+    """Every instance in the region is out of rotation."""
+
+
+@dataclass(frozen=True)
+class Instance:
+    name: str
+    region: Type[Region]
+    az: str
+    host: str
+    port: int
+
+
+@dataclass(frozen=True)
+class RouterConfig:
+    probe_interval_s: float = 1.0
+    probe_timeout_s: float = 0.25
+    healthy_after: int = 2  # consecutive good probes to return to rotation
+    eject_after_failures: int = 2  # consecutive failed requests
+    ewma_alpha: float = 0.2
+    outlier_factor: float = 4.0
+    outlier_ejection_s: float = 5.0
+    max_ejected_fraction: float = 0.5  # cap on outlier ejections, not on failed health checks
+    min_azs: int = 2
+    seed: int = 0
+
+    def __post_init__(self) -> None:
+        if self.probe_interval_s <= 0 or self.probe_timeout_s <= 0:
+            raise ValueError("probe_interval_s and probe_timeout_s must be positive")
+        if self.probe_timeout_s > self.probe_interval_s:
+            raise ValueError("probe_timeout_s must not exceed probe_interval_s")
+        if self.healthy_after < 1 or self.eject_after_failures < 1:
+            raise ValueError("healthy_after and eject_after_failures must be at least 1")
+        if not 0.0 < self.ewma_alpha <= 1.0:
+            raise ValueError("ewma_alpha must be in (0, 1]")
+
+
+@dataclass
+class InstanceState:
+    instance: Instance
+    healthy: bool = False  # until the first good probe
+    ewma_s: Optional[float] = None
+    outlier: float = 1.0  # EWMA over the median EWMA of the instances in rotation
+    outlier_until: float = 0.0
+    in_flight: int = 0
+    good_probes: int = 0
+    failed_requests: int = 0  # consecutive
+    requests: int = 0
+    failures: int = 0
+
+    def cost(self) -> float:
+        return (self.ewma_s or 0.0) * (self.in_flight + 1)
+
+
+@dataclass(frozen=True)
+class Ejection:
+    at: float
+    instance: str
+    az: str
+    reason: str
+
+
+# -- HTTP ---------------------------------------------------------------------
+
+
+async def _read_response(reader: asyncio.StreamReader) -> Tuple[int, bytes, bool]:
+    """(status, body, keep_alive) of one HTTP/1.1 response with a Content-Length."""
+    status_line = await reader.readline()
+    parts = status_line.split(None, 2)
+    if len(parts) < 2 or not parts[0].startswith(b"HTTP/1."):
+        raise ConnectionError(f"not an HTTP response: {status_line[:40]!r}")
+    length, keep_alive, size = 0, True, 0
+    while True:
+        line = await reader.readline()
+        size += len(line)
+        if not line:
+            raise ConnectionError("connection closed in response headers")
+        if line in (b"\r\n", b"\n") or size > _MAX_HEADER_BYTES:
+            break
+        name, _, value = line.partition(b":")
+        name = name.strip().lower()
+        if name == b"content-length":
+            length = int(value)
+        elif name == b"connection":
+            keep_alive = value.strip().lower() != b"close"
+    return int(parts[1]), await reader.readexactly(length), keep_alive
+
+
+class ScoringClient:
+    """Keep-alive HTTP/1.1 client with an idle connection pool per instance."""
+
+    def __init__(self, timeout_s: float = 1.0) -> None:
+        self.timeout_s = timeout_s
+        self._idle: Dict[str, Deque[Tuple[asyncio.StreamReader, asyncio.StreamWriter]]] = {}
+
+    async def post(self, instance: Instance, path: str, body: bytes) -> Tuple[int, bytes]:
+        idle = self._idle.setdefault(instance.name, deque())
+        if idle:
+            reader, writer = idle.pop()
+        else:
+            reader, writer = await asyncio.wait_for(asyncio.open_connection(instance.host, instance.port), self.timeout_s)
+        try:
+            writer.write(
+                b"POST %s HTTP/1.1\r\nHost: %s\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n"
+                % (path.encode(), instance.host.encode(), len(body))
+                + body
+            )
+            status, data, keep_alive = await asyncio.wait_for(_read_response(reader), self.timeout_s)
+        except BaseException:
+            writer.close()
+            raise
+        if keep_alive:
+            idle.append((reader, writer))
+        else:
+            writer.close()
+        return status, data
+
+    def close(self) -> None:
+        for idle in self._idle.values():
+            for _, writer in idle:
+                writer.close()
+        self._idle.clear()
+
+
+async def probe(instance: Instance, timeout_s: float) -> bool:
+    """One `GET /health` on a fresh connection; True only for a 200 within `timeout_s`."""
+
+    async def check() -> bool:
+        reader, writer = await asyncio.open_connection(instance.host, instance.port)
+        try:
+            writer.write(
+                b"GET %s HTTP/1.1\r\nHost: %s\r\nConnection: close\r\n\r\n" % (HEALTH_ROUTE.encode(), instance.host.encode())
+            )
+            status, _, _ = await _read_response(reader)
+            return status == 200
+        finally:
+            writer.close()
+
+    try:
+        return await asyncio.wait_for(check(), timeout_s)
+    except (OSError, ValueError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+        return False
+
+
+# -- router -------------------------------------------------------------------
+
+
+class Router:
+    """Routes one region's requests to its scoring instances; see the module docstring."""
+
+    def __init__(
+        self,
+        region: Type[Region],
+        instances: List[Instance],
+        config: RouterConfig = RouterConfig(),
+        clock: Callable[[], float] = time.monotonic,
+        prober: Callable[[Instance, float], Awaitable[bool]] = probe,
+    ) -> None:
+        foreign = [instance.name for instance in instances if instance.region is not region]
+        if foreign:
+            raise ResidencyViolation(f"{region.aws_region} router cannot route to {', '.join(foreign)}")
+        azs = {instance.az for instance in instances}
+        if len(azs) < config.min_azs:
+            raise ValueError(f"{region.aws_region} has instances in {len(azs)} AZ(s); at least {config.min_azs} required")
+        if len({instance.name for instance in instances}) != len(instances):
+            raise ValueError("Instance names must be unique")
+        self.region = region
+        self.config = config
+        self._clock = clock
+        self._prober = prober
+        self._rng = random.Random(config.seed)
+        self.states: Dict[str, InstanceState] = {instance.name: InstanceState(instance) for instance in instances}
+        self._groups: List[List[InstanceState]] = []
+        self.ejections: List[Ejection] = []
+        self.probe_rounds = 0
+        self._task: Optional[asyncio.Task] = None
+
+    # -- lifecycle -------------------------------------------------------------
+
+    async def start(self) -> "Router":
+        await self.probe_all()
+        self._task = asyncio.create_task(self._probe_loop())
+        return self
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def __aenter__(self) -> "Router":
+        return await self.start()
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.close()
+
+    async def _probe_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        next_round = loop.time() + self.config.probe_interval_s
+        while True:
+            await asyncio.sleep(max(0.0, next_round - loop.time()))
+            next_round += self.config.probe_interval_s
+            await self.probe_all()
+
+    # -- health ----------------------------------------------------------------
+
+    async def probe_all(self) -> None:
+        """One concurrent health-check round over every instance."""
+        states = list(self.states.values())
+        results = await asyncio.gather(*(self._prober(state.instance, self.config.probe_timeout_s) for state in states))
+        now = self._clock()
+        for state, ok in zip(states, results):
+            if not ok:
+                state.good_probes = 0
+                if state.healthy:
+                    self._eject(state, HEALTH_CHECK_FAILED, now)
+                continue
+            state.good_probes += 1
+            first = not state.requests and state.ewma_s is None
+            if not state.healthy and (first or state.good_probes >= self.config.healthy_after):
+                state.healthy = True
+                state.failed_requests = 0
+        self._detect_outliers(now)
+        self.probe_rounds += 1
+        self._rebuild()
+
+    def _detect_outliers(self, now: float) -> None:
+        live = [state for state in self.states.values() if state.healthy and state.ewma_s is not None]
+        if len(live) < 3:
+            return
+        median = statistics.median(state.ewma_s for state in live)  # type: ignore[misc]
+        if median <= 0.0:
+            return
+        allowed = int(len(self.states) * self.config.max_ejected_fraction)
+        ejected = sum(state.outlier_until > now for state in self.states.values())
+        for state in sorted(live, key=lambda s: s.ewma_s, reverse=True):  # type: ignore[arg-type, return-value]
+            state.outlier = state.ewma_s / median  # type: ignore[operator]
+            if state.outlier_until > now:
+                continue
+            if state.outlier_until:
+                # Back from an ejection: start over from the median instead of the stale EWMA.
+                state.outlier_until, state.ewma_s, state.outlier = 0.0, median, 1.0
+                continue
+            if state.outlier >= self.config.outlier_factor and ejected < allowed:
+                state.outlier_until = now + self.config.outlier_ejection_s
+                ejected += 1
+                self.ejections.append(Ejection(now, state.instance.name, state.instance.az, LATENCY_OUTLIER))
+
+    def _eject(self, state: InstanceState, reason: str, now: float) -> None:
+        state.healthy = False
+        state.good_probes = 0
+        self.ejections.append(Ejection(now, state.instance.name, state.instance.az, reason))
+        self._rebuild()
+
+    def _rebuild(self) -> None:
+        now = self._clock()
+        groups: Dict[str, List[InstanceState]] = {}
+        for state in self.states.values():
+            if state.healthy and state.outlier_until <= now:
+                groups.setdefault(state.instance.az, []).append(state)
+        self._groups = list(groups.values())
+
+    def in_rotation(self) -> List[str]:
+        return [state.instance.name for group in self._groups for state in group]
+
+    # -- routing ---------------------------------------------------------------
+
+    def pick(self, exclude: FrozenSet[str] = frozenset(), avoid_azs: FrozenSet[str] = frozenset()) -> InstanceState:
+        """Power-of-two-choices pick; `avoid_azs` is only honoured while another AZ has instances in rotation."""
+        groups = self._groups
+        if exclude:
+            groups = [kept for kept in ([s for s in group if s.instance.name not in exclude] for group in groups) if kept]
+        if avoid_azs:
+            elsewhere = [group for group in groups if group[0].instance.az not in avoid_azs]
+            groups = elsewhere or groups
+        if not groups:
+            raise NoHealthyInstance(f"No {self.region.aws_region} scoring instance is in rotation")
+        rng = self._rng
+        if len(groups) >= 2:
+            first, second = rng.sample(groups, 2)
+            a, b = rng.choice(first), rng.choice(second)
+        elif len(groups[0]) >= 2:
+            a, b = rng.sample(groups[0], 2)
+        else:
+            return groups[0][0]
+        return a if a.cost() <= b.cost() else b
+
+    async def route(self, call: Callable[[Instance], Awaitable[T]], attempts: int = 2) -> T:
+        """Run `call` against a picked instance, retrying failures on other instances up to `attempts` times."""
+        tried: Set[str] = set()
+        tried_azs: Set[str] = set()
+        error: Optional[BaseException] = None
+        for _ in range(attempts):
+            try:
+                state = self.pick(frozenset(tried), frozenset(tried_azs))
+            except NoHealthyInstance:
+                if error is not None:
+                    raise error
+                raise
+            tried.add(state.instance.name)
+            tried_azs.add(state.instance.az)
+            state.in_flight += 1
+            started = self._clock()
+            try:
+                result = await call(state.instance)
+            except Exception as exc:  # noqa: BLE001 - any failure counts against the instance
+                error = exc
+                self._failed(state)
+                continue
+            finally:
+                state.in_flight -= 1
+            self._succeeded(state, self._clock() - started)
+            return result
+        assert error is not None
+        raise error
+
+    def _succeeded(self, state: InstanceState, latency_s: float) -> None:
+        state.requests += 1
+        state.failed_requests = 0
+        alpha = self.config.ewma_alpha
+        state.ewma_s = latency_s if state.ewma_s is None else state.ewma_s + alpha * (latency_s - state.ewma_s)
+
+    def _failed(self, state: InstanceState) -> None:
+        state.requests += 1
+        state.failures += 1
+        state.failed_requests += 1
+        if state.healthy and state.failed_requests >= self.config.eject_after_failures:
+            self._eject(state, REQUESTS_FAILING, self._clock())
+
+
+# -- stub instances and the AZ failover harness -------------------------------
+
+
+class StubScoringInstance:
+    """
+    Local keep-alive scoring stand-in: `GET /health` and `POST /api/v1/score`.
+
+    Scores after `latency_s`. `healthy = False` makes health checks fail while
+    requests are still served (a draining or broken instance); `kill()` closes
+    the listener and every open connection (the instance or its AZ is gone).
+    """
+
+    def __init__(self, name: str, az: str, region: Type[Region] = CA, latency_s: float = 0.002) -> None:
+        self.name = name
+        self.az = az
+        self.region = region
+        self.latency_s = latency_s
+        self.healthy = True
+        self.host = "127.0.0.1"
+        self.port = 0
+        self.requests = 0
+        self.probes = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._handlers: Dict[asyncio.Task, asyncio.StreamWriter] = {}
+
+    @property
+    def instance(self) -> Instance:
+        return Instance(self.name, self.region, self.az, self.host, self.port)
+
+    @property
+    def alive(self) -> bool:
+        return self._server is not None
+
+    async def start(self) -> "StubScoringInstance":
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def kill(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            for writer in self._handlers.values():
+                writer.transport.abort()
+            await asyncio.gather(*self._handlers, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        assert task is not None
+        self._handlers[task] = writer
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                length, closing = 0, False
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.partition(b":")
+                    name = name.strip().lower()
+                    if name == b"content-length":
+                        length = int(value)
+                    elif name == b"connection":
+                        closing = value.strip().lower() == b"close"
+                await reader.readexactly(length)
+                method, path = request_line.split()[:2]
+                if path == HEALTH_ROUTE.encode():
+                    self.probes += 1
+                    status, body = (200, b'{"status":"ok"}') if self.healthy else (503, b'{"status":"unhealthy"}')
+                elif method == b"POST" and path == SCORE_ROUTE.encode():
+                    self.requests += 1
+                    if self.latency_s:
+                        await asyncio.sleep(self.latency_s)
+                    status, body = 200, b'{"instance":"%s"}' % self.name.encode()
+                else:
+                    status, body = 404, b"{}"
+                writer.write(
+                    b"HTTP/1.1 %d X\r\nContent-Type: application/json\r\nContent-Length: %d\r\nConnection: %s\r\n\r\n"
+                    % (status, len(body), b"close" if closing else b"keep-alive")
+                    + body
+                )
+                await writer.drain()
+                if closing:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+            self._handlers.pop(task, None)
+
+
+@dataclass(frozen=True)
+class FailoverConfig:
+    region: Type[Region] = CA
+    azs: Tuple[str, ...] = ("a", "b", "d")  # suffixes of the region's AWS name
+    instances_per_az: int = 2
+    rate_per_s: float = 300.0
+    duration_s: float = 4.0
+    kill_at_s: float = 1.5
+    kill_az: str = "a"
+    service_latency_s: float = 0.002
+    request_timeout_s: float = 0.5
+    attempts: int = 2
+    router: RouterConfig = RouterConfig(probe_interval_s=0.25, probe_timeout_s=0.1)
+
+
+@dataclass
+class FailoverReport:
+    region: str
+    killed_az: str
+    probe_interval_s: float
+    requests: int = 0
+    failed: int = 0  # no attempt succeeded
+    misrouted: int = 0  # attempts sent to an instance that was already dead
+    retried: int = 0
+    detect_s: Optional[float] = None  # kill -> last killed instance out of rotation
+    p99_s: Optional[float] = None
+    failover_p99_s: Optional[float] = None  # requests started between the kill and detection + one interval
+    served_by_az: Dict[str, int] = field(default_factory=dict)
+    ejections: List[Dict[str, Any]] = field(default_factory=list)
+    detect_slack_s: float = 0.1  # the probe timeout: a hung instance is only ejected once its probe times out
+
+    @property
+    def passed(self) -> bool:
+        """No request failed, the AZ was out within one probe interval and failover p99 stayed within the SLO."""
+        return (
+            self.failed == 0
+            and self.detect_s is not None
+            and self.detect_s <= self.probe_interval_s + self.detect_slack_s
+            and (self.failover_p99_s or 0.0) <= SCORING_P99_TARGET_S
+        )
+
+    def to_json(self) -> Dict[str, Any]:
+        document = asdict(self)
+        document["passed"] = self.passed
+        return document
+
+
+async def run_az_failover(config: FailoverConfig = FailoverConfig()) -> FailoverReport:
+    """Drive open-loop load through a router over stub instances and kill one AZ mid-run."""
+    aws = config.region.aws_region
+    stubs = [
+        StubScoringInstance(f"{aws}{az}-{idx}", f"{aws}{az}", config.region, config.service_latency_s)
+        for az in config.azs
+        for idx in range(config.instances_per_az)
+    ]
+    for stub in stubs:
+        await stub.start()
+    killed_az = f"{aws}{config.kill_az}"
+    report = FailoverReport(
+        config.region.code.decode(),
+        killed_az,
+        config.router.probe_interval_s,
+        detect_slack_s=config.router.probe_timeout_s,
+    )
+    router = Router(config.region, [stub.instance for stub in stubs], config.router)
+    client = ScoringClient(config.request_timeout_s)
+    dead: Set[str] = set()
+    latency = LatencyHistogram()
+    window: List[Tuple[float, float]] = []  # (started, latency) for the failover p99
+    transaction = {"transaction_id": "t", "tier": "standard", "features": [0.0] * len(FEATURE_NAMES)}
+    body = json.dumps({"feature_version": FEATURE_SCHEMA_VERSION, "transactions": [transaction]}).encode()
+    loop = asyncio.get_running_loop()
+
+    async def call(instance: Instance) -> bytes:
+        if instance.name in dead:
+            report.misrouted += 1
+        status, data = await client.post(instance, SCORE_ROUTE, body)
+        if status != 200:
+            raise ConnectionError(f"{instance.name} answered {status}")
+        return data
+
+    async def one() -> None:
+        started = loop.time()
+        attempts = 0
+
+        async def attempt(instance: Instance) -> bytes:
+            nonlocal attempts
+            attempts += 1
+            return await call(instance)
+
+        try:
+            data = await router.route(attempt, config.attempts)
+        except Exception:  # noqa: BLE001 - counted, the harness keeps going
+            report.failed += 1
+            return
+        finally:
+            report.requests += 1
+        elapsed = loop.time() - started
+        latency.record(elapsed)
+        window.append((started, elapsed))
+        az = json.loads(data)["instance"].rsplit("-", 1)[0]
+        report.served_by_az[az] = report.served_by_az.get(az, 0) + 1
+        if attempts > 1:
+            report.retried += 1
+
+    tasks: Set[asyncio.Task] = set()
+    kill_time: Optional[float] = None
+    async with router:
+        begin = loop.time()
+        sent = 0
+        tick_s = 0.005
+        while (now := loop.time()) - begin < config.duration_s:
+            if kill_time is None and now - begin >= config.kill_at_s:
+                kill_time = loop.time()
+                victims = [stub for stub in stubs if stub.az == killed_az]
+                dead.update(stub.name for stub in victims)
+                await asyncio.gather(*(stub.kill() for stub in victims))
+            due = int((now - begin) * config.rate_per_s) - sent
+            for _ in range(due):
+                task = asyncio.create_task(one())
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            sent += max(due, 0)
+            await asyncio.sleep(tick_s)
+        await asyncio.gather(*tasks)
+    client.close()
+    for stub in stubs:
+        await stub.kill()
+
+    if kill_time is not None:
+        out = {e.instance: e.at for e in router.ejections if e.at >= kill_time and e.instance in dead}
+        if len(out) == len(dead):
+            report.detect_s = max(out.values()) - kill_time
+        end = kill_time + (report.detect_s or 0.0) + config.router.probe_interval_s
+        failover = LatencyHistogram()
+        for started, elapsed in window:
+            if kill_time <= started <= end:
+                failover.record(elapsed)
+        report.failover_p99_s = failover.quantile(0.99)
+    report.p99_s = latency.quantile(0.99)
+    report.ejections = [asdict(e) for e in router.ejections]
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Kill one AZ of local scoring stubs under load and report failover.")
+    parser.add_argument("--region", choices=[region.code.decode() for region in REGIONS], default="CA")
+    parser.add_argument("--azs", nargs="+", default=["a", "b", "d"], help="AZ suffixes")
+    parser.add_argument("--per-az", type=int, default=2, help="Scoring instances per AZ")
+    parser.add_argument("--rate", type=float, default=300.0, help="Requests per second")
+    parser.add_argument("--duration", type=float, default=4.0)
+    parser.add_argument("--kill-at", type=float, default=1.5, help="Seconds into the run to kill the first AZ")
+    parser.add_argument("--probe-interval", type=float, default=0.25)
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    region = next(r for r in REGIONS if r.code.decode() == args.region)
+    config = FailoverConfig(
+        region=region,
+        azs=tuple(args.azs),
+        instances_per_az=args.per_az,
+        rate_per_s=args.rate,
+        duration_s=args.duration,
+        kill_at_s=args.kill_at,
+        kill_az=args.azs[0],
+        router=RouterConfig(probe_interval_s=args.probe_interval, probe_timeout_s=min(0.1, args.probe_interval)),
+    )
+    report = asyncio.run(run_az_failover(config))
+    if args.json:
+        print(json.dumps(report.to_json(), indent=2))
+    else:
+        def ms(value: Optional[float]) -> str:
+            return "-" if value is None else f"{value * 1000:.1f} ms"
+
+        print(f"killed {report.killed_az}: {report.requests} requests, {report.failed} failed, "
+              f"{report.misrouted} misrouted, {report.retried} retried")
+        print(f"detected in {ms(report.detect_s)} (probe interval {ms(report.probe_interval_s)}); "
+              f"p99 {ms(report.p99_s)}, p99 during failover {ms(report.failover_p99_s)}")
+        print("served by AZ: " + ", ".join(f"{az}={count}" for az, count in sorted(report.served_by_az.items())))
+    if not report.passed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
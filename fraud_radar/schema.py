@@ -0,0 +1,375 @@
+"""
+Ingest schemas shared by every merchant tier, compiled into batch validators.
+
+Each record shape is declared once as a `Schema` of `Field`s: the score
+request transaction (`SCORE_REQUEST`) and the raw telemetry event
+(`TELEMETRY`, column for column `fraud_radar.events.EVENT_DTYPE`). A field
+may name the tiers it is collected for, so a tier-specific field is
+expressible and visible: `check_tier_parity` compares each schema across
+`TIERS` and reports any field, type or constraint one tier gets and another
+does not (spec/overview.md, "the same telemetry fields for all merchants").
+
+`Schema.compile` turns a schema into a `BatchValidator` that checks a whole
+micro-batch of decoded JSON objects column by column instead of walking
+every field of every record through isinstance checks:
+
+- key sets are compared per distinct key set (usually one per batch), so
+  unknown and missing fields cost one set operation per batch;
+- each column's Python types are collected with one `set(map(type, ...))`
+  and compared with the field's allowed types;
+- lengths, choices and ranges are checked on the whole column, and the
+  column is converted to its numpy dtype in the same pass.
+
+The result is a dict of numpy columns ready for scoring or the event bus.
+Row-level detail is only computed after a check has failed, to name the
+first offending record. CVV and PAN fields are rejected outright with
+`SensitiveFieldError`, before any value is read.
+"""
+from __future__ import annotations
+
+import argparse
+import re
+from itertools import chain
+from dataclasses import dataclass, replace
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from fraud_radar.events import EVENT_DTYPE, new_events
+
+TIERS: Tuple[str, ...] = ("standard", "premium")
+
+STRING = "string"
+INTEGER = "integer"
+NUMBER = "number"
+CHOICE = "choice"
+VECTOR = "vector"
+KINDS = (STRING, INTEGER, NUMBER, CHOICE, VECTOR)
+
+# bool is an int subclass in Python but never a valid number in a record.
+_TYPES: Dict[str, FrozenSet[type]] = {
+    STRING: frozenset({str}),
+    INTEGER: frozenset({int}),
+    NUMBER: frozenset({int, float}),
+    CHOICE: frozenset({str}),
+    VECTOR: frozenset({list}),
+}
+_NUMERIC = frozenset({int, float})
+
+# Field names that carry card verification values or primary account
+# numbers; spec/overview.md forbids collecting either.
+_SENSITIVE = re.compile(
+    r"(?:^|_)(?:cvv2?|cvc2?|cid|csc|security_?code|card_?verification(?:_?value)?|pan|card_?number)(?:$|_)",
+    re.IGNORECASE,
+)
+
+
+class _Absent:
+    """Marks a key the record does not have, as opposed to an explicit null."""
+
+
+_ABSENT = _Absent()
+
+
+class SchemaError(ValueError):
+    """A record does not match its schema."""
+
+
+class SensitiveFieldError(SchemaError):
+    """A record carries a CVV or PAN field, which is never accepted at ingest."""
+
+
+@dataclass(frozen=True)
+class Field:
+    name: str
+    kind: str
+    required: bool = True
+    max_length: Optional[int] = None  # string: characters
+    length: Optional[int] = None  # vector: exact number of values (None = any, but equal within a batch)
+    choices: Tuple[str, ...] = ()  # choice: allowed values, encoded as their index for integer dtypes
+    minimum: Optional[float] = None  # integer / number / vector elements
+    dtype: str = ""  # numpy dtype of the validated column
+    default: Any = None  # value of an optional field the record leaves out
+    tiers: Tuple[str, ...] = TIERS  # tiers this field is collected for
+
+    def __post_init__(self) -> None:
+        if self.kind not in KINDS:
+            raise ValueError(f"Field `{self.name}`: unknown kind `{self.kind}`")
+        if self.kind == CHOICE and not self.choices:
+            raise ValueError(f"Field `{self.name}`: a choice field needs choices")
+        if _SENSITIVE.search(self.name):
+            raise ValueError(f"Field `{self.name}` would collect card verification or account numbers")
+        unknown = set(self.tiers) - set(TIERS)
+        if unknown:
+            raise ValueError(f"Field `{self.name}`: unknown tiers {sorted(unknown)}")
+
+    def constraints(self) -> Tuple[Any, ...]:
+        """Everything about the field except which tiers collect it."""
+        return (self.kind, self.required, self.max_length, self.length, self.choices, self.minimum, self.dtype)
+
+
+@dataclass(frozen=True)
+class Schema:
+    name: str
+    fields: Tuple[Field, ...]
+
+    def __post_init__(self) -> None:
+        names = [field.name for field in self.fields]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Schema `{self.name}` declares a field twice")
+
+    def for_tier(self, tier: str) -> "Schema":
+        if tier not in TIERS:
+            raise ValueError(f"Unknown tier `{tier}`")
+        return replace(self, fields=tuple(field for field in self.fields if tier in field.tiers))
+
+    def compile(self) -> "BatchValidator":
+        return BatchValidator(self)
+
+
+# -- compiled validator -------------------------------------------------------
+
+
+class BatchValidator:
+    """A schema compiled for whole-batch validation; see the module docstring."""
+
+    def __init__(self, schema: Schema) -> None:
+        self.schema = schema
+        self.fields = schema.fields
+        self.allowed: FrozenSet[str] = frozenset(field.name for field in self.fields)
+        self.required: FrozenSet[str] = frozenset(field.name for field in self.fields if field.required)
+        self._types = {
+            field.name: _TYPES[field.kind] | ({type(None), _Absent} if not field.required else set())
+            for field in self.fields
+        }
+        self._codes = {field.name: {value: code for code, value in enumerate(field.choices)} for field in self.fields}
+        self._choices = {field.name: frozenset(field.choices) for field in self.fields}
+        self._checked_keys: Dict[FrozenSet[str], None] = {}
+
+    def validate(self, records: Sequence[Any], path: str = "records") -> Dict[str, np.ndarray]:
+        """Check a batch of decoded JSON objects; return one numpy column per field."""
+        records = _mappings(records, path)
+        columns = {field.name: [record.get(field.name, _ABSENT) for record in records] for field in self.fields}
+        types = {name: set(map(type, column)) for name, column in columns.items()}
+        # Every record holding exactly as many keys as the schema has fields,
+        # none of them absent, means every key set is the schema's own.
+        if set(map(len, records)) != {len(self.fields)} or any(_Absent in found for found in types.values()):
+            for keys in set(map(frozenset, records)):
+                if keys not in self._checked_keys:
+                    self._check_keys(keys, records, path)
+        return {field.name: self._column(field, columns[field.name], types[field.name], path) for field in self.fields}
+
+    def _check_keys(self, keys: FrozenSet[str], records: Sequence[Dict[str, Any]], path: str) -> None:
+        sensitive = sorted(key for key in keys if isinstance(key, str) and _SENSITIVE.search(key))
+        unknown = sorted(map(str, keys - self.allowed))
+        missing = sorted(self.required - keys)
+        if sensitive or unknown or missing:
+            row = next(idx for idx, record in enumerate(records) if frozenset(record) == keys)
+            if sensitive:
+                raise SensitiveFieldError(f"{path}[{row}]: card verification/account number fields are never accepted: "
+                                          f"{', '.join(sensitive)}")
+            if unknown:
+                raise SchemaError(f"{path}[{row}]: unknown fields for `{self.schema.name}`: {', '.join(unknown)}")
+            raise SchemaError(f"{path}[{row}]: missing required fields: {', '.join(missing)}")
+        # Key sets are few and repeat from batch to batch; remember the good ones.
+        if len(self._checked_keys) < 64:
+            self._checked_keys[keys] = None
+
+    def _column(self, field: Field, column: List[Any], types: Set[type], path: str) -> np.ndarray:
+        name = field.name
+        if not types <= self._types[name]:
+            self._fail(field, column, path, lambda value: type(value) not in self._types[name], _expected(field))
+        present = column
+        if type(None) in types or _Absent in types:
+            column = [field.default if value is None or value is _ABSENT else value for value in column]
+            present = [value for value in column if value is not None]
+
+        if field.kind in (STRING, CHOICE):
+            if field.kind == CHOICE and not set(present) <= self._choices[name]:
+                self._fail(field, column, path, lambda value: value not in self._choices[name], _expected(field))
+            if field.max_length is not None and present and max(map(len, present)) > field.max_length:
+                self._fail(field, column, path, lambda value: value is not None and len(value) > field.max_length,
+                           _expected(field))
+            if np.dtype(field.dtype).kind == "u":
+                codes = self._codes[name]
+                return np.fromiter(map(codes.__getitem__, column), dtype=field.dtype, count=len(column))
+            if np.dtype(field.dtype).kind == "S" and not all(map(str.isascii, present)):
+                self._fail(field, column, path, lambda value: value is not None and not value.isascii(),
+                           "an ASCII string")
+            return np.array(column, dtype=field.dtype or object)
+
+        if field.kind == VECTOR:
+            width = field.length if field.length is not None else len(column[0])
+            expected = f"{width} numeric values" if width else "at least one numeric value"
+            if not width or set(map(len, column)) != {width}:
+                self._fail(field, column, path, lambda value: not value or len(value) != width, expected)
+            # One C-level pass over the element types: strings, nulls, nested
+            # lists and booleans (which numpy would silently read as 0/1) all fail.
+            if not set(map(type, chain.from_iterable(column))) <= _NUMERIC:
+                self._fail(field, column, path, lambda value: not set(map(type, value)) <= _NUMERIC, expected)
+            values = np.array(column, dtype=field.dtype or np.float64)
+        else:
+            try:
+                values = np.array(column, dtype=field.dtype or (np.int64 if field.kind == INTEGER else np.float64))
+            except OverflowError:
+                bounds = np.iinfo(field.dtype or np.int64)
+                self._fail(field, column, path, lambda value: not bounds.min <= value <= bounds.max,
+                           f"an integer in [{bounds.min}, {bounds.max}]")
+        if values.dtype.kind == "f" and not np.isfinite(values).all():
+            bad = ~np.isfinite(values.reshape(len(column), -1)).all(axis=1)
+            self._fail_row(field, path, int(np.argmax(bad)), "finite numbers")
+        if field.minimum is not None and values.size and values.min() < field.minimum:
+            bad = (values.reshape(len(column), -1) < field.minimum).any(axis=1)
+            self._fail_row(field, path, int(np.argmax(bad)), f"values >= {field.minimum:g}")
+        return values
+
+    def _fail(self, field: Field, column: List[Any], path: str, bad, expected: str) -> None:
+        row = next((idx for idx, value in enumerate(column) if bad(value)), 0)
+        self._fail_row(field, path, row, expected)
+
+    def _fail_row(self, field: Field, path: str, row: int, expected: str) -> None:
+        raise SchemaError(f"{path}[{row}].{field.name}: expected {expected}")
+
+
+def _expected(field: Field) -> str:
+    if field.kind == CHOICE:
+        return f"one of {', '.join(field.choices)}"
+    if field.kind == STRING:
+        limit = f" of at most {field.max_length} characters" if field.max_length is not None else ""
+        return f"a string{limit}"
+    if field.kind == VECTOR:
+        return f"{field.length} numeric values" if field.length is not None else "a list of numbers"
+    return "an integer" if field.kind == INTEGER else "a number"
+
+
+# -- schemas ------------------------------------------------------------------
+
+# One transaction in a `POST /api/v1/score` request (fraud_radar/api.py).
+SCORE_REQUEST = Schema(
+    "score_request",
+    (
+        Field("transaction_id", STRING, required=False, max_length=64, dtype="O"),
+        Field("merchant_id", STRING, required=False, max_length=16, dtype="O"),
+        Field("tier", CHOICE, choices=TIERS, dtype="O"),
+        Field("features", VECTOR, dtype="f8"),
+    ),
+)
+
+# One raw telemetry event, as ingested onto the region's event stream.
+TELEMETRY = Schema(
+    "telemetry",
+    (
+        Field("event_id", INTEGER, minimum=0, dtype="<u8"),
+        Field("ts_ms", INTEGER, minimum=0, dtype="<i8"),
+        Field("region", CHOICE, choices=("CA", "IN"), dtype="S2"),
+        Field("tier", CHOICE, choices=TIERS, dtype="u1"),
+        Field("currency", STRING, max_length=3, dtype="S3"),
+        Field("amount_minor", INTEGER, minimum=0, dtype="<i8"),
+        Field("merchant_id", STRING, max_length=16, dtype="S16"),
+        Field("card_token", STRING, max_length=24, dtype="S24"),
+        Field("device_hash", STRING, required=False, max_length=16, dtype="S16", default=""),
+    ),
+)
+
+SCHEMAS: Tuple[Schema, ...] = (SCORE_REQUEST, TELEMETRY)
+
+
+class TieredValidator:
+    """
+    Validates batches that mix tiers, each row against its own tier's schema.
+
+    While the tiers' schemas are identical (`check_tier_parity` is clean) the
+    batch is validated in one pass.
+    """
+
+    def __init__(self, schema: Schema) -> None:
+        self.schema = schema
+        tier_field = next((field for field in schema.fields if field.name == "tier"), None)
+        if tier_field is None or tier_field.tiers != TIERS:
+            raise ValueError(f"Schema `{schema.name}` needs a `tier` field collected for every tier")
+        self.validators = {tier: schema.for_tier(tier).compile() for tier in TIERS}
+        self.shared = len({self.validators[tier].schema.fields for tier in TIERS}) == 1
+
+    def validate(self, records: Sequence[Any], path: str = "records") -> Dict[str, np.ndarray]:
+        if self.shared:
+            return self.validators[TIERS[0]].validate(records, path)
+        tiers = np.array([record.get("tier") for record in _mappings(records, path)], dtype=object)
+        unknown = ~np.isin(tiers, TIERS)
+        if unknown.any():
+            raise SchemaError(f"{path}[{int(np.argmax(unknown))}].tier: expected one of {', '.join(TIERS)}")
+        columns: Dict[str, np.ndarray] = {}
+        for tier in TIERS:
+            rows = np.flatnonzero(tiers == tier)
+            if not len(rows):
+                continue
+            part = self.validators[tier].validate([records[row] for row in rows.tolist()], path)
+            for name, values in part.items():
+                if name not in columns:
+                    # Rows of tiers without the field keep zeros (None for object columns).
+                    empty = np.empty if values.dtype.kind == "O" else np.zeros
+                    columns[name] = empty((len(records),) + values.shape[1:], dtype=values.dtype)
+                columns[name][rows] = values
+        return columns
+
+
+def _mappings(records: Sequence[Any], path: str) -> Sequence[Dict[str, Any]]:
+    if not isinstance(records, list) or not records:
+        raise SchemaError(f"Expected `{path}` to be a non-empty list")
+    if set(map(type, records)) != {dict}:
+        row = next(idx for idx, record in enumerate(records) if type(record) is not dict)
+        raise SchemaError(f"{path}[{row}]: each record must be a mapping")
+    return records
+
+
+_TELEMETRY_VALIDATOR = TieredValidator(TELEMETRY)
+
+
+def telemetry_events(records: Sequence[Any], path: str = "events") -> np.ndarray:
+    """Validate decoded telemetry records and return them as `EVENT_DTYPE` rows."""
+    columns = _TELEMETRY_VALIDATOR.validate(records, path)
+    events = new_events(len(records))
+    for name, values in columns.items():
+        events[name] = values
+    return events
+
+
+# -- parity -------------------------------------------------------------------
+
+
+def check_tier_parity(schemas: Sequence[Schema] = SCHEMAS) -> List[str]:
+    """
+    Differences between tiers in what each schema collects; empty when every
+    tier accepts exactly the same fields with the same types and constraints.
+    Also checks that `TELEMETRY` still lays out `EVENT_DTYPE`.
+    """
+    problems: List[str] = []
+    for schema in schemas:
+        per_tier = {tier: {field.name: field for field in schema.for_tier(tier).fields} for tier in TIERS}
+        names = sorted(set().union(*per_tier.values()))
+        for name in names:
+            collected = [tier for tier in TIERS if name in per_tier[tier]]
+            if len(collected) != len(TIERS):
+                problems.append(f"{schema.name}.{name}: collected for {', '.join(collected)} only")
+                continue
+            if len({per_tier[tier][name].constraints() for tier in TIERS}) > 1:
+                problems.append(f"{schema.name}.{name}: type or constraints differ between tiers")
+    for tier in TIERS:
+        layout = np.dtype([(field.name, field.dtype) for field in TELEMETRY.for_tier(tier).fields])
+        if layout != EVENT_DTYPE:
+            problems.append(f"{TELEMETRY.name} for {tier} does not match the event stream layout (EVENT_DTYPE)")
+    return problems
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Check that every merchant tier collects the same fields.")
+    parser.parse_args(argv)
+    problems = check_tier_parity()
+    for schema in SCHEMAS:
+        print(f"{schema.name}: {', '.join(field.name for field in schema.fields)}")
+    if problems:
+        raise SystemExit("Tier schema parity violated:\n  " + "\n  ".join(problems))
+    print(f"Tier parity OK across {', '.join(TIERS)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+"""
+Vectorized fraud scoring for the `/api/v1/score` path.
+
+One shared model scores a whole micro-batch of feature vectors at once, and the
+spec/overview.md threshold ladder is applied in a single vectorized pass:
+
+  score >= 0.8        -> block
+  0.5 <= score < 0.8  -> review
+  score < 0.5         -> approve
+
+Tier is never an input to scoring. Standard and premium merchants go through
+the same `ScoringEngine`, the same model version and the same thresholds.
+
+Feature vectors are versioned (`FEATURE_SCHEMAS`). A new schema only appends
+features, so vectors and models built for an older one are zero-padded to the
+current width (`pad_features`, `FraudModel.padded`): zero is what the appended
+per-merchant anomaly features report for a merchant with no baseline yet, and
+a zero weight leaves an old model's scores unchanged.
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+FEATURE_NAMES: Tuple[str, ...] = (
+    "amount_log",
+    "amount_zscore",
+    "card_txn_count_1h",
+    "card_distinct_merchants_24h",
+    "device_txn_count_1h",
+    "merchant_risk",
+    "currency_mismatch",
+    "night_hour",
+    "merchant_amount_zscore",
+    "merchant_velocity_zscore",
+    "merchant_amount_tail",
+)
+
+# Feature schema version -> names. 1: the original eight; 2: + fraud_radar/anomaly.py.
+FEATURE_SCHEMAS: Dict[int, Tuple[str, ...]] = {1: FEATURE_NAMES[:8], 2: FEATURE_NAMES}
+FEATURE_SCHEMA_VERSION = 2
+
+REVIEW_THRESHOLD = 0.5
+BLOCK_THRESHOLD = 0.8
+
+APPROVE, REVIEW, BLOCK = 0, 1, 2
+DECISION_LABELS: Tuple[str, ...] = ("approve", "review", "block")
+
+_THRESHOLDS = np.array([REVIEW_THRESHOLD, BLOCK_THRESHOLD], dtype=np.float64)
+
+# Baseline logistic weights, one per entry in FEATURE_NAMES.
+_DEFAULT_WEIGHTS = (0.35, 0.9, 0.6, 0.8, 0.5, 1.2, 0.7, 0.4, 0.3, 0.3, 0.5)
+_DEFAULT_BIAS = -3.0
+
+
+def apply_thresholds(scores: np.ndarray) -> np.ndarray:
+    """Map fraud scores to decision codes (APPROVE/REVIEW/BLOCK) in one pass."""
+    return np.searchsorted(_THRESHOLDS, scores, side="right").astype(np.int8)
+
+
+def feature_schema_version(n_features: int) -> Optional[int]:
+    """The schema whose vectors are `n_features` wide, or None."""
+    for version, names in FEATURE_SCHEMAS.items():
+        if len(names) == n_features:
+            return version
+    return None
+
+
+def pad_features(features: np.ndarray, n_features: int) -> np.ndarray:
+    """Zero-pad an older schema's (batch, k) matrix to `n_features` columns."""
+    matrix = np.atleast_2d(np.asarray(features, dtype=np.float64))
+    if matrix.shape[1] == n_features:
+        return matrix
+    if matrix.shape[1] > n_features:
+        raise ValueError(f"Cannot narrow {matrix.shape[1]} features to {n_features}")
+    padded = np.zeros((matrix.shape[0], n_features), dtype=np.float64)
+    padded[:, : matrix.shape[1]] = matrix
+    return padded
+
+
+def model_digest(weights: np.ndarray, bias: float) -> str:
+    """sha256 over the float64 weights and bias; a model's version is its first 12 hex digits."""
+    digest = hashlib.sha256(np.ascontiguousarray(weights, dtype=np.float64).data)
+    digest.update(np.float64(bias).tobytes())
+    return digest.hexdigest()
+
+
+@dataclass(frozen=True, eq=False)
+class FraudModel:
+    """
+    Logistic fraud model shared by every merchant tier.
+
+    `version` is derived from the weights. Pass it only when it has already
+    been verified (`fraud_radar.registry` checks it at publish time), so
+    memory-mapped weights are not read end to end just to name them.
+    """
+
+    weights: np.ndarray
+    bias: float
+    version: str = ""
+
+    def __post_init__(self) -> None:
+        weights = np.ascontiguousarray(self.weights, dtype=np.float64)
+        weights.setflags(write=False)
+        object.__setattr__(self, "weights", weights)
+        if not self.version:
+            object.__setattr__(self, "version", model_digest(weights, self.bias)[:12])
+
+    @classmethod
+    def default(cls) -> "FraudModel":
+        return cls(np.array(_DEFAULT_WEIGHTS), _DEFAULT_BIAS)
+
+    @property
+    def n_features(self) -> int:
+        return int(self.weights.shape[0])
+
+    def padded(self, n_features: int) -> "FraudModel":
+        """This model with zero weights for the features a newer schema appends; same scores, same version."""
+        if n_features == self.n_features:
+            return self
+        return FraudModel(pad_features(self.weights, n_features)[0], self.bias, version=self.version)
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        """Return fraud probabilities for a (batch, n_features) matrix."""
+        logits = features @ self.weights
+        logits += self.bias
+        np.negative(logits, out=logits)
+        np.exp(logits, out=logits)
+        logits += 1.0
+        return np.reciprocal(logits, out=logits)
+
+
+@dataclass
+class ScoredBatch:
+    scores: np.ndarray
+    decisions: np.ndarray
+    model_version: str
+
+    def __len__(self) -> int:
+        return int(self.scores.shape[0])
+
+    def labels(self) -> List[str]:
+        return [DECISION_LABELS[code] for code in self.decisions.tolist()]
+
+    def slice(self, start: int, stop: int) -> "ScoredBatch":
+        return ScoredBatch(self.scores[start:stop], self.decisions[start:stop], self.model_version)
+
+
+class ScoringEngine:
+    """Scores micro-batches of transactions with a single shared model."""
+
+    def __init__(self, model: Optional[FraudModel] = None) -> None:
+        self.model = model or FraudModel.default()
+
+    @property
+    def model_version(self) -> str:
+        return self.model.version
+
+    def swap(self, model: FraudModel) -> FraudModel:
+        """
+        Replace the model for every later batch and return the old one. A batch
+        already scoring keeps the model it started with, so nothing in flight
+        is dropped or scored by a mix of versions. A model trained on an
+        older feature schema is padded to this engine's width.
+        """
+        width = self.model.n_features
+        if model.n_features != width:
+            schemas = (feature_schema_version(model.n_features), feature_schema_version(width))
+            if None in schemas or model.n_features > width:
+                raise ValueError(f"Model {model.version} takes {model.n_features} features, not {width}")
+            model = model.padded(width)
+        previous, self.model = self.model, model
+        return previous
+
+    def score_batch(self, features: np.ndarray) -> ScoredBatch:
+        model = self.model  # one model per batch, even across a swap
+        matrix = np.asarray(features, dtype=np.float64)
+        if matrix.ndim == 1:
+            matrix = matrix.reshape(1, -1)
+        if matrix.ndim != 2 or matrix.shape[1] != model.n_features:
+            raise ValueError(
+                f"Expected features shaped (batch, {model.n_features}), got {matrix.shape}"
+            )
+        scores = model.predict(matrix)
+        return ScoredBatch(scores, apply_thresholds(scores), model.version)
+
+
+@dataclass
+class _Pending:
+    features: np.ndarray
+    done: threading.Event = field(default_factory=threading.Event)
+    result: Optional[ScoredBatch] = None
+    error: Optional[BaseException] = None
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent scoring requests into one model call.
+
+    The first caller to arrive on an empty batch becomes the leader: it waits up
+    to `max_wait_s` (or until `max_batch` rows are queued), scores everything
+    that arrived in the meantime and hands each caller its own slice back.
+
+    `on_latency`, if given, receives each caller's submit-to-result latency in
+    seconds (e.g. `PremiumGuard.record_scoring`).
+    """
+
+    def __init__(
+        self,
+        engine: ScoringEngine,
+        max_batch: int = 512,
+        max_wait_s: float = 0.002,
+        on_latency: Optional[Callable[[float], None]] = None,
+    ) -> None:
+        if max_batch < 1:
+            raise ValueError("max_batch must be at least 1")
+        self.engine = engine
+        self.max_batch = max_batch
+        self.max_wait_s = max_wait_s
+        self.on_latency = on_latency
+        self._lock = threading.Lock()
+        self._full = threading.Condition(self._lock)
+        self._pending: List[_Pending] = []
+        self._pending_rows = 0
+
+    def submit(self, features: np.ndarray) -> ScoredBatch:
+        started = time.perf_counter()
+        item = _Pending(np.atleast_2d(np.asarray(features, dtype=np.float64)))
+        if item.features.ndim != 2 or item.features.shape[1] != self.engine.model.n_features:
+            raise ValueError(
+                f"Expected features shaped (batch, {self.engine.model.n_features}), got {item.features.shape}"
+            )
+        with self._lock:
+            self._pending.append(item)
+            self._pending_rows += item.features.shape[0]
+            leader = len(self._pending) == 1
+            if not leader and self._pending_rows >= self.max_batch:
+                self._full.notify()
+
+        if leader:
+            with self._lock:
+                self._full.wait_for(lambda: self._pending_rows >= self.max_batch, timeout=self.max_wait_s)
+                batch, self._pending, self._pending_rows = self._pending, [], 0
+            self._run(batch)
+
+        item.done.wait()
+        if item.error is not None:
+            raise item.error
+        assert item.result is not None
+        if self.on_latency is not None:
+            self.on_latency(time.perf_counter() - started)
+        return item.result
+
+    def _run(self, batch: List[_Pending]) -> None:
+        try:
+            scored = self.engine.score_batch(np.concatenate([item.features for item in batch]))
+        except BaseException as exc:  # propagate to every waiting caller
+            for item in batch:
+                item.error = exc
+                item.done.set()
+            return
+        offset = 0
+        for item in batch:
+            rows = item.features.shape[0]
+            item.result = scored.slice(offset, offset + rows)
+            offset += rows
+            item.done.set()
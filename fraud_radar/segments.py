@@ -0,0 +1,413 @@
+"""
+Columnar, append-only segment files for region-tagged raw fraud telemetry.
+
+Raw telemetry (token, merchant, amount, currency, device hash, features,
+score) lands in the same region/day partitions the retention engine expires:
+
+    <raw root>/region=CA/date=2025-11-17/seg-000000.frseg
+
+A segment is an immutable file written once through a temp file and rename:
+
+    preamble   magic, format version, region tag, header length, row count
+    header     JSON: column and dictionary offsets/dtypes, min/max stats and a
+               sparse time index (ts_ms of every `INDEX_EVERY`-th row)
+    data       fixed-width little-endian arrays, each 64-byte aligned
+
+- The region lives in the preamble, not in every row, and the writer refuses
+  records tagged for any other region (`ResidencyViolation`), so residency
+  audits check a segment by reading its first bytes.
+- Merchant ids and currencies are dictionary-encoded per segment: integer
+  codes per row plus a sorted fixed-width dictionary block, so the header stays
+  a few hundred bytes whatever the merchant count.
+- Rows are sorted by `ts_ms` before writing. Readers skip segments from the
+  header's time range alone, and find a time slice inside one from the sparse
+  index plus a search of the few rows it leaves.
+- Readers `np.memmap` the file and view columns in place: only the columns
+  (and pages) a scan touches are read.
+
+Segments are append-only per directory with one writer; `SegmentLog` buffers
+rows per region and day and cuts a segment every `rows_per_segment` rows or
+on `flush`.
+
+Usage:
+  python -m fraud_radar.segments inspect logs/raw/region=CA/date=2025-11-17/*.frseg
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import struct
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Type
+
+import numpy as np
+
+from fraud_radar.events import EVENT_DTYPE, Region, ResidencyViolation
+from fraud_radar.scoring import FEATURE_NAMES
+
+SEGMENT_SUFFIX = ".frseg"
+SEGMENT_MAGIC = b"FRSEG\x00\x00\x01"
+# 2: `features` widened to the version-2 feature schema. Version 1 segments are
+# still read; their narrower `features` are zero-padded (fraud_radar/scoring.py).
+SEGMENT_VERSION = 2
+READABLE_VERSIONS = (1, 2)
+# magic, region tag, format version, header bytes, rows
+PREAMBLE = struct.Struct("<8s2sHIQ")
+ALIGN = 64
+INDEX_EVERY = 4096
+DEFAULT_SEGMENT_ROWS = 1 << 16
+MS_PER_DAY = 86_400_000
+
+UNLABELLED, LEGIT, FRAUD = 0, 1, 2
+LABELS = ("", "legit", "fraud")
+
+TELEMETRY_DTYPE = np.dtype(
+    [
+        ("event_id", "<u8"),
+        ("ts_ms", "<i8"),
+        ("region", "S2"),
+        ("currency", "S3"),
+        ("amount_minor", "<i8"),
+        ("merchant_id", "S16"),
+        ("card_token", "S24"),
+        ("device_hash", "S16"),
+        # float64: decisions and score bins compare against thresholds, and a
+        # float32 score can land on the other side of one.
+        ("score", "<f8"),
+        ("latency_ms", "<f4"),
+        ("label", "u1"),  # UNLABELLED, LEGIT or FRAUD
+        ("features", "<f4", (len(FEATURE_NAMES),)),
+    ]
+)
+
+# Column name -> on-disk dtype. Dictionary columns are stored as codes.
+DICTIONARY_COLUMNS: Dict[str, str] = {"merchant_id": "<u4", "currency": "<u2"}
+STATS_COLUMNS = ("event_id", "ts_ms", "amount_minor", "score", "latency_ms")
+
+
+class SegmentFormatError(ValueError):
+    """A file is not a readable segment (bad magic, version or layout)."""
+
+
+def new_telemetry(count: int) -> np.ndarray:
+    return np.zeros(count, dtype=TELEMETRY_DTYPE)
+
+
+def telemetry_from_events(events: np.ndarray) -> np.ndarray:
+    """Telemetry rows carrying the event fields; score, features and label are left zero."""
+    if events.dtype != EVENT_DTYPE:
+        raise ValueError("Expected EVENT_DTYPE records")
+    telemetry = new_telemetry(len(events))
+    for name in TELEMETRY_DTYPE.names:
+        if name in EVENT_DTYPE.names:
+            telemetry[name] = events[name]
+    return telemetry
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGN) * ALIGN
+
+
+# -- writing ------------------------------------------------------------------
+
+
+def write_segment(path: Path, region: Type[Region], records: np.ndarray) -> "SegmentHeader":
+    """Write `records` (all tagged `region`) as one segment at `path`."""
+    if records.dtype != TELEMETRY_DTYPE or records.ndim != 1:
+        raise ValueError("write_segment expects a 1-d array of TELEMETRY_DTYPE records")
+    if not len(records):
+        raise ValueError("Refusing to write an empty segment")
+    if not (records["region"] == region.code).all():
+        raise ResidencyViolation(f"{region.aws_region} segment cannot hold records tagged for another region")
+
+    records = records[np.argsort(records["ts_ms"], kind="stable")]
+    arrays: Dict[str, np.ndarray] = {}
+    dictionaries: Dict[str, np.ndarray] = {}
+    for name in TELEMETRY_DTYPE.names:
+        if name == "region":
+            continue
+        column = records[name]
+        if name in DICTIONARY_COLUMNS:
+            dictionaries[name], codes = np.unique(column, return_inverse=True)
+            column = codes.astype(DICTIONARY_COLUMNS[name])
+        arrays[name] = np.ascontiguousarray(column)
+
+    blocks: List[np.ndarray] = []
+    offset = 0
+
+    def place(array: np.ndarray) -> dict:
+        nonlocal offset
+        spec = {"dtype": array.dtype.str, "shape": list(array.shape[1:]), "offset": offset}
+        blocks.append(array)
+        offset = _align(offset + array.nbytes)
+        return spec
+
+    columns = {name: place(array) for name, array in arrays.items()}
+    dictionary_specs = {name: dict(place(values), entries=len(values)) for name, values in dictionaries.items()}
+    ts = arrays["ts_ms"]
+    document = {
+        "columns": columns,
+        "dictionaries": dictionary_specs,
+        "stats": {name: [arrays[name].min().item(), arrays[name].max().item()] for name in STATS_COLUMNS},
+        "index_every": INDEX_EVERY,
+        "time_index": ts[::INDEX_EVERY].tolist(),
+    }
+    header = json.dumps(document, sort_keys=True).encode("utf-8")
+    data_offset = _align(PREAMBLE.size + len(header))
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("wb") as handle:
+        handle.write(PREAMBLE.pack(SEGMENT_MAGIC, region.code, SEGMENT_VERSION, len(header), len(records)))
+        handle.write(header)
+        for block in blocks:
+            handle.write(b"\0" * (_align(handle.tell()) - handle.tell()))
+            handle.write(block.tobytes())
+        handle.truncate(data_offset + offset)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(tmp, path)
+    return SegmentHeader.from_document(region.code.decode("ascii"), len(records), data_offset, document)
+
+
+class SegmentLog:
+    """Buffers telemetry per region and day and writes it out as segments."""
+
+    def __init__(self, raw_root: Path, rows_per_segment: int = DEFAULT_SEGMENT_ROWS) -> None:
+        if rows_per_segment < 1:
+            raise ValueError("rows_per_segment must be at least 1")
+        self.raw_root = Path(raw_root)
+        self.rows_per_segment = rows_per_segment
+        self._pending: Dict[Tuple[Type[Region], int], List[np.ndarray]] = {}
+        self._pending_rows: Dict[Tuple[Type[Region], int], int] = {}
+        self._next_index: Dict[Path, int] = {}
+        self._lock = threading.Lock()
+
+    def partition_dir(self, region: Type[Region], day: int) -> Path:
+        iso = np.datetime64(day, "D").astype(str)
+        return self.raw_root / f"region={region.code.decode('ascii')}" / f"date={iso}"
+
+    def append(self, region: Type[Region], records: np.ndarray) -> List[Path]:
+        """Buffer `region`'s records; returns any segments this cut."""
+        if records.dtype != TELEMETRY_DTYPE or records.ndim != 1:
+            raise ValueError("SegmentLog expects a 1-d array of TELEMETRY_DTYPE records")
+        if len(records) and not (records["region"] == region.code).all():
+            raise ResidencyViolation(f"{region.aws_region} telemetry contains records tagged for another region")
+        days = records["ts_ms"] // MS_PER_DAY
+        written: List[Path] = []
+        with self._lock:
+            for day in np.unique(days).tolist():
+                key = (region, day)
+                part = records[days == day]
+                self._pending.setdefault(key, []).append(part.copy())
+                self._pending_rows[key] = self._pending_rows.get(key, 0) + len(part)
+                while self._pending_rows[key] >= self.rows_per_segment:
+                    written.append(self._cut(key, self.rows_per_segment))
+        return written
+
+    def flush(self) -> List[Path]:
+        """Write every buffered row out, one segment per region and day."""
+        with self._lock:
+            return [self._cut(key, self._pending_rows[key]) for key in list(self._pending) if self._pending_rows[key]]
+
+    def _cut(self, key: Tuple[Type[Region], int], rows: int) -> Path:
+        buffered = np.concatenate(self._pending[key])
+        segment, rest = buffered[:rows], buffered[rows:]
+        self._pending[key] = [rest] if len(rest) else []
+        self._pending_rows[key] = len(rest)
+        region, day = key
+        directory = self.partition_dir(region, day)
+        if directory not in self._next_index:
+            taken = [int(path.stem[len("seg-") :]) for path in directory.glob(f"seg-*{SEGMENT_SUFFIX}")]
+            self._next_index[directory] = max(taken, default=-1) + 1
+        path = directory / f"seg-{self._next_index[directory]:06d}{SEGMENT_SUFFIX}"
+        self._next_index[directory] += 1
+        write_segment(path, region, segment)
+        return path
+
+
+# -- reading ------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class SegmentHeader:
+    region: str
+    rows: int
+    data_offset: int
+    columns: Dict[str, Tuple[np.dtype, Tuple[int, ...], int]]
+    dictionaries: Dict[str, Tuple[np.dtype, int, int]]  # value dtype, entries, offset
+    stats: Dict[str, Tuple[float, float]]
+    index_every: int
+    time_index: Tuple[int, ...]
+
+    @classmethod
+    def from_document(cls, region: str, rows: int, data_offset: int, document: dict) -> "SegmentHeader":
+        return cls(
+            region=region,
+            rows=rows,
+            data_offset=data_offset,
+            columns={
+                name: (np.dtype(spec["dtype"]), tuple(spec["shape"]), spec["offset"])
+                for name, spec in document["columns"].items()
+            },
+            dictionaries={
+                name: (np.dtype(spec["dtype"]), spec["entries"], spec["offset"])
+                for name, spec in document["dictionaries"].items()
+            },
+            stats={name: (low, high) for name, (low, high) in document["stats"].items()},
+            index_every=document["index_every"],
+            time_index=tuple(document["time_index"]),
+        )
+
+    @property
+    def ts_range(self) -> Tuple[int, int]:
+        low, high = self.stats["ts_ms"]
+        return int(low), int(high)
+
+    def overlaps(self, start_ms: Optional[int], end_ms: Optional[int]) -> bool:
+        """True if any row may fall in [start_ms, end_ms); None leaves that side open."""
+        low, high = self.ts_range
+        return (start_ms is None or high >= start_ms) and (end_ms is None or low < end_ms)
+
+
+def read_header(path: Path) -> SegmentHeader:
+    """Preamble and header only: no column data is read."""
+    with Path(path).open("rb") as handle:
+        preamble = handle.read(PREAMBLE.size)
+        if len(preamble) < PREAMBLE.size:
+            raise SegmentFormatError(f"{path} is too short to be a segment")
+        magic, region, version, header_bytes, rows = PREAMBLE.unpack(preamble)
+        if magic != SEGMENT_MAGIC:
+            raise SegmentFormatError(f"{path} is not a segment file")
+        if version not in READABLE_VERSIONS:
+            raise SegmentFormatError(f"{path} has unsupported segment version {version}")
+        try:
+            document = json.loads(handle.read(header_bytes))
+        except ValueError as exc:
+            raise SegmentFormatError(f"{path} has a corrupt header: {exc}") from None
+    return SegmentHeader.from_document(
+        region.decode("ascii"), rows, _align(PREAMBLE.size + header_bytes), document
+    )
+
+
+class Segment:
+    """Read-only view of one segment; columns are mapped on first access."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.header = read_header(self.path)
+        self._raw: Optional[np.memmap] = None
+
+    @property
+    def region(self) -> str:
+        return self.header.region
+
+    @property
+    def rows(self) -> int:
+        return self.header.rows
+
+    def _view(self, dtype: np.dtype, shape: Tuple[int, ...], offset: int, what: str) -> np.ndarray:
+        if self._raw is None:
+            self._raw = np.memmap(self.path, dtype=np.uint8, mode="r")
+        start = self.header.data_offset + offset
+        count = dtype.itemsize * int(np.prod(shape, dtype=np.int64))
+        if start + count > len(self._raw):
+            raise SegmentFormatError(f"{self.path} is truncated in {what}")
+        return self._raw[start : start + count].view(dtype).reshape(shape)
+
+    def codes(self, name: str) -> np.ndarray:
+        """Stored column as a read-only view of the mapped file (codes for dictionary columns)."""
+        try:
+            dtype, shape, offset = self.header.columns[name]
+        except KeyError:
+            raise KeyError(f"Segment has no column `{name}`") from None
+        return self._view(dtype, (self.rows,) + shape, offset, f"column `{name}`")
+
+    def dictionary(self, name: str) -> np.ndarray:
+        """Sorted distinct values of a dictionary-encoded column."""
+        dtype, entries, offset = self.header.dictionaries[name]
+        return self._view(dtype, (entries,), offset, f"the `{name}` dictionary")
+
+    def column(self, name: str, rows: slice = slice(None)) -> np.ndarray:
+        """Column values for `rows`, with dictionary columns decoded."""
+        values = self.codes(name)[rows]
+        if name in self.header.dictionaries:
+            return self.dictionary(name)[values]
+        return values
+
+    def rows_between(self, start_ms: Optional[int], end_ms: Optional[int]) -> slice:
+        """Rows with start_ms <= ts_ms < end_ms, found from the sparse index and a bounded search."""
+        if not self.header.overlaps(start_ms, end_ms):
+            return slice(0, 0)
+        index = np.asarray(self.header.time_index, dtype=np.int64)
+        step = self.header.index_every
+        low = 0 if start_ms is None else max(int(np.searchsorted(index, start_ms, "left")) - 1, 0) * step
+        high = self.rows if end_ms is None else min(int(np.searchsorted(index, end_ms, "left")) * step, self.rows)
+        ts = self.codes("ts_ms")[low:high]
+        first = 0 if start_ms is None else int(np.searchsorted(ts, start_ms, "left"))
+        last = len(ts) if end_ms is None else int(np.searchsorted(ts, end_ms, "left"))
+        return slice(low + first, low + last)
+
+    def read(self, columns: Optional[Sequence[str]] = None, rows: slice = slice(None)) -> np.ndarray:
+        """Decode `rows` of `columns` (default all) back into TELEMETRY_DTYPE records."""
+        names = list(self.header.columns) if columns is None else list(columns)
+        records = new_telemetry(len(range(*rows.indices(self.rows))))
+        records["region"] = self.region.encode("ascii")
+        for name in names:
+            values = self.column(name, rows)
+            if name == "features" and values.shape[1:] != records[name].shape[1:]:
+                records[name][:, : values.shape[1]] = values  # an older feature schema; the rest stay zero
+            else:
+                records[name] = values
+        return records
+
+
+def find_segments(raw_root: Path, region: Optional[str] = None) -> List[Path]:
+    """Every segment under `raw_root` (optionally one region's), in path order."""
+    pattern = f"region={region or '*'}/date=*/*{SEGMENT_SUFFIX}"
+    return sorted(Path(raw_root).glob(pattern))
+
+
+def scan(
+    raw_root: Path,
+    region: Optional[str] = None,
+    start_ms: Optional[int] = None,
+    end_ms: Optional[int] = None,
+    columns: Sequence[str] = ("ts_ms", "score"),
+) -> Iterator[np.ndarray]:
+    """Yield records in [start_ms, end_ms) segment by segment, skipping segments by header."""
+    for path in find_segments(raw_root, region):
+        header = read_header(path)
+        if not header.overlaps(start_ms, end_ms):
+            continue
+        segment = Segment(path)
+        rows = segment.rows_between(start_ms, end_ms)
+        if rows.stop > rows.start:
+            yield segment.read(columns, rows)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Inspect columnar telemetry segments.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    inspect = commands.add_parser("inspect", help="Print segment headers without reading column data")
+    inspect.add_argument("paths", nargs="+", type=Path)
+    args = parser.parse_args(argv)
+
+    for path in args.paths:
+        try:
+            header = read_header(path)
+        except (OSError, SegmentFormatError) as exc:
+            raise SystemExit(str(exc))
+        low, high = header.ts_range
+        merchants = header.dictionaries["merchant_id"][1] if "merchant_id" in header.dictionaries else 0
+        print(
+            f"{path}: region {header.region}, {header.rows} rows, {merchants} merchants, "
+            f"ts {np.datetime64(low, 'ms')} .. {np.datetime64(high, 'ms')}, {path.stat().st_size} bytes"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,455 @@
+"""
+Ingress tokenization of card data, one micro-batch at a time.
+
+The architecture tokenizes card data at ingress (spec/overview.md, Promise 2):
+only a tokenized card identifier and a device fingerprint hash enter the
+pipeline, and PAN/CVV never reach a log or a store. This is the first hop of
+every transaction, so it is inside the 120 ms ingestion p95.
+
+- Raw card data for a batch arrives as one `CardBatch`, a single `bytearray`
+  arena holding the PAN digits (and any CVVs) back to back. `tokenize` wipes
+  the arena as soon as the tokens are derived, on error as well, so the raw
+  values are zeroed after one use and never copied into Python strings.
+  `repr()` of a batch shows only counts.
+- Tokens are keyed BLAKE2b MACs. Each `Tokenizer` belongs to one region and
+  holds that region's card and device keys, and `IngressTokenizers` refuses
+  to give two regions the same key, so a CA token can never be reproduced or
+  linked in IN. Keying BLAKE2b is done once per tokenizer; each value is
+  hashed on a `copy()` of the keyed state, which skips the key setup that
+  per-request HMAC pays every time.
+- Digests are encoded with the letters a-p (one per nibble) as whole numpy
+  arrays. Tokens contain no digits, so a token can never look like a PAN to
+  the log redactor (fraud_radar.redaction) or the feature store.
+  `card_token` is `tok_` plus 20 letters (80 bits), which fills `S24`.
+  `device_hash` is 16 letters (64 bits), which fills `S16`.
+- Batches of at most `SCALAR_BATCH_MAX` cards (single-request ingress) skip
+  numpy: the PAN check sums the digits through lookup tables straight from
+  the arena, and digests are encoded with `bytes.translate`, because numpy's
+  fixed per-call cost would otherwise dominate. Both paths produce the same tokens.
+- A bounded LRU maps token -> `TokenMetadata` (card brand, PAN length, first
+  and last seen, uses) for repeat cards. It is keyed by the token and stores
+  nothing from which the PAN could be recovered.
+
+`held_bytes` and `find_card_data` are the hooks the PAN red-bar test uses to
+check that nothing raw survives a batch.
+"""
+from __future__ import annotations
+
+import hashlib
+import itertools
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Type, Union
+
+import numpy as np
+
+from fraud_radar.events import REGIONS, Region, ResidencyViolation
+from fraud_radar.redaction import RedactionStats, redact_bytes
+
+TOKEN_PREFIX = b"tok_"
+CARD_TOKEN_BYTES = 10  # 20 letters; with the prefix exactly EVENT_DTYPE's S24
+DEVICE_HASH_BYTES = 8  # 16 letters, EVENT_DTYPE's S16
+MIN_KEY_BYTES = 16
+DEFAULT_CACHE_SIZE = 100_000
+
+PAN_MIN_DIGITS = 12
+PAN_MAX_DIGITS = 19
+
+# Nibble -> letter; no digit ever appears in a token.
+_LETTERS = np.frombuffer(b"abcdefghijklmnop", dtype=np.uint8)
+_SEPARATORS = b" -"
+_LUHN_DOUBLED = np.array([0, 2, 4, 6, 8, 1, 3, 5, 7, 9], dtype=np.int16)
+# ASCII code -> digit value, plain and Luhn-doubled. Any other byte maps to
+# _NOT_A_DIGIT, which no sum of 19 real digits reaches.
+_NOT_A_DIGIT = 1000
+_ASCII_DIGIT = tuple(code - 48 if 48 <= code <= 57 else _NOT_A_DIGIT for code in range(256))
+_ASCII_DOUBLED = tuple(_LUHN_DOUBLED[code - 48].item() if 48 <= code <= 57 else _NOT_A_DIGIT for code in range(256))
+# Hex digit -> the same letter _LETTERS gives its nibble.
+_HEX_TO_LETTERS = bytes.maketrans(b"0123456789abcdef", b"abcdefghijklmnop")
+
+# Up to this many values, checking and encoding them one by one beats numpy's per-call overhead.
+SCALAR_BATCH_MAX = 16
+
+# Issuer identification prefixes for the metadata's card brand.
+_BRANDS = (
+    ("amex", ("34", "37")),
+    ("visa", ("4",)),
+    ("mastercard", ("51", "52", "53", "54", "55", "22", "23", "24", "25", "26", "27")),
+    ("rupay", ("60", "65", "81", "82", "508")),
+    ("discover", ("6011", "644", "645", "646", "647", "648", "649")),
+    ("jcb", ("35",)),
+)
+BRAND_NAMES = ("other",) + tuple(brand for brand, _ in _BRANDS)
+
+
+def _brand_table() -> np.ndarray:
+    """First four PAN digits -> brand code (index into BRAND_NAMES); longer prefixes win."""
+    table = np.zeros(10_000, dtype=np.int8)
+    entries = [(prefix, code) for code, (_, prefixes) in enumerate(_BRANDS, start=1) for prefix in prefixes]
+    for prefix, code in sorted(entries, key=lambda entry: len(entry[0])):
+        span = 10 ** (4 - len(prefix))
+        table[int(prefix) * span : (int(prefix) + 1) * span] = code
+    return table
+
+
+_BRAND_BY_FIRST4 = _brand_table()
+
+
+@dataclass(frozen=True)
+class TokenKeys:
+    card: bytes
+    device: bytes
+
+    def __post_init__(self) -> None:
+        if len(self.card) < MIN_KEY_BYTES or len(self.device) < MIN_KEY_BYTES:
+            raise ValueError(f"Tokenization keys must be at least {MIN_KEY_BYTES} bytes")
+        if len(self.card) > 64 or len(self.device) > 64:
+            raise ValueError("Tokenization keys must be at most 64 bytes (BLAKE2b key size)")
+
+    @classmethod
+    def generate(cls) -> "TokenKeys":
+        return cls(secrets.token_bytes(32), secrets.token_bytes(32))
+
+    def __repr__(self) -> str:
+        return "TokenKeys(<redacted>)"
+
+
+@dataclass
+class TokenMetadata:
+    brand: str
+    pan_length: int
+    first_seen_ms: int
+    last_seen_ms: int
+    uses: int = 1
+
+
+def _pack_chars(view: memoryview, position: int, value: Union[str, bytes], strip: bool) -> int:
+    """Write `value` one character at a time (str, or bytes with separators to drop); returns the next position."""
+    text = isinstance(value, str)
+    for char in value:
+        code = ord(char) if text else char
+        if strip and code in _SEPARATORS:
+            continue
+        if text and code > 127:
+            raise ValueError("Card data must be ASCII")
+        view[position] = code
+        position += 1
+    return position
+
+
+class CardBatch:
+    """One micro-batch of raw card data in a single wipeable arena (PAN digits, then CVVs)."""
+
+    __slots__ = ("_arena", "_pan_offsets", "_cvv_offsets", "wiped")
+
+    def __init__(self, arena: bytearray, pan_offsets: np.ndarray, cvv_offsets: Optional[np.ndarray] = None) -> None:
+        if not isinstance(arena, bytearray):
+            raise TypeError("Raw card data must be held in a bytearray so it can be wiped")
+        self._arena = arena
+        self._pan_offsets = np.asarray(pan_offsets, dtype=np.int64)
+        self._cvv_offsets = None if cvv_offsets is None else np.asarray(cvv_offsets, dtype=np.int64)
+        self.wiped = False
+
+    @classmethod
+    def from_values(
+        cls, pans: Sequence[Union[str, bytes]], cvvs: Optional[Sequence[Union[str, bytes]]] = None
+    ) -> "CardBatch":
+        """
+        Write decoded values straight into a preallocated arena, PAN separators
+        skipped, with no intermediate encoded or stripped copies. The caller's
+        `pans` and `cvvs` are then the only other copy of the raw values: drop
+        them as soon as this returns.
+        """
+        if cvvs is not None and len(cvvs) != len(pans):
+            raise ValueError("pans and cvvs differ in length")
+        # Sized for the values as given; dropped separators leave zero slack at the end.
+        arena = bytearray(sum(map(len, pans)) + (0 if cvvs is None else sum(map(len, cvvs))))
+        view = memoryview(arena)
+        offsets = [0]
+        space, dash = _SEPARATORS
+        try:
+            position = 0
+            for index, value in enumerate(itertools.chain(pans, cvvs or ())):
+                strip = index < len(pans)
+                end = position + len(value)
+                if isinstance(value, bytes) and not (strip and (space in value or dash in value)):
+                    view[position:end] = value
+                    position = end
+                else:
+                    position = _pack_chars(view, position, value, strip)
+                offsets.append(position)
+        except BaseException:
+            view[:] = bytes(len(arena))
+            raise
+        finally:
+            view.release()
+        pan_offsets = np.array(offsets[: len(pans) + 1], dtype=np.int64)
+        cvv_offsets = None if cvvs is None else np.array(offsets[len(pans) :], dtype=np.int64)
+        return cls(arena, pan_offsets, cvv_offsets)
+
+    def __len__(self) -> int:
+        return len(self._pan_offsets) - 1
+
+    def __repr__(self) -> str:
+        return f"CardBatch(cards={len(self)}, cvvs={self._cvv_offsets is not None}, wiped={self.wiped})"
+
+    def pans(self) -> List[memoryview]:
+        """Views into the arena; valid only until `wipe`."""
+        if self.wiped:
+            raise ValueError("CardBatch was already wiped")
+        view = memoryview(self._arena)
+        offsets = self._pan_offsets.tolist()
+        return [view[start:end] for start, end in zip(offsets[:-1], offsets[1:])]
+
+    def lengths(self) -> np.ndarray:
+        return np.diff(self._pan_offsets)
+
+    def valid_pans(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (valid, brand codes) for every PAN at once. Valid is 12-19 digits passing
+        the Luhn check. Digit temporaries are zeroed after use.
+        """
+        starts, ends = self._pan_offsets[:-1], self._pan_offsets[1:]
+        lengths = ends - starts
+        valid = (lengths >= PAN_MIN_DIGITS) & (lengths <= PAN_MAX_DIGITS)
+        total = int(self._pan_offsets[-1]) if len(self._pan_offsets) else 0
+        if not total:
+            return valid, np.zeros(len(lengths), dtype=np.int8)
+        digits = np.frombuffer(self._arena, dtype=np.uint8, count=total).astype(np.int16)
+        weighted = digits
+        try:
+            digits -= 48
+            non_digit = (digits < 0) | (digits > 9)
+            np.clip(digits, 0, 9, out=digits)
+            owner = np.repeat(np.arange(len(lengths)), lengths)
+            # Luhn doubles every second digit counted from the right.
+            single = (ends[owner] - 1 - np.arange(total)) % 2 == 0
+            weighted = _LUHN_DOUBLED[digits]
+            np.copyto(weighted, digits, where=single)
+            present = lengths > 0
+            sums = np.zeros(len(lengths), dtype=np.int64)
+            bad = np.zeros(len(lengths), dtype=np.int64)
+            sums[present] = np.add.reduceat(weighted, starts[present])
+            bad[present] = np.add.reduceat(non_digit, starts[present])
+            valid &= (bad == 0) & (sums % 10 == 0)
+            # The issuer prefix (first four digits) is all the metadata keeps from the PAN.
+            first4 = np.zeros(len(lengths), dtype=np.int64)
+            for offset in range(4):
+                first4 = first4 * 10 + digits[np.minimum(starts + offset, total - 1)]
+            brands = np.where(valid, _BRAND_BY_FIRST4[first4], 0).astype(np.int8)
+            first4.fill(0)
+        finally:
+            digits.fill(0)
+            weighted.fill(0)
+        return valid, brands
+
+    def check_each(self) -> Tuple[List[bool], List[int], List[int]]:
+        """
+        (valid, brand codes, lengths) as lists, the same answers as `valid_pans`
+        and `lengths` but one PAN at a time, reading the digits straight from
+        the arena. Cheaper than numpy for small batches.
+        """
+        view = memoryview(self._arena)
+        offsets = self._pan_offsets.tolist()
+        lengths = [end - start for start, end in zip(offsets[:-1], offsets[1:])]
+        valid: List[bool] = []
+        brands: List[int] = []
+        for start, length in zip(offsets, lengths):
+            digits = view[start : start + length]
+            ok = PAN_MIN_DIGITS <= length <= PAN_MAX_DIGITS
+            if ok:
+                # Luhn doubles every second digit counted from the right.
+                total = sum(map(_ASCII_DIGIT.__getitem__, digits[::-2]))
+                total += sum(map(_ASCII_DOUBLED.__getitem__, digits[-2::-2]))
+                ok = total < _NOT_A_DIGIT and total % 10 == 0
+            first4 = 0
+            for code in digits[:4] if ok else ():
+                first4 = first4 * 10 + code - 48
+            valid.append(ok)
+            brands.append(int(_BRAND_BY_FIRST4[first4]) if ok else 0)
+        return valid, brands, lengths
+
+    def wipe(self) -> None:
+        self._arena[:] = bytes(len(self._arena))
+        self.wiped = True
+
+    def arena_is_zero(self) -> bool:
+        return not any(self._arena)
+
+
+@dataclass
+class TokenizedBatch:
+    card_token: np.ndarray  # S24, b"" where the PAN was rejected
+    device_hash: np.ndarray  # S16, b"" where no fingerprint was given
+    rejected: np.ndarray  # bool: not 12-19 digits or failed the Luhn check
+
+
+def _encode(digests: List[bytes], keep: List[bool], width: int, prefix: bytes = b"") -> np.ndarray:
+    """`width`-byte digests -> `prefix` + letters a-p (one per nibble), as one fixed-width array; b"" where not kept."""
+    if len(digests) <= SCALAR_BATCH_MAX:
+        encoded = [
+            prefix + digest.hex().encode("ascii").translate(_HEX_TO_LETTERS) if kept else b""
+            for digest, kept in zip(digests, keep)
+        ]
+        return np.array(encoded, dtype=f"S{len(prefix) + 2 * width}")
+    raw = np.frombuffer(b"".join(digests), dtype=np.uint8).reshape(-1, width)
+    letters = np.empty((len(raw), len(prefix) + 2 * width), dtype=np.uint8)
+    letters[:, : len(prefix)] = np.frombuffer(prefix, dtype=np.uint8)
+    letters[:, len(prefix) :: 2] = _LETTERS[raw >> 4]
+    letters[:, len(prefix) + 1 :: 2] = _LETTERS[raw & 0x0F]
+    encoded = letters.view(f"S{letters.shape[1]}").ravel()
+    encoded[np.logical_not(keep)] = b""
+    return encoded
+
+
+class Tokenizer:
+    """Derives card tokens and device hashes for one region with that region's keys."""
+
+    def __init__(self, region: Type[Region], keys: TokenKeys, cache_size: int = DEFAULT_CACHE_SIZE) -> None:
+        if cache_size < 0:
+            raise ValueError("cache_size must not be negative")
+        self.region = region
+        # Keyed once; every value is hashed on a copy of these states.
+        self._card = hashlib.blake2b(key=keys.card, digest_size=CARD_TOKEN_BYTES, person=b"card:" + region.code)
+        self._device = hashlib.blake2b(key=keys.device, digest_size=DEVICE_HASH_BYTES, person=b"device:" + region.code)
+        self._key_ids = (hashlib.sha256(keys.card).digest(), hashlib.sha256(keys.device).digest())
+        self.cache_size = cache_size
+        self._metadata: "OrderedDict[bytes, TokenMetadata]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.tokenized = 0
+        self.rejected = 0
+
+    def tokenize(
+        self,
+        cards: CardBatch,
+        devices: Optional[Sequence[bytes]] = None,
+        ts_ms: Optional[int] = None,
+    ) -> TokenizedBatch:
+        """Tokens for every card (and device fingerprint) in the batch; the batch is wiped before returning."""
+        try:
+            n = len(cards)
+            if devices is not None and len(devices) != n:
+                raise ValueError("cards and devices differ in length")
+            if n <= SCALAR_BATCH_MAX:
+                valid, brands, lengths = cards.check_each()
+            else:
+                valid_mask, brand_codes = cards.valid_pans()
+                valid, brands, lengths = valid_mask.tolist(), brand_codes.tolist(), cards.lengths().tolist()
+            card_copy = self._card.copy
+            skipped = bytes(CARD_TOKEN_BYTES)
+            digests: List[bytes] = []
+            pans = cards.pans()
+            for pan, ok in zip(pans, valid):
+                if ok:
+                    state = card_copy()
+                    state.update(pan)
+                    digests.append(state.digest())
+                else:
+                    digests.append(skipped)
+            # Drop the views into the arena; `pan` is unbound when the batch is empty.
+            pans = pan = None
+        finally:
+            cards.wipe()
+
+        card_token = _encode(digests, valid, CARD_TOKEN_BYTES, TOKEN_PREFIX)
+        device_hash = self.device_hashes(devices) if devices is not None else np.zeros(n, dtype="S16")
+        self._remember(card_token, brands, lengths, int(time.time() * 1000) if ts_ms is None else ts_ms)
+        accepted = sum(valid)
+        self.tokenized += accepted
+        self.rejected += n - accepted
+        return TokenizedBatch(card_token, device_hash, np.logical_not(valid))
+
+    def device_hashes(self, fingerprints: Sequence[bytes]) -> np.ndarray:
+        """Keyed hashes of raw device fingerprints; an empty fingerprint stays b""."""
+        device_copy = self._device.copy
+        skipped = bytes(DEVICE_HASH_BYTES)
+        digests: List[bytes] = []
+        for fingerprint in fingerprints:
+            if fingerprint:
+                state = device_copy()
+                state.update(fingerprint)
+                digests.append(state.digest())
+            else:
+                digests.append(skipped)
+        return _encode(digests, [bool(fingerprint) for fingerprint in fingerprints], DEVICE_HASH_BYTES)
+
+    def fill(self, events: np.ndarray, cards: CardBatch, devices: Optional[Sequence[bytes]] = None) -> np.ndarray:
+        """Tokenize into `EVENT_DTYPE` rows of this region; returns the rejected mask."""
+        if len(events) and not np.all(events["region"] == self.region.code):
+            cards.wipe()
+            raise ResidencyViolation(f"{self.region.code.decode()} tokenizer only tokenizes its own region's events")
+        if len(events) != len(cards):
+            cards.wipe()
+            raise ValueError("events and cards differ in length")
+        result = self.tokenize(cards, devices, int(events["ts_ms"].max()) if len(events) else None)
+        events["card_token"] = result.card_token
+        events["device_hash"] = result.device_hash
+        return result.rejected
+
+    def _remember(self, tokens: np.ndarray, brands: List[int], lengths: List[int], now_ms: int) -> None:
+        if not self.cache_size:
+            return
+        with self._lock:
+            metadata = self._metadata
+            for token, brand, length in zip(tokens.tolist(), brands, lengths):
+                if not token:
+                    continue
+                entry = metadata.get(token)
+                if entry is None:
+                    metadata[token] = TokenMetadata(BRAND_NAMES[brand], length, now_ms, now_ms)
+                    if len(metadata) > self.cache_size:
+                        metadata.popitem(last=False)
+                else:
+                    entry.uses += 1
+                    entry.last_seen_ms = now_ms
+                    metadata.move_to_end(token)
+
+    def metadata(self, token: bytes) -> Optional[TokenMetadata]:
+        with self._lock:
+            return self._metadata.get(token)
+
+    def held_bytes(self) -> List[bytes]:
+        """Everything the tokenizer keeps between batches, as bytes, for auditing."""
+        with self._lock:
+            return [token + b" " + repr(entry).encode() for token, entry in self._metadata.items()]
+
+
+class IngressTokenizers:
+    """One tokenizer per region; no two regions may share a key."""
+
+    def __init__(self, keys: Dict[str, TokenKeys], cache_size: int = DEFAULT_CACHE_SIZE) -> None:
+        codes = {region.code.decode(): region for region in REGIONS}
+        unknown = sorted(set(keys) - set(codes))
+        if unknown:
+            raise ValueError(f"Unknown regions: {', '.join(unknown)}")
+        self._tokenizers = {code: Tokenizer(codes[code], region_keys, cache_size) for code, region_keys in keys.items()}
+        seen: Dict[bytes, str] = {}
+        for code, tokenizer in self._tokenizers.items():
+            for key_id in tokenizer._key_ids:
+                if key_id in seen:
+                    raise ValueError(f"Regions {seen[key_id]} and {code} share a tokenization key")
+                seen[key_id] = code
+
+    @classmethod
+    def generate(cls, cache_size: int = DEFAULT_CACHE_SIZE) -> "IngressTokenizers":
+        return cls({region.code.decode(): TokenKeys.generate() for region in REGIONS}, cache_size)
+
+    def __getitem__(self, region: str) -> Tokenizer:
+        tokenizer = self._tokenizers.get(region)
+        if tokenizer is None:
+            raise ValueError(f"No tokenizer for region `{region}`")
+        return tokenizer
+
+    def held_bytes(self) -> List[bytes]:
+        return [blob for tokenizer in self._tokenizers.values() for blob in tokenizer.held_bytes()]
+
+
+def find_card_data(blobs: Iterable[bytes]) -> RedactionStats:
+    """Scan blobs with the log redactor's PAN/CVV patterns; `findings` is 0 when nothing raw is present."""
+    stats = RedactionStats()
+    for blob in blobs:
+        redact_bytes(bytes(blob), stats)
+    return stats
@@ -0,0 +1,130 @@
+"""
+Seeded synthetic payment traffic for load tests and benchmarks.
+
+`generate` builds a CA/IN transaction stream as `EVENT_DTYPE` records plus
+arrival offsets and a fraud label, entirely with numpy (one pass per field,
+one small loop over fraud bursts):
+
+- Merchants belong to one region and one tier (`premium_share` of them are
+  premium). Traffic is skewed across merchants by a Zipf law over a shuffled
+  popularity rank, so a few merchants carry most of it.
+- Baseline arrivals are a Poisson process at `rate_per_s`; each charges a card
+  drawn from `cards` at the merchant's home currency (a small share foreign),
+  with log-normal amounts and a stable device per card (some missing).
+- Fraud bursts arrive as a Poisson process (`fraud_bursts_per_min`). A burst
+  is `burst_s` of rapid, large, mostly foreign-currency charges from a handful
+  of freshly compromised cards at a handful of merchants: the velocity and
+  amount pattern the feature engine and model are built to catch.
+
+The same profile and seed always produce the same stream.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from fraud_radar.events import new_events
+
+DEFAULT_START_MS = 1_763_400_000_000  # 2025-11-17T17:20:00Z
+
+
+@dataclass(frozen=True)
+class TrafficProfile:
+    rate_per_s: float = 2_000.0
+    ca_share: float = 0.5  # share of merchants (and so roughly of traffic) in CA
+    premium_share: float = 0.2  # share of merchants on the premium tier
+    merchants: int = 20_000
+    merchant_skew: float = 1.1  # Zipf exponent over merchant popularity rank
+    cards: int = 200_000
+    device_missing: float = 0.05
+    foreign_currency: float = 0.03
+    fraud_bursts_per_min: float = 2.0
+    burst_s: float = 5.0
+    burst_rate_per_s: float = 100.0
+    burst_cards: int = 20
+    burst_merchants: int = 5
+
+    def __post_init__(self) -> None:
+        if self.rate_per_s <= 0 or self.merchants < 1 or self.cards < 1:
+            raise ValueError("rate_per_s, merchants and cards must be positive")
+        for name in ("ca_share", "premium_share", "device_missing", "foreign_currency"):
+            if not 0.0 <= getattr(self, name) <= 1.0:
+                raise ValueError(f"{name} must be in [0, 1]")
+
+
+@dataclass
+class Traffic:
+    events: np.ndarray  # EVENT_DTYPE, in arrival order; event_id is the row index
+    arrival_s: np.ndarray  # seconds after the start of the stream
+    fraud: np.ndarray  # True for burst (fraudulent) transactions
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    @property
+    def duration_s(self) -> float:
+        return float(self.arrival_s[-1]) if len(self.arrival_s) else 0.0
+
+
+def _names(prefix: str, ids: np.ndarray, width: int) -> np.ndarray:
+    return np.char.add(prefix.encode("ascii"), ids.astype(f"S{width}"))
+
+
+def generate(profile: TrafficProfile, duration_s: float, seed: int = 0, start_ms: int = DEFAULT_START_MS) -> Traffic:
+    """`duration_s` of traffic shaped by `profile`."""
+    if duration_s <= 0:
+        raise ValueError("duration_s must be positive")
+    rng = np.random.default_rng(seed)
+
+    # Merchant directory: region, tier and popularity.
+    merchant_ca = rng.random(profile.merchants) < profile.ca_share
+    merchant_premium = rng.random(profile.merchants) < profile.premium_share
+    popularity = np.arange(1, profile.merchants + 1, dtype=np.float64) ** -profile.merchant_skew
+    cdf = np.cumsum(rng.permutation(popularity))
+    cdf /= cdf[-1]
+
+    # Baseline traffic.
+    n = rng.poisson(profile.rate_per_s * duration_s)
+    arrival = [rng.uniform(0.0, duration_s, n)]
+    merchant = [np.minimum(np.searchsorted(cdf, rng.random(n)), profile.merchants - 1)]
+    card_names = [_names("tok_", rng.integers(0, profile.cards, n), 12)]
+    amount = [rng.lognormal(np.log(40.0), 1.0, n)]
+    foreign = [rng.random(n) < profile.foreign_currency]
+    fraud = [np.zeros(n, dtype=bool)]
+
+    # Fraud bursts.
+    bursts = rng.poisson(profile.fraud_bursts_per_min * duration_s / 60.0)
+    for burst in range(bursts):
+        size = rng.poisson(profile.burst_rate_per_s * profile.burst_s)
+        start = rng.uniform(0.0, max(duration_s - profile.burst_s, 0.0))
+        arrival.append(np.minimum(start + rng.uniform(0.0, profile.burst_s, size), duration_s))
+        targets = rng.integers(0, profile.merchants, profile.burst_merchants)
+        merchant.append(targets[rng.integers(0, len(targets), size)])
+        compromised = rng.integers(0, profile.burst_cards, size)
+        card_names.append(np.char.add(f"tok_b{burst:03d}_".encode("ascii"), compromised.astype("S7")))
+        amount.append(rng.lognormal(np.log(400.0), 0.8, size))
+        foreign.append(rng.random(size) < 0.6)
+        fraud.append(np.ones(size, dtype=bool))
+
+    arrival_s = np.concatenate(arrival)
+    order = np.argsort(arrival_s, kind="stable")
+    arrival_s = arrival_s[order]
+    merchants = np.concatenate(merchant)[order]
+    cards = np.concatenate(card_names)[order]
+    is_ca = merchant_ca[merchants]
+
+    events = new_events(len(arrival_s))
+    events["event_id"] = np.arange(len(events), dtype=np.uint64)
+    events["ts_ms"] = start_ms + np.round(arrival_s * 1000.0).astype(np.int64)
+    events["region"] = np.where(is_ca, b"CA", b"IN")
+    events["tier"] = merchant_premium[merchants]
+    home = np.where(is_ca, b"CAD", b"INR")
+    events["currency"] = np.where(np.concatenate(foreign)[order], b"USD", home)
+    events["amount_minor"] = np.maximum(np.round(np.concatenate(amount)[order] * 100.0), 1).astype(np.int64)
+    events["merchant_id"] = _names("m-", merchants, 8)
+    events["card_token"] = cards
+    # A stable device per card, unless the fingerprint is missing.
+    device = np.char.add(b"d", np.char.replace(cards, b"tok_", b""))
+    events["device_hash"] = np.where(rng.random(len(events)) < profile.device_missing, b"", device)
+    return Traffic(events=events, arrival_s=arrival_s, fraud=np.concatenate(fraud)[order])
@@ -0,0 +1,660 @@
+"""
+Asynchronous premium webhook delivery.
+
+Premium alerts are pushed to merchant webhooks within 10 s (p99 < 15 s) with
+exponential backoff over at most 5 attempts (spec/overview.md, "Premium alert
+path SLO"). During a fraud spike that means thousands of merchant hosts at
+once, so the dispatcher is built around hosts rather than alerts:
+
+- One lane per merchant host (scheme, host, port) with a pending queue, at
+  most `per_host_limit` lane workers and a keep-alive connection pool of the
+  same size. Tasks and sockets scale with busy hosts, not with alerts.
+- HTTP/1.1 over asyncio streams, reusing idle connections; a reused
+  connection the merchant closed while idle is retried once on a fresh one
+  without spending an attempt.
+- Retries go on a hashed `TimerWheel` driven by one task, instead of one
+  sleeping task per retry. 2xx delivers; 408, 429, 5xx, timeouts and
+  connection errors retry; any other status is final.
+- Each delivery has an overall deadline (`RetryPolicy.deadline_s`, the 15 s
+  premium p99 by default). Attempt timeouts are clipped to what is left of
+  it, and a retry that could not start before it is abandoned, so five slow
+  attempts with backoff cannot push a delivery past the SLO unnoticed.
+- Delivery ids travel as the `Idempotency-Key` header and must be plain
+  tokens (letters, digits and `._:~-`); anything else is refused at submit.
+- Every attempt is recorded (latency, status, attempt number) in per-tier
+  log-bucket histograms and passed to `on_attempt`, and every finished
+  delivery records its end-to-end latency from submission.
+
+`StubWebhookServer` is a local keep-alive receiver with injectable latency and
+failures, for the red-bar tests and benchmarks/bench_webhooks.py.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import random
+import re
+import ssl
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from fraud_radar.metrics import LatencyHistogram
+
+PREMIUM_DELIVERY_TARGET_S = 10.0
+PREMIUM_DELIVERY_P99_S = 15.0
+MAX_ATTEMPTS = 5
+
+RETRYABLE_STATUS = frozenset({408, 425, 429, 500, 502, 503, 504})
+USER_AGENT = "fraud-radar-webhooks/1"
+_MAX_HEADER_BYTES = 64 * 1024
+_DELIVERY_ID = re.compile(r"[A-Za-z0-9][A-Za-z0-9._:~-]{0,199}")
+
+HostKey = Tuple[str, str, int]
+
+
+class WebhookProtocolError(Exception):
+    """The receiver answered with something that is not an HTTP/1.x response."""
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    Exponential backoff: base * multiplier^(attempt-1), +/- jitter, at most `max_attempts`.
+
+    `deadline_s` bounds the whole delivery from submission: attempts and
+    retries that would run past it are abandoned (use `math.inf` to disable).
+    """
+
+    max_attempts: int = MAX_ATTEMPTS
+    base_delay_s: float = 0.5
+    multiplier: float = 2.0
+    max_delay_s: float = 8.0
+    jitter: float = 0.2
+    deadline_s: float = PREMIUM_DELIVERY_P99_S
+
+    def delay(self, attempt: int, rng: random.Random) -> float:
+        """Delay before attempt `attempt + 1`, after `attempt` failed."""
+        delay = min(self.max_delay_s, self.base_delay_s * self.multiplier ** (attempt - 1))
+        return delay * (1.0 + self.jitter * (2.0 * rng.random() - 1.0))
+
+
+# -- timer wheel --------------------------------------------------------------
+
+
+class TimerWheel:
+    """
+    Hashed timing wheel: O(1) schedule and O(due) expiry.
+
+    Items land in slot `(tick + ticks) % slots` with the number of extra
+    rotations to wait; delays longer than one rotation simply carry rounds.
+    """
+
+    def __init__(self, tick_s: float = 0.05, slots: int = 512, clock: Callable[[], float] = time.monotonic) -> None:
+        if tick_s <= 0 or slots < 1:
+            raise ValueError("tick_s must be positive and slots at least 1")
+        self.tick_s = tick_s
+        self._clock = clock
+        self._slots: List[List[List[Any]]] = [[] for _ in range(slots)]
+        self._origin = clock()
+        self._tick = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _now_tick(self) -> int:
+        return int((self._clock() - self._origin) / self.tick_s)
+
+    def schedule(self, delay_s: float, item: Any) -> None:
+        if not self._size:
+            # Nothing pending: fast-forward instead of replaying idle ticks.
+            self._tick = max(self._tick, self._now_tick())
+        ticks = max(1, math.ceil(delay_s / self.tick_s))
+        slots = len(self._slots)
+        self._slots[(self._tick + ticks) % slots].append([(ticks - 1) // slots, item])
+        self._size += 1
+
+    def advance(self) -> List[Any]:
+        """Move the cursor to now and return every item that came due."""
+        due: List[Any] = []
+        target = self._now_tick()
+        if not self._size:
+            self._tick = max(self._tick, target)
+            return due
+        slots = len(self._slots)
+        while self._tick < target and self._size:
+            self._tick += 1
+            bucket = self._slots[self._tick % slots]
+            if not bucket:
+                continue
+            waiting = []
+            for entry in bucket:
+                if entry[0] == 0:
+                    due.append(entry[1])
+                else:
+                    entry[0] -= 1
+                    waiting.append(entry)
+            self._slots[self._tick % slots] = waiting
+            self._size -= len(bucket) - len(waiting)
+        self._tick = max(self._tick, target)
+        return due
+
+
+# -- connections --------------------------------------------------------------
+
+
+@dataclass
+class _Connection:
+    reader: asyncio.StreamReader
+    writer: asyncio.StreamWriter
+    idle_since: float = 0.0
+    requests: int = 0
+
+    def close(self) -> None:
+        if not self.writer.is_closing():
+            self.writer.close()
+
+
+class HostPool:
+    """Keep-alive connections to one merchant host."""
+
+    def __init__(
+        self,
+        key: HostKey,
+        connect_timeout_s: float,
+        idle_timeout_s: float,
+        clock: Callable[[], float],
+        ssl_context: Optional[ssl.SSLContext] = None,
+    ) -> None:
+        self.key = key
+        self._connect_timeout_s = connect_timeout_s
+        self._idle_timeout_s = idle_timeout_s
+        self._clock = clock
+        self._ssl = ssl_context if key[0] == "https" else None
+        self._idle: Deque[_Connection] = deque()
+        self.opened = 0
+        self.reused = 0
+
+    async def acquire(self) -> Tuple[_Connection, bool]:
+        """An idle live connection (reused=True) or a freshly opened one."""
+        now = self._clock()
+        while self._idle:
+            conn = self._idle.pop()
+            if now - conn.idle_since < self._idle_timeout_s and not conn.reader.at_eof():
+                self.reused += 1
+                return conn, True
+            conn.close()
+        _, host, port = self.key
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(host, port, ssl=self._ssl), self._connect_timeout_s
+        )
+        self.opened += 1
+        return _Connection(reader, writer), False
+
+    def release(self, conn: _Connection, keep_alive: bool) -> None:
+        if keep_alive and not conn.writer.is_closing():
+            conn.idle_since = self._clock()
+            self._idle.append(conn)
+        else:
+            conn.close()
+
+    def close(self) -> None:
+        while self._idle:
+            self._idle.pop().close()
+
+
+async def _read_response(reader: asyncio.StreamReader) -> Tuple[int, bool]:
+    """Read one HTTP/1.x response; returns (status, keep_alive)."""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionResetError("connection closed before a response")
+    parts = status_line.split(None, 2)
+    if len(parts) < 2 or not parts[0].startswith(b"HTTP/1.") or not parts[1].isdigit():
+        raise WebhookProtocolError(f"bad status line {status_line[:64]!r}")
+    status = int(parts[1])
+    keep_alive = parts[0] == b"HTTP/1.1"
+    length: Optional[int] = None
+    chunked = False
+    header_bytes = 0
+    while True:
+        line = await reader.readline()
+        header_bytes += len(line)
+        if header_bytes > _MAX_HEADER_BYTES:
+            raise WebhookProtocolError("response headers too large")
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.partition(b":")
+        name = name.strip().lower()
+        value = value.strip().lower()
+        if name == b"content-length":
+            length = int(value)
+        elif name == b"transfer-encoding":
+            chunked = b"chunked" in value
+        elif name == b"connection":
+            keep_alive = value == b"keep-alive" or (keep_alive and value != b"close")
+    # Webhook responses are acknowledgements; the body is read to keep the
+    # connection in sync and then discarded.
+    if chunked:
+        while True:
+            size = int((await reader.readline()).split(b";")[0].strip() or b"0", 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif length is not None:
+        await reader.readexactly(length)
+    elif status not in (204, 304) and not 100 <= status < 200:
+        await reader.read()
+        keep_alive = False
+    return status, keep_alive
+
+
+# -- dispatcher -----------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class AttemptRecord:
+    delivery_id: str
+    host: str
+    tier: str
+    attempt: int
+    status: Optional[int]
+    latency_s: float
+    error: str = ""
+
+
+@dataclass(frozen=True)
+class DeliveryResult:
+    delivery_id: str
+    delivered: bool
+    attempts: int
+    status: Optional[int]
+    latency_s: float
+    error: str = ""
+
+
+@dataclass
+class WebhookMetrics:
+    attempt_latency: Dict[str, LatencyHistogram] = field(default_factory=dict)
+    delivery_latency: Dict[str, LatencyHistogram] = field(default_factory=dict)
+    attempts: Dict[int, int] = field(default_factory=dict)
+    statuses: Dict[str, int] = field(default_factory=dict)
+    delivered: int = 0
+    dead: int = 0
+    retries: int = 0
+    stale_reconnects: int = 0
+
+    def _histogram(self, table: Dict[str, LatencyHistogram], tier: str) -> LatencyHistogram:
+        if tier not in table:
+            table[tier] = LatencyHistogram()
+        return table[tier]
+
+    def record_attempt(self, record: AttemptRecord) -> None:
+        self._histogram(self.attempt_latency, record.tier).record(record.latency_s)
+        self.attempts[record.attempt] = self.attempts.get(record.attempt, 0) + 1
+        key = str(record.status) if record.status is not None else "error"
+        self.statuses[key] = self.statuses.get(key, 0) + 1
+
+    def record_delivery(self, tier: str, result: DeliveryResult) -> None:
+        if result.delivered:
+            self.delivered += 1
+            self._histogram(self.delivery_latency, tier).record(result.latency_s)
+        else:
+            self.dead += 1
+
+    def delivery_percentiles(self, tier: str, quantiles: Tuple[float, ...] = (0.5, 0.95, 0.99)) -> Dict[str, float]:
+        histogram = self.delivery_latency.get(tier)
+        if histogram is None or not histogram.count:
+            return {}
+        return {f"p{q * 100:g}": histogram.quantile(q) for q in quantiles}  # type: ignore[misc]
+
+
+@dataclass
+class _Delivery:
+    delivery_id: str
+    key: HostKey
+    path: str
+    body: bytes
+    tier: str
+    created_at: float
+    future: "asyncio.Future[DeliveryResult]"
+    attempts: int = 0
+
+
+@dataclass
+class _Lane:
+    pool: HostPool
+    pending: Deque[_Delivery] = field(default_factory=deque)
+    workers: int = 0
+
+
+def _split_url(url: str) -> Tuple[HostKey, str]:
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise ValueError(f"Webhook URL must be http(s)://host[:port]/path, got `{url}`")
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    path = parts.path or "/"
+    if parts.query:
+        path += "?" + parts.query
+    return (parts.scheme, parts.hostname, port), path
+
+
+class WebhookDispatcher:
+    """Per-host keep-alive lanes with a timer-wheel retry schedule."""
+
+    def __init__(
+        self,
+        policy: Optional[RetryPolicy] = None,
+        per_host_limit: int = 4,
+        max_inflight: int = 1024,
+        request_timeout_s: float = 5.0,
+        connect_timeout_s: float = 2.0,
+        idle_timeout_s: float = 30.0,
+        wheel_tick_s: float = 0.05,
+        ssl_context: Optional[ssl.SSLContext] = None,
+        on_attempt: Optional[Callable[[AttemptRecord], None]] = None,
+        clock: Callable[[], float] = time.monotonic,
+        seed: Optional[int] = None,
+    ) -> None:
+        if per_host_limit < 1 or max_inflight < 1:
+            raise ValueError("per_host_limit and max_inflight must be at least 1")
+        self.policy = policy or RetryPolicy()
+        self.per_host_limit = per_host_limit
+        self.request_timeout_s = request_timeout_s
+        self.connect_timeout_s = connect_timeout_s
+        self.idle_timeout_s = idle_timeout_s
+        self.on_attempt = on_attempt
+        self.metrics = WebhookMetrics()
+        self._ssl = ssl_context
+        self._clock = clock
+        self._rng = random.Random(seed)
+        self._lanes: Dict[HostKey, _Lane] = {}
+        self._wheel = TimerWheel(wheel_tick_s, clock=clock)
+        self._wheel_ready = asyncio.Event()
+        self._inflight = asyncio.Semaphore(max_inflight)
+        self._outstanding: set = set()
+        self._tasks: set = set()
+        self._driver: Optional[asyncio.Task] = None
+
+    # -- public API --------------------------------------------------------
+
+    async def start(self) -> None:
+        if self._driver is None:
+            self._driver = asyncio.create_task(self._drive_wheel())
+
+    async def close(self) -> None:
+        """Stop retries and close pooled connections; undelivered futures are cancelled."""
+        if self._driver is not None:
+            self._driver.cancel()
+            await asyncio.gather(self._driver, return_exceptions=True)
+            self._driver = None
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        for future in list(self._outstanding):
+            future.cancel()
+        for lane in self._lanes.values():
+            lane.pool.close()
+
+    async def __aenter__(self) -> "WebhookDispatcher":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.close()
+
+    def submit(self, url: str, payload: Any, delivery_id: str, tier: str = "premium") -> "asyncio.Future[DeliveryResult]":
+        """Queue one webhook; the future resolves once it is delivered, out of attempts or past the deadline."""
+        if not isinstance(delivery_id, str) or not _DELIVERY_ID.fullmatch(delivery_id):
+            raise ValueError(f"delivery_id must be 1-200 characters of [A-Za-z0-9._:~-], got {delivery_id!r}")
+        key, path = _split_url(url)
+        body = payload if isinstance(payload, bytes) else json.dumps(payload, separators=(",", ":")).encode()
+        future: asyncio.Future[DeliveryResult] = asyncio.get_running_loop().create_future()
+        self._outstanding.add(future)
+        future.add_done_callback(self._outstanding.discard)
+        self._enqueue(_Delivery(delivery_id, key, path, body, tier, self._clock(), future))
+        return future
+
+    async def deliver(self, url: str, payload: Any, delivery_id: str, tier: str = "premium") -> DeliveryResult:
+        return await self.submit(url, payload, delivery_id, tier)
+
+    async def drain(self) -> None:
+        """Wait until every submitted webhook has a final result."""
+        while self._outstanding:
+            await asyncio.gather(*list(self._outstanding), return_exceptions=True)
+
+    def pool_stats(self) -> Dict[str, int]:
+        pools = [lane.pool for lane in self._lanes.values()]
+        return {
+            "hosts": len(pools),
+            "connections_opened": sum(pool.opened for pool in pools),
+            "connections_reused": sum(pool.reused for pool in pools),
+            "retries_scheduled": len(self._wheel),
+        }
+
+    # -- lanes -------------------------------------------------------------
+
+    def _enqueue(self, delivery: _Delivery) -> None:
+        lane = self._lanes.get(delivery.key)
+        if lane is None:
+            pool = HostPool(delivery.key, self.connect_timeout_s, self.idle_timeout_s, self._clock, self._ssl)
+            lane = self._lanes[delivery.key] = _Lane(pool)
+        lane.pending.append(delivery)
+        if lane.workers < self.per_host_limit:
+            lane.workers += 1
+            task = asyncio.create_task(self._lane_worker(lane))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _lane_worker(self, lane: _Lane) -> None:
+        try:
+            while lane.pending:
+                delivery = lane.pending.popleft()
+                if delivery.future.done():
+                    continue
+                async with self._inflight:
+                    await self._attempt(lane, delivery)
+        finally:
+            lane.workers -= 1
+
+    async def _drive_wheel(self) -> None:
+        while True:
+            if not len(self._wheel):
+                self._wheel_ready.clear()
+                await self._wheel_ready.wait()
+            await asyncio.sleep(self._wheel.tick_s)
+            for delivery in self._wheel.advance():
+                self._enqueue(delivery)
+
+    # -- attempts ----------------------------------------------------------
+
+    async def _attempt(self, lane: _Lane, delivery: _Delivery) -> None:
+        started = self._clock()
+        remaining = self.policy.deadline_s - (started - delivery.created_at)
+        if remaining <= 0:
+            # Queued behind a busy lane until the deadline passed.
+            self._finish(delivery, False, None, "deadline exceeded")
+            return
+        delivery.attempts += 1
+        status: Optional[int] = None
+        error = ""
+        try:
+            status = await asyncio.wait_for(self._post(lane.pool, delivery), min(self.request_timeout_s, remaining))
+        except asyncio.TimeoutError:
+            error = "timeout"
+        except (OSError, asyncio.IncompleteReadError, WebhookProtocolError, ValueError) as exc:
+            error = f"{type(exc).__name__}: {exc}"
+        latency = self._clock() - started
+        record = AttemptRecord(delivery.delivery_id, lane.pool.key[1], delivery.tier, delivery.attempts, status, latency, error)
+        self.metrics.record_attempt(record)
+        if self.on_attempt is not None:
+            self.on_attempt(record)
+
+        if status is not None and 200 <= status < 300:
+            self._finish(delivery, True, status, "")
+        elif (status is None or status in RETRYABLE_STATUS) and delivery.attempts < self.policy.max_attempts:
+            delay = self.policy.delay(delivery.attempts, self._rng)
+            if self._clock() + delay - delivery.created_at >= self.policy.deadline_s:
+                self._finish(delivery, False, status, f"deadline exceeded after {error or f'HTTP {status}'}")
+                return
+            self.metrics.retries += 1
+            self._wheel.schedule(delay, delivery)
+            self._wheel_ready.set()
+        else:
+            self._finish(delivery, False, status, error or f"HTTP {status}")
+
+    def _finish(self, delivery: _Delivery, delivered: bool, status: Optional[int], error: str) -> None:
+        result = DeliveryResult(
+            delivery.delivery_id, delivered, delivery.attempts, status, self._clock() - delivery.created_at, error
+        )
+        self.metrics.record_delivery(delivery.tier, result)
+        if not delivery.future.done():
+            delivery.future.set_result(result)
+
+    def _request(self, delivery: _Delivery) -> bytes:
+        _, host, port = delivery.key
+        head = (
+            f"POST {delivery.path} HTTP/1.1\r\n"
+            f"Host: {host}:{port}\r\n"
+            f"User-Agent: {USER_AGENT}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(delivery.body)}\r\n"
+            f"Idempotency-Key: {delivery.delivery_id}\r\n"
+            f"X-Delivery-Attempt: {delivery.attempts}\r\n"
+            "Connection: keep-alive\r\n\r\n"
+        )
+        return head.encode("latin-1") + delivery.body
+
+    async def _post(self, pool: HostPool, delivery: _Delivery) -> int:
+        request = self._request(delivery)
+        conn, reused = await pool.acquire()
+        try:
+            conn.writer.write(request)
+            await conn.writer.drain()
+            status, keep_alive = await _read_response(conn.reader)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            conn.close()
+            if not reused:
+                raise
+            # The merchant closed the idle connection; that is not this
+            # attempt's fault, so retry once on a fresh connection.
+            self.metrics.stale_reconnects += 1
+            conn, _ = await pool.acquire()
+            try:
+                conn.writer.write(request)
+                await conn.writer.drain()
+                status, keep_alive = await _read_response(conn.reader)
+            except BaseException:
+                conn.close()
+                raise
+        except BaseException:
+            conn.close()
+            raise
+        conn.requests += 1
+        pool.release(conn, keep_alive)
+        return status
+
+
+# -- local stub receiver --------------------------------------------------------
+
+
+class StubWebhookServer:
+    """
+    Local HTTP/1.1 keep-alive webhook receiver.
+
+    Answers every POST after `latency_s`. The first `fail_attempts` requests
+    for each Idempotency-Key get `fail_status`, and any other request fails
+    with probability `failure_rate`. `max_requests_per_connection` closes
+    connections after that many requests to exercise stale-connection handling.
+    """
+
+    def __init__(
+        self,
+        latency_s: float = 0.0,
+        fail_attempts: int = 0,
+        failure_rate: float = 0.0,
+        fail_status: int = 503,
+        max_requests_per_connection: Optional[int] = None,
+        seed: int = 0,
+    ) -> None:
+        self.latency_s = latency_s
+        self.fail_attempts = fail_attempts
+        self.failure_rate = failure_rate
+        self.fail_status = fail_status
+        self.max_requests_per_connection = max_requests_per_connection
+        self._rng = random.Random(seed)
+        self._server: Optional[asyncio.AbstractServer] = None
+        self.host = "127.0.0.1"
+        self.port = 0
+        self.connections = 0
+        self.requests = 0
+        self.seen: Dict[str, int] = {}
+        self.accepted: Dict[str, bytes] = {}
+        self._handlers: Dict[asyncio.Task, asyncio.StreamWriter] = {}
+
+    async def start(self) -> "StubWebhookServer":
+        self._server = await asyncio.start_server(self._handle, self.host, 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    def url(self, path: str = "/webhook") -> str:
+        return f"http://{self.host}:{self.port}{path}"
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            # Server.wait_closed does not wait for live keep-alive handlers.
+            for writer in self._handlers.values():
+                writer.close()
+            await asyncio.gather(*self._handlers, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        assert task is not None
+        self._handlers[task] = writer
+        self.connections += 1
+        served = 0
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers: Dict[bytes, bytes] = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.partition(b":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get(b"content-length", b"0")))
+                self.requests += 1
+                served += 1
+                key = headers.get(b"idempotency-key", b"").decode()
+                self.seen[key] = self.seen.get(key, 0) + 1
+                if self.latency_s:
+                    await asyncio.sleep(self.latency_s)
+                if self.seen[key] <= self.fail_attempts or self._rng.random() < self.failure_rate:
+                    status, reason = self.fail_status, b"Unavailable"
+                else:
+                    status, reason = 200, b"OK"
+                    self.accepted.setdefault(key, body)
+                closing = headers.get(b"connection", b"").lower() == b"close" or (
+                    self.max_requests_per_connection is not None and served >= self.max_requests_per_connection
+                )
+                writer.write(
+                    b"HTTP/1.1 %d %s\r\nContent-Length: 2\r\nConnection: %s\r\n\r\nok"
+                    % (status, reason, b"close" if closing else b"keep-alive")
+                )
+                await writer.drain()
+                if closing:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            self._handlers.pop(task, None)
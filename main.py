@@ -1,5 +1,70 @@
-def main():
-    print("Hello from project3-repo-template!")
+"""
+Serve the fraud scoring API (`POST /api/v1/score`), its Prometheus
+metrics (`GET /metrics`) and its health check (`GET /health`) locally.
+
+Usage:
+  uv run python main.py --port 8080
+  uv run python main.py --port 8080 --model-registry models/
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+from pathlib import Path
+from http.server import ThreadingHTTPServer
+
+from fraud_radar.api import HEALTH_ROUTE, METRICS_ROUTE, SCORE_ROUTE, TENANT_HEADER, ApiMetrics, make_handler
+from fraud_radar.ratelimit import TenantLimit, TenantRateLimiter
+from fraud_radar.redaction import PanCvvRedactingFilter
+from fraud_radar.registry import ModelRegistry, ModelWatcher
+from fraud_radar.scoring import MicroBatcher, ScoringEngine
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the Payments Fraud Radar scoring API.")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    parser.add_argument("--port", type=int, default=8080, help="Port to listen on")
+    parser.add_argument("--max-batch", type=int, default=512, help="Rows per scoring micro-batch")
+    parser.add_argument("--max-wait-ms", type=float, default=2.0, help="Max time to hold a micro-batch open")
+    parser.add_argument(
+        "--tenant-rate", type=float, default=0.0, help=f"Transactions/s per {TENANT_HEADER} (0 disables rate limiting)"
+    )
+    parser.add_argument("--tenant-burst", type=float, default=None, help="Token bucket size per tenant (default 2 s of rate)")
+    parser.add_argument(
+        "--model-registry", type=Path, default=None, help="Serve the registry's active model and follow activations"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    for handler in logging.getLogger().handlers:
+        handler.addFilter(PanCvvRedactingFilter())
+
+    watcher = None
+    if args.model_registry is not None:
+        registry = ModelRegistry(args.model_registry)
+        try:
+            engine = ScoringEngine(registry.load_active())
+        except ValueError as exc:
+            raise SystemExit(str(exc))
+        watcher = ModelWatcher(registry, engine).start()
+    else:
+        engine = ScoringEngine()
+    batcher = MicroBatcher(engine, max_batch=args.max_batch, max_wait_s=args.max_wait_ms / 1000.0)
+    limiter = None
+    if args.tenant_rate > 0:
+        limiter = TenantRateLimiter(TenantLimit(args.tenant_rate, args.tenant_burst or 2.0 * args.tenant_rate))
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(batcher, ApiMetrics(), limiter))
+    print(f"Scoring model {engine.model_version} on http://{args.host}:{args.port}{SCORE_ROUTE}")
+    print(f"Prometheus metrics on http://{args.host}:{args.port}{METRICS_ROUTE}")
+    print(f"Health check on http://{args.host}:{args.port}{HEALTH_ROUTE}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if watcher is not None:
+            watcher.stop()
+        server.server_close()
 
 
 if __name__ == "__main__":
@@ -1,6 +1,42 @@
+import ipaddress
+import json
+import random
+from dataclasses import replace
+
 import pytest
 
-def test_premium_dns_no_privilege_escalation():
+from fraud_radar.dns import (
+    DEFAULT_POLICIES,
+    NOERROR,
+    NXDOMAIN,
+    REFUSED,
+    FirewallLog,
+    ResolverSet,
+    check_policies,
+)
+from fraud_radar.events import CA, IN
+from fraud_radar.schema import TIERS
+
+
+def _fuzz_names(rng, count):
+    """Names under every regional allowlist, the other region, global services and the open internet."""
+    suffixes = [
+        "scoring.ca.central.internal", "scoring.ap.south.internal", "monitoring.ca.central.internal",
+        "s3.ca-central-1.amazonaws.com", "s3.ap-south-1.amazonaws.com", "s3.us-east-1.amazonaws.com",
+        "logs.ca-central-1.amazonaws.com", "logs.ap-south-1.amazonaws.com", "kinesis.us-west-2.amazonaws.com",
+        "d111.cloudfront.net", "a1.awsglobalaccelerator.com", "www.google-analytics.com", "api.segment.io",
+        "hooks.merchant.example.in", "amazonaws.com", "internal",
+    ]
+    names = []
+    for _ in range(count):
+        name = rng.choice(suffixes)
+        for _ in range(rng.randrange(3)):
+            name = f"x{rng.randrange(1 << 20):x}.{name}"
+        names.append(name.upper() + "." if rng.random() < 0.1 else name)
+    return names
+
+
+def test_premium_dns_no_privilege_escalation(tmp_path):
     """
     Red bar: Premium-tier merchants resolve DNS differently than standard-tier merchants.
 
@@ -19,7 +55,47 @@ def test_premium_dns_no_privilege_escalation():
       and identical failover behavior. Premium acceleration occurs only at the
       application layer, never at the DNS layer.
     """
-    pytest.fail(
-        "Premium DNS routing differs from standard tier. "
-        "Residency and fairness risk: premium may escape region-locked resolvers."
-    )
+    assert check_policies() == []
+    log = FirewallLog(tmp_path, batch_size=256)
+    resolvers = ResolverSet(log=log)
+    for region in ("CA", "IN"):
+        assert len({id(resolvers.for_merchant(region, tier)) for tier in TIERS}) == 1
+
+    # A premium-only resolver, or one allowlisting the other region, is refused outright.
+    premium_only = replace(DEFAULT_POLICIES[0], tiers=("premium",))
+    with pytest.raises(ValueError, match="premium only"):
+        ResolverSet([premium_only, DEFAULT_POLICIES[1]])
+    leaky = replace(DEFAULT_POLICIES[0], allow=DEFAULT_POLICIES[0].allow + ("logs.ap-south-1.amazonaws.com",))
+    with pytest.raises(ValueError, match="ap-south-1"):
+        ResolverSet([leaky, DEFAULT_POLICIES[1]])
+
+    rng = random.Random(7)
+    names = _fuzz_names(rng, 20_000)
+    own = {"CA": ("ca-central-1", "ca.central.internal"), "IN": ("ap-south-1", "ap.south.internal")}
+    blocked = {"CA": 0, "IN": 0}
+    for region, policy in (("CA", DEFAULT_POLICIES[0]), ("IN", DEFAULT_POLICIES[1])):
+        network = ipaddress.ip_network(policy.network)
+        answers = {tier: resolvers.for_merchant(region, tier).resolve_many(names) for tier in TIERS}
+        assert answers["premium"] == answers["standard"]
+        for name, answer in zip(names, answers["premium"]):
+            if answer.status == NOERROR:
+                assert ipaddress.ip_address(answer.address) in network
+                assert any(marker in name.lower() for marker in own[region]), name
+            else:
+                assert answer.status in (NXDOMAIN, REFUSED)
+                blocked[region] += 1
+        # Nothing from the other region, other AWS regions or global services resolves.
+        for name, answer in zip(names, answers["premium"]):
+            if not any(marker in name.lower() for marker in own[region]) or "us-" in name.lower():
+                assert answer.status != NOERROR, name
+        stats = resolvers.resolver(region).stats
+        assert stats.hits >= len(names)  # the second tier's queries were all answered from the cache
+        assert stats.blocked + stats.refused == blocked[region] * len(TIERS)
+
+    # Every blocked query is in its region's firewall log, with no tier or merchant field.
+    log.flush()
+    for region in (CA, IN):
+        lines = [json.loads(line) for path in log.directory(region).glob("*.jsonl") for line in path.open()]
+        assert len(lines) == blocked[region.code.decode()] * len(TIERS)
+        assert {entry["resolver"] for entry in lines} == {f"{region.aws_region}-resolver"}
+        assert all(set(entry) == {"ts_ms", "resolver", "name", "status", "rule"} for entry in lines)
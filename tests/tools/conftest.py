@@ -0,0 +1,19 @@
+from pathlib import Path
+
+import pytest
+
+
+class _Touch:
+    """Pickles to a call that creates `marker` when the pickle is loaded."""
+
+    def __init__(self, marker):
+        self.marker = marker
+
+    def __reduce__(self):
+        return (Path.touch, (self.marker,))
+
+
+@pytest.fixture
+def pickle_bomb(tmp_path):
+    """An object whose pickle creates `pickle_bomb.marker` if anything ever loads it."""
+    return _Touch(tmp_path / "executed")
@@ -0,0 +1,101 @@
+import json
+import pickle
+import subprocess
+
+import redbar
+
+TEST_SOURCE = '''
+import helpers
+
+
+def test_fast():
+    assert helpers.VALUE == 1
+
+
+def test_slow():
+    assert True
+'''
+
+
+def _project(root):
+    tests = root / "tests" / "redbar"
+    tests.mkdir(parents=True)
+    (tests / "test_sample.py").write_text(TEST_SOURCE)
+    (root / "helpers.py").write_text("VALUE = 1\n")
+    return "tests/redbar/test_sample.py"
+
+
+def test_index_cache_is_json_and_reused(tmp_path):
+    relpath = _project(tmp_path)
+    cache_file = tmp_path / ".speckit-cache" / redbar.INDEX_FILE
+
+    index = redbar.TestIndex(tmp_path, cache_file)
+    assert index.nodeids(relpath) == [f"{relpath}::test_fast", f"{relpath}::test_slow"]
+    assert index.dependencies(relpath) == {relpath, "helpers.py"}
+    index.record_durations({f"{relpath}::test_slow": 2.5})
+    index.save()
+    assert json.loads(cache_file.read_text())["format"] == redbar.INDEX_FORMAT
+
+    reloaded = redbar.TestIndex(tmp_path, cache_file)
+    assert reloaded.get(relpath) == index.get(relpath) and reloaded.reparsed == []
+    assert reloaded.durations == {f"{relpath}::test_slow": 2.5}
+
+    (tmp_path / relpath).write_text(TEST_SOURCE + "\n\ndef test_new():\n    pass\n")
+    assert f"{relpath}::test_new" in reloaded.nodeids(relpath) and reloaded.reparsed == [relpath]
+
+
+def test_index_cache_never_unpickles(tmp_path, pickle_bomb):
+    relpath = _project(tmp_path)
+    cache_file = tmp_path / ".speckit-cache" / redbar.INDEX_FILE
+    cache_file.parent.mkdir()
+    for planted in (
+        pickle.dumps({"format": redbar.INDEX_FORMAT, "files": pickle_bomb}),
+        json.dumps({"format": redbar.INDEX_FORMAT, "files": {relpath: [1, 2, {"tests": []}]}}).encode(),
+        json.dumps({"format": redbar.INDEX_FORMAT, "durations": {"x": "slow"}}).encode(),
+    ):
+        cache_file.write_bytes(planted)
+        index = redbar.TestIndex(tmp_path, cache_file)
+        assert index.durations == {} and len(index.nodeids(relpath)) == 2 and index.reparsed == [relpath]
+    assert not pickle_bomb.marker.exists()
+
+
+def test_run_records_junit_durations(tmp_path, capsys):
+    relpath = _project(tmp_path)
+    cache_file = tmp_path / ".speckit-cache" / redbar.INDEX_FILE
+    index = redbar.TestIndex(tmp_path, cache_file)
+    nodeids = index.nodeids(relpath)
+
+    shards = redbar.plan_shards(nodeids, 2, {nodeids[1]: 5.0})
+    assert sorted(shards) == [[nodeid] for nodeid in nodeids]
+    assert redbar.run_shards(tmp_path, shards, [], index) == 0
+    assert "2 test(s) in 2 shard(s)" in capsys.readouterr().out
+    index.save()
+
+    durations = redbar.TestIndex(tmp_path, cache_file).durations
+    assert set(durations) == set(nodeids) and all(seconds >= 0.0 for seconds in durations.values())
+
+    (tmp_path / "helpers.py").write_text("VALUE = 2\n")
+    assert redbar.run_shards(tmp_path, [nodeids], [], index) == 1
+
+
+def test_changed_files_are_relative_to_a_nested_manifest(tmp_path):
+    root = tmp_path / "stacks" / "fraud"
+    relpath = _project(root)
+    (root / "project3.yaml").write_text("risks: {}\n")
+    (tmp_path / "README.md").write_text("outside the stack\n")
+    git = ["git", "-c", "user.name=t", "-c", "user.email=t@example.com"]
+    subprocess.run([*git, "init", "-q"], cwd=tmp_path, check=True)
+    subprocess.run([*git, "add", "-A"], cwd=tmp_path, check=True)
+    subprocess.run([*git, "commit", "-q", "-m", "base"], cwd=tmp_path, check=True)
+
+    (root / relpath).write_text(TEST_SOURCE.replace("assert True", "assert 1"))
+    (root / "helpers.py").write_text("VALUE = 1  # edited\n")
+    (root / "notes.md").write_text("untracked\n")
+    (tmp_path / "README.md").write_text("edited outside the stack\n")
+    assert redbar.changed_files(root, "HEAD") == ["helpers.py", "notes.md", relpath]
+
+    index = redbar.TestIndex(root, None)
+    selection = redbar.select_tests(
+        root, root / "project3.yaml", {}, redbar.DEFAULT_TESTS_DIR, redbar.changed_files(root, "HEAD"), "HEAD", index
+    )
+    assert selection.nodeids == index.nodeids(relpath)
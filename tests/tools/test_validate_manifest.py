@@ -0,0 +1,174 @@
+import json
+import pickle
+import shutil
+from pathlib import Path
+
+import pytest
+
+import validate_manifest as vm
+
+REPO_MANIFEST = Path(__file__).resolve().parents[2] / "project3.yaml"
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    path = tmp_path / "project3.yaml"
+    shutil.copy(REPO_MANIFEST, path)
+    return path
+
+
+def _edit(path, old, new):
+    text = path.read_text(encoding="utf-8")
+    assert old in text
+    path.write_text(text.replace(old, new), encoding="utf-8")
+
+
+def test_cache_is_json_and_skips_unchanged_sections(manifest):
+    cache_dir = manifest.parent / vm.CACHE_DIR_NAME
+    first = vm.validate_manifest_cached(manifest, True, cache_dir)
+    assert first.parsed and set(first.revalidated) == set(vm.SECTION_VALIDATORS)
+
+    (cache_file,) = cache_dir.iterdir()
+    assert cache_file.suffix == ".json"
+    assert json.loads(cache_file.read_text())["format"] == vm.CACHE_FORMAT
+
+    second = vm.validate_manifest_cached(manifest, True, cache_dir)
+    assert not second.parsed and second.revalidated == []
+    assert all(timing.cached for timing in second.timings.values())
+    assert second.issues == first.issues and second.refs == first.refs
+
+    _edit(manifest, 'uptime_slo: "99.9"', 'uptime_slo: "99.95"')
+    third = vm.validate_manifest_cached(manifest, True, cache_dir)
+    assert third.parsed and third.revalidated == ["observability"]
+    assert third.issues == first.issues
+
+
+def test_cache_never_unpickles(manifest, pickle_bomb):
+    cache_dir = manifest.parent / vm.CACHE_DIR_NAME
+    cache_file = vm._cache_file(cache_dir, manifest)
+    cache_dir.mkdir()
+    for planted in (
+        pickle.dumps({"format": vm.CACHE_FORMAT, "payload": pickle_bomb}),
+        b"{not json",
+        json.dumps({"format": vm.CACHE_FORMAT, "sections": {"project": 3}}).encode(),
+        json.dumps({"format": vm.CACHE_FORMAT - 1}).encode(),
+    ):
+        cache_file.write_bytes(planted)
+        run = vm.validate_manifest_cached(manifest, False, cache_dir)
+        assert run.parsed and set(run.revalidated) == set(vm.SECTION_VALIDATORS)
+        assert json.loads(cache_file.read_text())["format"] == vm.CACHE_FORMAT
+    assert not pickle_bomb.marker.exists()
+
+
+def test_watch_revalidates_edited_section(manifest, monkeypatch, capsys):
+    sleeps = []
+
+    def fake_sleep(interval):
+        sleeps.append(interval)
+        if len(sleeps) == 1:
+            _edit(manifest, "p95_latency_ms: 2000", "p95_latency_ms: 1500")
+        else:
+            raise KeyboardInterrupt
+
+    monkeypatch.setattr(vm.time, "sleep", fake_sleep)
+    vm.watch(manifest, True, manifest.parent / vm.CACHE_DIR_NAME, interval=0.01)
+
+    output = capsys.readouterr().out
+    assert output.count("-- watching") == 2
+    assert "-- re-checked sections: observability;" in output
+
+
+def test_json_and_sarif_reports(manifest, tmp_path):
+    _edit(manifest, 'tos_path: "policy/terms_of_service.md"', 'tos_path: ""')
+    run = vm.validate_manifest_cached(manifest, True, None)
+    assert run.issues
+
+    json_path = tmp_path / "reports" / "speckit_report.json"
+    vm.write_report(vm.json_report(run, manifest, True), json_path)
+    document = json.loads(json_path.read_text())
+    assert document["ok"] is False and document["summary"]["errors"] == 1
+    assert {row["validator"] for row in document["validators"]} == set(vm.SECTION_VALIDATORS)
+    assert [issue["location"] for issue in document["issues"] if issue["severity"] == "ERROR"] == ["policies.tos_path"]
+
+    sarif_path = tmp_path / "reports" / "speckit_report.sarif"
+    vm.write_report(vm.sarif_report([(manifest, run)]), sarif_path)
+    sarif = json.loads(sarif_path.read_text())
+    results = sarif["runs"][0]["results"]
+    assert sarif["version"] == "2.1.0" and len(results) == len(run.issues)
+    assert {"ruleId": "manifest/policies", "level": "error"}.items() <= next(
+        result for result in results if result["level"] == "error"
+    ).items()
+
+
+def _stack(root, name, edits=()):
+    path = root / "stacks" / name / "project3.yaml"
+    path.parent.mkdir(parents=True)
+    shutil.copy(REPO_MANIFEST, path)
+    for old, new in edits:
+        _edit(path, old, new)
+    return path
+
+
+def _consistency(batch):
+    return {path.parent.name: run.sections.get("consistency", []) for path, run in batch.runs}
+
+
+def test_tree_flags_minority_shared_reference(tmp_path):
+    _stack(tmp_path, "ca")
+    # Written differently but the same relative reference: not an inconsistency.
+    _stack(tmp_path, "in", [('"policy/terms_of_service.md"', '"./policy/terms_of_service.md"')])
+    _stack(tmp_path, "eu", [("policy/log_retention_policy.md", "policy/retention.md")])
+    _stack(tmp_path, ".archive", [("policy/log_retention_policy.md", "policy/old.md")])
+
+    batch = vm.validate_tree(tmp_path, vm.DEFAULT_GLOB, False, False, 1)
+    flagged = _consistency(batch)
+    assert set(flagged) == {"ca", "in", "eu"}, "Hidden directories must be skipped."
+    assert flagged["ca"] == flagged["in"] == []
+    (issue,) = flagged["eu"]
+    assert issue.severity == "WARN" and issue.location == "policies.log_policy_path"
+    assert "`policy/retention.md` here, but 2 of 3 manifests use `policy/log_retention_policy.md`" in issue.message
+    assert issue in batch.issues
+
+
+def test_tree_tie_flags_every_variant(tmp_path, monkeypatch, capsys):
+    _stack(tmp_path, "ca")
+    _stack(tmp_path, "in", [("policy/log_retention_policy.md", "policy/retention.md")])
+
+    flagged = _consistency(vm.validate_tree(tmp_path, "stacks/*/project3.yaml", False, False, 1))
+    assert [issue.location for issue in flagged["ca"]] == [issue.location for issue in flagged["in"]]
+    split = "no majority among 2 manifests (1 use `policy/log_retention_policy.md`, 1 use `policy/retention.md`)"
+    for issue in flagged["ca"] + flagged["in"]:
+        assert issue.location == "policies.log_policy_path" and split in issue.message
+
+    argv = ["validate_manifest.py", "--root", str(tmp_path), "--glob", "stacks/*/project3.yaml", "--processes", "1"]
+    monkeypatch.setattr(vm.sys, "argv", argv + ["--no-cache"])
+    with pytest.raises(SystemExit) as exited:
+        vm.main()
+    assert exited.value.code == 0, "Inconsistencies are warnings, not errors."
+    assert "Validated 2 manifest(s)" in capsys.readouterr().out
+
+
+def test_tree_stats_each_referenced_path_once(tmp_path, monkeypatch):
+    shared = tmp_path / "stacks" / "shared" / "log_retention_policy.md"
+    shared.parent.mkdir(parents=True)
+    shared.write_text("30 days\n")
+    pointer = ("policy/log_retention_policy.md", "../shared/log_retention_policy.md")
+    manifests = [_stack(tmp_path, name, [pointer]) for name in ("ca", "in")]
+
+    calls = []
+    stat_path = vm.stat_path
+
+    def counting_stat(path_str, base_dir):
+        calls.append(path_str)
+        return stat_path(path_str, base_dir)
+
+    monkeypatch.setattr(vm, "stat_path", counting_stat)
+    batch = vm.validate_tree(tmp_path, vm.DEFAULT_GLOB, True, False, 1)
+
+    assert len(calls) == len(set(calls)) == batch.paths_checked
+    assert calls.count(str(shared)) == 1, "A path shared by two manifests must be stat()ed once."
+    for manifest_path, run in batch.runs:
+        missing = {issue.location for issue in run.issues if "not found" in issue.message}
+        assert "policies.log_policy_path" not in missing and "policies.tos_path" in missing
+    assert [path for path, _ in batch.runs] == manifests
+    assert _consistency(batch) == {"ca": [], "in": []}
@@ -0,0 +1,542 @@
+#!/usr/bin/env python3
+"""
+Clause→test collector and change-based runner for the red-bar suite.
+
+Every test reference in project3.yaml (`clause_control_test.promises[].test`,
+`monetization.events[].acceptance_test`, `risks.high_risk_items[].associated_test`)
+is resolved against an AST index of the test files, so a reference to a
+function that does not exist is caught without importing or running anything.
+
+Usage:
+  uv run python tools/redbar.py check
+  uv run python tools/redbar.py select --diff origin/main
+  uv run python tools/redbar.py run --diff origin/main --workers 4
+  uv run python tools/redbar.py run --all --workers 4 -- --maxfail=1
+
+`select` and `run` pick the tests touched by a change set (`--diff REF` compares
+the working tree, including untracked files, against REF; `--changed` takes an
+explicit file list):
+
+- manifest entries whose content changed select their referenced test;
+- changed test functions are selected individually, while changes to module-level
+  code in a test file (helpers, fixtures, imports) select the whole file;
+- a changed repo module selects every test file that imports it, transitively;
+- a changed file mentioned by name in a manifest entry (e.g. a policy file in an
+  `enforcement_point`) selects that entry's test;
+- changes to conftest.py or the project's dependency files select everything.
+
+`run` shards the selection across worker processes, longest-first using the
+test durations recorded by earlier runs.
+
+The index (per-file test digests and imports, keyed by mtime and size) and the
+recorded durations are cached as JSON under .speckit-cache/ next to the manifest.
+"""
+from __future__ import annotations
+
+import argparse
+import ast
+import hashlib
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from validate_manifest import CACHE_DIR_NAME, Issue, load_manifest, read_json_cache, report, write_json_cache
+
+INDEX_FORMAT = 2
+INDEX_FILE = "redbar-index.json"
+DEFAULT_TESTS_DIR = "tests/redbar"
+# Changes to these re-run everything: they can alter any test's behaviour.
+RUN_ALL_FILES = {"conftest.py", "pyproject.toml", "uv.lock", "requirements.txt"}
+# Seconds assumed for a test with no recorded duration when balancing shards.
+DEFAULT_DURATION_S = 1.0
+
+
+@dataclass
+class TestRef:
+    location: str
+    nodeid: str
+    entry: Dict[str, Any]
+
+    @property
+    def file(self) -> str:
+        return self.nodeid.split("::", 1)[0]
+
+    @property
+    def name(self) -> str:
+        return self.nodeid.split("::", 1)[1] if "::" in self.nodeid else ""
+
+
+def manifest_test_refs(manifest: Dict[str, Any]) -> List[TestRef]:
+    """Test references in manifest order; structure errors are validate_manifest's job."""
+    sources = (
+        ("clause_control_test", "promises", "test"),
+        ("monetization", "events", "acceptance_test"),
+        ("risks", "high_risk_items", "associated_test"),
+    )
+    refs: List[TestRef] = []
+    for section, key, field_name in sources:
+        block = manifest.get(section)
+        entries = block.get(key) if isinstance(block, dict) else None
+        if not isinstance(entries, list):
+            continue
+        for idx, entry in enumerate(entries):
+            if isinstance(entry, dict) and isinstance(entry.get(field_name), str) and entry[field_name]:
+                refs.append(TestRef(f"{section}.{key}[{idx}].{field_name}", entry[field_name], entry))
+    return refs
+
+
+# -- AST index ---------------------------------------------------------------
+
+
+def _digest(node: Any) -> str:
+    text = node if isinstance(node, str) else ast.dump(node)
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+
+def _is_test_function(node: ast.AST) -> bool:
+    return isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name.startswith("test")
+
+
+def analyze_source(source: bytes, module: str) -> Dict[str, Any]:
+    """Test ids with a digest of each test's AST, a digest of everything else, and imports."""
+    tree = ast.parse(source)
+    tests: Dict[str, str] = {}
+    other: List[str] = []
+    for node in tree.body:
+        if _is_test_function(node):
+            tests[node.name] = _digest(node)
+        elif isinstance(node, ast.ClassDef) and node.name.startswith("Test"):
+            for item in node.body:
+                if _is_test_function(item):
+                    tests[f"{node.name}::{item.name}"] = _digest(item)
+                else:
+                    other.append(ast.dump(item))
+        else:
+            other.append(ast.dump(node))
+
+    imports: Set[str] = set()
+    package = module.rsplit(".", 1)[0] if "." in module else ""
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            imports.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                parts = package.split(".") if package else []
+                base = ".".join(parts[: len(parts) - node.level + 1] + ([node.module] if node.module else []))
+            else:
+                base = node.module or ""
+            if base:
+                imports.add(base)
+                imports.update(f"{base}.{alias.name}" for alias in node.names)
+    return {"tests": tests, "module_digest": _digest("\n".join(other)), "imports": sorted(imports)}
+
+
+def _module_name(relpath: str) -> str:
+    name = relpath[:-3].replace("/", ".")
+    return name[: -len(".__init__")] if name.endswith(".__init__") else name
+
+
+# (st_mtime_ns, st_size, analyze_source result or None when the file does not parse)
+FileEntry = Tuple[int, int, Optional[Dict[str, Any]]]
+
+
+class TestIndex:
+    """Cached per-file AST summaries, refreshed when a file's mtime or size changes."""
+
+    def __init__(self, root: Path, cache_file: Optional[Path]) -> None:
+        self.root = root
+        self.cache_file = cache_file
+        self._files: Dict[str, FileEntry] = {}
+        self.durations: Dict[str, float] = {}
+        self.reparsed: List[str] = []
+        if cache_file:
+            self._files, self.durations = _decode_index(read_json_cache(cache_file, INDEX_FORMAT))
+        self._dirty = False
+
+    def get(self, relpath: str) -> Optional[Dict[str, Any]]:
+        """Summary for a repo-relative .py file; None if missing or unparsable."""
+        path = self.root / relpath
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        cached = self._files.get(relpath)
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return cached[2]
+        try:
+            info: Optional[Dict[str, Any]] = analyze_source(path.read_bytes(), _module_name(relpath))
+        except (SyntaxError, ValueError):
+            info = None
+        self._files[relpath] = (st.st_mtime_ns, st.st_size, info)
+        self.reparsed.append(relpath)
+        self._dirty = True
+        return info
+
+    def test_files(self, tests_dir: str) -> List[str]:
+        base = self.root / tests_dir
+        return sorted(
+            path.relative_to(self.root).as_posix()
+            for path in base.rglob("test_*.py")
+            if "__pycache__" not in path.parts
+        )
+
+    def nodeids(self, relpath: str) -> List[str]:
+        info = self.get(relpath)
+        return [f"{relpath}::{name}" for name in info["tests"]] if info else []
+
+    def resolve_module(self, name: str) -> Optional[str]:
+        stem = name.replace(".", "/")
+        for candidate in (f"{stem}.py", f"{stem}/__init__.py"):
+            if (self.root / candidate).is_file():
+                return candidate
+        return None
+
+    def dependencies(self, relpath: str) -> Set[str]:
+        """Repo files imported by `relpath`, transitively (including itself)."""
+        seen = {relpath}
+        stack = [relpath]
+        while stack:
+            info = self.get(stack.pop())
+            if not info:
+                continue
+            for name in info["imports"]:
+                dep = self.resolve_module(name)
+                if dep and dep not in seen:
+                    seen.add(dep)
+                    stack.append(dep)
+        return seen
+
+    def record_durations(self, durations: Dict[str, float]) -> None:
+        self.durations.update(durations)
+        self._dirty = True
+
+    def save(self) -> None:
+        if self.cache_file and self._dirty:
+            write_json_cache(
+                self.cache_file,
+                {"format": INDEX_FORMAT, "files": self._files, "durations": self.durations},
+            )
+            self._dirty = False
+
+
+def _decode_index(cache: Dict[str, Any]) -> Tuple[Dict[str, FileEntry], Dict[str, float]]:
+    # JSON turns the (mtime, size, info) tuples into lists; anything malformed drops the whole index.
+    try:
+        files = {
+            str(relpath): (int(mtime_ns), int(size), None if info is None else _checked_info(info))
+            for relpath, (mtime_ns, size, info) in cache.get("files", {}).items()
+        }
+        durations = {str(nodeid): float(seconds) for nodeid, seconds in cache.get("durations", {}).items()}
+    except (AttributeError, TypeError, ValueError, KeyError):
+        return {}, {}
+    return files, durations
+
+
+def _checked_info(info: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "tests": {str(name): str(digest) for name, digest in info["tests"].items()},
+        "module_digest": str(info["module_digest"]),
+        "imports": [str(name) for name in info["imports"]],
+    }
+
+
+# -- check -------------------------------------------------------------------
+
+
+def check_refs(refs: List[TestRef], index: TestIndex, tests_dir: str) -> List[Issue]:
+    defined: Dict[str, List[str]] = {}
+    for relpath in index.test_files(tests_dir):
+        for nodeid in index.nodeids(relpath):
+            defined.setdefault(nodeid.split("::", 1)[1], []).append(relpath)
+
+    issues: List[Issue] = []
+    for ref in refs:
+        if not ref.name:
+            issues.append(Issue("ERROR", f"Expected a `path::test` reference, got `{ref.nodeid}`", ref.location))
+            continue
+        info = index.get(ref.file)
+        if info is not None and ref.name in info["tests"]:
+            continue
+        hint = ""
+        if ref.name in defined:
+            hint = f" (defined in {', '.join(defined[ref.name])})"
+        if not (index.root / ref.file).is_file():
+            issues.append(Issue("ERROR", f"Test file not found: {ref.file}{hint}", ref.location))
+        elif info is None:
+            issues.append(Issue("ERROR", f"Test file does not parse: {ref.file}", ref.location))
+        else:
+            issues.append(Issue("ERROR", f"Test `{ref.name}` not found in {ref.file}{hint}", ref.location))
+    return issues
+
+
+# -- change-based selection --------------------------------------------------
+
+
+@dataclass
+class Selection:
+    reasons: Dict[str, List[str]] = field(default_factory=dict)
+
+    def add(self, nodeids: Iterable[str], reason: str) -> None:
+        for nodeid in nodeids:
+            bucket = self.reasons.setdefault(nodeid, [])
+            if reason not in bucket:
+                bucket.append(reason)
+
+    @property
+    def nodeids(self) -> List[str]:
+        return sorted(self.reasons)
+
+
+def _git(root: Path, *args: str) -> Optional[bytes]:
+    result = subprocess.run(["git", *args], cwd=root, capture_output=True)
+    return result.stdout if result.returncode == 0 else None
+
+
+def changed_files(root: Path, base: str) -> List[str]:
+    """Files changed since `base` plus untracked ones, relative to `root` (which may be below the git top level)."""
+    diff = _git(root, "diff", "--name-only", "--relative", base, "--")
+    if diff is None:
+        raise SystemExit(f"git diff against `{base}` failed; is it a valid ref?")
+    untracked = _git(root, "ls-files", "--others", "--exclude-standard") or b""
+    names = diff.decode().splitlines() + untracked.decode().splitlines()
+    return sorted(set(name for name in names if name))
+
+
+def _base_analysis(root: Path, base: Optional[str], relpath: str) -> Optional[Dict[str, Any]]:
+    if base is None:
+        return None
+    source = _git(root, "show", f"{base}:{relpath}")
+    if source is None:
+        return None
+    try:
+        return analyze_source(source, _module_name(relpath))
+    except (SyntaxError, ValueError):
+        return None
+
+
+def select_tests(
+    root: Path,
+    manifest_path: Path,
+    manifest: Dict[str, Any],
+    tests_dir: str,
+    changed: List[str],
+    base: Optional[str],
+    index: TestIndex,
+) -> Selection:
+    selection = Selection()
+    refs = manifest_test_refs(manifest)
+    test_files = index.test_files(tests_dir)
+    manifest_rel = manifest_path.resolve().relative_to(root).as_posix()
+    changed_set = set(changed)
+
+    if any(Path(name).name in RUN_ALL_FILES for name in changed):
+        for relpath in test_files:
+            selection.add(index.nodeids(relpath), "project-wide change")
+        selection.add((ref.nodeid for ref in refs), "project-wide change")
+        return selection
+
+    # Manifest entries whose content changed (new entries count as changed).
+    if manifest_rel in changed_set:
+        old_refs: Dict[str, TestRef] = {}
+        old_source = _git(root, "show", f"{base}:{manifest_rel}") if base else None
+        if old_source is not None:
+            try:
+                old_refs = {ref.location: ref for ref in manifest_test_refs(load_manifest(old_source))}
+            except SystemExit:
+                old_refs = {}
+        for ref in refs:
+            old = old_refs.get(ref.location)
+            if old is None or old.entry != ref.entry:
+                selection.add([ref.nodeid], f"manifest entry {ref.location} changed")
+
+    for relpath in test_files:
+        if relpath not in changed_set:
+            continue
+        info = index.get(relpath)
+        old = _base_analysis(root, base, relpath)
+        if info is None or old is None or info["module_digest"] != old["module_digest"]:
+            selection.add(index.nodeids(relpath), f"{relpath} changed")
+            continue
+        for name, digest in info["tests"].items():
+            if old["tests"].get(name) != digest:
+                selection.add([f"{relpath}::{name}"], "test changed")
+
+    changed_modules = {name for name in changed if name.endswith(".py") and name not in test_files}
+    if changed_modules:
+        for relpath in test_files:
+            hit = sorted(index.dependencies(relpath) & changed_modules)
+            if hit:
+                selection.add(index.nodeids(relpath), f"imports {', '.join(hit)}")
+
+    # Non-code files (policies, specs) named in a manifest entry.
+    for name in changed:
+        if name.endswith(".py") or name == manifest_rel:
+            continue
+        basename = Path(name).name
+        for ref in refs:
+            if any(isinstance(value, str) and basename in value for value in ref.entry.values()):
+                selection.add([ref.nodeid], f"{name} referenced by {ref.location}")
+    return selection
+
+
+# -- sharded run -------------------------------------------------------------
+
+
+def plan_shards(nodeids: List[str], workers: int, durations: Dict[str, float]) -> List[List[str]]:
+    """Longest-processing-time-first assignment of tests to `workers` shards."""
+    known = sorted(durations[n] for n in nodeids if n in durations)
+    fallback = known[len(known) // 2] if known else DEFAULT_DURATION_S
+    shards: List[List[str]] = [[] for _ in range(max(1, min(workers, len(nodeids))))]
+    loads = [0.0] * len(shards)
+    for nodeid in sorted(nodeids, key=lambda n: (-durations.get(n, fallback), n)):
+        slot = loads.index(min(loads))
+        shards[slot].append(nodeid)
+        loads[slot] += durations.get(nodeid, fallback)
+    return [sorted(shard) for shard in shards if shard]
+
+
+def _junit_results(path: Path) -> Dict[str, Tuple[str, float]]:
+    results: Dict[str, Tuple[str, float]] = {}
+    try:
+        tree = ET.parse(path)
+    except (OSError, ET.ParseError):
+        return results
+    for case in tree.iter("testcase"):
+        classname = case.get("classname", "")
+        parts = classname.split(".")
+        # junit classname is dotted: tests.redbar.test_x[.TestClass]
+        module_parts = parts
+        class_name = ""
+        if parts and parts[-1].startswith("Test"):
+            module_parts, class_name = parts[:-1], parts[-1]
+        nodeid = "/".join(module_parts) + ".py::" + (f"{class_name}::" if class_name else "") + case.get("name", "")
+        outcome = "passed"
+        for child in case:
+            if child.tag in ("failure", "error"):
+                outcome = "failed"
+            elif child.tag == "skipped":
+                outcome = "skipped"
+        results[nodeid] = (outcome, float(case.get("time", 0.0)))
+    return results
+
+
+def run_shards(root: Path, shards: List[List[str]], pytest_args: List[str], index: TestIndex) -> int:
+    started = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix="redbar-") as tmp:
+        procs = []
+        for idx, shard in enumerate(shards):
+            junit = Path(tmp) / f"shard-{idx}.xml"
+            cmd = [
+                sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider",
+                f"--junitxml={junit}", *pytest_args, *shard,
+            ]
+            procs.append((idx, shard, junit, subprocess.Popen(
+                cmd, cwd=root, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+            )))
+
+        exit_code = 0
+        outcomes: Dict[str, Tuple[str, float]] = {}
+        for idx, shard, junit, proc in procs:
+            output, _ = proc.communicate()
+            print(f"== shard {idx + 1}/{len(shards)}: {len(shard)} test(s), exit {proc.returncode} ==")
+            print(output.rstrip())
+            # 5 = nothing collected, which only happens for an empty shard.
+            if proc.returncode not in (0, 5):
+                exit_code = 1
+            outcomes.update(_junit_results(junit))
+
+    index.record_durations({nodeid: seconds for nodeid, (_, seconds) in outcomes.items()})
+    counts: Dict[str, int] = {}
+    for outcome, _ in outcomes.values():
+        counts[outcome] = counts.get(outcome, 0) + 1
+    summary = ", ".join(f"{count} {outcome}" for outcome, count in sorted(counts.items())) or "no results"
+    print(f"\n{sum(len(s) for s in shards)} test(s) in {len(shards)} shard(s), "
+          f"{time.perf_counter() - started:.2f}s: {summary}.")
+    return exit_code
+
+
+# -- CLI ---------------------------------------------------------------------
+
+
+def _selection_from_args(args: argparse.Namespace, root: Path, manifest_path: Path,
+                         manifest: Dict[str, Any], index: TestIndex) -> Selection:
+    if args.all:
+        selection = Selection()
+        for relpath in index.test_files(args.tests_dir):
+            selection.add(index.nodeids(relpath), "--all")
+        return selection
+    if args.changed is not None:
+        changed = sorted(set(Path(name).as_posix() for name in args.changed))
+        base = args.diff
+    else:
+        base = args.diff or "HEAD"
+        changed = changed_files(root, base)
+    return select_tests(root, manifest_path, manifest, args.tests_dir, changed, base, index)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Resolve, select and run red-bar tests referenced by project3.yaml.")
+    parser.add_argument("--manifest", default="project3.yaml", help="Path to project3.yaml")
+    parser.add_argument("--tests-dir", default=DEFAULT_TESTS_DIR, help="Red-bar test directory, relative to the manifest")
+    parser.add_argument("--no-cache", action="store_true", help=f"Ignore and do not update {CACHE_DIR_NAME}/")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("check", help="Verify every manifest test reference resolves to a test function")
+    for name, help_text in (("select", "List tests affected by a change set"),
+                            ("run", "Run affected tests sharded across worker processes")):
+        sub = commands.add_parser(name, help=help_text)
+        sub.add_argument("--diff", metavar="REF", help="Compare the working tree against REF (default: HEAD)")
+        sub.add_argument("--changed", nargs="*", metavar="FILE", help="Explicit changed files (repo-relative)")
+        sub.add_argument("--all", action="store_true", help="Select every red-bar test")
+        if name == "run":
+            sub.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes (shards)")
+            sub.add_argument("pytest_args", nargs=argparse.REMAINDER, help="Extra pytest arguments after `--`")
+    args = parser.parse_args()
+
+    manifest_path = Path(args.manifest)
+    if not manifest_path.exists():
+        raise SystemExit(f"{manifest_path} not found.")
+    root = manifest_path.resolve().parent
+    manifest = load_manifest(manifest_path.read_bytes())
+    index = TestIndex(root, None if args.no_cache else root / CACHE_DIR_NAME / INDEX_FILE)
+
+    try:
+        if args.command == "check":
+            refs = manifest_test_refs(manifest)
+            issues = check_refs(refs, index, args.tests_dir)
+            if not issues:
+                print(f"{len(refs)} test reference(s) resolved.")
+            sys.exit(report(issues) if issues else 0)
+
+        selection = _selection_from_args(args, root, manifest_path, manifest, index)
+        if args.command == "select":
+            for nodeid in selection.nodeids:
+                print(f"{nodeid}  # {'; '.join(selection.reasons[nodeid])}")
+            return
+        if args.workers < 1:
+            raise SystemExit("--workers must be at least 1.")
+        runnable = []
+        for nodeid in selection.nodeids:
+            relpath, _, name = nodeid.partition("::")
+            info = index.get(relpath)
+            if info is not None and name in info["tests"]:
+                runnable.append(nodeid)
+            else:
+                print(f"skipping unresolved reference {nodeid} (see `redbar.py check`)")
+        pytest_args = [arg for arg in args.pytest_args if arg != "--"]
+        if not runnable:
+            print("No red-bar tests affected.")
+            return
+        shards = plan_shards(runnable, args.workers, index.durations)
+        sys.exit(run_shards(root, shards, pytest_args, index))
+    finally:
+        index.save()
+
+
+if __name__ == "__main__":
+    main()
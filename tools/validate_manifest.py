@@ -3,8 +3,28 @@
 Validate Project 3 manifest files (project3.yaml) for structural integrity.
 
 Usage:
-  uv run python projects/analysis/validate_project3_manifest.py --path project3.yaml
-  uv run python projects/analysis/validate_project3_manifest.py --path project3.yaml --check-paths
+  uv run python tools/validate_manifest.py --path project3.yaml
+  uv run python tools/validate_manifest.py --path project3.yaml --check-paths
+  uv run python tools/validate_manifest.py --path project3.yaml --check-paths --watch
+  uv run python tools/validate_manifest.py --path project3.yaml --check-paths --report reports/speckit_report.json
+  uv run python tools/validate_manifest.py --root stacks/ --check-paths --report reports/speckit_report.json
+
+Results are cached as JSON under .speckit-cache/ next to the manifest: each
+section's issues keyed by a hash of its YAML subtree, the manifest's content
+hash (an unchanged file is not even parsed), and referenced paths by their
+stat results. Only sections whose subtree changed are re-validated; pass
+--no-cache to validate from scratch.
+
+Stale sections are validated on a thread pool (--jobs) and every distinct
+referenced path is stat()ed once, concurrently. --report writes the issues plus
+per-validator timing as JSON, or as SARIF 2.1.0 when the path ends in .sarif.
+
+--root validates every manifest matching --glob below a directory in one
+interpreter: manifests are parsed and checked on a process pool, referenced
+paths are stat()ed once across all of them, and shared policy references
+(policies.*_path) that are written differently in different manifests are
+flagged: the manifests in the minority, or every manifest when no value has a
+majority.
 
 Install PyYAML if required:
   uv pip install pyyaml
@@ -12,10 +32,17 @@ Install PyYAML if required:
 from __future__ import annotations
 
 import argparse
+import hashlib
+import json
+import os
 import sys
-from dataclasses import dataclass
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import nullcontext
+from dataclasses import asdict, dataclass, field
+from functools import partial
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 try:
     import yaml  # type: ignore
@@ -24,6 +51,14 @@ except ImportError as exc:  # pragma: no cover - handled at runtime
         "PyYAML is required. Install with `uv pip install pyyaml` and re-run."
     ) from exc
 
+# The libyaml-backed loader is an order of magnitude faster when available.
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+CACHE_DIR_NAME = ".speckit-cache"
+CACHE_FORMAT = 3
+# Stat calls release the GIL, so threads pay off even on few cores (and on NFS).
+DEFAULT_JOBS = 8
+
 
 @dataclass
 class Issue:
@@ -35,6 +70,12 @@ class Issue:
         return f"[{self.severity}] {self.location}: {self.message}"
 
 
+# (path string as written in the manifest, location it was referenced from)
+PathRef = Tuple[str, str]
+# (exists, st_mtime_ns, st_size); None when the path could not be parsed
+PathStat = Optional[Tuple[bool, int, int]]
+
+
 def expect_dict(data: Dict[str, Any], key: str, location: str, issues: List[Issue]) -> Dict[str, Any]:
     value = data.get(key)
     if not isinstance(value, dict):
@@ -59,41 +100,56 @@ def expect_str(data: Dict[str, Any], key: str, location: str, issues: List[Issue
     return value
 
 
-def validate_paths(paths: Iterable[str], base_dir: Path, location: str, issues: List[Issue]) -> None:
-    for path_str in paths:
-        try:
-            if not path_str:
-                raise ValueError("empty path string")
-            candidate = (base_dir / Path(path_str)).resolve()
-        except Exception as exc:  # pragma: no cover - path parsing issue
-            issues.append(Issue("WARN", f"Could not parse path `{path_str}` ({exc})", location))
-            continue
-        if not candidate.exists():
-            issues.append(Issue("WARN", f"Referenced path not found: {path_str}", location))
+def stat_path(path_str: str, base_dir: Path) -> PathStat:
+    """Single stat() per reference; no resolve(), which walks every path component."""
+    if not path_str:
+        return None
+    try:
+        st = os.stat(os.path.join(base_dir, path_str))
+    except FileNotFoundError:
+        return (False, 0, 0)
+    except (OSError, ValueError):
+        return None
+    return (True, st.st_mtime_ns, st.st_size)
 
 
-def validate_manifest(manifest: Dict[str, Any], base_dir: Path, check_paths: bool) -> List[Issue]:
-    issues: List[Issue] = []
+def path_issue(path_str: str, stat: PathStat, location: str) -> Optional[Issue]:
+    if stat is None:
+        return Issue("WARN", f"Could not parse path `{path_str}`", location)
+    if not stat[0]:
+        return Issue("WARN", f"Referenced path not found: {path_str}", location)
+    return None
+
+
+# -- section validators ------------------------------------------------------
+#
+# Each validator reads only its own top-level key, appends structural issues and
+# records the paths it references. Path existence is checked separately so the
+# structural result depends on nothing but the section's YAML subtree.
 
+
+def validate_project(manifest: Dict[str, Any], issues: List[Issue], refs: List[PathRef]) -> None:
     project = expect_dict(manifest, "project", "project", issues)
-    if project:
-        expect_str(project, "title", "project.title", issues)
-        expect_str(project, "scenario", "project.scenario", issues)
-        team_members = project.get("team_members")
-        if not isinstance(team_members, list) or not team_members:
-            issues.append(Issue("ERROR", "Expected `team_members` to list at least one member", "project.team_members"))
-        else:
-            for idx, member in enumerate(team_members):
-                loc = f"project.team_members[{idx}]"
-                if not isinstance(member, dict):
-                    issues.append(Issue("ERROR", "Team member must be a mapping", loc))
-                    continue
-                expect_str(member, "name", f"{loc}.name", issues)
-                expect_str(member, "role", f"{loc}.role", issues)
-        if check_paths and "spec_iteration_notes" in project:
-            if isinstance(project["spec_iteration_notes"], str):
-                validate_paths([project["spec_iteration_notes"]], base_dir, "project.spec_iteration_notes", issues)
+    if not project:
+        return
+    expect_str(project, "title", "project.title", issues)
+    expect_str(project, "scenario", "project.scenario", issues)
+    team_members = project.get("team_members")
+    if not isinstance(team_members, list) or not team_members:
+        issues.append(Issue("ERROR", "Expected `team_members` to list at least one member", "project.team_members"))
+    else:
+        for idx, member in enumerate(team_members):
+            loc = f"project.team_members[{idx}]"
+            if not isinstance(member, dict):
+                issues.append(Issue("ERROR", "Team member must be a mapping", loc))
+                continue
+            expect_str(member, "name", f"{loc}.name", issues)
+            expect_str(member, "role", f"{loc}.role", issues)
+    if isinstance(project.get("spec_iteration_notes"), str):
+        refs.append((project["spec_iteration_notes"], "project.spec_iteration_notes"))
 
+
+def validate_speckit(manifest: Dict[str, Any], issues: List[Issue], refs: List[PathRef]) -> None:
     speckit = expect_dict(manifest, "speckit", "speckit", issues)
     if speckit:
         expect_str(speckit, "spec_root", "speckit.spec_root", issues)
@@ -101,121 +157,461 @@ def validate_manifest(manifest: Dict[str, Any], base_dir: Path, check_paths: boo
         expect_str(speckit, "validation_command", "speckit.validation_command", issues)
         expect_str(speckit, "last_validation", "speckit.last_validation", issues)
 
+
+def validate_clause_control_test(manifest: Dict[str, Any], issues: List[Issue], refs: List[PathRef]) -> None:
     cct = expect_dict(manifest, "clause_control_test", "clause_control_test", issues)
-    if cct:
-        promises = expect_list(cct, "promises", "clause_control_test.promises", issues)
-        for idx, item in enumerate(promises):
-            loc = f"clause_control_test.promises[{idx}]"
-            if not isinstance(item, dict):
-                issues.append(Issue("ERROR", "Each promise must be a mapping", loc))
-                continue
-            expect_str(item, "clause", f"{loc}.clause", issues)
-            expect_str(item, "control", f"{loc}.control", issues)
-            test_ref = expect_str(item, "test", f"{loc}.test", issues)
-            expect_str(item, "enforcement_point", f"{loc}.enforcement_point", issues)
-            if check_paths and test_ref:
-                # Convert pytest-style references `path::test` into file paths.
-                file_part = test_ref.split("::", 1)[0]
-                validate_paths([file_part], base_dir, loc, issues)
+    if not cct:
+        return
+    promises = expect_list(cct, "promises", "clause_control_test.promises", issues)
+    for idx, item in enumerate(promises):
+        loc = f"clause_control_test.promises[{idx}]"
+        if not isinstance(item, dict):
+            issues.append(Issue("ERROR", "Each promise must be a mapping", loc))
+            continue
+        expect_str(item, "clause", f"{loc}.clause", issues)
+        expect_str(item, "control", f"{loc}.control", issues)
+        test_ref = expect_str(item, "test", f"{loc}.test", issues)
+        expect_str(item, "enforcement_point", f"{loc}.enforcement_point", issues)
+        if test_ref:
+            # Convert pytest-style references `path::test` into file paths.
+            refs.append((test_ref.split("::", 1)[0], loc))
+
 
+def validate_monetization(manifest: Dict[str, Any], issues: List[Issue], refs: List[PathRef]) -> None:
     monetization = expect_dict(manifest, "monetization", "monetization", issues)
-    if monetization:
-        events = expect_list(monetization, "events", "monetization.events", issues)
-        for idx, event in enumerate(events):
-            loc = f"monetization.events[{idx}]"
-            if not isinstance(event, dict):
-                issues.append(Issue("ERROR", "Each monetization event must be a mapping", loc))
-                continue
-            expect_str(event, "name", f"{loc}.name", issues)
-            expect_str(event, "description", f"{loc}.description", issues)
-            revenue = event.get("projected_monthly_revenue")
-            if not isinstance(revenue, (int, float)):
-                issues.append(Issue("ERROR", "projected_monthly_revenue must be numeric", f"{loc}.projected_monthly_revenue"))
-            expect_str(event, "acceptance_test", f"{loc}.acceptance_test", issues)
-            if check_paths:
-                evidence = event.get("evidence_path")
-                if isinstance(evidence, str) and evidence:
-                    validate_paths([evidence], base_dir, loc, issues)
-        expect_str(monetization, "viability_statement", "monetization.viability_statement", issues)
+    if not monetization:
+        return
+    events = expect_list(monetization, "events", "monetization.events", issues)
+    for idx, event in enumerate(events):
+        loc = f"monetization.events[{idx}]"
+        if not isinstance(event, dict):
+            issues.append(Issue("ERROR", "Each monetization event must be a mapping", loc))
+            continue
+        expect_str(event, "name", f"{loc}.name", issues)
+        expect_str(event, "description", f"{loc}.description", issues)
+        revenue = event.get("projected_monthly_revenue")
+        if not isinstance(revenue, (int, float)):
+            issues.append(Issue("ERROR", "projected_monthly_revenue must be numeric", f"{loc}.projected_monthly_revenue"))
+        expect_str(event, "acceptance_test", f"{loc}.acceptance_test", issues)
+        evidence = event.get("evidence_path")
+        if isinstance(evidence, str) and evidence:
+            refs.append((evidence, loc))
+    expect_str(monetization, "viability_statement", "monetization.viability_statement", issues)
+
+
+POLICY_KEYS = ("tos_path", "privacy_path", "dns_policy_path", "log_policy_path", "data_policy_path")
+
 
+def validate_policies(manifest: Dict[str, Any], issues: List[Issue], refs: List[PathRef]) -> None:
     policies = expect_dict(manifest, "policies", "policies", issues)
-    policy_paths: List[str] = []
     if policies:
-        for key in ("tos_path", "privacy_path", "dns_policy_path", "log_policy_path", "data_policy_path"):
+        for key in POLICY_KEYS:
             path_value = expect_str(policies, key, f"policies.{key}", issues)
             if path_value:
-                policy_paths.append(path_value)
+                refs.append((path_value, f"policies.{key}"))
 
-    observability = expect_dict(manifest, "observability", "observability", issues)
-    if observability:
-        expect_str(observability, "uptime_slo", "observability.uptime_slo", issues)
-        latency = observability.get("p95_latency_ms")
-        if not isinstance(latency, (int, float)):
-            issues.append(Issue("ERROR", "p95_latency_ms must be numeric", "observability.p95_latency_ms"))
-        stack = observability.get("monitoring_stack")
-        if not isinstance(stack, list) or not stack:
-            issues.append(Issue("ERROR", "monitoring_stack must list tools/services", "observability.monitoring_stack"))
-        if check_paths:
-            chaos_path = observability.get("chaos_experiment_summary")
-            if isinstance(chaos_path, str) and chaos_path:
-                validate_paths([chaos_path], base_dir, "observability.chaos_experiment_summary", issues)
 
+def validate_observability(manifest: Dict[str, Any], issues: List[Issue], refs: List[PathRef]) -> None:
+    observability = expect_dict(manifest, "observability", "observability", issues)
+    if not observability:
+        return
+    expect_str(observability, "uptime_slo", "observability.uptime_slo", issues)
+    latency = observability.get("p95_latency_ms")
+    if not isinstance(latency, (int, float)):
+        issues.append(Issue("ERROR", "p95_latency_ms must be numeric", "observability.p95_latency_ms"))
+    stack = observability.get("monitoring_stack")
+    if not isinstance(stack, list) or not stack:
+        issues.append(Issue("ERROR", "monitoring_stack must list tools/services", "observability.monitoring_stack"))
+    chaos_path = observability.get("chaos_experiment_summary")
+    if isinstance(chaos_path, str) and chaos_path:
+        refs.append((chaos_path, "observability.chaos_experiment_summary"))
+
+
+def validate_ai_usage(manifest: Dict[str, Any], issues: List[Issue], refs: List[PathRef]) -> None:
     ai_usage = expect_dict(manifest, "ai_usage", "ai_usage", issues)
-    if ai_usage:
-        tools = ai_usage.get("tools")
-        if not isinstance(tools, list) or not tools:
-            issues.append(Issue("ERROR", "tools must be a non-empty list", "ai_usage.tools"))
-        doc_path = expect_str(ai_usage, "documentation_path", "ai_usage.documentation_path", issues)
-        expect_str(ai_usage, "review_cadence", "ai_usage.review_cadence", issues)
-        if check_paths and doc_path:
-            validate_paths([doc_path], base_dir, "ai_usage.documentation_path", issues)
-
+    if not ai_usage:
+        return
+    tools = ai_usage.get("tools")
+    if not isinstance(tools, list) or not tools:
+        issues.append(Issue("ERROR", "tools must be a non-empty list", "ai_usage.tools"))
+    doc_path = expect_str(ai_usage, "documentation_path", "ai_usage.documentation_path", issues)
+    expect_str(ai_usage, "review_cadence", "ai_usage.review_cadence", issues)
+    if doc_path:
+        refs.append((doc_path, "ai_usage.documentation_path"))
+
+
+def validate_risks(manifest: Dict[str, Any], issues: List[Issue], refs: List[PathRef]) -> None:
     risks = manifest.get("risks")
-    if isinstance(risks, dict):
-        ledger = risks.get("ledger_snapshot")
-        if ledger and check_paths and isinstance(ledger, str):
-            validate_paths([ledger], base_dir, "risks.ledger_snapshot", issues)
-        high_risk = risks.get("high_risk_items")
-        if isinstance(high_risk, list):
-            for idx, item in enumerate(high_risk):
-                loc = f"risks.high_risk_items[{idx}]"
-                if not isinstance(item, dict):
-                    issues.append(Issue("ERROR", "Risk entries must be mappings", loc))
-                    continue
-                expect_str(item, "description", f"{loc}.description", issues)
-                expect_str(item, "mitigation", f"{loc}.mitigation", issues)
-                expect_str(item, "associated_test", f"{loc}.associated_test", issues)
-
-    if check_paths and policy_paths:
-        validate_paths(policy_paths, base_dir, "policies", issues)
+    if not isinstance(risks, dict):
+        return
+    ledger = risks.get("ledger_snapshot")
+    if ledger and isinstance(ledger, str):
+        refs.append((ledger, "risks.ledger_snapshot"))
+    high_risk = risks.get("high_risk_items")
+    if isinstance(high_risk, list):
+        for idx, item in enumerate(high_risk):
+            loc = f"risks.high_risk_items[{idx}]"
+            if not isinstance(item, dict):
+                issues.append(Issue("ERROR", "Risk entries must be mappings", loc))
+                continue
+            expect_str(item, "description", f"{loc}.description", issues)
+            expect_str(item, "mitigation", f"{loc}.mitigation", issues)
+            expect_str(item, "associated_test", f"{loc}.associated_test", issues)
+
+
+SectionValidator = Callable[[Dict[str, Any], List[Issue], List[PathRef]], None]
+
+SECTION_VALIDATORS: Dict[str, SectionValidator] = {
+    "project": validate_project,
+    "speckit": validate_speckit,
+    "clause_control_test": validate_clause_control_test,
+    "monetization": validate_monetization,
+    "policies": validate_policies,
+    "observability": validate_observability,
+    "ai_usage": validate_ai_usage,
+    "risks": validate_risks,
+}
+
 
+def validate_section(name: str, manifest: Dict[str, Any]) -> Tuple[List[Issue], List[PathRef]]:
+    issues: List[Issue] = []
+    refs: List[PathRef] = []
+    SECTION_VALIDATORS[name](manifest, issues, refs)
+    return issues, refs
+
+
+def check_refs(refs: List[PathRef], stats: Dict[str, PathStat]) -> List[Issue]:
+    issues = []
+    for path_str, location in refs:
+        issue = path_issue(path_str, stats[path_str], location)
+        if issue:
+            issues.append(issue)
     return issues
 
 
-def main() -> None:
-    parser = argparse.ArgumentParser(description="Validate a Project 3 manifest (YAML).")
-    parser.add_argument("--path", required=True, help="Path to project3.yaml")
-    parser.add_argument("--check-paths", action="store_true", help="Verify referenced files exist on disk")
-    args = parser.parse_args()
+def validate_manifest(
+    manifest: Dict[str, Any],
+    base_dir: Path,
+    check_paths: bool,
+    executor: Optional[Executor] = None,
+) -> List[Issue]:
+    names = list(SECTION_VALIDATORS)
+    results = _map(executor, partial(validate_section, manifest=manifest), names)
+    stats = stat_paths([refs for _, refs in results], base_dir, executor) if check_paths else {}
+    issues: List[Issue] = []
+    for section_issues, refs in results:
+        issues.extend(section_issues)
+        if check_paths:
+            issues.extend(check_refs(refs, stats))
+    return issues
 
-    manifest_path = Path(args.path)
-    if not manifest_path.exists():
-        raise SystemExit(f"{manifest_path} not found.")
 
+def _map(executor: Optional[Executor], fn: Callable[[Any], Any], items: List[Any]) -> List[Any]:
+    if executor is None or len(items) < 2:
+        return [fn(item) for item in items]
+    return list(executor.map(fn, items))
+
+
+def stat_paths(ref_lists: List[List[PathRef]], base_dir: Path, executor: Optional[Executor]) -> Dict[str, PathStat]:
+    """Stat every distinct referenced path once, concurrently when an executor is given."""
+    unique = list(dict.fromkeys(path_str for refs in ref_lists for path_str, _ in refs))
+    return dict(zip(unique, _map(executor, partial(stat_path, base_dir=base_dir), unique)))
+
+
+# -- cached, incremental validation -------------------------------------------
+
+
+@dataclass
+class ValidatorTiming:
+    seconds: float = 0.0
+    cached: bool = False
+
+
+@dataclass
+class ValidationRun:
+    issues: List[Issue]
+    watched_paths: List[Path]
+    revalidated: List[str] = field(default_factory=list)
+    changed_paths: List[str] = field(default_factory=list)
+    parsed: bool = False
+    # Issues (structural and path) grouped by the section validator that raised them.
+    sections: Dict[str, List[Issue]] = field(default_factory=dict)
+    refs: Dict[str, List[PathRef]] = field(default_factory=dict)
+    timings: Dict[str, ValidatorTiming] = field(default_factory=dict)
+    paths_checked: int = 0
+    stat_seconds: float = 0.0
+    total_seconds: float = 0.0
+
+
+def load_manifest(raw: bytes) -> Dict[str, Any]:
     try:
-        manifest_data = yaml.safe_load(manifest_path.read_text(encoding="utf-8"))
+        manifest_data = yaml.load(raw, Loader=_YamlLoader)
     except yaml.YAMLError as exc:
         raise SystemExit(f"Failed to parse YAML: {exc}") from exc
-
     if not isinstance(manifest_data, dict):
         raise SystemExit("Manifest root must be a mapping.")
+    return manifest_data
+
 
+def _cache_file(cache_dir: Path, manifest_path: Path) -> Path:
+    key = hashlib.sha256(str(manifest_path.resolve()).encode("utf-8")).hexdigest()[:16]
+    return cache_dir / f"manifest-{key}.json"
+
+
+def read_json_cache(cache_file: Path, cache_format: int) -> Dict[str, Any]:
+    """
+    A cache written by `write_json_cache`, or {} if it is missing, unreadable
+    or another format. Caches are plain JSON, never pickle: a file dropped
+    into .speckit-cache/ can at worst be ignored, not executed.
+    """
+    try:
+        cache = json.loads(cache_file.read_bytes())
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(cache, dict) or cache.get("format") != cache_format:
+        return {}
+    return cache
+
+
+def write_json_cache(cache_file: Path, cache: Dict[str, Any]) -> None:
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp = cache_file.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(cache, separators=(",", ":")), encoding="utf-8")
+    os.replace(tmp, cache_file)
+
+
+def _decode_cache(cache: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, PathStat]]:
+    # JSON has no tuples or Issues: rebuild them, and drop the whole cache if anything is malformed.
+    try:
+        sections = {
+            name: (subtree, [Issue(**issue) for issue in issues], [(path_str, location) for path_str, location in refs])
+            for name, (subtree, issues, refs) in cache.get("sections", {}).items()
+        }
+        stats = {
+            path_str: None if stat is None else (bool(stat[0]), int(stat[1]), int(stat[2]))
+            for path_str, stat in cache.get("stats", {}).items()
+        }
+    except (AttributeError, TypeError, ValueError, IndexError):
+        return {}, {}
+    return sections, stats
+
+
+def _subtree_digest(manifest: Dict[str, Any], name: str) -> str:
+    return hashlib.sha256(repr(manifest.get(name)).encode("utf-8")).hexdigest()
+
+
+def _timed_section(name: str, manifest: Dict[str, Any]) -> Tuple[List[Issue], List[PathRef], float]:
+    start = time.perf_counter()
+    issues, refs = validate_section(name, manifest)
+    return issues, refs, time.perf_counter() - start
+
+
+def validate_manifest_cached(
+    manifest_path: Path,
+    check_paths: bool,
+    cache_dir: Optional[Path],
+    executor: Optional[Executor] = None,
+) -> ValidationRun:
+    started = time.perf_counter()
+    raw = manifest_path.read_bytes()
+    digest = hashlib.sha256(raw).hexdigest()
     base_dir = manifest_path.resolve().parent
-    issues = validate_manifest(manifest_data, base_dir, args.check_paths)
+    cache_file = _cache_file(cache_dir, manifest_path) if cache_dir else None
+    cache = read_json_cache(cache_file, CACHE_FORMAT) if cache_file else {}
+    cached_sections, cached_stats = _decode_cache(cache)
+
+    # The manifest itself is not cached: an unchanged file with every section cached needs no parse.
+    unchanged = cache.get("manifest_sha256") == digest
+    fully_cached = unchanged and all(name in cached_sections for name in SECTION_VALIDATORS)
+    manifest = {} if fully_cached else load_manifest(raw)
+    run = ValidationRun(issues=[], watched_paths=[manifest_path], parsed=not fully_cached)
+    sections: Dict[str, Any] = {}
+    stats: Dict[str, PathStat] = {}
+
+    pending: List[Tuple[str, str]] = []
+    for name in SECTION_VALIDATORS:
+        previous = cached_sections.get(name)
+        subtree = previous[0] if unchanged and previous else _subtree_digest(manifest, name)
+        if previous and previous[0] == subtree:
+            sections[name] = previous
+            run.timings[name] = ValidatorTiming(cached=True)
+        else:
+            pending.append((name, subtree))
+
+    # Validators only read their own subtree, so stale sections run side by side.
+    results = _map(executor, lambda item: _timed_section(item[0], manifest), pending)
+    for (name, subtree), (section_issues, refs, elapsed) in zip(pending, results):
+        sections[name] = (subtree, section_issues, refs)
+        run.timings[name] = ValidatorTiming(seconds=elapsed)
+        run.revalidated.append(name)
+
+    if check_paths:
+        stat_start = time.perf_counter()
+        stats = stat_paths([sections[name][2] for name in SECTION_VALIDATORS], base_dir, executor)
+        run.stat_seconds = time.perf_counter() - stat_start
+        run.paths_checked = len(stats)
+        for path_str, stat in stats.items():
+            if stat is not None:
+                run.watched_paths.append(base_dir / path_str)
+            if path_str in cached_stats and cached_stats[path_str] != stat:
+                run.changed_paths.append(path_str)
+
+    for name in SECTION_VALIDATORS:
+        _, section_issues, refs = sections[name]
+        found = list(section_issues)
+        if check_paths:
+            found.extend(check_refs(refs, stats))
+        run.sections[name] = found
+        run.refs[name] = refs
+        run.issues.extend(found)
+
+    if cache_file:
+        updated_stats = stats if check_paths else cached_stats
+        if run.revalidated or updated_stats != cached_stats or not unchanged:
+            document = {
+                "format": CACHE_FORMAT,
+                "manifest_sha256": digest,
+                "sections": {
+                    name: [subtree, [asdict(issue) for issue in section_issues], refs]
+                    for name, (subtree, section_issues, refs) in sections.items()
+                },
+                "stats": updated_stats,
+            }
+            write_json_cache(cache_file, document)
+    run.total_seconds = time.perf_counter() - started
+    return run
+
+
+# -- multi-manifest batches ---------------------------------------------------
+
+DEFAULT_GLOB = "**/project3.yaml"
+# References every stack is expected to share; a manifest pointing elsewhere is flagged.
+SHARED_REFERENCES = tuple(f"policies.{key}" for key in POLICY_KEYS)
+
+
+@dataclass
+class BatchRun:
+    root: Path
+    runs: List[Tuple[Path, ValidationRun]]
+    paths_checked: int = 0
+    stat_seconds: float = 0.0
+    total_seconds: float = 0.0
+
+    @property
+    def issues(self) -> List[Issue]:
+        return [issue for _, run in self.runs for issue in run.issues]
+
+
+def find_manifests(root: Path, pattern: str) -> List[Path]:
+    """Manifests under `root` matching `pattern`, skipping hidden directories."""
+    return sorted(
+        path
+        for path in root.glob(pattern)
+        if path.is_file() and not any(part.startswith(".") for part in path.relative_to(root).parts[:-1])
+    )
 
+
+def _ref_key(base_dir: Path, path_str: str) -> str:
+    return os.path.normpath(os.path.join(base_dir, path_str))
+
+
+def _validate_structure(manifest_path: Path, use_cache: bool) -> ValidationRun:
+    # Runs in a worker process: parse + structural checks only. Paths are
+    # stat()ed once in the parent so overlapping references share one lookup.
+    cache_dir = manifest_path.resolve().parent / CACHE_DIR_NAME if use_cache else None
+    try:
+        return validate_manifest_cached(manifest_path, False, cache_dir)
+    except (SystemExit, OSError) as exc:
+        issue = Issue("ERROR", str(exc), "manifest")
+        return ValidationRun(issues=[issue], watched_paths=[manifest_path], sections={"manifest": [issue]})
+
+
+def consistency_issues(runs: List[Tuple[Path, ValidationRun]]) -> Dict[Path, List[Issue]]:
+    """
+    Flag manifests whose shared references differ from the others'. Values are
+    compared as written (normalized), not resolved per manifest directory: two
+    projects both pointing at their own `policies/privacy.md` agree.
+    """
+    values: Dict[str, Dict[str, List[Path]]] = {}
+    for manifest_path, run in runs:
+        for refs in run.refs.values():
+            for path_str, location in refs:
+                if location in SHARED_REFERENCES:
+                    values.setdefault(location, {}).setdefault(os.path.normpath(path_str), []).append(manifest_path)
+
+    flagged: Dict[Path, List[Issue]] = {}
+    for location, by_value in values.items():
+        if len(by_value) < 2:
+            continue
+        ranked = sorted(by_value.items(), key=lambda item: (-len(item[1]), item[0]))
+        total = sum(len(manifests) for manifests in by_value.values())
+        majority, majority_manifests = ranked[0]
+        if len(ranked[1][1]) == len(majority_manifests):
+            # A tie has no majority to side with, so every variant is reported.
+            split = ", ".join(f"{len(manifests)} use `{value}`" for value, manifests in ranked)
+            context = f"no majority among {total} manifests ({split})"
+            outliers = [(value, manifests, context) for value, manifests in ranked]
+        else:
+            context = f"{len(majority_manifests)} of {total} manifests use `{majority}`"
+            outliers = [(value, manifests, context) for value, manifests in ranked[1:]]
+        for value, manifests, context in outliers:
+            message = f"Inconsistent across manifests: `{value}` here, but {context}"
+            for manifest_path in manifests:
+                flagged.setdefault(manifest_path, []).append(Issue("WARN", message, location))
+    return flagged
+
+
+def validate_tree(
+    root: Path,
+    pattern: str,
+    check_paths: bool,
+    use_cache: bool,
+    processes: int,
+    executor: Optional[Executor] = None,
+) -> BatchRun:
+    started = time.perf_counter()
+    manifests = find_manifests(root, pattern)
+    worker = partial(_validate_structure, use_cache=use_cache)
+    if processes > 1 and len(manifests) > 1:
+        workers = min(processes, len(manifests))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            runs = list(pool.map(worker, manifests, chunksize=max(1, len(manifests) // (workers * 4))))
+    else:
+        runs = [worker(path) for path in manifests]
+    batch = BatchRun(root, list(zip(manifests, runs)))
+
+    if check_paths:
+        bases = {manifest_path: manifest_path.resolve().parent for manifest_path in manifests}
+        keys = list(dict.fromkeys(
+            _ref_key(bases[manifest_path], path_str)
+            for manifest_path, run in batch.runs
+            for refs in run.refs.values()
+            for path_str, _ in refs
+        ))
+        stat_start = time.perf_counter()
+        stats = dict(zip(keys, _map(executor, partial(stat_path, base_dir=root), keys)))
+        batch.stat_seconds = time.perf_counter() - stat_start
+        batch.paths_checked = len(stats)
+        for manifest_path, run in batch.runs:
+            for name, refs in run.refs.items():
+                for path_str, location in refs:
+                    issue = path_issue(path_str, stats[_ref_key(bases[manifest_path], path_str)], location)
+                    if issue:
+                        run.sections[name].append(issue)
+
+    runs_by_path = dict(batch.runs)
+    for manifest_path, issues in consistency_issues(batch.runs).items():
+        runs_by_path[manifest_path].sections["consistency"] = issues
+    for _, run in batch.runs:
+        run.issues = [issue for issues in run.sections.values() for issue in issues]
+    batch.total_seconds = time.perf_counter() - started
+    return batch
+
+
+def report(issues: List[Issue]) -> int:
     if not issues:
         print("Manifest OK ✓")
-        sys.exit(0)
+        return 0
 
     for issue in issues:
         print(issue)
@@ -223,9 +619,225 @@ def main() -> None:
     error_count = sum(1 for issue in issues if issue.severity == "ERROR")
     warn_count = len(issues) - error_count
     print(f"\nSummary: {error_count} error(s), {warn_count} warning(s).")
+    return 1 if error_count > 0 else 0
+
+
+def report_batch(batch: BatchRun) -> int:
+    for manifest_path, run in batch.runs:
+        for issue in run.issues:
+            print(f"{manifest_path}: {issue}")
+
+    issues = batch.issues
+    error_count = sum(1 for issue in issues if issue.severity == "ERROR")
+    warn_count = len(issues) - error_count
+    print(
+        f"\nValidated {len(batch.runs)} manifest(s) under {batch.root} in {batch.total_seconds:.2f}s: "
+        f"{error_count} error(s), {warn_count} warning(s)."
+    )
+    return 1 if error_count > 0 else 0
+
+
+# -- machine-readable reports ------------------------------------------------
+
+REPORT_FORMATS = ("json", "sarif")
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+_SARIF_LEVELS = {"ERROR": "error", "WARN": "warning"}
+
+
+def _timing_rows(run: ValidationRun) -> List[Dict[str, Any]]:
+    return [
+        {
+            "validator": name,
+            "duration_ms": round(timing.seconds * 1000, 3),
+            "cached": timing.cached,
+            "issues": len(run.sections.get(name, [])),
+        }
+        for name, timing in run.timings.items()
+    ]
+
+
+def _summary(issues: List[Issue]) -> Dict[str, Any]:
+    error_count = sum(1 for issue in issues if issue.severity == "ERROR")
+    return {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "ok": error_count == 0,
+        "summary": {"errors": error_count, "warnings": len(issues) - error_count},
+    }
+
+
+def json_report(run: ValidationRun, manifest_path: Path, check_paths: bool) -> Dict[str, Any]:
+    return {
+        "manifest": str(manifest_path),
+        **_summary(run.issues),
+        "check_paths": check_paths,
+        "duration_ms": round(run.total_seconds * 1000, 3),
+        "path_stats": {"paths": run.paths_checked, "duration_ms": round(run.stat_seconds * 1000, 3)},
+        "validators": _timing_rows(run),
+        "issues": [
+            {"validator": name, **asdict(issue)}
+            for name, issues in run.sections.items()
+            for issue in issues
+        ],
+    }
+
+
+def json_batch_report(batch: BatchRun, check_paths: bool) -> Dict[str, Any]:
+    return {
+        "root": str(batch.root),
+        **_summary(batch.issues),
+        "check_paths": check_paths,
+        "duration_ms": round(batch.total_seconds * 1000, 3),
+        "path_stats": {"paths": batch.paths_checked, "duration_ms": round(batch.stat_seconds * 1000, 3)},
+        "manifests": [json_report(run, manifest_path, check_paths) for manifest_path, run in batch.runs],
+    }
+
+
+def sarif_report(runs: List[Tuple[Path, ValidationRun]]) -> Dict[str, Any]:
+    results = [
+        {
+            "ruleId": f"manifest/{name}",
+            "level": _SARIF_LEVELS.get(issue.severity, "note"),
+            "message": {"text": issue.message},
+            "locations": [
+                {
+                    "physicalLocation": {"artifactLocation": {"uri": manifest_path.as_posix()}},
+                    "logicalLocations": [{"fullyQualifiedName": issue.location}],
+                }
+            ],
+        }
+        for manifest_path, run in runs
+        for name, issues in run.sections.items()
+        for issue in issues
+    ]
+    rule_ids = list(SECTION_VALIDATORS) + ["consistency", "manifest"]
+    return {
+        "$schema": SARIF_SCHEMA,
+        "version": "2.1.0",
+        "runs": [
+            {
+                "tool": {
+                    "driver": {
+                        "name": "validate_manifest",
+                        "rules": [{"id": f"manifest/{name}"} for name in rule_ids],
+                    }
+                },
+                "invocations": [
+                    {
+                        "executionSuccessful": True,
+                        "properties": {
+                            "manifests": [
+                                {"manifest": manifest_path.as_posix(), "validators": _timing_rows(run)}
+                                for manifest_path, run in runs
+                            ]
+                        },
+                    }
+                ],
+                "results": results,
+            }
+        ],
+    }
+
+
+def write_report(document: Dict[str, Any], report_path: Path) -> None:
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    report_path.write_text(json.dumps(document, indent=2) + "\n", encoding="utf-8")
+
+
+def _signature(paths: List[Path]) -> List[Optional[Tuple[int, int]]]:
+    signature: List[Optional[Tuple[int, int]]] = []
+    for path in paths:
+        try:
+            st = path.stat()
+        except OSError:
+            signature.append(None)
+            continue
+        signature.append((st.st_mtime_ns, st.st_size))
+    return signature
+
+
+def watch(
+    manifest_path: Path,
+    check_paths: bool,
+    cache_dir: Optional[Path],
+    interval: float,
+    executor: Optional[Executor] = None,
+) -> None:
+    """Re-validate whenever the manifest or a referenced path changes (Ctrl-C to stop)."""
+    while True:
+        try:
+            run = validate_manifest_cached(manifest_path, check_paths, cache_dir, executor)
+            report(run.issues)
+            if run.revalidated or run.changed_paths:
+                print(f"-- re-checked sections: {', '.join(run.revalidated) or 'none'}; "
+                      f"changed paths: {', '.join(run.changed_paths) or 'none'}")
+            watched = run.watched_paths
+        except SystemExit as exc:  # YAML errors: report and wait for the next edit
+            print(exc)
+            watched = [manifest_path]
+        print(f"-- watching {len(watched)} path(s), last run {time.strftime('%H:%M:%S')}")
+        baseline = _signature(watched)
+        try:
+            while _signature(watched) == baseline:
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            return
+
+
+def _executor(jobs: int) -> Any:
+    return ThreadPoolExecutor(max_workers=jobs) if jobs > 1 else nullcontext()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Validate a Project 3 manifest (YAML).")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--path", help="Path to project3.yaml")
+    target.add_argument("--root", type=Path, help="Validate every manifest under this directory")
+    parser.add_argument("--glob", default=DEFAULT_GLOB, help=f"Manifest pattern for --root (default: {DEFAULT_GLOB})")
+    parser.add_argument("--check-paths", action="store_true", help="Verify referenced files exist on disk")
+    parser.add_argument("--watch", action="store_true", help="Re-validate whenever the manifest or referenced files change")
+    parser.add_argument("--interval", type=float, default=0.5, help="Polling interval in seconds for --watch")
+    parser.add_argument("--no-cache", action="store_true", help=f"Ignore and do not update {CACHE_DIR_NAME}/")
+    parser.add_argument("--jobs", type=int, default=DEFAULT_JOBS, help="Worker threads for validators and path stats (1 = serial)")
+    parser.add_argument("--report", type=Path, help="Write a machine-readable report, e.g. reports/speckit_report.json")
+    parser.add_argument("--report-format", choices=REPORT_FORMATS, help="Report format (default: sarif for *.sarif, else json)")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1, help="Worker processes for --root (1 = in-process)")
+    args = parser.parse_args()
+    if args.jobs < 1 or args.processes < 1:
+        raise SystemExit("--jobs and --processes must be at least 1.")
+    fmt = None
+    if args.report:
+        fmt = args.report_format or ("sarif" if args.report.suffix == ".sarif" else "json")
+
+    if args.root is not None:
+        if args.watch:
+            raise SystemExit("--watch takes a single --path.")
+        if not args.root.is_dir():
+            raise SystemExit(f"{args.root} is not a directory.")
+        with _executor(args.jobs) as executor:
+            batch = validate_tree(args.root, args.glob, args.check_paths, not args.no_cache, args.processes, executor)
+        if not batch.runs:
+            raise SystemExit(f"No manifests matching `{args.glob}` under {args.root}.")
+        if args.report:
+            document = sarif_report(batch.runs) if fmt == "sarif" else json_batch_report(batch, args.check_paths)
+            write_report(document, args.report)
+        sys.exit(report_batch(batch))
+
+    manifest_path = Path(args.path)
+    if not manifest_path.exists():
+        raise SystemExit(f"{manifest_path} not found.")
 
-    if error_count > 0:
-        sys.exit(1)
+    cache_dir = None if args.no_cache else manifest_path.resolve().parent / CACHE_DIR_NAME
+    if args.watch:
+        with _executor(args.jobs) as executor:
+            watch(manifest_path, args.check_paths, cache_dir, args.interval, executor)
+        return
+
+    with _executor(args.jobs) as executor:
+        run = validate_manifest_cached(manifest_path, args.check_paths, cache_dir, executor)
+    if args.report:
+        document = sarif_report([(manifest_path, run)]) if fmt == "sarif" else json_report(run, manifest_path, args.check_paths)
+        write_report(document, args.report)
+    sys.exit(report(run.issues))
 
 
 if __name__ == "__main__":